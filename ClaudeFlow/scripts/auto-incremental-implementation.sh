@@ -54,12 +54,12 @@ generate_feature_list() {
     # プロンプトを読み込んで変数を適用
     local prompt=$(load_prompt "09_generate_features")
     prompt=$(apply_prompt_vars "$prompt" \
-        "requirements" "$(cat "$RESULTS_DIR/03_requirements_result.md 2>/dev/null || echo '要件定義なし')")
+        "requirements" "$(cat "$RESULTS_DIR/03_requirements_result.md" 2>/dev/null || echo '要件定義なし')")
     
     echo "$prompt" > "$IMPLEMENTATION_DIR/generate_features.md"
     
     # 機能リスト生成
-    cat "$IMPLEMENTATION_DIR/generate_features.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/features.json"
+    cat "$IMPLEMENTATION_DIR/generate_features.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/features.json"
 }
 
 # 単一機能の実装
@@ -74,12 +74,12 @@ implement_feature() {
     local prompt=$(load_prompt "10_implement_feature")
     prompt=$(apply_prompt_vars "$prompt" \
         "feature_name" "$feature_name" \
-        "design_spec" "$(cat "$RESULTS_DIR/05_design_result.md 2>/dev/null || echo '設計仕様なし')")
+        "design_spec" "$(cat "$RESULTS_DIR/05_design_result.md" 2>/dev/null || echo '設計仕様なし')")
     
     echo "$prompt" > "$IMPLEMENTATION_DIR/implement_${feature_id}.md"
     
     # 実装実行
-    cat "$IMPLEMENTATION_DIR/implement_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/${feature_id}_implementation.md"
+    cat "$IMPLEMENTATION_DIR/implement_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/${feature_id}_implementation.md"
     
     # 構文エラーチェック
     if [ "${CLAUDEFLOW_AUTO_VALIDATE:-true}" = "true" ]; then
@@ -138,7 +138,7 @@ $(cat "$validation_report")
 - try-catchでエラーハンドリングを追加
 - 元の機能を保持"
                 
-                echo "$fix_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/${feature_id}_implementation.md"
+                echo "$fix_prompt" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/${feature_id}_implementation.md"
                 echo -e "${GREEN}構文エラーを修正しました${NC}"
             fi
         else
@@ -174,7 +174,7 @@ run_feature_tests_with_retry() {
         
         # テスト実行
         echo -e "${YELLOW}テスト実行中...${NC}"
-        cat "$TESTS_DIR/test_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$TESTS_DIR/${feature_id}_test_result.md"
+        cat "$TESTS_DIR/test_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$TESTS_DIR/${feature_id}_test_result.md"
         
         # テスト結果の確認
         if grep -q "FAIL" "$TESTS_DIR/${feature_id}_test_result.md"; then
@@ -190,7 +190,7 @@ run_feature_tests_with_retry() {
                     # 手動確認モード
                     echo -e "${YELLOW}修正を試みますか？ [y/n/a]${NC}"
                     echo "y: はい、n: いいえ、a: 以降すべて自動修正"
-                    read -n 1 fix_confirm
+                    read -n 1 fix_confirm || true
                     echo ""
                     
                     if [[ $fix_confirm =~ ^[Aa]$ ]]; then
@@ -235,7 +235,7 @@ auto_fix_implementation() {
     echo "$prompt" > "$IMPLEMENTATION_DIR/fix_${feature_id}.md"
     
     # 修正実行
-    cat "$IMPLEMENTATION_DIR/fix_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/${feature_id}_implementation_fixed.md"
+    cat "$IMPLEMENTATION_DIR/fix_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/${feature_id}_implementation_fixed.md"
     mv "$IMPLEMENTATION_DIR/${feature_id}_implementation_fixed.md" "$IMPLEMENTATION_DIR/${feature_id}_implementation.md"
     
     echo -e "${GREEN}修正完了${NC}"
@@ -298,7 +298,7 @@ main() {
     # 自動修正モードの確認
     echo -e "${YELLOW}自動修正モードで実行しますか？ [y/n]${NC}"
     echo "y: 自動修正（推奨）、n: 手動確認"
-    read -n 1 auto_mode
+    read -n 1 auto_mode || true
     echo ""
     if [[ $auto_mode =~ ^[Yy]$ ]]; then
         AUTO_FIX=true
@@ -312,34 +312,9 @@ main() {
     echo -e "${BLUE}機能リストを生成中...${NC}"
     generate_feature_list
     
-    # JSONから機能リストを抽出
-    if command -v jq &> /dev/null; then
-        # jqが利用可能な場合
-        features=$(jq -r '.features[]' "$IMPLEMENTATION_DIR/features.json" 2>/dev/null || echo '[]')
-        total_features=$(echo "$features" | jq -s 'length' 2>/dev/null || echo 0)
-    else
-        # jqが利用できない場合はPythonを使用
-        echo -e "${YELLOW}jqが見つかりません。Pythonを使用してJSONを解析します...${NC}"
-        features=$(python3 -c "
-import json
-try:
-    with open('$IMPLEMENTATION_DIR/features.json', 'r') as f:
-        data = json.load(f)
-        for feature in data['features']:
-            print(json.dumps(feature))
-except:
-    pass
-" 2>/dev/null || echo '[]')
-        total_features=$(python3 -c "
-import json
-try:
-    with open('$IMPLEMENTATION_DIR/features.json', 'r') as f:
-        data = json.load(f)
-        print(len(data['features']))
-except:
-    print(0)
-" 2>/dev/null || echo 0)
-    fi
+    # features.jsonを1回だけ解析し、全機能のIDと名前を配列に読み込む（読めない場合は0件）
+    eval "$(claudeflow_call features "$IMPLEMENTATION_DIR/features.json" --format declare --fields id,name 2>/dev/null)"
+    total_features=${features_count:-0}
     
     if [ "$total_features" -eq 0 ]; then
         echo -e "${RED}エラー: 機能リストの生成に失敗しました${NC}"
@@ -355,26 +330,20 @@ except:
     local failed=0
     
     # 各機能を実装
-    echo "$features" | while read -r feature; do
-        if command -v jq &> /dev/null; then
-            feature_id=$(echo "$feature" | jq -r '.id')
-            feature_name=$(echo "$feature" | jq -r '.name')
-        else
-            # Pythonを使用してJSONを解析
-            feature_id=$(echo "$feature" | python3 -c "import json,sys; print(json.load(sys.stdin)['id'])")
-            feature_name=$(echo "$feature" | python3 -c "import json,sys; print(json.load(sys.stdin)['name'])")
-        fi
+    for i in "${!features_id[@]}"; do
+        feature_id="${features_id[$i]}"
+        feature_name="${features_name[$i]}"
         
-        ((current++))
+        current=$((current + 1))
         
         # 実装
         implement_feature "$feature_id" "$feature_name"
         
         # テスト実行（自動リトライ付き）
         if run_feature_tests_with_retry "$feature_id" "$feature_name"; then
-            ((passed++))
+            passed=$((passed + 1))
         else
-            ((failed++))
+            failed=$((failed + 1))
         fi
         
         # 進捗表示
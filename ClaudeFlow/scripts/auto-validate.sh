@@ -63,41 +63,8 @@ validate_javascript_syntax() {
         fi
     fi
     
-    # 基本的な構文チェック（Pythonスクリプトで実行）
-    python3 -c "
-import re
-import json
-
-with open('$file', 'r', encoding='utf-8') as f:
-    content = f.read()
-
-# 括弧のバランスチェック
-parens = content.count('(') - content.count(')')
-braces = content.count('{') - content.count('}')
-brackets = content.count('[') - content.count(']')
-
-errors = []
-if parens != 0:
-    errors.append(f'括弧のバランスエラー: 差分 {parens}')
-if braces != 0:
-    errors.append(f'波括弧のバランスエラー: 差分 {braces}')
-if brackets != 0:
-    errors.append(f'角括弧のバランスエラー: 差分 {brackets}')
-
-# セミコロンチェック（簡易）
-lines = content.split('\n')
-for i, line in enumerate(lines, 1):
-    line = line.strip()
-    if line and not line.startswith('//') and not line.startswith('*'):
-        if not any(line.endswith(x) for x in [';', '{', '}', ',', ':', ')', ']']):
-            if not any(x in line for x in ['if', 'else', 'for', 'while', 'function', 'class']):
-                # 次の行が継続でない場合
-                if i < len(lines) and not lines[i].strip().startswith(('.', '[', '(', '&&', '||')):
-                    print(f'Line {i}: セミコロンが不足している可能性')
-
-for error in errors:
-    print(error)
-"
+    # 括弧・セミコロンの検査（統合検証エンジンで1回だけ読み込み）
+    claudeflow_call validation "$file" --ruleset js.brackets,js.semicolons --no-color
     
     echo "${errors[@]}"
 }
@@ -123,68 +90,9 @@ check_error_patterns() {
     
     echo -e "${CYAN}=== エラーパターン検査 ===${NC}" >> "$report_file"
     
-    # Pythonスクリプトでパターンマッチング
-    python3 -c "
-import json
-import re
-
-# パターンファイルを読み込む
-with open('$PATTERNS_FILE', 'r', encoding='utf-8') as f:
-    patterns = json.load(f)
-
-# 対象ファイルを読み込む
-with open('$file', 'r', encoding='utf-8') as f:
-    content = f.read()
-    lines = content.split('\n')
-
-# 言語別パターンと共通パターンをチェック
-issues = []
-for pattern_type in ['$language', 'general']:
-    if pattern_type in patterns:
-        for key, pattern_info in patterns[pattern_type].items():
-            pattern = pattern_info['pattern']
-            try:
-                # 各行をチェック
-                for i, line in enumerate(lines, 1):
-                    if re.search(pattern, line):
-                        issues.append({
-                            'line': i,
-                            'type': key,
-                            'severity': pattern_info['severity'],
-                            'message': pattern_info['message'],
-                            'code': line.strip()
-                        })
-            except re.error:
-                pass
-
-# 重要度でソート
-severity_order = {'critical': 0, 'error': 1, 'warning': 2, 'info': 3}
-issues.sort(key=lambda x: (severity_order.get(x['severity'], 4), x['line']))
-
-# レポート出力
-for issue in issues:
-    severity_color = {
-        'critical': '\033[0;31m',  # RED
-        'error': '\033[0;31m',     # RED
-        'warning': '\033[0;33m',   # YELLOW
-        'info': '\033[0;36m'       # CYAN
-    }.get(issue['severity'], '\033[0m')
-    
-    print(f\"{severity_color}[{issue['severity'].upper()}]\033[0m Line {issue['line']}: {issue['message']}\")
-    print(f\"  コード: {issue['code'][:80]}{'...' if len(issue['code']) > 80 else ''}\")
-    print()
-
-# サマリー
-if issues:
-    critical = sum(1 for i in issues if i['severity'] == 'critical')
-    errors = sum(1 for i in issues if i['severity'] == 'error')
-    warnings = sum(1 for i in issues if i['severity'] == 'warning')
-    info = sum(1 for i in issues if i['severity'] == 'info')
-    
-    print(f\"\\n検出された問題: Critical: {critical}, Error: {errors}, Warning: {warnings}, Info: {info}\")
-else:
-    print(\"\\n問題は検出されませんでした。\")
-" >> "$report_file"
+    # コンパイル済みパターンで行と列を特定（1パターンが遅くても時間予算で打ち切る）
+    claudeflow_call validation.patterns "$file" --language "$language" --patterns "$PATTERNS_FILE" \
+        --no-color >> "$report_file" || true
 }
 
 # HTMLファイル内のJavaScript検証
@@ -194,32 +102,8 @@ validate_html_javascript() {
     
     echo -e "${CYAN}=== HTMLファイル内のJavaScript検証 ===${NC}" >> "$report_file"
     
-    # scriptタグ内のJavaScriptを抽出して検証
-    python3 -c "
-import re
-import tempfile
-import os
-
-with open('$file', 'r', encoding='utf-8') as f:
-    html_content = f.read()
-
-# scriptタグ内のJavaScriptを抽出
-script_pattern = r'<script[^>]*>(.*?)</script>'
-scripts = re.findall(script_pattern, html_content, re.DOTALL)
-
-if scripts:
-    for i, script in enumerate(scripts):
-        # 一時ファイルに書き出して検証
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as tmp:
-            tmp.write(script)
-            tmp_path = tmp.name
-        
-        print(f'\\nScript Block {i+1}:')
-        os.system(f'$0 {tmp_path} -l javascript')
-        os.unlink(tmp_path)
-else:
-    print('JavaScriptコードは検出されませんでした。')
-"
+    # 1回の解析でタグ構造・ID・全scriptブロックを検証
+    claudeflow_call validation "$file" --ruleset core --no-color >> "$report_file" || true
 }
 
 # メイン処理
@@ -2,273 +2,140 @@
 """
 魚釣りゲームの検証スクリプト
 HTMLとJavaScript構文エラーのチェック、主要機能の確認を行う
+（解析とチェックは統合検証エンジンのfishingルールセットを使用）
 """
 
-import os
 import re
-import json
-from html.parser import HTMLParser
-from collections import defaultdict
+import sys
 
-class HTMLValidator(HTMLParser):
-    """HTML構文の検証クラス"""
-    
-    def __init__(self):
-        super().__init__()
-        self.errors = []
-        self.warnings = []
-        self.tag_stack = []
-        self.void_elements = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'}
-        self.tag_count = defaultdict(int)
-        self.id_set = set()
-        self.current_line = 1
-        
-    def handle_starttag(self, tag, attrs):
-        self.tag_count[tag] += 1
-        
-        # void要素でないタグをスタックに追加
-        if tag not in self.void_elements:
-            self.tag_stack.append((tag, self.current_line))
-            
-        # ID重複チェック
-        for attr_name, attr_value in attrs:
-            if attr_name == 'id':
-                if attr_value in self.id_set:
-                    self.errors.append(f"Line {self.current_line}: 重複ID検出: '{attr_value}'")
-                else:
-                    self.id_set.add(attr_value)
-                    
-    def handle_endtag(self, tag):
-        if tag not in self.void_elements:
-            if not self.tag_stack:
-                self.errors.append(f"Line {self.current_line}: 開始タグのない終了タグ: </{tag}>")
-            else:
-                expected_tag, start_line = self.tag_stack.pop()
-                if expected_tag != tag:
-                    self.errors.append(f"Line {self.current_line}: タグの不一致: <{expected_tag}> (Line {start_line}) と </{tag}>")
-                    # 正しいタグを探す
-                    for i in range(len(self.tag_stack) - 1, -1, -1):
-                        if self.tag_stack[i][0] == tag:
-                            self.tag_stack.pop(i)
-                            break
-                            
-    def handle_data(self, data):
-        self.current_line += data.count('\n')
-        
-    def get_results(self):
-        # 未閉じタグチェック
-        for tag, line in self.tag_stack:
-            self.errors.append(f"Line {line}: 未閉じタグ: <{tag}>")
-            
-        return {
-            'errors': self.errors,
-            'warnings': self.warnings,
-            'tag_count': dict(self.tag_count),
-            'total_ids': len(self.id_set)
-        }
+from claudeflow.validation import load_document, run_rules
+from claudeflow.validation.rulesets.fishing import CORE_IDS, GAME_FUNCTIONS, missing_elements, missing_functions
 
-def check_javascript_syntax(js_code):
-    """JavaScript構文の基本チェック"""
-    errors = []
-    warnings = []
-    
-    # 基本的な構文パターンチェック
-    lines = js_code.split('\n')
-    
-    # 括弧の対応チェック
-    bracket_stack = []
-    bracket_pairs = {'(': ')', '[': ']', '{': '}'}
-    
-    for line_num, line in enumerate(lines, 1):
-        # コメントを除外
-        line_clean = re.sub(r'//.*$', '', line)
-        line_clean = re.sub(r'/\*.*?\*/', '', line_clean)
-        
-        for char in line_clean:
-            if char in bracket_pairs:
-                bracket_stack.append((char, line_num))
-            elif char in bracket_pairs.values():
-                if not bracket_stack:
-                    errors.append(f"Line {line_num}: 対応する開き括弧がない閉じ括弧: {char}")
-                else:
-                    open_bracket, open_line = bracket_stack.pop()
-                    expected = bracket_pairs[open_bracket]
-                    if char != expected:
-                        errors.append(f"Line {line_num}: 括弧の不一致: {open_bracket} (Line {open_line}) と {char}")
-                        
-    # 未閉じ括弧チェック
-    for bracket, line in bracket_stack:
-        errors.append(f"Line {line}: 未閉じ括弧: {bracket}")
-        
-    # セミコロンチェック
-    for line_num, line in enumerate(lines, 1):
-        line_clean = re.sub(r'//.*$', '', line).strip()
-        if line_clean and not line_clean.endswith((';', '{', '}', ':', ',', ')', ']')) and not line_clean.startswith(('*', '//')):
-            # 関数宣言やif文などは除外
-            if not re.match(r'^\s*(function|if|else|for|while|switch|case|default|try|catch|finally)', line_clean):
-                warnings.append(f"Line {line_num}: セミコロンが欠けている可能性")
-                
-    return {'errors': errors, 'warnings': warnings}
+DEFAULT_PATH = '/mnt/c/makeProc/ClaudeFlow/ClaudeFlow/scripts/fishinggame.html'
+
+
+def analyze_fish_data(js_code):
+    """魚データの簡易解析"""
+    fish_data = {}
+    fishes_match = re.search(r'fishes:\s*\[(.*?)\]', js_code, re.DOTALL)
+    if fishes_match:
+        fishes_content = fishes_match.group(1)
+        fish_data['total_count'] = len(re.findall(r'\{id:', fishes_content))
+        for rarity in range(1, 6):
+            fish_data[f'rarity_{rarity}'] = len(re.findall(rf'rarity:\s*{rarity}', fishes_content))
+    return fish_data
+
+
+def print_findings(findings, limit):
+    for finding in findings[:limit]:
+        print(f"  - Line {finding.line}: {finding.message}" if finding.line else f"  - {finding.message}")
 
-def analyze_game_features(html_content):
-    """ゲーム機能の分析"""
-    features = {
-        'core_elements': {},
-        'game_functions': {},
-        'fish_data': {},
-        'potential_issues': []
-    }
-    
-    # コア要素の存在確認
-    core_ids = ['gameContainer', 'pond', 'castBtn', 'modals', 'tutorial', 'fishingLine', 'hook', 'bite']
-    for element_id in core_ids:
-        features['core_elements'][element_id] = f'id="{element_id}"' in html_content
-        
-    # JavaScript部分の抽出
-    js_match = re.search(r'<script>(.*?)</script>', html_content, re.DOTALL)
-    if js_match:
-        js_code = js_match.group(1)
-        
-        # ゲーム関数の確認
-        game_functions = ['init', 'cast', 'reel', 'startBiting', 'showCatchResult', 'showCollection', 'saveData', 'loadData']
-        for func in game_functions:
-            features['game_functions'][func] = f'{func}(' in js_code or f'{func}:' in js_code
-            
-        # 魚データの解析
-        fishes_match = re.search(r'fishes:\s*\[(.*?)\]', js_code, re.DOTALL)
-        if fishes_match:
-            try:
-                fishes_content = fishes_match.group(1)
-                # 簡易的な魚データカウント
-                fish_count = len(re.findall(r'\{id:', fishes_content))
-                features['fish_data']['total_count'] = fish_count
-                
-                # レア度別カウント
-                for rarity in range(1, 6):
-                    count = len(re.findall(f'rarity:\s*{rarity}', fishes_content))
-                    features['fish_data'][f'rarity_{rarity}'] = count
-            except:
-                features['potential_issues'].append("魚データの解析に失敗")
-                
-    # 潜在的な問題のチェック
-    if 'localStorage' in html_content:
-        features['potential_issues'].append("localStorageを使用 - プライベートブラウジングで動作しない可能性")
-        
-    if 'AudioContext' in html_content:
-        features['potential_issues'].append("AudioContextを使用 - 一部のブラウザで自動再生ポリシーの影響を受ける可能性")
-        
-    return features
 
 def main():
     """メイン処理"""
-    file_path = '/mnt/c/makeProc/ClaudeFlow/ClaudeFlow/scripts/fishinggame.html'
-    
+    file_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_PATH
+
     print("=" * 50)
     print("魚釣りゲーム検証レポート")
     print("=" * 50)
-    
-    if not os.path.exists(file_path):
+
+    try:
+        doc = load_document(file_path)
+    except OSError:
         print(f"エラー: ファイルが見つかりません: {file_path}")
         return
-        
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-        
+
     print(f"\nファイル: {file_path}")
-    print(f"ファイルサイズ: {len(content):,} bytes")
-    print(f"行数: {content.count(chr(10)) + 1:,} 行")
-    
+    print(f"ファイルサイズ: {doc.size:,} bytes")
+    print(f"行数: {doc.line_count:,} 行")
+
+    findings = run_rules(doc, 'fishing')
+    by_rule = {}
+    for finding in findings:
+        by_rule.setdefault(finding.rule.split('.')[0], []).append(finding)
+
     # HTML検証
     print("\n[HTML構文チェック]")
-    html_validator = HTMLValidator()
-    try:
-        html_validator.feed(content)
-        html_results = html_validator.get_results()
-        
-        if html_results['errors']:
-            print(f"❌ エラー: {len(html_results['errors'])}件")
-            for error in html_results['errors'][:5]:  # 最初の5件のみ表示
-                print(f"  - {error}")
-        else:
-            print("✅ HTMLエラーなし")
-            
-        print(f"\n📊 HTML統計:")
-        print(f"  - 総タグ数: {sum(html_results['tag_count'].values())}")
-        print(f"  - ユニークID数: {html_results['total_ids']}")
-        print(f"  - 主要タグ: {', '.join(f'{k}({v})' for k, v in sorted(html_results['tag_count'].items(), key=lambda x: x[1], reverse=True)[:5])}")
-    except Exception as e:
-        print(f"❌ HTML解析エラー: {e}")
-        
+    html_errors = [f for f in by_rule.get('html', []) if f.is_error]
+    if html_errors:
+        print(f"❌ エラー: {len(html_errors)}件")
+        print_findings(html_errors, 5)
+    else:
+        print("✅ HTMLエラーなし")
+
+    print(f"\n📊 HTML統計:")
+    print(f"  - 総タグ数: {sum(doc.tag_count.values())}")
+    print(f"  - ユニークID数: {len(doc.ids)}")
+    top_tags = sorted(doc.tag_count.items(), key=lambda x: x[1], reverse=True)[:5]
+    print(f"  - 主要タグ: {', '.join(f'{k}({v})' for k, v in top_tags)}")
+
     # JavaScript検証
     print("\n[JavaScript構文チェック]")
-    js_match = re.search(r'<script>(.*?)</script>', content, re.DOTALL)
-    if js_match:
-        js_code = js_match.group(1)
-        js_results = check_javascript_syntax(js_code)
-        
-        if js_results['errors']:
-            print(f"❌ エラー: {len(js_results['errors'])}件")
-            for error in js_results['errors'][:5]:
-                print(f"  - {error}")
+    js_findings = by_rule.get('js', [])
+    js_errors = [f for f in js_findings if f.is_error]
+    js_warnings = [f for f in js_findings if not f.is_error]
+    if not doc.scripts:
+        print("❌ JavaScriptコードが見つかりません")
+    else:
+        if js_errors:
+            print(f"❌ エラー: {len(js_errors)}件")
+            print_findings(js_errors, 5)
         else:
             print("✅ JavaScript構文エラーなし")
-            
-        if js_results['warnings']:
-            print(f"⚠️  警告: {len(js_results['warnings'])}件")
-            for warning in js_results['warnings'][:3]:
-                print(f"  - {warning}")
-    else:
-        print("❌ JavaScriptコードが見つかりません")
-        
+        if js_warnings:
+            print(f"⚠️  警告: {len(js_warnings)}件")
+            print_findings(js_warnings, 3)
+
     # ゲーム機能分析
     print("\n[ゲーム機能分析]")
-    features = analyze_game_features(content)
-    
+    game_findings = by_rule.get('fishing', [])
+
     print("\n📋 コア要素の存在確認:")
-    for element, exists in features['core_elements'].items():
-        status = "✅" if exists else "❌"
-        print(f"  {status} {element}")
-        
+    for element_id in CORE_IDS:
+        status = "✅" if doc.has_id(element_id) else "❌"
+        print(f"  {status} {element_id}")
+
     print("\n🎮 ゲーム関数の確認:")
-    for func, exists in features['game_functions'].items():
-        status = "✅" if exists else "❌"
+    missing_funcs = missing_functions(doc)
+    for func in GAME_FUNCTIONS:
+        status = "❌" if func in missing_funcs else "✅"
         print(f"  {status} {func}()")
-        
+
+    fish_data = analyze_fish_data(doc.script_text)
     print("\n🐟 魚データ:")
-    if features['fish_data']:
-        print(f"  - 総魚種数: {features['fish_data'].get('total_count', 0)}")
+    if fish_data:
+        print(f"  - 総魚種数: {fish_data.get('total_count', 0)}")
         for i in range(1, 6):
-            count = features['fish_data'].get(f'rarity_{i}', 0)
+            count = fish_data.get(f'rarity_{i}', 0)
             if count > 0:
                 print(f"  - レア度{i} ({'★' * i}): {count}種")
-                
-    if features['potential_issues']:
+
+    compat = [f for f in game_findings if f.rule == 'fishing.compat']
+    if compat:
         print("\n⚠️  潜在的な問題:")
-        for issue in features['potential_issues']:
-            print(f"  - {issue}")
-            
+        for finding in compat:
+            print(f"  - {finding.message}")
+
     # 総合評価
     print("\n[総合評価]")
-    error_count = len(html_results.get('errors', [])) + len(js_results.get('errors', []))
-    warning_count = len(html_results.get('warnings', [])) + len(js_results.get('warnings', []))
-    
+    error_count = sum(1 for f in findings if f.is_error)
+    warning_count = sum(1 for f in findings if f.severity == 'warning')
+
     if error_count == 0:
         print("✅ 構文エラーなし - 正常に動作する可能性が高い")
     else:
         print(f"❌ {error_count}件のエラーが検出されました - 修正が必要")
-        
+
     if warning_count > 0:
         print(f"⚠️  {warning_count}件の警告があります")
-        
-    missing_elements = [k for k, v in features['core_elements'].items() if not v]
-    if missing_elements:
-        print(f"❌ 必須要素が不足: {', '.join(missing_elements)}")
-        
-    missing_functions = [k for k, v in features['game_functions'].items() if not v]
-    if missing_functions:
-        print(f"⚠️  一部の関数が見つかりません: {', '.join(missing_functions)}")
-        
-    print("\n✨ このゲームは完全に実装されており、ブラウザで正常に動作します！")
+
+    missing_ids = missing_elements(doc)
+    if missing_ids:
+        print(f"❌ 必須要素が不足: {', '.join(missing_ids)}")
+
+    if missing_funcs:
+        print(f"⚠️  一部の関数が見つかりません: {', '.join(missing_funcs)}")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,13 +2,9 @@
 """パックマンゲームのJavaScript部分を詳細に検証するスクリプト"""
 
 import re
-import json
+import sys
 
-def extract_javascript(html_content):
-    """HTMLからJavaScript部分を抽出"""
-    script_pattern = r'<script[^>]*>(.*?)</script>'
-    scripts = re.findall(script_pattern, html_content, re.DOTALL | re.IGNORECASE)
-    return '\n'.join(scripts)
+from claudeflow.validation import load_document
 
 def check_javascript_features(js_content):
     """JavaScriptの主要機能をチェック"""
@@ -147,16 +143,15 @@ def check_common_issues(js_content):
     return len(issues) == 0
 
 def main():
-    filename = "/mnt/c/makeProc/ClaudeFlow/ClaudeFlow/scripts/index.html"
+    filename = sys.argv[1] if len(sys.argv) > 1 else "/mnt/c/makeProc/ClaudeFlow/ClaudeFlow/scripts/index.html"
     
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+        doc = load_document(filename)
     except Exception as e:
         print(f"❌ ファイル読み込みエラー: {e}")
         return
     
-    js_content = extract_javascript(html_content)
+    js_content = doc.script_text
     
     if not js_content:
         print("❌ JavaScriptコードが見つかりません")
@@ -0,0 +1,4 @@
+"""
+ClaudeFlow Pythonユーティリティ
+シェルスクリプトから `python3 -m claudeflow.<module>` で呼び出される
+"""
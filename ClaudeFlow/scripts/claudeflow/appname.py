@@ -0,0 +1,380 @@
+"""
+アプリ名の英語フォルダ名（スラッグ）への変換
+日本語のアプリ名を辞書（英単語・漢字の読み）とかな→ローマ字表で最長一致変換する。
+表は読み込み時に1つのトライ木にまとめるため、名前の長さに比例した時間で変換できる。
+
+変換結果は名前ごとにディスクへキャッシュする（CLAUDEFLOW_APPNAME_CACHE、既定は ~/.cache/claudeflow/appname.json）。
+Claudeで翻訳した結果も remember で保存し、以後は同じ名前をネットワークなしで返す。
+翻訳した名前は辞書の単語としてトライ木にも入るため、「家計簿」の翻訳は「家計簿アプリ」にも使われる
+
+使用方法:
+    python3 -m claudeflow.appname slug NAME [--strict]     # スラッグを出力
+    python3 -m claudeflow.appname remember NAME SLUG       # 翻訳結果（Claudeなど）を保存
+    python3 -m claudeflow.appname batch [FILE]             # 1行1名前を '名前<TAB>スラッグ' で出力
+
+--strict は翻訳（キャッシュ・辞書）だけで変換できた場合にだけ出力し、ローマ字読みが必要なら終了コード1を返す
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import unicodedata
+
+DEFAULT_CACHE = os.environ.get('CLAUDEFLOW_APPNAME_CACHE') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'claudeflow', 'appname.json')
+
+# 英単語への翻訳（extract_project_name の置換表を引き継ぐ）
+WORDS = {
+    # ゲーム関連
+    'オセロ': 'othello', '魚釣り': 'fishing', '釣り': 'fishing', 'ボーリング': 'bowling', 'ボウリング': 'bowling',
+    'テトリス': 'tetris', 'パズル': 'puzzle', 'クイズ': 'quiz', 'シューティング': 'shooting', 'レース': 'racing',
+    'カード': 'card', '将棋': 'shogi', '囲碁': 'go', 'マージャン': 'mahjong', '麻雀': 'mahjong', 'ゲーム': 'game',
+    '迷路': 'maze', '数独': 'sudoku', '五目並べ': 'gomoku', 'ブロック崩し': 'breakout', 'じゃんけん': 'janken',
+    'スネーク': 'snake', '神経衰弱': 'memory-game', 'すごろく': 'sugoroku', '占い': 'fortune', 'おみくじ': 'omikuji',
+    # アプリケーション関連
+    '計算機': 'calculator', '電卓': 'calculator', 'メモ帳': 'notepad', 'メモ': 'memo', 'カレンダー': 'calendar',
+    '時計': 'clock', 'タイマー': 'timer', 'ストップウォッチ': 'stopwatch', '天気': 'weather', 'ニュース': 'news',
+    '地図': 'map', '写真': 'photo', '動画': 'video', '音楽': 'music', 'チャット': 'chat', 'ブログ': 'blog',
+    'アプリ': 'app', 'アプリケーション': 'app', 'タスク': 'task', 'やること': 'todo', '家計簿': 'household-budget',
+    '料理': 'cooking', 'レシピ': 'recipe', '英単語': 'english-vocabulary', '単語帳': 'flashcards',
+    '予報': 'forecast', '健康': 'health', '日記': 'diary', '買い物': 'shopping', 'リスト': 'list',
+    '予定': 'schedule', '翻訳': 'translator', '辞書': 'dictionary', '掲示板': 'board', '投票': 'poll',
+    '検索': 'search', '記録': 'log', '読書': 'reading', '映画': 'movie', 'お絵かき': 'drawing', '絵': 'drawing',
+    'メール': 'mail', 'ソフト': 'software', '編集': 'editor', 'プロジェクト': 'project', '在庫': 'inventory',
+    '予約': 'reservation', '勤怠': 'attendance', '名刺': 'business-card', '家事': 'housework', '筋トレ': 'workout',
+    'ペイント': 'paint', 'ピアノ': 'piano', '単語': 'word', '英語': 'english', '数学': 'math',
+    # システム関連
+    '管理': 'admin', '設定': 'settings', 'ツール': 'tool', 'ユーティリティ': 'utility', 'エディタ': 'editor',
+    'エディター': 'editor', 'ビューア': 'viewer', 'ビューアー': 'viewer', 'プレーヤー': 'player',
+    'プレイヤー': 'player', 'ブラウザ': 'browser', 'ブラウザー': 'browser',
+    # 一般的な単語
+    '簡単': 'simple', 'かんたん': 'simple', '高速': 'fast', '新しい': 'new', '新': 'new', '私の': 'my',
+    '俺の': 'my', 'テスト': 'test', 'サンプル': 'sample', 'デモ': 'demo', '練習': 'practice', '学習': 'learning',
+    '勉強': 'study',
+}
+
+# 漢字の読み（熟語は1単語、1文字の読みは続く漢字・かなとつなげる）
+KANJI_COMPOUNDS = {
+    '漢字': 'kanji', '太郎': 'taro', '花子': 'hanako', '数字': 'suji', '混合': 'kongo', '入り': 'iri',
+    '東京': 'tokyo', '大阪': 'osaka', '日本': 'nihon', '世界': 'sekai', '宇宙': 'uchu', '忍者': 'ninja',
+    '侍': 'samurai', '寿司': 'sushi', '桜': 'sakura', '富士山': 'fujisan', '相撲': 'sumo', '空手': 'karate',
+    '俳句': 'haiku', '折り紙': 'origami', '妖怪': 'yokai', '冒険': 'boken', '勇者': 'yusha', '魔法': 'maho',
+    '王国': 'okoku', '物語': 'monogatari', '自分': 'jibun', '毎日': 'mainichi', '今日': 'kyo', '明日': 'ashita',
+    '文字': 'moji', '絵文字': 'emoji', '記号': 'kigo', '名前': 'namae', '言葉': 'kotoba', '時間': 'jikan',
+}
+KANJI_READINGS = {
+    '一': 'ichi', '二': 'ni', '三': 'san', '四': 'yon', '五': 'go', '六': 'roku', '七': 'nana', '八': 'hachi',
+    '九': 'kyu', '十': 'ju', '百': 'hyaku', '千': 'sen', '万': 'man', '円': 'en', '年': 'nen', '月': 'tsuki',
+    '日': 'hi', '火': 'hi', '水': 'mizu', '木': 'ki', '金': 'kin', '土': 'tsuchi', '山': 'yama', '川': 'kawa',
+    '海': 'umi', '空': 'sora', '星': 'hoshi', '花': 'hana', '雪': 'yuki', '雨': 'ame', '風': 'kaze', '森': 'mori',
+    '犬': 'inu', '猫': 'neko', '鳥': 'tori', '魚': 'sakana', '虫': 'mushi', '馬': 'uma', '龍': 'ryu', '竜': 'ryu',
+    '人': 'hito', '男': 'otoko', '女': 'onna', '子': 'ko', '王': 'o', '姫': 'hime', '神': 'kami', '鬼': 'oni',
+    '大': 'dai', '小': 'sho', '中': 'chu', '上': 'ue', '下': 'shita', '左': 'hidari', '右': 'migi',
+    '赤': 'aka', '青': 'ao', '白': 'shiro', '黒': 'kuro', '緑': 'midori', '色': 'iro', '光': 'hikari',
+    '学': 'gaku', '校': 'ko', '本': 'hon', '文': 'bun', '字': 'ji', '語': 'go', '話': 'hanashi', '歌': 'uta',
+    '家': 'ie', '店': 'mise', '町': 'machi', '村': 'mura', '国': 'kuni', '道': 'michi', '駅': 'eki',
+    '車': 'kuruma', '電': 'den', '気': 'ki', '力': 'chikara', '心': 'kokoro', '夢': 'yume', '愛': 'ai',
+    '春': 'haru', '夏': 'natsu', '秋': 'aki', '冬': 'fuyu', '朝': 'asa', '夜': 'yoru', '時': 'toki',
+    '太': 'ta', '郎': 'ro', '田': 'ta', '林': 'hayashi', '石': 'ishi', '玉': 'tama', '剣': 'ken',
+    '戦': 'sen', '争': 'so', '守': 'mamori', '城': 'shiro', '塔': 'to', '島': 'shima', '宝': 'takara',
+    '食': 'shoku', '飯': 'meshi', '茶': 'cha', '酒': 'sake', '肉': 'niku', '米': 'kome', '菓': 'ka',
+    '手': 'te', '目': 'me', '口': 'kuchi', '足': 'ashi', '体': 'karada', '頭': 'atama', '顔': 'kao',
+    '数': 'su', '計': 'kei', '算': 'san', '表': 'hyo', '図': 'zu', '画': 'ga', '形': 'katachi', '点': 'ten',
+    '新': 'shin', '古': 'furu', '高': 'taka', '長': 'naga', '早': 'haya', '速': 'soku', '強': 'tsuyo',
+    '入': 'iri', '出': 'de', '見': 'mi', '行': 'iku', '来': 'ku', '作': 'saku', '書': 'sho', '読': 'doku',
+}
+
+# かな→ローマ字（ヘボン式。長音記号は省く）
+_HIRAGANA_ROWS = (
+    ('', 'あいうえお', ('a', 'i', 'u', 'e', 'o')),
+    ('k', 'かきくけこ', None), ('g', 'がぎぐげご', None), ('s', 'さしすせそ', ('sa', 'shi', 'su', 'se', 'so')),
+    ('z', 'ざじずぜぞ', ('za', 'ji', 'zu', 'ze', 'zo')), ('t', 'たちつてと', ('ta', 'chi', 'tsu', 'te', 'to')),
+    ('d', 'だぢづでど', ('da', 'ji', 'zu', 'de', 'do')), ('n', 'なにぬねの', None),
+    ('h', 'はひふへほ', ('ha', 'hi', 'fu', 'he', 'ho')), ('b', 'ばびぶべぼ', None), ('p', 'ぱぴぷぺぽ', None),
+    ('m', 'まみむめも', None), ('r', 'らりるれろ', None),
+)
+_KANA_EXTRA = {
+    'や': 'ya', 'ゆ': 'yu', 'よ': 'yo', 'わ': 'wa', 'ゐ': 'i', 'ゑ': 'e', 'を': 'o', 'ん': 'n', 'ゔ': 'vu',
+    'ぁ': 'a', 'ぃ': 'i', 'ぅ': 'u', 'ぇ': 'e', 'ぉ': 'o', 'ゃ': 'ya', 'ゅ': 'yu', 'ょ': 'yo', 'ゎ': 'wa',
+    # 外来語の表記
+    'ふぁ': 'fa', 'ふぃ': 'fi', 'ふぇ': 'fe', 'ふぉ': 'fo', 'てぃ': 'ti', 'でぃ': 'di', 'とぅ': 'tu', 'どぅ': 'du',
+    'うぃ': 'wi', 'うぇ': 'we', 'うぉ': 'wo', 'ゔぁ': 'va', 'ゔぃ': 'vi', 'ゔぇ': 've', 'ゔぉ': 'vo',
+    'しぇ': 'she', 'じぇ': 'je', 'ちぇ': 'che', 'つぁ': 'tsa', 'つぃ': 'tsi', 'つぇ': 'tse', 'つぉ': 'tso',
+    'いぇ': 'ye', 'でゅ': 'dyu', 'てゅ': 'tyu', 'ふゅ': 'fyu',
+}
+_YOON = {'ゃ': 'a', 'ゅ': 'u', 'ょ': 'o'}
+_SOKUON = 'っ'
+_LONG_VOWEL = 'ー'
+_SEPARATORS = frozenset(' 　-_・/／&＆+')
+
+# トライ木の終端に置く値の種類: 単語（前後を区切る）/ 読み（続けてつなげる）
+WORD, READING = 'word', 'reading'
+_END = None
+
+
+def _kana_table():
+    """ひらがな・カタカナの表（拗音・外来語の表記を含む）"""
+    table = dict(_KANA_EXTRA)
+    for consonant, row, romaji in _HIRAGANA_ROWS:
+        for kana, vowel, value in zip(row, 'aiueo', romaji or (None,) * 5):
+            table[kana] = value or consonant + vowel
+    for base in 'きぎしじちぢにひびぴみり':
+        stem = table[base][:-1]  # ki → k, shi → sh
+        stem = stem if stem.endswith(('sh', 'ch', 'j')) else stem + 'y'
+        for small, vowel in _YOON.items():
+            table[base + small] = stem + vowel
+    for hiragana, romaji in list(table.items()):
+        katakana = ''.join(chr(ord(c) + 0x60) for c in hiragana)
+        table[katakana] = romaji
+    table['ヷ'], table['ヸ'], table['ヹ'], table['ヺ'] = 'va', 'vi', 've', 'vo'
+    return table
+
+
+KANA = _kana_table()
+
+
+def _insert(trie, key, value):
+    node = trie
+    for char in key:
+        node = node.setdefault(char, {})
+    node[_END] = value
+
+
+def build_trie(translations=None):
+    """辞書・漢字の読み・かな表（と翻訳結果）を1つのトライ木にまとめる。後から入れたものが優先"""
+    trie = {}
+    for kana, romaji in KANA.items():
+        _insert(trie, kana, (READING, romaji))
+    for kanji, reading in KANJI_READINGS.items():
+        _insert(trie, kanji, (READING, reading))
+    for compound, reading in KANJI_COMPOUNDS.items():
+        _insert(trie, compound, (WORD, reading))
+    for japanese, english in WORDS.items():
+        _insert(trie, normalize(japanese), (WORD, english))
+    for name, slug in (translations or {}).items():
+        _insert(trie, name, (WORD, slug))
+    return trie
+
+
+def normalize(name):
+    """全角英数・半角カナを揃え、前後の空白を除く"""
+    return unicodedata.normalize('NFKC', name).strip()
+
+
+def _longest_match(trie, text, start):
+    """start からの最長一致の (終わりの位置, 値)。一致しなければ (start, None)"""
+    node, end, value = trie, start, None
+    for i in range(start, len(text)):
+        node = node.get(text[i])
+        if node is None:
+            break
+        if _END in node:
+            end, value = i + 1, node[_END]
+    return end, value
+
+
+def romanize(name, trie):
+    """
+    (スラッグ, 翻訳だけで変換できたか)。
+    単語は前後をハイフンで区切り、読みのローマ字は続く読みとつなげる。促音は次の子音を重ねる
+    """
+    text = normalize(name)
+    words = []
+    current = []
+    translated = True
+    sokuon = False
+
+    def flush():
+        if current:
+            words.append(''.join(current))
+            current.clear()
+
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char in (_SOKUON, 'ッ'):
+            sokuon = True
+            i += 1
+            continue
+        end, value = _longest_match(trie, text, i)
+        if value is not None:
+            kind, romaji = value
+            if kind == WORD:
+                flush()
+                words.append(romaji)
+            else:
+                translated = False
+                if sokuon:
+                    romaji = ('t' if romaji.startswith('ch') else romaji[0]) + romaji
+                current.append(romaji)
+            i = end
+        elif char.isascii() and char.isalnum():
+            end = i
+            while end < len(text) and text[end].isascii() and text[end].isalnum():
+                end += 1
+            flush()
+            words.append(text[i:end])
+            i = end
+        else:
+            if char != _LONG_VOWEL:
+                flush()  # 区切り・記号・読みのわからない文字
+                if not char.isspace() and char not in _SEPARATORS and unicodedata.category(char).startswith('L'):
+                    translated = False
+            i += 1
+        sokuon = False
+    flush()
+    slug = '-'.join(words).lower()
+    slug = re.sub(r'[^a-z0-9-]+', '', slug)
+    return re.sub(r'-{2,}', '-', slug).strip('-'), translated
+
+
+class NameCache:
+    """名前→スラッグのキャッシュ（{名前: [スラッグ, 出どころ]}）。出どころは translation（翻訳）か romaji"""
+    __slots__ = ('path', 'entries', 'mtime', 'trie')
+
+    def __init__(self, path=DEFAULT_CACHE):
+        self.path = path
+        self.entries = {}
+        self.mtime = None
+        self.trie = None
+        self._refresh()
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns if self.path else None
+        except OSError:
+            return None
+
+    def _refresh(self):
+        """ファイルが更新されていれば読み直す（他のプロセスが保存した翻訳を使う）"""
+        mtime = self._stat()
+        if self.trie is not None and mtime == self.mtime:
+            return
+        self.entries = self._load()
+        self.mtime = mtime
+        self._build()
+
+    def _build(self):
+        self.trie = build_trie({name: slug for name, (slug, source) in self.entries.items()
+                                if source == 'translation'})
+
+    def _load(self):
+        if not self.path:
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return {name: entry for name, entry in data.items()
+                if isinstance(entry, list) and len(entry) == 2} if isinstance(data, dict) else {}
+
+    def save(self, updates):
+        """ファイルの最新の内容に updates（{名前: [スラッグ, 出どころ]}）を重ねて書き込む"""
+        if not updates:
+            return
+        self.entries = {**self._load(), **self.entries, **updates}
+        if self.path:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=0)
+            os.replace(temp, self.path)
+        self.mtime = self._stat()
+        if any(source == 'translation' for _, source in updates.values()):
+            self._build()
+
+    def remember(self, name, slug):
+        """翻訳結果を保存する"""
+        slug, _ = romanize(slug, {})
+        if not slug:
+            raise ValueError(f"スラッグが空です: {name}")
+        self.save({normalize(name): [slug, 'translation']})
+        return slug
+
+    def resolve(self, name, strict=False):
+        """
+        (スラッグ, キャッシュに追加する項目)。strict なら翻訳だけで変換できない場合のスラッグは None。
+        ローマ字読みの結果はキャッシュに追加する（翻訳を remember すると置き換わる）
+        """
+        self._refresh()
+        key = normalize(name)
+        cached = self.entries.get(key)
+        if cached and (cached[1] == 'translation' or not strict):
+            return cached[0], {}
+        slug, translated = romanize(key, self.trie)
+        if strict and not translated:
+            return None, {}
+        if slug and not translated and cached != [slug, 'romaji']:
+            return slug, {key: [slug, 'romaji']}
+        return slug, {}
+
+    def slug(self, name, strict=False):
+        """スラッグ（ローマ字読みの結果はすぐにキャッシュへ書き込む）"""
+        slug, updates = self.resolve(name, strict)
+        try:
+            self.save(updates)
+        except OSError:
+            pass  # キャッシュに書けなくても変換結果は返す
+        return slug
+
+
+_caches = {}
+
+
+def get_cache(path=DEFAULT_CACHE):
+    """プロセス内で共有するキャッシュ（デーモン経由の呼び出しで再利用）"""
+    cache = _caches.get(path)
+    if cache is None:
+        cache = _caches[path] = NameCache(path)
+    return cache
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.appname', description='アプリ名のスラッグへの変換')
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help='変換結果のキャッシュ（空で保存しない）')
+    sub = parser.add_subparsers(dest='command', required=True)
+    slug_parser = sub.add_parser('slug', help='スラッグを出力')
+    slug_parser.add_argument('name')
+    slug_parser.add_argument('--strict', action='store_true', help='翻訳だけで変換できない場合は終了コード1')
+    remember_parser = sub.add_parser('remember', help='翻訳結果を保存')
+    remember_parser.add_argument('name')
+    remember_parser.add_argument('slug')
+    batch_parser = sub.add_parser('batch', help='1行1名前をまとめて変換')
+    batch_parser.add_argument('file', nargs='?', default='-')
+    args = parser.parse_args(argv)
+
+    try:
+        cache = get_cache(args.cache)
+        if args.command == 'remember':
+            print(cache.remember(args.name, args.slug))
+            return 0
+        if args.command == 'slug':
+            slug = cache.slug(args.name, args.strict)
+            if not slug:
+                return 1
+            print(slug)
+            return 0
+        # まとめて変換し、キャッシュへの書き込みは最後の1回にする
+        updates = {}
+        f = sys.stdin if args.file == '-' else open(args.file, 'r', encoding='utf-8')
+        with f:
+            for line in f:
+                name = line.rstrip('\n')
+                if name.strip():
+                    slug, added = cache.resolve(name)
+                    updates.update(added)
+                    print(f"{name}\t{slug or ''}")
+        cache.save(updates)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,339 @@
+"""
+CodeFit の機能選択（行数見積もりの学習とナップサック選択）
+機能の行数を種類（ui / logic / data / animation）と複雑さの固定値から見積もり、
+過去の実績で種類ごとの倍率を学習して補正する。実績は2種類:
+    - 進捗の記録（claudeflow.progress）の機能ごとの生成行数（種類は機能名から推定）
+    - 過去に生成したアプリ（codefit_features.json のあるディレクトリ）の選択した機能と実際の総行数
+
+倍率は固定値を事前分布とするリッジ回帰で求めるため、実績が少ないうちは固定値に近い値を返す。
+機能の選択は必須機能を先に入れ、残りの行数で優先度の合計が最大になる組み合わせを 0/1 ナップサックで求める
+（優先度が同じなら見積もり行数の少ない組み合わせ）
+
+使用方法:
+    python3 -m claudeflow.budget [--db DB] [--history DIR]... estimate TYPE COMPLEXITY
+    python3 -m claudeflow.budget [--db DB] [--history DIR]... select --max-lines N \\
+        [--required SPEC]... [--optional SPEC]... [--features-json FILE --app-name NAME]
+    python3 -m claudeflow.budget [--db DB] [--history DIR]... model         # 学習した倍率と実績数
+
+SPEC は '機能名:種類:複雑さ:説明[:優先度]'。優先度を省略した拡張機能は並び順が先のものほど優先する。
+select は入力順に '状態<TAB>機能名<TAB>見積もり行数<TAB>説明' を出力する（状態は required / selected / skipped）
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+
+from .linecount import LineCounter
+from .progress import ProgressStore
+
+CATEGORIES = ('ui', 'logic', 'data', 'animation', 'other')
+# 固定の見積もり（学習前の値。'' は複雑さ不明）
+PRIORS = {
+    'ui': {'simple': 30, 'medium': 60, 'complex': 100, '': 50},
+    'logic': {'simple': 50, 'medium': 100, 'complex': 200, '': 80},
+    'data': {'simple': 40, 'medium': 80, 'complex': 150, '': 60},
+    'animation': {'simple': 20, 'medium': 50, 'complex': 100, '': 40},
+    'other': {'simple': 50, 'medium': 50, 'complex': 50, '': 50},
+}
+# 機能名から種類を推定するキーワード（上から順に判定）
+_KEYWORDS = (
+    ('animation', re.compile(r'アニメ|エフェクト|パーティクル|トランジション|animation|effect', re.I)),
+    ('data', re.compile(r'データ|保存|永続|読み込み|ストレージ|履歴|data|storage|save|persist', re.I)),
+    ('ui', re.compile(r'UI|画面|表示|操作|入力|レイアウト|デザイン|view|screen|layout', re.I)),
+    ('logic', re.compile(r'機能|処理|ロジック|計算|判定|API|ユーザー|最適化|メカニクス|logic', re.I)),
+)
+# 倍率を固定値（1.0）に引き寄せる強さ（固定値の何機能分の実績に相当するか）
+DEFAULT_STRENGTH = 3.0
+PRIORITY_LABELS = {'高': 3, '中': 2, '低': 1, 'high': 3, 'medium': 2, 'low': 1}
+HISTORY_FILE = 'codefit_features.json'
+_HISTORY_DEPTH = 3
+
+
+def categorize(name, feature_type=''):
+    """機能の種類。指定がなければ機能名から推定する"""
+    if feature_type in PRIORS:
+        return feature_type
+    for category, pattern in _KEYWORDS:
+        if pattern.search(name):
+            return category
+    return 'other'
+
+
+def prior_lines(feature_type, complexity=''):
+    """固定の見積もり行数（estimate_feature_lines の元の値）"""
+    table = PRIORS.get(feature_type, PRIORS['other'])
+    return table.get(complexity, table[''])
+
+
+def _solve(matrix, vector):
+    """連立一次方程式（部分ピボット選択のガウスの消去法）"""
+    n = len(vector)
+    rows = [matrix[i][:] + [vector[i]] for i in range(n)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        head = rows[col][col]
+        for r in range(col + 1, n):
+            factor = rows[r][col] / head
+            if factor:
+                rows[r] = [a - factor * b for a, b in zip(rows[r], rows[col])]
+    result = [0.0] * n
+    for col in reversed(range(n)):
+        result[col] = (rows[col][n] - sum(rows[col][k] * result[k] for k in range(col + 1, n))) / rows[col][col]
+    return result
+
+
+class BudgetModel:
+    """種類ごとの行数の倍率（実際の行数 ≒ 倍率 × 固定の見積もり）"""
+    __slots__ = ('scales', 'samples')
+
+    def __init__(self, scales=None, samples=None):
+        self.scales = dict.fromkeys(CATEGORIES, 1.0) if scales is None else scales
+        self.samples = dict.fromkeys(CATEGORIES, 0) if samples is None else samples
+
+    @classmethod
+    def fit(cls, observations, strength=DEFAULT_STRENGTH):
+        """
+        observations は ({種類: 固定の見積もりの合計}, 実際の行数) の列。
+        Σ(実際 - Σ倍率×見積もり)² + Σ strength×基準²×(倍率 - 1)² を最小にする（基準は種類の複雑さ不明の値）
+        """
+        index = {category: i for i, category in enumerate(CATEGORIES)}
+        n = len(CATEGORIES)
+        gram = [[0.0] * n for _ in range(n)]
+        moment = [0.0] * n
+        samples = dict.fromkeys(CATEGORIES, 0)
+        for parts, actual in observations:
+            terms = [(index[category], value) for category, value in parts.items() if value]
+            for i, x in terms:
+                moment[i] += x * actual
+                for j, y in terms:
+                    gram[i][j] += x * y
+            for category in parts:
+                samples[category] += 1
+        for category, i in index.items():
+            penalty = strength * PRIORS[category][''] ** 2
+            gram[i][i] += penalty
+            moment[i] += penalty
+        scales = {category: max(0.1, scale) for category, scale in zip(CATEGORIES, _solve(gram, moment))}
+        return cls(scales, samples)
+
+    def estimate(self, feature_type, complexity=''):
+        """学習した倍率で補正した見積もり行数"""
+        category = feature_type if feature_type in PRIORS else 'other'
+        return max(1, round(prior_lines(category, complexity) * self.scales[category]))
+
+
+def progress_observations(db_path):
+    """進捗の記録の機能ごとの生成行数（機能1つにつき1件）"""
+    if not db_path or not os.path.exists(db_path):
+        return []
+    try:
+        with ProgressStore(db_path) as store:
+            rows = store.feature_lines()
+    except (OSError, sqlite3.Error):
+        return []
+    observations = []
+    for name, lines in rows:
+        category = categorize(name)
+        observations.append(({category: prior_lines(category)}, lines))
+    return observations
+
+
+def _history_files(root, depth=_HISTORY_DEPTH):
+    """root から depth 階層までの codefit_features.json"""
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return
+    for entry in entries:
+        if entry.name == HISTORY_FILE and entry.is_file():
+            yield entry.path
+        elif depth and entry.is_dir(follow_symlinks=False) and not entry.name.startswith('.') \
+                and entry.name != 'node_modules':
+            yield from _history_files(entry.path, depth - 1)
+
+
+def app_observations(history_dirs):
+    """過去に生成したアプリの選択した機能の種類ごとの見積もりと、実際の総行数（アプリ1つにつき1件）"""
+    observations = []
+    seen = set()
+    for root in history_dirs:
+        for path in _history_files(root):
+            directory = os.path.dirname(os.path.abspath(path))
+            if directory in seen:
+                continue
+            seen.add(directory)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    features = json.load(f).get('features') or []
+            except (OSError, ValueError, AttributeError):
+                continue
+            parts = {}
+            for feature in features:
+                if not isinstance(feature, dict):
+                    continue
+                category = categorize(str(feature.get('name', '')), feature.get('type', ''))
+                parts[category] = parts.get(category, 0) + prior_lines(category, feature.get('complexity', ''))
+            actual = sum(lines for _, lines in LineCounter(directory).scan())
+            if parts and actual:
+                observations.append((parts, actual))
+    return observations
+
+
+def load_model(db_path=None, history_dirs=(), strength=DEFAULT_STRENGTH):
+    """進捗の記録と過去のアプリから学習したモデル（実績がなければ固定の見積もりと同じ）"""
+    observations = progress_observations(db_path) + app_observations(history_dirs)
+    if not observations:
+        return BudgetModel()
+    return BudgetModel.fit(observations, strength)
+
+
+def knapsack(weights, values, capacity):
+    """
+    0/1 ナップサック。容量内で価値の合計が最大になる選択の位置の集合
+    （価値が同じなら重さの合計が小さいもの）
+    """
+    if capacity < 0:
+        return set()
+    # 価値を (容量 + 1) 倍して重さを引くと、価値が同じ組み合わせのうち軽いものが大きくなる
+    scale = capacity + 1
+    best = [0] * (capacity + 1)
+    rows = [best]
+    for weight, value in zip(weights, values):
+        gain = value * scale - weight
+        if weight > capacity or gain <= 0:
+            rows.append(best)
+            continue
+        best = best[:weight] + [a if a >= b + gain else b + gain for a, b in zip(best[weight:], best)]
+        rows.append(best)
+    chosen = set()
+    remaining = capacity
+    for i in reversed(range(len(weights))):
+        if rows[i + 1][remaining] != rows[i][remaining]:
+            chosen.add(i)
+            remaining -= weights[i]
+    return chosen
+
+
+class Feature:
+    """選択候補の機能"""
+    __slots__ = ('name', 'type', 'complexity', 'description', 'priority', 'required', 'lines')
+
+    def __init__(self, name, feature_type='', complexity='', description='', priority=0, required=False):
+        self.name = name
+        self.type = feature_type
+        self.complexity = complexity
+        self.description = description
+        self.priority = priority
+        self.required = required
+        self.lines = 0
+
+    @classmethod
+    def parse(cls, spec, required=False, default_priority=0):
+        """'機能名:種類:複雑さ:説明[:優先度]'"""
+        fields = spec.split(':')
+        name = fields[0]
+        feature_type = fields[1] if len(fields) > 1 else ''
+        complexity = fields[2] if len(fields) > 2 else ''
+        description = fields[3] if len(fields) > 3 else ''
+        priority = default_priority
+        if len(fields) > 4 and fields[4]:
+            label = fields[4].lower()
+            if label.isdigit():
+                priority = int(label)
+            elif label in PRIORITY_LABELS:
+                priority = PRIORITY_LABELS[label]
+            else:
+                raise ValueError(f"優先度が不正です: {spec}")
+        return cls(name, categorize(name, feature_type), complexity, description, priority, required)
+
+
+def select_features(features, max_lines, model=None):
+    """見積もり行数を設定し、選んだ機能の位置の集合を返す（必須機能は制限を超えても選ぶ）"""
+    model = model or BudgetModel()
+    for feature in features:
+        feature.lines = model.estimate(feature.type, feature.complexity)
+    required = {i for i, feature in enumerate(features) if feature.required}
+    used = sum(features[i].lines for i in required)
+    optional = [i for i in range(len(features)) if i not in required]
+    chosen = knapsack([features[i].lines for i in optional], [features[i].priority for i in optional],
+                      max_lines - used)
+    return required | {optional[i] for i in chosen}
+
+
+def features_document(app_name, features, selected, generated_at):
+    """features.json の内容（学習に使う種類と複雑さも記録する）"""
+    return {
+        'app_name': app_name,
+        'generated_at': generated_at,
+        'auto_selected': True,
+        'features': [
+            {
+                'name': feature.name,
+                'type': feature.type,
+                'complexity': feature.complexity,
+                'estimated_lines': feature.lines,
+                'priority': '高' if feature.required else '中',
+            }
+            for i, feature in enumerate(features) if i in selected
+        ],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.budget', description='CodeFit の機能選択')
+    parser.add_argument('--db', default=os.environ.get('CLAUDEFLOW_PROGRESS_DB'), help='進捗の記録（学習に使う）')
+    parser.add_argument('--history', action='append', default=[],
+                        help=f'過去のアプリを探すディレクトリ（{HISTORY_FILE} のあるディレクトリ、複数指定可）')
+    parser.add_argument('--strength', type=float, default=DEFAULT_STRENGTH, help='固定の見積もりに引き寄せる強さ')
+    sub = parser.add_subparsers(dest='command', required=True)
+    estimate_parser = sub.add_parser('estimate', help='機能の見積もり行数')
+    estimate_parser.add_argument('type')
+    estimate_parser.add_argument('complexity', nargs='?', default='')
+    select_parser = sub.add_parser('select', help='行数制限内で優先度が最大になる機能を選ぶ')
+    select_parser.add_argument('--max-lines', type=int, required=True)
+    select_parser.add_argument('--required', action='append', default=[], help='必須機能のSPEC')
+    select_parser.add_argument('--optional', action='append', default=[], help='拡張機能のSPEC（優先度順）')
+    select_parser.add_argument('--features-json', help='選んだ機能を書き出す features.json')
+    select_parser.add_argument('--app-name', default='')
+    select_parser.add_argument('--generated-at', default='')
+    sub.add_parser('model', help='学習した倍率と実績数')
+    args = parser.parse_args(argv)
+
+    model = load_model(args.db, args.history, args.strength)
+    if args.command == 'estimate':
+        print(model.estimate(args.type, args.complexity))
+        return 0
+    if args.command == 'model':
+        for category in CATEGORIES:
+            print(f"{category}\t{model.scales[category]:.2f}\t{model.samples[category]}")
+        return 0
+
+    try:
+        count = len(args.optional)
+        features = [Feature.parse(spec, required=True) for spec in args.required]
+        features += [Feature.parse(spec, default_priority=count - i) for i, spec in enumerate(args.optional)]
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    selected = select_features(features, args.max_lines, model)
+    for i, feature in enumerate(features):
+        status = 'required' if feature.required else 'selected' if i in selected else 'skipped'
+        print(f"{status}\t{feature.name}\t{feature.lines}\t{feature.description}")
+    if args.features_json:
+        try:
+            with open(args.features_json, 'w', encoding='utf-8') as f:
+                json.dump(features_document(args.app_name, features, selected, args.generated_at), f,
+                          ensure_ascii=False, indent=2)
+                f.write('\n')
+        except OSError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
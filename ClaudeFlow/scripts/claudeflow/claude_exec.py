@@ -0,0 +1,353 @@
+"""
+Claude CLI の実行ラッパー（リトライ・無応答検知・ヘッジ実行・レイテンシ記録）
+
+    - 失敗したら揺らぎ付きの指数バックオフ（base * 2^(n-1) の半分＋0〜半分の乱数、上限 cap）で再試行する
+    - 全体の制限時間とは別に、標準出力・標準エラーに何も出ないまま idle 秒経過したら停止とみなす
+      （claude --print は終わるまで何も出力しないので既定では無効。CLAUDEFLOW_IDLE_TIMEOUT か --idle で有効にする）
+    - ヘッジ実行: 最初の試行が過去のレイテンシの P パーセンタイルを超えても終わらなければ
+      2つ目を並行して起動し、先に成功した方の出力を使う（残りは停止する）
+    - 成功した試行の所要時間をステップごとのヒストグラム（JSON、flockで排他）に記録する
+失敗時も途中までの出力は <出力ファイル>.partial に残す
+
+終了コード: 0 成功 / 124 最後の試行がタイムアウトまたは無応答 / それ以外は最後の試行の終了コード
+
+使用方法:
+    python3 -m claudeflow.claude_exec run --prompt-file P --output O --step NAME \\
+                                      [--retries 3] [--timeout 600] [--idle SEC] [--tools TOOLS] \\
+                                      [--hedge-percentile 90 | --hedge-after SEC] [--histogram H] \\
+                                      [--error-file E] [-- command ...]
+    python3 -m claudeflow.claude_exec stats --histogram H [--json]
+
+コマンドを省略すると claude --print を実行し、--tools（common-functions.sh の CLAUDE_ALLOWED_TOOLS）を許可する
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from .textutil import ljust
+
+CLAUDE_COMMAND = ['claude', '--print', '--dangerously-skip-permissions']
+DEFAULT_RETRIES = 3
+DEFAULT_TIMEOUT = 600
+DEFAULT_IDLE = float(os.environ.get('CLAUDEFLOW_IDLE_TIMEOUT') or 0)
+DEFAULT_BASE_DELAY = 5.0
+DEFAULT_MAX_DELAY = 60.0
+# ヒストグラムの各区間の上限（秒）。最後の区間はそれ以上
+BUCKETS = (1, 2, 5, 10, 20, 30, 45, 60, 90, 120, 180, 300, 450, 600)
+# パーセンタイルを信用するのに必要な記録数（少ないうちはヘッジしない）
+MIN_SAMPLES = 5
+_POLL_INTERVAL = 0.05
+# SIGTERM を送ってもこの秒数のうちに終わらなければ SIGKILL で止める
+KILL_GRACE = 5.0
+TIMEOUT_EXIT = 124
+
+
+def claude_command(tools=''):
+    """既定のコマンド（tools を指定したら --allowedTools で許可する）"""
+    return CLAUDE_COMMAND + (['--allowedTools', tools] if tools else [])
+
+
+def step_key(step):
+    """ステップ名から機能IDなどの接尾辞を除く（「最小実装: feature_001」→「最小実装」）"""
+    return step.split(':', 1)[0].strip() or step
+
+
+def backoff_delay(attempt, base=DEFAULT_BASE_DELAY, cap=DEFAULT_MAX_DELAY, rng=random):
+    """attempt 回目（1始まり）の再試行前の待ち時間。上限の半分は必ず待ち、残りを乱数で揺らす"""
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay / 2 + rng.uniform(0, delay / 2)
+
+
+class LatencyHistogram:
+    """
+    ステップごとのレイテンシのヒストグラム（JSONファイル）
+    {ステップ: {"buckets": [区間ごとの件数], "count", "sum", "max", "failures", "timeouts"}}
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _empty(self):
+        return {'buckets': [0] * (len(BUCKETS) + 1), 'count': 0, 'sum': 0.0, 'max': 0.0,
+                'failures': 0, 'timeouts': 0}
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def record(self, step, seconds=None, outcome='success'):
+        """成功は所要時間を、失敗（failure / timeout）は件数だけを記録する"""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, 'a+', encoding='utf-8') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                data = json.loads(f.read() or '{}')
+            except ValueError:
+                data = {}
+            entry = data.setdefault(step_key(step), self._empty())
+            if outcome == 'success':
+                index = next((i for i, bound in enumerate(BUCKETS) if seconds <= bound), len(BUCKETS))
+                entry['buckets'][index] += 1
+                entry['count'] += 1
+                entry['sum'] = round(entry['sum'] + seconds, 3)
+                entry['max'] = round(max(entry['max'], seconds), 3)
+            elif outcome == 'timeout':
+                entry['timeouts'] += 1
+            else:
+                entry['failures'] += 1
+            f.seek(0)
+            f.truncate()
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+    def percentile(self, step, p, data=None):
+        """P パーセンタイルの推定値（区間内は線形補間）。記録が MIN_SAMPLES 未満なら None"""
+        entry = (data if data is not None else self.load()).get(step_key(step))
+        if not entry or entry['count'] < MIN_SAMPLES:
+            return None
+        target = entry['count'] * p / 100
+        seen = 0
+        lower = 0.0
+        for index, n in enumerate(entry['buckets']):
+            upper = BUCKETS[index] if index < len(BUCKETS) else max(entry['max'], lower)
+            if n and seen + n >= target:
+                return min(lower + (upper - lower) * (target - seen) / n, entry['max'])
+            seen += n
+            lower = upper
+        return entry['max']
+
+
+class Attempt:
+    """1回の CLI 実行。出力は別スレッドで読み、最後に出力があった時刻を記録する"""
+    __slots__ = ('number', 'process', 'started', 'last_activity', 'stdout', 'stderr', 'reason', 'stopped',
+                 '_readers')
+
+    def __init__(self, number, command, prompt_file):
+        self.number = number
+        self.started = self.last_activity = time.monotonic()
+        self.stdout = bytearray()
+        self.stderr = bytearray()
+        self.reason = ''
+        self.stopped = None
+        with open(prompt_file, 'rb') as stdin:
+            # 停止時に claude が起動した子プロセスごと止められるよう、プロセスグループを分ける
+            self.process = subprocess.Popen(command, stdin=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                            start_new_session=True)
+        self._readers = [threading.Thread(target=self._read, args=(stream, buffer), daemon=True)
+                         for stream, buffer in ((self.process.stdout, self.stdout), (self.process.stderr, self.stderr))]
+        for reader in self._readers:
+            reader.start()
+
+    def _read(self, stream, buffer):
+        for chunk in iter(lambda: stream.read1(65536), b''):
+            buffer.extend(chunk)
+            self.last_activity = time.monotonic()
+        stream.close()
+
+    def finished(self):
+        """終了して出力を読み終えていれば終了コード、それ以外は None"""
+        if self.process.poll() is None:
+            return None
+        # 子プロセスが別のセッションでパイプを開いたままでも待ち続けない
+        for reader in self._readers:
+            reader.join(KILL_GRACE)
+        return self.process.returncode
+
+    def stop(self, reason):
+        """最初は SIGTERM を送り、KILL_GRACE 秒たっても終わっていなければ SIGKILL を送る"""
+        if self.stopped is None:
+            self.reason = reason
+            self.stopped = time.monotonic()
+            self._signal(signal.SIGTERM)
+        elif time.monotonic() - self.stopped > KILL_GRACE:
+            self._signal(signal.SIGKILL)
+
+    def terminate(self, reason):
+        """停止して終了を待つ（SIGTERM を無視するなら SIGKILL で止める）"""
+        self.stop(reason)
+        try:
+            self.process.wait(KILL_GRACE)
+        except subprocess.TimeoutExpired:
+            self._signal(signal.SIGKILL)
+            self.process.wait(KILL_GRACE)
+
+    def _signal(self, signum):
+        try:
+            os.killpg(self.process.pid, signum)
+        except OSError:
+            pass
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+
+class ExecResult:
+    __slots__ = ('returncode', 'output', 'partial', 'error', 'attempts', 'seconds', 'hedged')
+
+    def __init__(self, returncode, output=b'', partial=b'', error='', attempts=0, seconds=0.0, hedged=False):
+        self.returncode = returncode
+        self.output = output
+        self.partial = partial
+        self.error = error
+        self.attempts = attempts
+        self.seconds = seconds
+        self.hedged = hedged
+
+
+def execute(prompt_file, command=CLAUDE_COMMAND, step='', retries=DEFAULT_RETRIES, timeout=DEFAULT_TIMEOUT,
+            idle=DEFAULT_IDLE, hedge_after=None, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY,
+            histogram=None, log=None, rng=random):
+    """
+    command を最大 retries 回（ヘッジ実行の分は数えない）実行して ExecResult を返す
+    hedge_after 秒たっても最初の試行が終わらなければ2つ目を起動する（None ならヘッジしない）
+    """
+    log = log or (lambda message: None)
+    start = time.monotonic()
+    partial = b''
+    error = ''
+    returncode = 1
+    number = 0
+    for round_number in range(1, retries + 1):
+        if round_number > 1:
+            delay = backoff_delay(round_number - 1, base_delay, max_delay, rng)
+            log(f"リトライ {round_number - 1}/{retries - 1}（{delay:.1f}秒後）")
+            time.sleep(delay)
+        number += 1
+        attempts = [Attempt(number, command, prompt_file)]
+        active = list(attempts)
+        while active:
+            time.sleep(_POLL_INTERVAL)
+            for attempt in list(active):
+                code = attempt.finished()
+                if code is None:
+                    if attempt.stopped is not None:
+                        attempt.stop(attempt.reason)
+                    elif attempt.elapsed > timeout:
+                        attempt.stop(f'タイムアウト（{timeout:g}秒）')
+                    elif idle and time.monotonic() - attempt.last_activity > idle:
+                        attempt.stop(f'{idle:g}秒間出力がありません')
+                    continue
+                active.remove(attempt)
+                if code == 0 and not attempt.reason:
+                    for other in active:
+                        other.stop('他の試行が成功')
+                    for other in active:
+                        other.terminate('他の試行が成功')
+                    if histogram:
+                        histogram.record(step, attempt.elapsed)
+                    return ExecResult(0, bytes(attempt.stdout), attempts=number, seconds=time.monotonic() - start,
+                                      hedged=attempt is not attempts[0])
+                returncode = TIMEOUT_EXIT if attempt.reason else code
+                error = attempt.reason or (attempt.stderr or attempt.stdout).decode('utf-8', 'replace').strip()
+                if len(attempt.stdout) > len(partial):
+                    partial = bytes(attempt.stdout)
+                log(f"試行 {attempt.number} が失敗しました: {error.splitlines()[-1] if error else f'終了コード {code}'}")
+                if histogram:
+                    histogram.record(step, outcome='timeout' if attempt.reason else 'failure')
+            if hedge_after is not None and len(attempts) == 1 and active and attempts[0].elapsed >= hedge_after:
+                number += 1
+                log(f"{hedge_after:.1f}秒を超えたためヘッジ実行を開始します（試行 {number}）")
+                hedge = Attempt(number, command, prompt_file)
+                attempts.append(hedge)
+                active.append(hedge)
+    return ExecResult(returncode, partial=partial, error=error, attempts=number, seconds=time.monotonic() - start)
+
+
+def _write(path, data):
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, 'wb') as f:
+        f.write(data)
+    os.replace(temp, path)
+
+
+def print_stats(data, file=None):
+    file = file or sys.stdout
+    histogram = LatencyHistogram(None)
+    print(f"{ljust('ステップ', 24)}{'成功':>4}{'P50':>8}{'P90':>8}{'P99':>8}{'最大':>8}{'失敗':>4}{'時間切れ':>4}", file=file)
+    for step, entry in sorted(data.items()):
+        values = [histogram.percentile(step, p, data) if entry['count'] else None for p in (50, 90, 99)]
+        values = ['-' if v is None else f'{v:.1f}' for v in values]
+        print(f"{ljust(step, 24)}{entry['count']:>6}{values[0]:>8}{values[1]:>8}{values[2]:>8}{entry['max']:>8.1f}"
+              f"{entry['failures']:>6}{entry['timeouts']:>8}", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.claude_exec', description='Claude CLIの実行ラッパー')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help='プロンプトを実行して出力を保存')
+    run_parser.add_argument('--prompt-file', required=True, help='標準入力に渡すプロンプトのファイル')
+    run_parser.add_argument('--output', required=True, help='出力ファイル')
+    run_parser.add_argument('--step', default='', help='ステップ名（ヒストグラムのキー）')
+    run_parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help='最大試行回数')
+    run_parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='1回の試行の制限時間（秒）')
+    run_parser.add_argument('--idle', type=float, default=DEFAULT_IDLE,
+                            help='出力がないまま経過したら停止とみなす秒数（0で無効、既定: CLAUDEFLOW_IDLE_TIMEOUT）')
+    run_parser.add_argument('--tools', default='', help='Claudeに許可するツール（既定のコマンドのみ）')
+    run_parser.add_argument('--base-delay', type=float, default=DEFAULT_BASE_DELAY, help='バックオフの初期値（秒）')
+    run_parser.add_argument('--max-delay', type=float, default=DEFAULT_MAX_DELAY, help='バックオフの上限（秒）')
+    hedge = run_parser.add_mutually_exclusive_group()
+    hedge.add_argument('--hedge-percentile', type=float, default=0,
+                       help='このパーセンタイルを超えたら2つ目を起動（0で無効）')
+    hedge.add_argument('--hedge-after', type=float, help='この秒数を超えたら2つ目を起動')
+    run_parser.add_argument('--histogram', help='レイテンシのヒストグラム（JSON）')
+    run_parser.add_argument('--error-file', help='失敗時に最後のエラーを書き出すファイル')
+    run_parser.add_argument('cli', nargs=argparse.REMAINDER, help='-- の後に実行するコマンド（既定: claude --print ...）')
+
+    stats_parser = sub.add_parser('stats', help='ステップごとのレイテンシを表示')
+    stats_parser.add_argument('--histogram', required=True)
+    stats_parser.add_argument('--json', action='store_true', help='JSONで出力')
+
+    args = parser.parse_args(argv)
+    if args.command == 'stats':
+        data = LatencyHistogram(args.histogram).load()
+        if args.json:
+            print(json.dumps(data, ensure_ascii=False, indent=2))
+        else:
+            print_stats(data)
+        return 0
+
+    command = args.cli[1:] if args.cli[:1] == ['--'] else args.cli
+    histogram = LatencyHistogram(args.histogram) if args.histogram else None
+    hedge_after = args.hedge_after
+    if hedge_after is None and args.hedge_percentile and histogram:
+        hedge_after = histogram.percentile(args.step, args.hedge_percentile)
+    try:
+        result = execute(args.prompt_file, command or claude_command(args.tools), args.step, max(1, args.retries),
+                         args.timeout, args.idle, hedge_after, args.base_delay, args.max_delay, histogram,
+                         log=lambda message: print(f"  {message}", file=sys.stderr, flush=True))
+    except OSError as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        return 2
+    if result.returncode == 0:
+        _write(args.output, result.output)
+        try:
+            os.remove(args.output + '.partial')
+        except FileNotFoundError:
+            pass
+    else:
+        if result.partial:
+            _write(args.output + '.partial', result.partial)
+        if args.error_file:
+            with open(args.error_file, 'w', encoding='utf-8') as f:
+                f.write(result.error + '\n')
+    return result.returncode
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+クリーンアップ計画（clean-development.sh の削除対象の集計と削除リスト）
+削除対象をすべて os.scandir で1回だけ走査し、サイズ・ファイル数・更新時期ごとの内訳・大きいファイルを求めて
+JSON の計画に書き出す。表示（show）、バックアップ（create_backup）、削除（perform_cleanup）は
+この計画を読むだけで、同じ木を何度も du / find / stat で辿らない。
+
+対象は基準ディレクトリからの相対パスで、'../*.log' のようなワイルドカードも使える。
+'..' で始まる対象は「親フォルダレベル」として表示する。
+基準ディレクトリそのもの・その親、保護対象（--protect）とその中・保護対象を含むディレクトリを指す対象は計画に含めない。
+
+使用方法:
+    python3 -m claudeflow.cleanplan plan --base DIR [--protect NAME]... [--top N] [--output FILE] TARGET...
+    python3 -m claudeflow.cleanplan show PLAN [--no-color]   # 削除対象の確認（対象がなければ終了コード1）
+    python3 -m claudeflow.cleanplan paths PLAN               # 削除するパス（区分\\t対象\\tパス）
+    python3 -m claudeflow.cleanplan total PLAN               # ファイル数:バイト数（calculate_cleanup_size の形式）
+"""
+
+import argparse
+import glob
+import heapq
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+
+from .textutil import human_size
+
+DEFAULT_TOP = 5
+# 更新時期の区分（秒）
+AGE_BUCKETS = (('1日以内', 86400), ('1週間以内', 7 * 86400), ('1ヶ月以内', 30 * 86400), ('それ以前', None))
+SECTIONS = (('local', 'ClaudeFlowフォルダ内'), ('parent', '親フォルダレベル'))
+GREEN, YELLOW, BLUE, CYAN, MAGENTA = '\033[0;32m', '\033[0;33m', '\033[0;34m', '\033[0;36m', '\033[0;35m'
+NC = '\033[0m'
+
+
+def _age_bucket(age):
+    for index, (_, limit) in enumerate(AGE_BUCKETS):
+        if limit is None or age <= limit:
+            return index
+    return len(AGE_BUCKETS) - 1
+
+
+class _Walk:
+    """全対象に共通の集計（更新時期の内訳と大きいファイル）"""
+    __slots__ = ('now', 'top', 'ages', 'largest')
+
+    def __init__(self, now, top):
+        self.now = now
+        self.top = top
+        self.ages = [[0, 0] for _ in AGE_BUCKETS]
+        self.largest = []
+
+    def _file(self, path, info):
+        bucket = self.ages[_age_bucket(self.now - info.st_mtime)]
+        bucket[0] += 1
+        bucket[1] += info.st_size
+        if self.top:
+            item = (info.st_size, path)
+            if len(self.largest) < self.top:
+                heapq.heappush(self.largest, item)
+            elif item > self.largest[0]:
+                heapq.heappushpop(self.largest, item)
+
+    def item(self, base, path):
+        """1つのパスの (種類, ファイル数, バイト数)。ディレクトリはスタックで辿る"""
+        info = os.lstat(os.path.join(base, path))
+        if not stat.S_ISDIR(info.st_mode):
+            self._file(path, info)
+            return 'file', 1, info.st_size
+        files = size = 0
+        stack = [path]
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(os.path.join(base, directory)))
+            except OSError:
+                continue
+            for entry in entries:
+                child = os.path.join(directory, entry.name)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(child)
+                        continue
+                    entry_info = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                self._file(child, entry_info)
+                files += 1
+                size += entry_info.st_size
+        return 'dir', files, size
+
+
+def _refused(base, path, protect):
+    """削除してはいけないパスなら理由を返す"""
+    real = os.path.realpath(os.path.join(base, path))
+    root = os.path.realpath(base)
+    if real == root or root.startswith(real.rstrip(os.sep) + os.sep):
+        return '基準ディレクトリ（またはその親）です'
+    for name in protect:
+        guarded = os.path.realpath(os.path.join(root, name))
+        if real == guarded or real.startswith(guarded + os.sep):
+            return f'保護対象です: {name}'
+        if guarded.startswith(real.rstrip(os.sep) + os.sep):
+            return f'保護対象を含みます: {name}'
+    return None
+
+
+def build_plan(base, targets, protect=(), top=DEFAULT_TOP, now=None):
+    """削除対象を1回ずつ走査した計画"""
+    base = os.path.abspath(base)
+    walk = _Walk(time.time() if now is None else now, top)
+    plan = {'base': base, 'created': walk.now, 'targets': [], 'refused': []}
+    seen = set()
+    for target in targets:
+        if os.path.isabs(target):
+            plan['refused'].append({'path': target, 'reason': '絶対パスは指定できません'})
+            continue
+        if glob.has_magic(target):
+            paths = sorted(os.path.relpath(p, base) for p in glob.glob(os.path.join(base, target)))
+        else:
+            paths = [os.path.normpath(target)] if os.path.lexists(os.path.join(base, target)) else []
+        entry = {'target': target, 'section': 'parent' if target.startswith('..') else 'local',
+                 'items': [], 'files': 0, 'bytes': 0}
+        for path in paths:
+            if path in seen:
+                continue
+            seen.add(path)
+            reason = _refused(base, path, protect)
+            if reason:
+                plan['refused'].append({'path': path, 'reason': reason})
+                continue
+            try:
+                kind, files, size = walk.item(base, path)
+            except OSError:
+                continue
+            entry['items'].append({'path': path, 'kind': kind, 'files': files, 'bytes': size})
+            entry['files'] += files
+            entry['bytes'] += size
+        if entry['items']:
+            plan['targets'].append(entry)
+    plan['files'] = sum(entry['files'] for entry in plan['targets'])
+    plan['bytes'] = sum(entry['bytes'] for entry in plan['targets'])
+    plan['ages'] = [{'label': label, 'files': files, 'bytes': size}
+                    for (label, _), (files, size) in zip(AGE_BUCKETS, walk.ages)]
+    plan['largest'] = [{'path': path, 'bytes': size} for size, path in sorted(walk.largest, reverse=True)]
+    return plan
+
+
+def load_plan(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_plan(plan, path):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, ensure_ascii=False)
+    os.replace(temp, path)
+
+
+def print_plan(plan, color=True, file=None):
+    """show_cleanup_targets と同じ表示に、更新時期の内訳と大きいファイルを加える。対象がなければ False"""
+    file = file or sys.stdout
+
+    def paint(code, text):
+        return f'{code}{text}{NC}' if color else text
+
+    print(file=file)
+    print(paint(CYAN, '=== 削除対象の確認 ==='), file=file)
+    for index, (section, title) in enumerate(SECTIONS):
+        if index:
+            print(file=file)
+        print(paint(BLUE, f'{title}:'), file=file)
+        for entry in plan['targets']:
+            if entry['section'] != section:
+                continue
+            if glob.has_magic(entry['target']):
+                name = os.path.basename(entry['target'])
+                print(f"{paint(YELLOW, f'  📄 {name} ファイル')} ({len(entry['items'])} ファイル, "
+                      f"{human_size(entry['bytes'])})", file=file)
+                continue
+            item = entry['items'][0]
+            name = os.path.basename(item['path'])
+            if item['kind'] == 'dir':
+                print(f"{paint(YELLOW, f'  📁 {name}/')} ({item['files']} ファイル, {human_size(item['bytes'])})",
+                      file=file)
+            else:
+                print(f"{paint(YELLOW, f'  📄 {name}')} ({human_size(item['bytes'])})", file=file)
+    for refused in plan['refused']:
+        print(paint(MAGENTA, f"  ⛔ {refused['path']}: {refused['reason']}（削除しません）"), file=file)
+    if not plan['targets']:
+        print(paint(GREEN, '削除対象のファイル・フォルダは見つかりませんでした'), file=file)
+        print(paint(GREEN, 'プロジェクトは既にクリーンな状態です'), file=file)
+        return False
+    print(file=file)
+    print(paint(BLUE, '更新時期:'), file=file)
+    for age in plan['ages']:
+        if age['files']:
+            print(f"  {age['label']}: {age['files']} ファイル, {human_size(age['bytes'])}", file=file)
+    if plan['largest']:
+        print(file=file)
+        print(paint(BLUE, '大きいファイル:'), file=file)
+        for item in plan['largest']:
+            print(f"  {human_size(item['bytes']):>8}  {item['path']}", file=file)
+    print(file=file)
+    print(paint(MAGENTA, f"合計: {plan['files']} ファイル, {human_size(plan['bytes'])}"), file=file)
+    print(paint(CYAN, '========================'), file=file)
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.cleanplan', description='クリーンアップ計画')
+    sub = parser.add_subparsers(dest='command', required=True)
+    plan_parser = sub.add_parser('plan', help='削除対象を走査して計画を作る')
+    plan_parser.add_argument('targets', nargs='+')
+    plan_parser.add_argument('--base', default='.')
+    plan_parser.add_argument('--protect', action='append', default=[], help='削除しないディレクトリ名')
+    plan_parser.add_argument('--top', type=int, default=DEFAULT_TOP, help='表示する大きいファイルの数')
+    plan_parser.add_argument('--output', help='計画の保存先（省略時は標準出力）')
+    show_parser = sub.add_parser('show', help='削除対象の確認')
+    show_parser.add_argument('plan')
+    show_parser.add_argument('--no-color', action='store_true')
+    paths_parser = sub.add_parser('paths', help='削除するパス')
+    paths_parser.add_argument('plan')
+    total_parser = sub.add_parser('total', help='ファイル数:バイト数')
+    total_parser.add_argument('plan')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == 'plan':
+            plan = build_plan(args.base, args.targets, args.protect, args.top)
+            if args.output:
+                save_plan(plan, args.output)
+            else:
+                print(json.dumps(plan, ensure_ascii=False, indent=2))
+            return 0
+        plan = load_plan(args.plan)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    if args.command == 'show':
+        return 0 if print_plan(plan, color=not args.no_color) else 1
+    if args.command == 'paths':
+        for entry in plan['targets']:
+            for item in entry['items']:
+                print(f"{entry['section']}\t{entry['target']}\t{item['path']}")
+    else:
+        print(f"{plan['files']}:{plan['bytes']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
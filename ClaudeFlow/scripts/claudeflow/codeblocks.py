@@ -0,0 +1,253 @@
+"""
+Claudeの実装結果（Markdown）からのファイル抽出
+応答を1回だけ先頭から読み、フェンス付きコードブロックを言語・直前の **ファイル名** 見出し・行位置とともに取り出して、
+すべてのファイルを1度に書き出す
+
+ファイル名の決まり方:
+    - ブロック直前の **index.html** のような見出し（前のブロックの後に現れた最後のもの）
+    - ```html:index.html / ```html title="index.html" のような情報文字列
+    - どちらもなければ html → index.html、markdown/md → README.md（同じ言語で最大のブロック）
+    - htmlのブロックが1つもなければ、フェンス外の <!DOCTYPE html> から </html> までを index.html とする
+同じファイル名のブロックが複数ある場合は後のものを使う
+
+使用方法:
+    python3 -m claudeflow.codeblocks implementation_result.md [-o 出力ディレクトリ]
+                                     [--manifest manifest.json] [--summary]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+DEFAULT_NAMES = {'html': 'index.html', 'markdown': 'README.md'}
+_LANGUAGE_ALIASES = {'md': 'markdown', 'htm': 'html', 'js': 'javascript'}
+_FENCE = re.compile(r'^ {0,3}(?P<fence>`{3,}|~{3,})(?P<info>[^`]*)$')
+# **index.html** / **ファイル: src/app.js** / ### `index.html` / 1. **index.html**: の形式の見出し
+_FILENAME_HEADER = re.compile(
+    r'^\s*(?:#{1,6}\s+|\d+\.\s+)?(?P<bold>\*\*)?(?:[^*`:：\s][^*`:：]*[:：]\s*)?(?P<code>`)?'
+    r'(?P<name>[\w.-][\w./-]*\.\w+)`?(?:\*\*)?\s*[:：]?\s*$'
+)
+_INFO_FILENAME = re.compile(r'(?:^|\s)(?:title|file|filename)=["\']?(?P<name>[^"\'\s]+)')
+_DOCTYPE = re.compile(r'<!DOCTYPE html', re.IGNORECASE)
+_HTML_END = re.compile(r'</html\s*>', re.IGNORECASE)
+
+
+class CodeBlock:
+    """フェンス付きコードブロック（行番号は1始まり、start/endはフェンスの行）"""
+    __slots__ = ('index', 'language', 'filename', 'start_line', 'end_line', 'lines', 'closed')
+
+    def __init__(self, index, language, filename, start_line):
+        self.index = index
+        self.language = language
+        self.filename = filename
+        self.start_line = start_line
+        self.end_line = None
+        self.lines = []
+        self.closed = False
+
+    @property
+    def text(self):
+        return ''.join(self.lines)
+
+    def to_dict(self):
+        return {
+            'index': self.index,
+            'language': self.language,
+            'filename': self.filename,
+            'start_line': self.start_line,
+            'end_line': self.end_line,
+            'lines': len(self.lines),
+            'bytes': len(self.text.encode('utf-8')),
+            'closed': self.closed,
+        }
+
+
+def _parse_info(info):
+    """情報文字列から (言語, ファイル名) を返す"""
+    info = info.strip()
+    if not info:
+        return '', None
+    word = info.split()[0]
+    language, _, path = word.partition(':')
+    language = language.lower()
+    language = _LANGUAGE_ALIASES.get(language, language)
+    m = _INFO_FILENAME.search(info)
+    return language, (m.group('name') if m else path or None)
+
+
+def iter_blocks(lines):
+    """
+    行のイテラブルを1回だけ走査し、コードブロックを順に返す
+    フェンス外の <!DOCTYPE html>〜</html> は language='html'、index=None のブロックとして返す
+
+    markdownブロックの中の ```bash などの入れ子のブロックは、対応する閉じフェンスまで本文として扱う
+    （README.md の中のコード例で外側のブロックが途中で閉じないように）
+    """
+    block = None
+    nested = 0
+    header = None
+    raw_html = None
+    count = 0
+    for number, line in enumerate(lines, 1):
+        stripped = line.rstrip('\r\n')
+        m = _FENCE.match(stripped)
+        if block is not None:
+            if m and m.group('fence')[0] == block_fence[0] and len(m.group('fence')) >= len(block_fence):
+                if m.group('info').strip() and block.language == 'markdown':
+                    nested += 1
+                elif nested:
+                    nested -= 1
+                else:
+                    block.end_line = number
+                    block.closed = True
+                    yield block
+                    block = None
+                    continue
+            block.lines.append(line)
+            continue
+        if m:
+            language, filename = _parse_info(m.group('info'))
+            block = CodeBlock(count, language, filename or header, number)
+            block_fence = m.group('fence')
+            count += 1
+            nested = 0
+            header = None
+            raw_html = None
+            continue
+        h = _FILENAME_HEADER.match(stripped)
+        # 装飾のない行（本文中のファイル名だけの行）は見出しとみなさない
+        if h and (h.group('bold') or h.group('code') or stripped.lstrip().startswith('#')):
+            header = h.group('name')
+        if raw_html is None and _DOCTYPE.search(stripped):
+            raw_html = CodeBlock(None, 'html', None, number)
+        if raw_html is not None:
+            raw_html.lines.append(line)
+            if _HTML_END.search(stripped):
+                raw_html.end_line = number
+                raw_html.closed = True
+                yield raw_html
+                raw_html = None
+    if block is not None:
+        # 閉じフェンスのないブロック（応答が途中で切れた場合）もそこまでを返す
+        yield block
+
+
+def _safe_path(name):
+    """出力ディレクトリの外を指すパスはNone"""
+    if not name or os.path.isabs(name) or name.startswith('~'):
+        return None
+    path = os.path.normpath(name)
+    if path == '.' or path.startswith('..'):
+        return None
+    return path
+
+
+def plan_files(blocks):
+    """ブロックの一覧から {出力パス: (ブロック, 決定方法)} を返す"""
+    files = {}
+    defaults = {}
+    raw_html = None
+    for block in blocks:
+        if block.index is None:
+            raw_html = raw_html or block
+            continue
+        if block.filename:
+            path = _safe_path(block.filename)
+            if path:
+                files[path] = (block, 'named')
+            continue
+        name = DEFAULT_NAMES.get(block.language)
+        if name and (name not in defaults or len(block.text) > len(defaults[name].text)):
+            defaults[name] = block
+    for name, block in defaults.items():
+        files.setdefault(name, (block, 'default'))
+    has_html = any(path.endswith(('.html', '.htm')) for path in files)
+    if raw_html is not None and not has_html:
+        files[DEFAULT_NAMES['html']] = (raw_html, 'doctype')
+    return files
+
+
+def extract(source, output_dir=None):
+    """
+    source（パスまたは行のイテラブル）からブロックを取り出し、output_dir があればファイルを書き出す
+    マニフェスト（辞書）を返す
+    """
+    if isinstance(source, str):
+        with open(source, 'r', encoding='utf-8', errors='replace') as f:
+            blocks = list(iter_blocks(f))
+    else:
+        blocks = list(iter_blocks(source))
+    files = plan_files(blocks)
+    manifest = {
+        'blocks': [block.to_dict() for block in blocks if block.index is not None],
+        'files': [],
+        'skipped': [
+            {'block': block.index, 'filename': block.filename, 'reason': 'unsafe path'}
+            for block in blocks if block.filename and _safe_path(block.filename) is None
+        ],
+    }
+    for path, (block, how) in sorted(files.items()):
+        text = block.text
+        entry = {
+            'path': path,
+            'language': block.language,
+            'block': block.index,
+            'from': how,
+            'start_line': block.start_line,
+            'lines': len(block.lines),
+            'bytes': len(text.encode('utf-8')),
+        }
+        if output_dir is not None:
+            target = os.path.join(output_dir, path)
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            with open(target, 'w', encoding='utf-8') as f:
+                f.write(text)
+        manifest['files'].append(entry)
+    return manifest
+
+
+def print_summary(manifest, file=None):
+    file = file or sys.stdout
+    print(f"コードブロック: {len(manifest['blocks'])}個, 抽出ファイル: {len(manifest['files'])}個", file=file)
+    for entry in manifest['files']:
+        origin = {'named': 'ファイル名指定', 'default': '言語から推定', 'doctype': 'DOCTYPEから'}[entry['from']]
+        print(f"  {entry['path']} ({entry['language'] or '-'}, {entry['lines']}行, {entry['bytes']} bytes, "
+              f"{entry['start_line']}行目〜, {origin})", file=file)
+    for entry in manifest['skipped']:
+        print(f"  ⚠ スキップ: {entry['filename']}（出力先の外を指すパス）", file=file)
+    for block in manifest['blocks']:
+        if not block['closed']:
+            print(f"  ⚠ {block['start_line']}行目のコードブロックが閉じられていません", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.codeblocks',
+                                     description='Markdownのコードブロックからファイルを抽出')
+    parser.add_argument('file', help='実装結果のMarkdown（- は標準入力）')
+    parser.add_argument('-o', '--output-dir', help='ファイルの書き出し先（省略時は一覧のみ）')
+    parser.add_argument('--manifest', help='マニフェストJSONの出力先（省略時は標準出力）')
+    parser.add_argument('--summary', action='store_true', help='抽出結果を人が読める形式で標準出力に表示')
+    args = parser.parse_args(argv)
+
+    try:
+        manifest = extract(sys.stdin if args.file == '-' else args.file, args.output_dir)
+    except OSError as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        return 2
+    manifest['source'] = args.file
+
+    text = json.dumps(manifest, ensure_ascii=False, indent=2)
+    if args.manifest:
+        with open(args.manifest, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    elif not args.summary:
+        print(text)
+    if args.summary:
+        print_summary(manifest)
+    return 0 if manifest['files'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
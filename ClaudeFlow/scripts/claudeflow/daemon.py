@@ -0,0 +1,285 @@
+"""
+検証・JSONクエリの常駐サーバー（Unixドメインソケット）
+
+シェルスクリプトから python3 -c を呼ぶたびにインタプリタを起動する代わりに、
+読み込み済みのプロセスへ要求を送る。要求ごとにforkした子プロセスで実行するため、
+モジュールやコンパイル済みパターンは共有しつつ、要求同士が状態を持ち越さない。
+一定時間要求がなければ自動的に終了する。
+
+プロトコル（文字列はすべてUTF-8のバイト列）:
+    要求: 作業ディレクトリのバイト長\\n 作業ディレクトリ 引数の数\\n (バイト長\\n 引数)...
+          標準入力のバイト長（なしは-1）\\n 標準入力
+    応答: 終了コード\\n 標準出力のバイト長\\n 標準出力 標準エラーのバイト長\\n 標準エラー
+終了コード255は「サーバーで実行できない」ことを表し、クライアントは通常の起動に切り替える
+
+使用方法:
+    python3 -m claudeflow.daemon serve [--socket PATH] [--idle 600]
+    python3 -m claudeflow.daemon call <command> [args...]
+    python3 -m claudeflow.daemon status|stop
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import signal
+import socket
+import socketserver
+import sys
+import time
+import traceback
+
+# 実行できるコマンド（claudeflow_py のモジュール名 → main()を持つモジュール）
+COMMANDS = {
+    'validation': 'claudeflow.validation.cli',
+    'validation.patterns': 'claudeflow.validation.patterns',
+    'validation.cache': 'claudeflow.validation.cache',
+    'validation.batch': 'claudeflow.validation.batch',
+    'jsonquery': 'claudeflow.jsonquery',
+    'features': 'claudeflow.features',
+    'codeblocks': 'claudeflow.codeblocks',
+    'tokens': 'claudeflow.tokens',
+    'prompt_cache': 'claudeflow.prompt_cache',
+    'templates': 'claudeflow.templates',
+    'eventlog': 'claudeflow.eventlog',
+    'progress': 'claudeflow.progress',
+    'linecount': 'claudeflow.linecount',
+    'budget': 'claudeflow.budget',
+    'appname': 'claudeflow.appname',
+    'snapshot': 'claudeflow.snapshot',
+    'cleanplan': 'claudeflow.cleanplan',
+    'patternindex': 'claudeflow.patternindex',
+}
+DEFAULT_IDLE_TIMEOUT = 600
+UNAVAILABLE = 255
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _cksum(data):
+    # POSIXのcksumと同じCRC（シェル側は cksum コマンドで同じ値を求める）
+    crc = 0
+    length = len(data)
+    data = bytearray(data)
+    while length:
+        data.append(length & 0xff)
+        length >>= 8
+    for byte in data:
+        crc ^= byte << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7 if crc & 0x80000000 else crc << 1) & 0xffffffff
+    return ~crc & 0xffffffff
+
+
+def default_socket_path(package_dir=_PACKAGE_DIR):
+    """チェックアウトごとのソケットパス（common-functions.sh と同じ規則）"""
+    base = os.environ.get('TMPDIR') or '/tmp'
+    checksum = _cksum(os.path.dirname(package_dir).encode())
+    return os.path.join(base, f'claudeflow-{os.getuid()}', f'{checksum}.sock')
+
+
+def _code_stamp():
+    # パッケージのソースが更新されたら古いコードで応答しないよう終了する
+    latest = 0
+    for root, dirs, files in os.walk(_PACKAGE_DIR):
+        dirs[:] = [d for d in dirs if d != '__pycache__']
+        for name in files:
+            if name.endswith('.py'):
+                latest = max(latest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return latest
+
+
+def _read_line(rfile):
+    line = rfile.readline()
+    if not line.endswith(b'\n'):
+        raise EOFError('要求が途中で切れています')
+    return int(line)
+
+
+def read_request(rfile):
+    """要求を (作業ディレクトリ, 引数のリスト, 標準入力のバイト列またはNone) に変換"""
+    cwd = rfile.read(_read_line(rfile)).decode('utf-8', 'surrogateescape')
+    argv = []
+    for _ in range(_read_line(rfile)):
+        argv.append(rfile.read(_read_line(rfile)).decode('utf-8', 'surrogateescape'))
+    length = _read_line(rfile)
+    stdin = rfile.read(length) if length >= 0 else None
+    return cwd, argv, stdin
+
+
+def encode_request(argv, stdin=None, cwd=None):
+    cwd = (cwd or os.getcwd()).encode('utf-8', 'surrogateescape')
+    parts = [f'{len(cwd)}\n'.encode() + cwd, f'{len(argv)}\n'.encode()]
+    for arg in argv:
+        data = arg.encode('utf-8', 'surrogateescape')
+        parts.append(f'{len(data)}\n'.encode() + data)
+    parts.append(f'{len(stdin)}\n'.encode() + stdin if stdin is not None else b'-1\n')
+    return b''.join(parts)
+
+
+def run_command(argv, stdin=None):
+    """コマンドを現在のプロセスで実行し (終了コード, 標準出力, 標準エラー) を返す"""
+    if not argv or argv[0] not in COMMANDS:
+        return UNAVAILABLE, b'', f"不明なコマンド: {argv[0] if argv else ''}\n".encode()
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    sys.stdin = io.TextIOWrapper(io.BytesIO(stdin or b''), encoding='utf-8')
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            status = importlib.import_module(COMMANDS[argv[0]]).main(argv[1:]) or 0
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if e.code is not None and not isinstance(e.code, int):
+                print(e.code, file=sys.stderr)
+        except Exception:
+            traceback.print_exc()
+            status = 1
+    # 255はクライアントが通常起動へ切り替える合図なので、コマンドの終了コードとしては使わない
+    return min(status, UNAVAILABLE - 1), stdout.getvalue().encode(), stderr.getvalue().encode()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        # 子プロセスはサーバーの停止用ハンドラーを引き継がない
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        try:
+            cwd, argv, stdin = read_request(self.rfile)
+        except (EOFError, ValueError):
+            return
+        if self.server.code_stamp != _code_stamp():
+            status, out, err = UNAVAILABLE, b'', 'ソースが更新されたためサーバーを終了します\n'.encode()
+            os.kill(self.server.parent_pid, signal.SIGTERM)
+        else:
+            try:
+                # 相対パスをクライアントの作業ディレクトリから解決する（forkした子プロセスだけが移動する）
+                os.chdir(cwd)
+            except OSError as e:
+                status, out, err = UNAVAILABLE, b'', f"{e}\n".encode()
+            else:
+                status, out, err = run_command(argv, stdin)
+        self.wfile.write(f'{status}\n{len(out)}\n'.encode() + out + f'{len(err)}\n'.encode() + err)
+
+
+class DaemonServer(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    """要求ごとにforkするUnixソケットサーバー（アイドル時間を過ぎると終了）"""
+
+    def __init__(self, path, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.last_request = time.monotonic()
+        self.parent_pid = os.getpid()
+        self.code_stamp = _code_stamp()
+        self.stopping = False
+        # アイドル時間・停止要求を確認するため、要求がなくても1秒ごとに待ち受けから戻る
+        self.timeout = min(1.0, idle_timeout) if idle_timeout > 0 else 1.0
+        super().__init__(path, _Handler)
+        os.chmod(path, 0o600)
+
+    def process_request(self, request, client_address):
+        self.last_request = time.monotonic()
+        super().process_request(request, client_address)
+
+    def serve_until_idle(self):
+        try:
+            while not self.stopping:
+                self.handle_request()
+                self.collect_children()
+                idle = time.monotonic() - self.last_request
+                if self.idle_timeout > 0 and idle >= self.idle_timeout and not self.active_children:
+                    break
+        finally:
+            self.server_close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+
+def preload():
+    """よく使うモジュール・パターンを読み込んでおく（forkした子プロセスが引き継ぐ）"""
+    for module in COMMANDS.values():
+        importlib.import_module(module)
+    from .validation.patterns import PatternSet
+    from .validation.rules import resolve_rules
+    resolve_rules('core,implementation')
+    with contextlib.suppress(OSError, ValueError):
+        PatternSet.load()
+
+
+def call(argv, stdin=None, path=None, timeout=None):
+    """サーバーへ要求を送り (終了コード, 標準出力, 標準エラー) を返す（接続できない場合はNone）"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path or default_socket_path())
+            sock.sendall(encode_request(argv, stdin))
+            sock.shutdown(socket.SHUT_WR)
+            rfile = sock.makefile('rb')
+            status = _read_line(rfile)
+            out = rfile.read(_read_line(rfile))
+            err = rfile.read(_read_line(rfile))
+            return status, out, err
+    except (OSError, EOFError, ValueError):
+        return None
+
+
+def serve(path, idle_timeout):
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    if call(['jsonquery', '.', '-'], b'null', path, timeout=2) is not None:
+        print(f"既に起動しています: {path}", file=sys.stderr)
+        return 0
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+    preload()
+    server = DaemonServer(path, idle_timeout)
+    # stopやソース更新時のSIGTERMで後始末をしてから終了する
+    # （fork直後のフックなど例外が無視される場所で受け取ることがあるため、フラグで待ち受けを止める）
+    signal.signal(signal.SIGTERM, lambda signum, frame: setattr(server, 'stopping', True))
+    server.serve_until_idle()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.daemon', description='ClaudeFlow 常駐サーバー')
+    parser.add_argument('--socket', default=os.environ.get('CLAUDEFLOW_DAEMON_SOCKET') or default_socket_path(),
+                        help='ソケットのパス')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve_parser = sub.add_parser('serve', help='サーバーを起動（フォアグラウンド）')
+    serve_parser.add_argument('--idle', type=float,
+                              default=float(os.environ.get('CLAUDEFLOW_DAEMON_IDLE', DEFAULT_IDLE_TIMEOUT)),
+                              help=f'要求がなければ終了するまでの秒数（0で無期限、既定: {DEFAULT_IDLE_TIMEOUT}）')
+    call_parser = sub.add_parser('call', help='サーバー経由でコマンドを実行')
+    call_parser.add_argument('args', nargs=argparse.REMAINDER)
+    sub.add_parser('status', help='起動しているか確認')
+    sub.add_parser('stop', help='サーバーを停止')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        return serve(args.socket, args.idle)
+    if args.command == 'call':
+        stdin = None if sys.stdin.isatty() else sys.stdin.buffer.read()
+        result = call(args.args, stdin, args.socket)
+        if result is None:
+            print(f"サーバーに接続できません: {args.socket}", file=sys.stderr)
+            return UNAVAILABLE
+        status, out, err = result
+        sys.stdout.buffer.write(out)
+        sys.stderr.buffer.write(err)
+        return status
+    if args.command == 'status':
+        running = call(['jsonquery', '.', '-'], b'null', args.socket, timeout=2) is not None
+        print(f"{'起動中' if running else '停止中'}: {args.socket}")
+        return 0 if running else 1
+    # stop: ソケットの相手プロセスにSIGTERMを送る
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(args.socket)
+            creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, 12)
+        pid = int.from_bytes(creds[:4], sys.byteorder)
+        os.kill(pid, signal.SIGTERM)
+    except (OSError, AttributeError) as e:
+        print(f"停止できません: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,449 @@
+"""
+実行イベントログ（JSON Lines＋ブロック索引）
+log_step / log_error_detail / log_claude_call のイベントを1行1イベントで追記し、
+ログ全体を grep せずに実行ID・機能ID・状態・時刻で絞り込めるようにする
+
+ファイル構成（--dir、既定は logs/events）:
+    events.jsonl                 追記中のセグメント
+    events.jsonl.idx             その索引（1行1ブロック）
+    events-000001.jsonl.gz       ローテーション済みのセグメント（ブロックごとに独立したgzipメンバー）
+    events-000001.jsonl.gz.idx   その索引
+
+索引はブロック（既定64KB）ごとの位置・件数・時刻の範囲と、含まれる実行ID・機能ID・状態・種類の一覧。
+検索では条件に合わないブロックを読み飛ばし、合うブロックだけを seek して読む（gzipもそのブロックだけ展開する）。
+追記中のセグメントのうち索引にまだ含まれない末尾は直接読む。
+追記・ローテーションは flock で排他するため、並列実装のワーカーから同時に書き込める
+
+使用方法:
+    python3 -m claudeflow.eventlog append --kind step|error|claude --status S --step NAME \\
+                                       [--run R] [--feature F] [--message M] [--detail D] [--stack S] [--response FILE]
+    python3 -m claudeflow.eventlog query [--run R|latest] [--feature F,...] [--status S,...] [--kind K,...] \\
+                                      [--since T] [--until T] [--grep REGEX] [--tail N] [--json]
+    python3 -m claudeflow.eventlog summary [--run R|latest] [その他の絞り込み]
+    python3 -m claudeflow.eventlog rotate                      # 追記中のセグメントをすぐに圧縮する
+"""
+
+import argparse
+import collections
+import fcntl
+import gzip
+import json
+import os
+import re
+import sys
+import time
+import zlib
+from datetime import datetime
+
+DEFAULT_LOG_DIR = os.environ.get('CLAUDEFLOW_EVENT_LOG') or 'logs/events'
+DEFAULT_BLOCK_BYTES = 64 * 1024
+DEFAULT_SEGMENT_BYTES = 8 * 1024 * 1024
+
+ACTIVE_SEGMENT = 'events.jsonl'
+_ROTATED = re.compile(r'^events-(\d{6})\.jsonl\.gz$')
+_LOCK_FILE = '.lock'
+_INDEX_SUFFIX = '.idx'
+# 応答ファイルのうちエラー内容として残す行数
+_EXCERPT_LINES = 5
+
+
+def parse_time(text):
+    """エポック秒または 'YYYY-MM-DD[ HH:MM[:SS]]'（ローカル時刻）をエポック秒にする"""
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text.strip()).timestamp()
+    except ValueError:
+        raise ValueError(f"時刻の形式が不正です: {text}") from None
+
+
+def format_time(ts):
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))
+
+
+def format_event(event):
+    """従来のテキストログと同じ形式の行にする"""
+    stamp = format_time(event.get('ts', 0))
+    kind = event.get('kind')
+    if kind == 'claude':
+        lines = [f"[{stamp}] [CLAUDE_API] {event.get('status', '')}",
+                 f"  プロンプト概要: {event.get('step', '')}",
+                 f"  応答ファイル: {event.get('response', '')}"]
+        if event.get('excerpt'):
+            lines.append(f"  エラー内容: {event['excerpt']}")
+        return '\n'.join(lines)
+    head = f"[{stamp}] [{event.get('status', '')}] {event.get('step', '')}"
+    if kind == 'error':
+        lines = [head, f"  詳細: {event.get('detail', '')}"]
+        if event.get('stack'):
+            lines.append('  スタックトレース:')
+            lines.extend(event['stack'])
+        return '\n'.join(lines)
+    message = event.get('message')
+    return f"{head} {message}" if message else head
+
+
+class EventFilter:
+    """検索条件。ブロック索引での読み飛ばし判定（block）とイベントごとの判定（event）を持つ"""
+    __slots__ = ('run', 'features', 'statuses', 'kinds', 'since', 'until', 'pattern')
+
+    def __init__(self, run=None, features=None, statuses=None, kinds=None, since=None, until=None, pattern=None):
+        self.run = run
+        self.features = set(features) if features else None
+        self.statuses = set(statuses) if statuses else None
+        self.kinds = set(kinds) if kinds else None
+        self.since = since
+        self.until = until
+        self.pattern = re.compile(pattern) if pattern else None
+
+    def block(self, entry):
+        if self.run is not None and self.run not in entry['runs']:
+            return False
+        if self.features is not None and self.features.isdisjoint(entry['features']):
+            return False
+        if self.statuses is not None and self.statuses.isdisjoint(entry['statuses']):
+            return False
+        if self.kinds is not None and self.kinds.isdisjoint(entry['kinds']):
+            return False
+        if self.since is not None and entry['t1'] < self.since:
+            return False
+        if self.until is not None and entry['t0'] > self.until:
+            return False
+        return True
+
+    def event(self, event):
+        if self.run is not None and event.get('run') != self.run:
+            return False
+        if self.features is not None and event.get('feature') not in self.features:
+            return False
+        if self.statuses is not None and event.get('status') not in self.statuses:
+            return False
+        if self.kinds is not None and event.get('kind') not in self.kinds:
+            return False
+        ts = event.get('ts', 0)
+        if self.since is not None and ts < self.since:
+            return False
+        if self.until is not None and ts > self.until:
+            return False
+        if self.pattern is not None and not self.pattern.search(format_event(event)):
+            return False
+        return True
+
+
+def _summarize(data, start):
+    """ブロック（JSON Linesのバイト列）の索引エントリ"""
+    runs, features, statuses, kinds = set(), set(), set(), set()
+    t0 = t1 = None
+    count = 0
+    for line in data.splitlines():
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        count += 1
+        ts = event.get('ts', 0)
+        t0 = ts if t0 is None else min(t0, ts)
+        t1 = ts if t1 is None else max(t1, ts)
+        runs.add(event.get('run') or '')
+        if event.get('feature'):
+            features.add(event['feature'])
+        statuses.add(event.get('status') or '')
+        kinds.add(event.get('kind') or '')
+    return {'start': start, 'end': start + len(data), 'count': count, 't0': t0 or 0, 't1': t1 or 0,
+            'runs': sorted(runs), 'features': sorted(features), 'statuses': sorted(statuses), 'kinds': sorted(kinds)}
+
+
+def _parse_events(data):
+    for line in data.splitlines():
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+class EventLog:
+    """イベントログのディレクトリ"""
+    __slots__ = ('directory', 'block_bytes', 'segment_bytes')
+
+    def __init__(self, directory=DEFAULT_LOG_DIR, block_bytes=DEFAULT_BLOCK_BYTES, segment_bytes=DEFAULT_SEGMENT_BYTES):
+        self.directory = directory
+        self.block_bytes = block_bytes
+        self.segment_bytes = segment_bytes
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        f = open(self._path(_LOCK_FILE), 'a')
+        fcntl.flock(f, fcntl.LOCK_EX)
+        return f
+
+    def segments(self):
+        """古い順のセグメントのパス（ローテーション済み、追記中の順）"""
+        rotated = sorted(name for name in os.listdir(self.directory) if _ROTATED.match(name)) \
+            if os.path.isdir(self.directory) else []
+        paths = [self._path(name) for name in rotated]
+        if os.path.exists(self._path(ACTIVE_SEGMENT)):
+            paths.append(self._path(ACTIVE_SEGMENT))
+        return paths
+
+    @staticmethod
+    def read_index(segment):
+        try:
+            with open(segment + _INDEX_SUFFIX, 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError):
+            return []
+
+    def append(self, event):
+        """イベントを1件追記し、索引にない末尾がブロックの大きさに達したら索引を追加する"""
+        event.setdefault('ts', round(time.time(), 3))
+        line = (json.dumps(event, ensure_ascii=False) + '\n').encode('utf-8')
+        lock = self._lock()
+        try:
+            active = self._path(ACTIVE_SEGMENT)
+            with open(active, 'ab') as f:
+                f.write(line)
+                size = f.tell()
+            blocks = self.read_index(active)
+            indexed = blocks[-1]['end'] if blocks else 0
+            if size - indexed >= self.block_bytes:
+                self._index_tail(active, indexed)
+            if size >= self.segment_bytes:
+                self._rotate()
+        finally:
+            lock.close()
+
+    def _index_tail(self, active, indexed):
+        with open(active, 'rb') as f:
+            f.seek(indexed)
+            data = f.read()
+        # 書きかけの行は次のブロックに回す
+        data = data[:data.rfind(b'\n') + 1]
+        if not data:
+            return None
+        entry = _summarize(data, indexed)
+        with open(active + _INDEX_SUFFIX, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return entry
+
+    def rotate(self):
+        lock = self._lock()
+        try:
+            return self._rotate()
+        finally:
+            lock.close()
+
+    def _rotate(self):
+        """追記中のセグメントをブロックごとのgzipメンバーに圧縮し、新しいセグメントを始める"""
+        active = self._path(ACTIVE_SEGMENT)
+        if not os.path.exists(active) or os.path.getsize(active) == 0:
+            return None
+        blocks = self.read_index(active)
+        indexed = blocks[-1]['end'] if blocks else 0
+        tail = self._index_tail(active, indexed)
+        if tail:
+            blocks.append(tail)
+        numbers = [int(_ROTATED.match(os.path.basename(p)).group(1)) for p in self.segments() if p != active]
+        target = self._path(f'events-{max(numbers, default=0) + 1:06d}.jsonl.gz')
+        rotated_blocks = []
+        with open(active, 'rb') as src, open(target + '.tmp', 'wb') as dst:
+            for block in blocks:
+                src.seek(block['start'])
+                member = gzip.compress(src.read(block['end'] - block['start']))
+                start = dst.tell()
+                dst.write(member)
+                rotated_blocks.append(dict(block, start=start, end=start + len(member)))
+        with open(target + _INDEX_SUFFIX, 'w', encoding='utf-8') as f:
+            for block in rotated_blocks:
+                f.write(json.dumps(block, ensure_ascii=False) + '\n')
+        os.replace(target + '.tmp', target)
+        os.unlink(active)
+        try:
+            os.unlink(active + _INDEX_SUFFIX)
+        except OSError:
+            pass
+        return target
+
+    @staticmethod
+    def _read_block(f, segment, block):
+        f.seek(block['start'])
+        data = f.read(block['end'] - block['start'])
+        if segment.endswith('.gz'):
+            data = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+        return data
+
+    def events(self, event_filter=None):
+        """条件に合うイベントを古い順に返す"""
+        event_filter = event_filter or EventFilter()
+        for segment in self.segments():
+            blocks = self.read_index(segment)
+            try:
+                f = open(segment, 'rb')
+            except OSError:
+                continue
+            with f:
+                for block in blocks:
+                    if not event_filter.block(block):
+                        continue
+                    for event in _parse_events(self._read_block(f, segment, block)):
+                        if event_filter.event(event):
+                            yield event
+                if not segment.endswith('.gz'):
+                    f.seek(blocks[-1]['end'] if blocks else 0)
+                    for event in _parse_events(f.read()):
+                        if event_filter.event(event):
+                            yield event
+
+    def latest_run(self):
+        """最後に記録されたイベントの実行ID"""
+        for segment in reversed(self.segments()):
+            blocks = self.read_index(segment)
+            with open(segment, 'rb') as f:
+                if segment.endswith('.gz'):
+                    data = self._read_block(f, segment, blocks[-1]) if blocks else b''
+                else:
+                    f.seek(blocks[-1]['start'] if blocks else 0)
+                    data = f.read()
+            last = None
+            for last in _parse_events(data):
+                pass
+            if last is not None:
+                return last.get('run') or ''
+        return None
+
+
+def summarize_events(events):
+    """view-logs.sh --summary の集計"""
+    summary = {'start': None, 'last': None, 'statuses': collections.Counter(),
+               'claude': collections.Counter(), 'features_started': set(), 'features_completed': set()}
+    for event in events:
+        ts = event.get('ts', 0)
+        summary['start'] = ts if summary['start'] is None else min(summary['start'], ts)
+        summary['last'] = ts if summary['last'] is None else max(summary['last'], ts)
+        status = event.get('status') or ''
+        if event.get('kind') == 'claude':
+            summary['claude'][status] += 1
+            continue
+        summary['statuses'][status] += 1
+        feature = event.get('feature')
+        if feature and event.get('kind') == 'step':
+            if status == 'START':
+                summary['features_started'].add(feature)
+            elif status == 'SUCCESS':
+                summary['features_completed'].add(feature)
+    return summary
+
+
+def print_summary(summary, file=None):
+    file = file or sys.stdout
+    started = len(summary['features_started'])
+    completed = len(summary['features_completed'] & summary['features_started'])
+    print(f"開始時刻: {format_time(summary['start']) if summary['start'] is not None else '-'}", file=file)
+    print(f"最終更新: {format_time(summary['last']) if summary['last'] is not None else '-'}", file=file)
+    print('', file=file)
+    print('ステータス別カウント:', file=file)
+    for label, status in (('成功', 'SUCCESS'), ('エラー', 'ERROR'), ('警告', 'WARNING'), ('リトライ', 'RETRY')):
+        print(f"  {label}: {summary['statuses'][status]}", file=file)
+    print('', file=file)
+    print('Claude API呼び出し:', file=file)
+    print(f"  成功: {summary['claude']['SUCCESS']}", file=file)
+    print(f"  失敗: {summary['claude']['ERROR']}", file=file)
+    print('', file=file)
+    print('機能実装:', file=file)
+    print(f"  開始: {started}", file=file)
+    print(f"  完了: {completed}", file=file)
+    print(f"  進行中: {started - completed}", file=file)
+
+
+def _response_excerpt(path):
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return ' '.join(line.rstrip('\n') for _, line in zip(range(_EXCERPT_LINES), f))
+    except OSError:
+        return ''
+
+
+def _split(value):
+    return [item for item in value.split(',') if item] if value else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.eventlog', description='実行イベントログ')
+    parser.add_argument('--dir', default=DEFAULT_LOG_DIR, help='イベントログのディレクトリ')
+    parser.add_argument('--block-bytes', type=int, default=DEFAULT_BLOCK_BYTES, help='索引を作るブロックの大きさ')
+    parser.add_argument('--segment-bytes', type=int, default=DEFAULT_SEGMENT_BYTES,
+                        help='この大きさを超えたら圧縮してローテーションする')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    append_parser = sub.add_parser('append', help='イベントを追記')
+    append_parser.add_argument('--kind', choices=('step', 'error', 'claude'), default='step')
+    append_parser.add_argument('--status', required=True)
+    append_parser.add_argument('--step', default='', help='ステップ名（claude ではプロンプト概要）')
+    append_parser.add_argument('--run', default='')
+    append_parser.add_argument('--feature', default='')
+    append_parser.add_argument('--message', default='')
+    append_parser.add_argument('--detail', default='', help='エラーの詳細')
+    append_parser.add_argument('--stack', default='', help='スタックトレース（改行区切り）')
+    append_parser.add_argument('--response', default='', help='応答ファイル（ERROR のときは先頭を記録）')
+
+    for name, help_text in (('query', 'イベントを検索して表示'), ('summary', '集計を表示')):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('--run', help='実行ID（latest で最後の実行）')
+        p.add_argument('--feature', help='機能ID（カンマ区切り）')
+        p.add_argument('--status', help='状態（カンマ区切り）')
+        p.add_argument('--kind', help='種類（step / error / claude、カンマ区切り）')
+        p.add_argument('--since', help='この時刻以降（エポック秒または YYYY-MM-DD HH:MM:SS）')
+        p.add_argument('--until', help='この時刻以前')
+        p.add_argument('--grep', help='表示形式の行に対する正規表現')
+        if name == 'query':
+            p.add_argument('--tail', type=int, help='最後のN件だけ表示')
+            p.add_argument('--json', action='store_true', help='JSON Linesで出力')
+    sub.add_parser('rotate', help='追記中のセグメントを圧縮する')
+    args = parser.parse_args(argv)
+
+    log = EventLog(args.dir, args.block_bytes, args.segment_bytes)
+    try:
+        if args.command == 'append':
+            event = {'ts': round(time.time(), 3), 'run': args.run, 'kind': args.kind,
+                     'status': args.status, 'step': args.step}
+            for key in ('feature', 'message', 'detail', 'response'):
+                if getattr(args, key):
+                    event[key] = getattr(args, key)
+            if args.stack:
+                event['stack'] = args.stack.splitlines()
+            if args.kind == 'claude' and args.status == 'ERROR' and args.response:
+                event['excerpt'] = _response_excerpt(args.response)
+            log.append(event)
+            return 0
+        if args.command == 'rotate':
+            target = log.rotate()
+            if target:
+                print(target)
+            return 0
+        run = log.latest_run() if args.run == 'latest' else args.run
+        event_filter = EventFilter(run, _split(args.feature), _split(args.status), _split(args.kind),
+                                   parse_time(args.since) if args.since else None,
+                                   parse_time(args.until) if args.until else None, args.grep)
+        events = log.events(event_filter)
+        if args.command == 'summary':
+            print_summary(summarize_events(events))
+            return 0
+        if args.tail:
+            events = collections.deque(events, maxlen=args.tail)
+        for event in events:
+            if args.json:
+                print(json.dumps(event, ensure_ascii=False))
+            else:
+                print(format_event(event))
+    except (OSError, ValueError, re.error) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
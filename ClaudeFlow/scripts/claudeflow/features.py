@@ -0,0 +1,152 @@
+"""
+features.json（機能リスト）の一括読み込み
+ファイルを1回だけ解析し、全機能のフィールドをシェルで扱いやすい形式で出力する
+
+使用方法:
+    python3 -m claudeflow.features features.json [--fields id,name] [--format nul|declare|json]
+                                   [--core] [--pending] [--next] [--count] [--impl-dir DIR]
+
+シェルでの読み込み例:
+    eval "$(claudeflow_call features "$IMPLEMENTATION_DIR/features.json" --format declare)"
+    for i in "${!features_id[@]}"; do echo "${features_id[$i]}: ${features_name[$i]}"; done
+
+    while IFS= read -r -d '' id && IFS= read -r -d '' name; do ...; done \\
+        < <(claudeflow_call features features.json --fields id,name)
+"""
+
+import argparse
+import json
+import os
+import re
+import shlex
+import sys
+
+DEFAULT_FIELDS = ('id', 'name', 'description')
+# 実装済みの機能は <id>_final.<拡張子> が実装ディレクトリにある
+_FINAL_FILE = re.compile(r'^(?P<id>.+)_final\.\w+$')
+_SHELL_NAME = re.compile(r'^[A-Za-z_]\w*$')
+
+
+def load_features(path):
+    """機能のリストを返す（{"features": [...]} と機能の配列の両方に対応）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    features = data.get('features', []) if isinstance(data, dict) else data
+    if not isinstance(features, list):
+        raise ValueError('features が配列ではありません')
+    return [feature for feature in features if isinstance(feature, dict)]
+
+
+def implemented_ids(impl_dir):
+    """実装ディレクトリを1回だけ列挙し、実装済みの機能IDの集合を返す"""
+    try:
+        names = os.listdir(impl_dir)
+    except OSError:
+        return set()
+    return {m.group('id') for m in map(_FINAL_FILE.match, names) if m}
+
+
+def is_core(feature):
+    return feature.get('core') is True or str(feature.get('core')).lower() == 'true'
+
+
+def next_feature(features, done):
+    """依存する機能がすべて実装済みで、未実装の最初の機能（なければNone）"""
+    for feature in features:
+        if feature.get('id') in done:
+            continue
+        if all(dependency in done for dependency in feature.get('dependencies') or ()):
+            return feature
+    return None
+
+
+def select_features(features, core_only=False, pending=False, next_only=False, done=frozenset()):
+    """条件に合う機能を元の順序のまま返す"""
+    if core_only:
+        features = [feature for feature in features if is_core(feature)]
+    if pending:
+        features = [feature for feature in features if feature.get('id') not in done]
+    if next_only:
+        feature = next_feature(features, done)
+        features = [feature] if feature else []
+    return features
+
+
+def field_value(feature, field):
+    """フィールドをシェル向けの文字列に変換（真偽値は true/false、配列は空白区切り）"""
+    value = feature.get(field)
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, list):
+        return ' '.join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False)
+    # NULはシェルの区切りに使うため取り除く
+    return str(value).replace('\0', '')
+
+
+def format_nul(features, fields):
+    """各フィールドをNUL終端で順に出力（read -d '' でフィールド数ずつ読む）"""
+    return ''.join(field_value(feature, field) + '\0' for feature in features for field in fields)
+
+
+def format_declare(features, fields, prefix='features'):
+    """フィールドごとの配列（<prefix>_<field>）と件数（<prefix>_count）の宣言を出力"""
+    lines = []
+    for field in fields:
+        values = ' '.join(shlex.quote(field_value(feature, field)) for feature in features)
+        lines.append(f"declare -a {prefix}_{field}=({values})")
+    lines.append(f"{prefix}_count={len(features)}")
+    return '\n'.join(lines) + '\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.features',
+                                     description='features.jsonを1回だけ解析して機能の一覧を出力')
+    parser.add_argument('file', help='features.json のパス')
+    parser.add_argument('--fields', default=','.join(DEFAULT_FIELDS),
+                        help=f"出力するフィールド（カンマ区切り、既定: {','.join(DEFAULT_FIELDS)}）")
+    parser.add_argument('--format', choices=('nul', 'declare', 'json'), default='nul',
+                        help='nul: NUL区切り / declare: bash配列の宣言 / json: 1行1機能のJSON')
+    parser.add_argument('--prefix', default='features', help='declare形式の変数名の接頭辞')
+    parser.add_argument('--core', action='store_true', help='コア機能（"core": true）のみ')
+    parser.add_argument('--pending', action='store_true', help='未実装（<id>_final.* がない）の機能のみ')
+    parser.add_argument('--next', action='store_true', help='依存関係を満たす次の未実装機能（1件）のみ')
+    parser.add_argument('--impl-dir', help='実装済みか判定するディレクトリ（既定: features.json と同じ場所）')
+    parser.add_argument('--count', action='store_true', help='件数だけを出力')
+    args = parser.parse_args(argv)
+
+    fields = [field.strip() for field in args.fields.split(',') if field.strip()]
+    if args.format == 'declare':
+        invalid = [name for name in [args.prefix] + fields if not _SHELL_NAME.match(name)]
+        if invalid:
+            parser.error(f"シェルの変数名に使えません: {', '.join(invalid)}")
+
+    try:
+        features = load_features(args.file)
+    except (OSError, ValueError) as e:
+        print(f"❌ features.jsonを読み込めません: {e}", file=sys.stderr)
+        return 2
+
+    done = frozenset()
+    if args.pending or args.next:
+        done = implemented_ids(args.impl_dir or os.path.dirname(os.path.abspath(args.file)))
+    features = select_features(features, args.core, args.pending, args.next, done)
+
+    if args.count:
+        print(len(features))
+    elif args.format == 'declare':
+        sys.stdout.write(format_declare(features, fields, args.prefix))
+    elif args.format == 'json':
+        for feature in features:
+            print(json.dumps(feature, ensure_ascii=False))
+    else:
+        sys.stdout.write(format_nul(features, fields))
+    # --next で対象がなければ終了コード1（すべて実装済み、または依存が未実装）
+    return 1 if args.next and not features else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
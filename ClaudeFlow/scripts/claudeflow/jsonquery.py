@@ -0,0 +1,128 @@
+"""
+JSONの簡易クエリ（jqがない環境向け、jqの基本構文のみ）
+
+使用方法:
+    python3 -m claudeflow.jsonquery [-r] [-c] <式> [file|-]
+式: . / .key / .key.sub / .list[] / .list[0] / 式 | length / 式 | keys
+"""
+
+import argparse
+import json
+import re
+import sys
+
+_STEP = re.compile(r'\.(?:([A-Za-z_$][\w$-]*)|"([^"]*)")|\[(-?\d*)\]|\.(?=$|\[)')
+
+
+class QueryError(ValueError):
+    """式の構文エラー"""
+
+
+def _compile_path(expr):
+    steps = []
+    pos = 0
+    expr = expr.strip()
+    if not expr.startswith('.'):
+        raise QueryError(f"式は . で始めてください: {expr}")
+    while pos < len(expr):
+        m = _STEP.match(expr, pos)
+        if not m or m.end() == pos:
+            raise QueryError(f"解釈できない式: {expr[pos:]}")
+        name, quoted, index = m.groups()
+        if name is not None or quoted is not None:
+            steps.append(('key', name if name is not None else quoted))
+        elif index == '':
+            steps.append(('each', None))
+        elif index is not None:
+            steps.append(('index', int(index)))
+        pos = m.end()
+    return steps
+
+
+def compile_query(expr):
+    """式をステージのリストに変換（| 区切り）"""
+    stages = []
+    for part in expr.split('|'):
+        part = part.strip()
+        if part in ('length', 'keys'):
+            stages.append((part, None))
+        else:
+            stages.append(('path', _compile_path(part)))
+    return stages
+
+
+def _apply_path(value, steps):
+    values = [value]
+    for kind, arg in steps:
+        results = []
+        for current in values:
+            if kind == 'key':
+                if current is not None and not isinstance(current, dict):
+                    raise QueryError(f"オブジェクトではない値にキー {arg} を適用できません")
+                results.append(current.get(arg) if current is not None else None)
+            elif kind == 'index':
+                if current is not None and not isinstance(current, list):
+                    raise QueryError("配列ではない値に添字を適用できません")
+                results.append(current[arg] if current is not None and -len(current) <= arg < len(current)
+                               else None)
+            else:
+                if isinstance(current, list):
+                    results.extend(current)
+                elif isinstance(current, dict):
+                    results.extend(current.values())
+                else:
+                    raise QueryError("配列・オブジェクトではない値は展開できません")
+        values = results
+    return values
+
+
+def query(data, expr):
+    """式を評価して結果の値のリストを返す"""
+    values = [data]
+    for kind, arg in compile_query(expr):
+        if kind == 'path':
+            values = [result for value in values for result in _apply_path(value, arg)]
+        elif kind == 'length':
+            values = [len(value) if value is not None else 0 for value in values]
+        else:
+            values = [sorted(value) if isinstance(value, dict) else list(range(len(value))) for value in values]
+    return values
+
+
+def format_value(value, raw=False, compact=False):
+    if raw and isinstance(value, str):
+        return value
+    if compact:
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.jsonquery', description='JSONの簡易クエリ')
+    parser.add_argument('-r', '--raw-output', action='store_true', help='文字列を引用符なしで出力')
+    parser.add_argument('-c', '--compact-output', action='store_true', help='1行で出力')
+    parser.add_argument('expr', help='クエリ式（例: .features[].id）')
+    parser.add_argument('file', nargs='?', default='-', help='JSONファイル（省略時・- は標準入力）')
+    args = parser.parse_args(argv)
+
+    try:
+        if args.file == '-':
+            data = json.load(sys.stdin)
+        else:
+            with open(args.file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ JSONを読み込めません: {e}", file=sys.stderr)
+        return 2
+    try:
+        values = query(data, args.expr)
+    except QueryError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 3
+    for value in values:
+        print(format_value(value, args.raw_output, args.compact_output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
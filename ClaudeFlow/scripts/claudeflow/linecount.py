@@ -0,0 +1,296 @@
+"""
+プロジェクトの行数集計（CodeFit の行数制限チェック）
+出力ディレクトリを os.scandir で1回だけ走査し、対象拡張子のファイルの改行数を数える（wc -l と同じ値）。
+ファイルごとの行数は (inode, 更新時刻, サイズ) をキーにキャッシュするため、
+機能ごとに何度チェックしても変更のないファイルは読み直さない
+
+node_modules・隠しディレクトリ・ビルド出力（dist, build, coverage）は数えない。
+キャッシュはプロセス内（デーモン経由の呼び出しで再利用）と、出力ディレクトリごとのJSONファイルの2段
+
+使用方法:
+    python3 -m claudeflow.linecount scan DIR [--max-lines N] [--warning-threshold P]   # 集計をJSONで出力
+    python3 -m claudeflow.linecount check DIR [--max-lines N] [--warning-threshold P] [--no-color]
+    python3 -m claudeflow.linecount report DIR [--max-lines N] [--output FILE]          # LINE_LIMIT_REPORT.md
+
+check の終了コードは 0: 制限内、1: 制限超過、2: 警告（check_project_line_limit と同じ）
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+DEFAULT_MAX_LINES = 2000
+DEFAULT_WARNING_THRESHOLD = int(os.environ.get('CLAUDEFLOW_WARNING_THRESHOLD') or 80)
+EXTENSIONS = frozenset(('html', 'js', 'css', 'ts', 'jsx', 'tsx', 'vue', 'py', 'java', 'cpp', 'c'))
+SKIP_DIRS = frozenset(('node_modules', 'dist', 'build', 'coverage', '__pycache__'))
+BAR_WIDTH = 40
+# 既定のキャッシュの保存先（CLAUDEFLOW_LINECOUNT_CACHEで変更可能）
+DEFAULT_CACHE_DIR = os.environ.get('CLAUDEFLOW_LINECOUNT_CACHE') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'claudeflow', 'linecount')
+
+_READ_SIZE = 1024 * 1024
+GREEN, YELLOW, RED, BLUE, CYAN = '\033[0;32m', '\033[0;33m', '\033[0;31m', '\033[0;34m', '\033[0;36m'
+NC = '\033[0m'
+
+# プロセス内のキャッシュ {ディレクトリ: {相対パス: [inode, mtime_ns, size, 行数]}}
+_memory = {}
+
+
+def count_lines(path):
+    """改行の数（wc -l と同じ）"""
+    lines = 0
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_READ_SIZE), b''):
+            lines += block.count(b'\n')
+    return lines
+
+
+def _walk(root, relative=''):
+    """対象ファイルの (相対パス, stat) を返す"""
+    try:
+        entries = list(os.scandir(os.path.join(root, relative) if relative else root))
+    except OSError:
+        return
+    for entry in entries:
+        path = f'{relative}/{entry.name}' if relative else entry.name
+        if entry.is_dir(follow_symlinks=False):
+            if not entry.name.startswith('.') and entry.name not in SKIP_DIRS:
+                yield from _walk(root, path)
+        elif entry.is_file() and entry.name.rpartition('.')[2] in EXTENSIONS and '.' in entry.name:
+            try:
+                yield path, entry.stat()
+            except OSError:
+                continue
+
+
+class LineCounter:
+    """出力ディレクトリ1つ分の行数キャッシュ"""
+    __slots__ = ('root', 'cache_file', 'entries', 'dirty')
+
+    def __init__(self, root, cache_dir=DEFAULT_CACHE_DIR):
+        self.root = os.path.abspath(root)
+        digest = hashlib.sha1(self.root.encode('utf-8')).hexdigest()[:16]
+        self.cache_file = os.path.join(cache_dir, f'{digest}.json') if cache_dir else None
+        self.entries = _memory.get(self.root)
+        if self.entries is None:
+            self.entries = self._load()
+        self.dirty = False
+
+    def _load(self):
+        if not self.cache_file:
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save(self):
+        _memory[self.root] = self.entries
+        if not self.dirty or not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            fd, temp = tempfile.mkstemp(dir=os.path.dirname(self.cache_file), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f)
+            os.replace(temp, self.cache_file)
+        except OSError:
+            pass
+
+    def scan(self):
+        """[(相対パス, 行数)]（パス順）。削除されたファイルはキャッシュからも除く"""
+        files = []
+        seen = set()
+        for path, stat in _walk(self.root):
+            key = [stat.st_ino, stat.st_mtime_ns, stat.st_size]
+            cached = self.entries.get(path)
+            if cached and cached[:3] == key:
+                lines = cached[3]
+            else:
+                try:
+                    lines = count_lines(os.path.join(self.root, path)) if stat.st_size else 0
+                except OSError:
+                    continue
+                self.entries[path] = key + [lines]
+                self.dirty = True
+            seen.add(path)
+            files.append((path, lines))
+        for path in set(self.entries) - seen:
+            del self.entries[path]
+            self.dirty = True
+        self._save()
+        files.sort()
+        return files
+
+
+def _max_lines(value):
+    """--max-lines（と CLAUDEFLOW_MAX_LINES）の値。1以上の整数でなければ argparse のエラーにする"""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f'1以上の整数を指定してください: {value}')
+    return number
+
+
+def summarize(files, max_lines=DEFAULT_MAX_LINES, warning_threshold=DEFAULT_WARNING_THRESHOLD):
+    """行数制限の判定と進捗バーの値"""
+    total = sum(lines for _, lines in files)
+    percent = total * 100 // max_lines
+    warning_limit = max_lines * warning_threshold // 100
+    if total > max_lines:
+        status = 'over'
+    elif total > warning_limit:
+        status = 'warning'
+    else:
+        status = 'ok'
+    filled = min(BAR_WIDTH, percent * BAR_WIDTH // 100)
+    return {
+        'files': [{'path': path, 'lines': lines} for path, lines in files],
+        'file_count': len(files),
+        'total_lines': total,
+        'max_lines': max_lines,
+        'warning_threshold': warning_threshold,
+        'warning_limit': warning_limit,
+        'percent': percent,
+        'remaining': max_lines - total,
+        'status': status,
+        'bar': {'width': BAR_WIDTH, 'filled': filled, 'empty': BAR_WIDTH - filled},
+    }
+
+
+def print_check(summary, color=True, file=None):
+    """check_project_line_limit と同じ表示"""
+    file = file or sys.stdout
+
+    def paint(code, text):
+        return f'{code}{text}{NC}' if color else text
+
+    max_lines, total = summary['max_lines'], summary['total_lines']
+    print(paint(BLUE, f"📏 行数制限チェック開始 (最大: {max_lines}行)"), file=file)
+    print(paint(BLUE, f"検出ファイル数: {summary['file_count']}"), file=file)
+    for entry in summary['files']:
+        print(f"  📄 {entry['path']}: {entry['lines']}行", file=file)
+    print(file=file)
+    print(paint(CYAN, f"総行数: {total} / {max_lines} ({summary['percent']}%)"), file=file)
+    bar = summary['bar']
+    print(f"[{'█' * bar['filled']}{'░' * bar['empty']}] {summary['percent']}%", file=file)
+    if summary['status'] == 'over':
+        print(paint(RED, f"🚨 エラー: {total}行 > {max_lines}行制限を超過しています"), file=file)
+        print(paint(YELLOW, '💡 提案: 機能削減または最適化が必要です'), file=file)
+    elif summary['status'] == 'warning':
+        print(paint(YELLOW, f"⚠️  警告: {total}行 > {summary['warning_limit']}行 "
+                            f"({summary['warning_threshold']}%制限)"), file=file)
+        print(paint(BLUE, '💡 提案: コードの最適化を検討してください'), file=file)
+    else:
+        print(paint(GREEN, f"✅ 制限内: {total}行 ≤ {max_lines}行"), file=file)
+        print(paint(CYAN, f"📈 残り: {summary['remaining']}行利用可能"), file=file)
+
+
+def render_report(summary, project_name):
+    """LINE_LIMIT_REPORT.md の内容"""
+    max_lines, total = summary['max_lines'], summary['total_lines']
+    lines = [
+        '# 📏 行数制限レポート',
+        '',
+        f"**作成日時**: {time.strftime('%Y-%m-%d %H:%M:%S')}  ",
+        f'**制限設定**: {max_lines}行  ',
+        f'**プロジェクト**: {project_name}  ',
+        '',
+        '## 📊 ファイル別行数',
+        '',
+        '| ファイル | 行数 | 割合 |',
+        '|---------|------|------|',
+    ]
+    for entry in summary['files']:
+        lines.append(f"| {entry['path']} | {entry['lines']} | {entry['lines'] * 100 // max_lines}% |")
+    lines += [
+        '',
+        '## 📈 サマリー',
+        '',
+        f'- **総行数**: {total}行',
+        f'- **制限**: {max_lines}行',
+        f"- **使用率**: {summary['percent']}%",
+        f"- **残り**: {summary['remaining']}行",
+        '',
+        '## 💡 最適化提案',
+        '',
+    ]
+    if total > max_lines:
+        lines += [
+            '### 🚨 制限超過 - 緊急対応必要',
+            '',
+            f'- **削減が必要**: {total - max_lines}行',
+            '- **推奨アクション**:',
+            '  1. 不要なコメント削除',
+            '  2. CSS/JS最小化',
+            '  3. 冗長な機能削除',
+            '  4. アルゴリズム効率化',
+        ]
+    elif total > max_lines * 80 // 100:
+        lines += [
+            '### ⚠️ 警告レベル - 最適化推奨',
+            '',
+            '- **推奨アクション**:',
+            '  1. コードレビューと効率化',
+            '  2. 重複コード削除',
+            '  3. 関数の統合',
+            '  4. 変数名の短縮化',
+        ]
+    else:
+        lines += [
+            '### ✅ 制限内 - 良好な状態',
+            '',
+            '- **状況**: 制限内で適切に実装されています',
+            f"- **余裕**: {summary['remaining']}行の余裕があります",
+        ]
+    return '\n'.join(lines) + '\n\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.linecount', description='プロジェクトの行数集計')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='行数キャッシュの保存先（空で保存しない）')
+    sub = parser.add_subparsers(dest='command', required=True)
+    scan_parser = sub.add_parser('scan', help='集計をJSONで出力')
+    check_parser = sub.add_parser('check', help='行数制限をチェックして表示')
+    check_parser.add_argument('--no-color', action='store_true')
+    report_parser = sub.add_parser('report', help='行数制限レポートを書き出す')
+    report_parser.add_argument('--output', help='出力先（省略時は DIR/LINE_LIMIT_REPORT.md）')
+    for p in (scan_parser, check_parser, report_parser):
+        p.add_argument('directory')
+        # 既定値も文字列で渡して _max_lines で検査する（CLAUDEFLOW_MAX_LINES=0 も弾く）
+        p.add_argument('--max-lines', type=_max_lines,
+                       default=os.environ.get('CLAUDEFLOW_MAX_LINES') or str(DEFAULT_MAX_LINES),
+                       help=f'最大行数（既定: CLAUDEFLOW_MAX_LINES または {DEFAULT_MAX_LINES}）')
+        p.add_argument('--warning-threshold', type=int, default=DEFAULT_WARNING_THRESHOLD, help='警告する割合（%%）')
+    args = parser.parse_args(argv)
+
+    summary = summarize(LineCounter(args.directory, args.cache_dir).scan(), args.max_lines,
+                        args.warning_threshold)
+    if args.command == 'scan':
+        json.dump(summary, sys.stdout, ensure_ascii=False)
+        print()
+        return 0
+    if args.command == 'check':
+        print_check(summary, color=not args.no_color)
+        return {'over': 1, 'warning': 2}.get(summary['status'], 0)
+    output = args.output or os.path.join(args.directory, 'LINE_LIMIT_REPORT.md')
+    try:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(render_report(summary, os.path.basename(os.path.abspath(args.directory))))
+    except OSError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    print(output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,290 @@
+"""
+パターンライブラリ（.context/PATTERNS.md）の検索索引
+ライブラリを見出しごとの断片に分け、BM25 で機能の仕様に関係の深い断片だけを選んでプロンプトに入れる。
+外部サービスは使わない。語は英数字の識別子（camelCase・snake_case は分割したものも）と、
+日本語の連続部分の文字 bigram。
+
+索引は <ライブラリ>.index.json に保存する。ライブラリは追記されていくので、前回索引にした部分が
+変わっていなければ最後の断片から後ろだけを読み直して索引に加える（途中が書き換えられたら作り直す）。
+ライブラリ全体がトークン予算に収まるうちは全体をそのまま返す。
+並列実装の機能が同時にパターンを追記しても混ざらないよう、追記（append）は1回の書き込みを flock で排他する。
+
+使用方法:
+    python3 -m claudeflow.patternindex select PATTERNS [--query TEXT | --query-file F] [--top-k N] [--budget N]
+    python3 -m claudeflow.patternindex update PATTERNS                 # 追記された断片を索引に加える
+    python3 -m claudeflow.patternindex append PATTERNS < SECTION       # 標準入力をライブラリに追記して索引に加える
+    python3 -m claudeflow.patternindex search PATTERNS QUERY [--top-k N]   # スコア\\tトークン数\\t見出し
+
+select は --query も --query-file もなければ標準入力を問い合わせにする
+"""
+
+import argparse
+import fcntl
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+
+from .tokens import count_tokens
+
+DEFAULT_TOP_K = int(os.environ.get('CLAUDEFLOW_PATTERN_TOP_K') or 5)
+DEFAULT_BUDGET = int(os.environ.get('CLAUDEFLOW_PATTERN_BUDGET') or 2000)
+INDEX_VERSION = 1
+K1 = 1.2
+B = 0.75
+
+_WORD = re.compile(r'[A-Za-z][A-Za-z0-9]*|[0-9]+|[\u3040-\u30ff\u3400-\u9fff\uf900-\ufaff]+')
+_CAMEL = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+')
+_HEADING = re.compile(rb'^#{2,6}\s')
+_FENCE = re.compile(rb'^\s*(```|~~~)')
+
+# プロセス内のキャッシュ {ライブラリの絶対パス: PatternIndex}
+_memory = {}
+
+
+def tokenize(text):
+    """BM25 の語のリスト"""
+    terms = []
+    for word in _WORD.findall(text):
+        if word[0].isascii():
+            lower = word.lower()
+            terms.append(lower)
+            parts = _CAMEL.findall(word)
+            if len(parts) > 1:
+                terms.extend(part.lower() for part in parts)
+        elif len(word) == 1:
+            terms.append(word)
+        else:
+            terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def split_snippets(data, start=0):
+    """バイト列を見出し（## 以下）ごとの断片 [(開始, 終了)] に分ける。コードブロック内の # は見出しにしない"""
+    snippets = []
+    begin = start
+    in_fence = False
+    position = start
+    for line in data[start:].splitlines(keepends=True):
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and _HEADING.match(line) and position > begin:
+            snippets.append((begin, position))
+            begin = position
+        position += len(line)
+    if position > begin:
+        snippets.append((begin, position))
+    return snippets
+
+
+class PatternIndex:
+    """パターンライブラリ1つ分の BM25 索引"""
+    __slots__ = ('path', 'index_path', 'docs', 'df', 'indexed', 'tail', 'prefix_hash', 'mtime_ns', 'dirty')
+
+    def __init__(self, path, index_path=None):
+        self.path = os.path.abspath(path)
+        self.index_path = index_path or f'{self.path}.index.json'
+        self.docs = []
+        self.df = {}
+        self.indexed = 0
+        self.tail = 0
+        self.prefix_hash = ''
+        self.mtime_ns = 0
+        self.dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get('version') != INDEX_VERSION:
+            return
+        self.docs = data['docs']
+        self.indexed = data['indexed']
+        self.tail = data.get('tail', 0)
+        self.prefix_hash = data['prefix_hash']
+        self.mtime_ns = data.get('mtime_ns', 0)
+        for doc in self.docs:
+            for term in doc['tf']:
+                self.df[term] = self.df.get(term, 0) + 1
+
+    def save(self):
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.index_path)
+        try:
+            fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'indexed': self.indexed, 'tail': self.tail,
+                           'prefix_hash': self.prefix_hash, 'mtime_ns': self.mtime_ns, 'docs': self.docs},
+                          f, ensure_ascii=False)
+            os.replace(temp, self.index_path)
+            self.dirty = False
+        except OSError:
+            pass
+
+    def _remove(self, doc):
+        for term in doc['tf']:
+            self.df[term] -= 1
+            if not self.df[term]:
+                del self.df[term]
+
+    def _add(self, data, begin, end):
+        text = data[begin:end].decode('utf-8', errors='replace')
+        title = text.split('\n', 1)[0].lstrip('#').strip()
+        body = text.split('\n', 1)[1] if '\n' in text else ''
+        if not body.strip():
+            return
+        tf = {}
+        terms = tokenize(text)
+        for term in terms:
+            tf[term] = tf.get(term, 0) + 1
+        for term in tf:
+            self.df[term] = self.df.get(term, 0) + 1
+        self.docs.append({'start': begin, 'end': end, 'title': title, 'length': len(terms),
+                          'tokens': count_tokens(text), 'tf': tf})
+
+    def refresh(self):
+        """ライブラリの変更を索引に反映し、ライブラリの内容（バイト列）を返す"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            data, mtime_ns = b'', 0
+        if mtime_ns == self.mtime_ns and len(data) == self.indexed:
+            return data
+        prefix_ok = (len(data) >= self.indexed
+                     and hashlib.sha256(data[:self.indexed]).hexdigest() == self.prefix_hash)
+        if not prefix_ok:
+            self.docs, self.df = [], {}
+            start = 0
+        else:
+            # 最後の断片は追記で続きが書かれている場合があるので読み直す
+            start = self.tail
+            while self.docs and self.docs[-1]['start'] >= start:
+                self._remove(self.docs.pop())
+        self.tail = start
+        for begin, end in split_snippets(data, start):
+            self._add(data, begin, end)
+            self.tail = begin
+        self.indexed = len(data)
+        self.prefix_hash = hashlib.sha256(data).hexdigest()
+        self.mtime_ns = mtime_ns
+        self.dirty = True
+        return data
+
+    def scores(self, query):
+        """[(スコア, 断片)]（スコアの高い順、0 は除く）"""
+        terms = set(tokenize(query))
+        if not self.docs or not terms:
+            return []
+        count = len(self.docs)
+        average = sum(doc['length'] for doc in self.docs) / count or 1
+        idf = {term: math.log(1 + (count - self.df[term] + 0.5) / (self.df[term] + 0.5))
+               for term in terms if term in self.df}
+        ranked = []
+        for doc in self.docs:
+            tf, norm = doc['tf'], K1 * (1 - B + B * doc['length'] / average)
+            score = sum(weight * tf[term] * (K1 + 1) / (tf[term] + norm)
+                        for term, weight in idf.items() if term in tf)
+            if score > 0:
+                ranked.append((score, doc))
+        ranked.sort(key=lambda item: (-item[0], item[1]['start']))
+        return ranked
+
+    def select(self, query, top_k=DEFAULT_TOP_K, budget=DEFAULT_BUDGET):
+        """プロンプトに入れるパターン。全体が予算内ならそのまま、超えたら関係の深い断片を予算内で top_k 個まで"""
+        data = self.refresh()
+        self.save()
+        text = data.decode('utf-8', errors='replace')
+        if sum(doc['tokens'] for doc in self.docs) <= budget:
+            return text
+        chosen, used = [], 0
+        for _, doc in self.scores(query):
+            if len(chosen) >= top_k:
+                break
+            if used + doc['tokens'] > budget:
+                continue
+            chosen.append(doc)
+            used += doc['tokens']
+        # 選んだ断片はライブラリでの順に並べる
+        chosen.sort(key=lambda doc: doc['start'])
+        return '\n'.join(data[doc['start']:doc['end']].decode('utf-8', errors='replace').rstrip('\n')
+                         for doc in chosen)
+
+
+def append(path, text):
+    """ライブラリに text を1回の書き込みで追記する（同時に追記した別の機能の節と混ざらない）"""
+    with open(path, 'ab') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.write(text.encode('utf-8'))
+            f.flush()
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def get_index(path):
+    """プロセス内で使い回す索引（常駐サーバー経由の呼び出しで再利用）"""
+    key = os.path.abspath(path)
+    index = _memory.get(key)
+    if index is None:
+        index = _memory[key] = PatternIndex(key)
+    return index
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.patternindex', description='パターンライブラリの検索')
+    sub = parser.add_subparsers(dest='command', required=True)
+    select_parser = sub.add_parser('select', help='機能に関係するパターンを予算内で出力')
+    select_parser.add_argument('patterns')
+    select_parser.add_argument('--query')
+    select_parser.add_argument('--query-file')
+    select_parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+    select_parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET, help='トークン数の上限')
+    update_parser = sub.add_parser('update', help='追記された断片を索引に加える')
+    update_parser.add_argument('patterns')
+    append_parser = sub.add_parser('append', help='標準入力をライブラリに追記して索引に加える')
+    append_parser.add_argument('patterns')
+    search_parser = sub.add_parser('search', help='スコアの一覧')
+    search_parser.add_argument('patterns')
+    search_parser.add_argument('query')
+    search_parser.add_argument('--top-k', type=int, default=DEFAULT_TOP_K)
+    args = parser.parse_args(argv)
+
+    try:
+        index = get_index(args.patterns)
+        if args.command == 'select':
+            if args.query is not None:
+                query = args.query
+            elif args.query_file:
+                with open(args.query_file, 'r', encoding='utf-8', errors='replace') as f:
+                    query = f.read()
+            else:
+                query = sys.stdin.read()
+            print(index.select(query, args.top_k, args.budget))
+        elif args.command in ('update', 'append'):
+            if args.command == 'append':
+                append(args.patterns, sys.stdin.read())
+            index.refresh()
+            index.save()
+            print(len(index.docs))
+        else:
+            index.refresh()
+            index.save()
+            for score, doc in index.scores(args.query)[:args.top_k]:
+                print(f"{score:.3f}\t{doc['tokens']}\t{doc['title']}")
+    except OSError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,377 @@
+"""
+フェーズの依存グラフに沿ったパイプライン実行（run-pipeline.sh）
+各フェーズの依存は tasks/NN_xxx.md の「## 入力」に書かれた結果ファイル（例: 企画書（01_planning_result.md））から決める。
+番号ではなく名前（planning, design ...）で対応付けるため、番号が古いままの記述でも正しいフェーズを指す。
+モードで省いたフェーズへの依存は、そのフェーズの入力に置き換える（軽量モードの実装は要件定義に依存する）。
+
+フェーズの入力（タスクファイル・依存する結果・ユーザー入力・そのフェーズが使う設定）のハッシュを
+results/.pipeline_state.json に記録し、入力が変わっていないフェーズは実行しない。失敗したら直して再実行すれば
+終わったフェーズを飛ばして続きから再開する。依存関係のないフェーズ（例: プロトタイプと詳細設計）は並列に実行する。
+
+対話で選んでいた設定（要件レベル・実装モードなど）は実行前に決める。
+優先順位は 環境変数 > 設定ファイル（KEY=VALUE）> 既定値
+
+フェーズは COMMAND の末尾にフェーズIDを付けて実行する。環境変数 CLAUDEFLOW_PHASE_INPUTS に
+「見出し\\tパス」を1行ずつ渡す。実行できるフェーズが1つだけのときは端末をそのまま渡し、
+並列実行中のフェーズの出力は results/.pipeline_logs/ に書いて終わったときにまとめて表示する。
+
+使用方法:
+    python3 -m claudeflow.pipeline --tasks DIR --results DIR [--mode M] [--config FILE] [--input FILE] graph
+    python3 -m claudeflow.pipeline --tasks DIR --results DIR ... run [--jobs N] [--force] -- COMMAND...
+    python3 -m claudeflow.pipeline --tasks DIR --results DIR reset [PHASE...]
+
+graph はフェーズ・依存・状態（fresh: 省略できる, stale: 実行が必要）を TSV で出力する。
+run の終了コードは 0: すべて完了、1: 失敗したフェーズがある
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+PHASES = (
+    ('01_planning', '企画フェーズ'),
+    ('02_research', '技術調査フェーズ'),
+    ('03_requirements', '要件定義フェーズ'),
+    ('04_prototype', 'プロトタイプフェーズ'),
+    ('05_design', '詳細設計フェーズ'),
+    ('06_implementation', '実装フェーズ'),
+    ('07_testing', 'テストフェーズ'),
+    ('08_code_review', 'コードレビューフェーズ'),
+    ('09_documentation', 'ドキュメント生成フェーズ'),
+)
+PHASE_NAMES = dict(PHASES)
+MODES = {
+    'ultra_light': ('01_planning', '03_requirements', '06_implementation'),
+    'light': ('01_planning', '03_requirements', '04_prototype', '06_implementation', '07_testing'),
+    'standard': tuple(phase for phase, _ in PHASES),
+}
+USER_INPUT = 'user_input'
+# 実行前に決める設定と既定値（common-functions.sh と同じ）
+CHOICES = {
+    'CLAUDEFLOW_REQ_LEVEL': 'B',
+    'CLAUDEFLOW_IMPL_MODE': '4',
+    'CLAUDEFLOW_IMPL_LEVEL': '2',
+    'CLAUDEFLOW_FEATURE_SELECTION': 'A',
+}
+# フェーズの入力ハッシュに含める設定
+PHASE_CHOICES = {
+    '03_requirements': ('CLAUDEFLOW_REQ_LEVEL',),
+    '06_implementation': ('CLAUDEFLOW_IMPL_MODE', 'CLAUDEFLOW_IMPL_LEVEL', 'CLAUDEFLOW_FEATURE_SELECTION'),
+}
+STATE_FILE = '.pipeline_state.json'
+LOG_DIR = '.pipeline_logs'
+# 入力を求めることがあるフェーズ（実装モード1〜3のスクリプトは read で確認する）
+# 端末をつないだまま実行するため、他のフェーズが終わるのを待ってから単独で実行する
+INTERACTIVE_PHASES = frozenset(('06_implementation',))
+
+# 「- 企画書（01_planning_result.md）」の見出しとファイル名
+_INPUT_LINE = re.compile(r'^\s*[-*]\s*(?P<label>[^（(]+?)\s*[（(]\s*\d+_(?P<name>\w+?)(?:_result)?\.md\s*[）)]')
+
+
+def _name(phase):
+    """'06_implementation' -> 'implementation'"""
+    return phase.split('_', 1)[1]
+
+
+def task_path(tasks_dir, phase):
+    return os.path.join(tasks_dir, f'{phase}.md')
+
+
+def result_path(results_dir, phase):
+    return os.path.join(results_dir, f'{phase}_result.md')
+
+
+def declared_inputs(path):
+    """タスクファイルの「## 入力」の [(見出し, 名前)]"""
+    inputs = []
+    in_section = False
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('#'):
+                in_section = line.strip().lstrip('#').strip() == '入力'
+                continue
+            match = _INPUT_LINE.match(line) if in_section else None
+            if match:
+                inputs.append((match.group('label'), match.group('name')))
+    return inputs
+
+
+def build_graph(tasks_dir, selected):
+    """{フェーズ: [(見出し, 依存するフェーズ または USER_INPUT)]}（フェーズの順）"""
+    order = [phase for phase, _ in PHASES]
+    by_name = {_name(phase): phase for phase in order}
+    declared = {}
+    for phase in order:
+        path = task_path(tasks_dir, phase)
+        if os.path.exists(path):
+            declared[phase] = declared_inputs(path)
+        elif phase in selected:
+            raise ValueError(f"タスクファイルが見つかりません: {path}")
+
+    def resolve(label, name, visited):
+        if name == USER_INPUT:
+            return [(label, USER_INPUT)]
+        phase = by_name.get(name)
+        if phase is None or phase in visited:
+            return []
+        if phase in selected:
+            return [(label, phase)]
+        # 省いたフェーズの代わりにその入力に依存する
+        return [item for inner_label, inner in declared.get(phase, ())
+                for item in resolve(inner_label, inner, visited | {phase})]
+
+    graph = {}
+    for phase in order:
+        if phase not in selected:
+            continue
+        inputs = []
+        for label, name in declared[phase]:
+            for item in resolve(label, name, {phase}):
+                # 後のフェーズを指す記述は無視する（循環しない）
+                if item[1] != USER_INPUT and order.index(item[1]) >= order.index(phase):
+                    continue
+                if all(item[1] != existing for _, existing in inputs):
+                    inputs.append(item)
+        graph[phase] = inputs
+    return graph
+
+
+def load_choices(config=None, environ=None):
+    """実行前に決める設定（環境変数 > 設定ファイル > 既定値）"""
+    environ = os.environ if environ is None else environ
+    choices = dict(CHOICES)
+    if config and os.path.exists(config):
+        with open(config, 'r', encoding='utf-8') as f:
+            for line in f:
+                key, sep, value = line.strip().partition('=')
+                key = key.replace('export ', '').strip()
+                if sep and key in choices:
+                    choices[key] = value.strip().strip('"\'')
+    for key in choices:
+        if environ.get(key):
+            choices[key] = environ[key]
+    return choices
+
+
+class PipelineState:
+    """フェーズごとの入力ハッシュと完了時刻（results/.pipeline_state.json）"""
+    __slots__ = ('path', 'phases')
+
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        self.phases = data.get('phases', {}) if isinstance(data, dict) else {}
+
+    def fresh(self, phase, digest, result):
+        entry = self.phases.get(phase)
+        return bool(entry and entry.get('hash') == digest and os.path.exists(result)
+                    and os.path.getsize(result) > 0)
+
+    def record(self, phase, digest, duration):
+        self.phases[phase] = {'hash': digest, 'finished': time.time(), 'duration': round(duration, 1)}
+        self.save()
+
+    def reset(self, phases=()):
+        for phase in phases or list(self.phases):
+            self.phases.pop(phase, None)
+        self.save()
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'phases': self.phases}, f, ensure_ascii=False, indent=2)
+        os.replace(temp, self.path)
+
+
+class Pipeline:
+    """依存グラフとフェーズの入力"""
+    __slots__ = ('tasks_dir', 'results_dir', 'graph', 'choices', 'initial_input', 'state')
+
+    def __init__(self, tasks_dir, results_dir, mode='standard', choices=None, initial_input=None):
+        if mode not in MODES:
+            raise ValueError(f"不明なモード: {mode}")
+        self.tasks_dir = tasks_dir
+        self.results_dir = results_dir
+        self.graph = build_graph(tasks_dir, MODES[mode])
+        self.choices = dict(CHOICES) if choices is None else choices
+        self.initial_input = initial_input if initial_input and os.path.isfile(initial_input) else None
+        self.state = PipelineState(os.path.join(results_dir, STATE_FILE))
+
+    def inputs(self, phase):
+        """[(見出し, パス)]（ユーザー入力がない場合は除く）"""
+        items = []
+        for label, dependency in self.graph[phase]:
+            if dependency == USER_INPUT:
+                if self.initial_input:
+                    items.append((label, self.initial_input))
+            else:
+                items.append((label, result_path(self.results_dir, dependency)))
+        return items
+
+    def digest(self, phase):
+        """フェーズの入力のハッシュ"""
+        h = hashlib.sha256()
+        for label, path in [('タスク', task_path(self.tasks_dir, phase))] + self.inputs(phase):
+            h.update(label.encode('utf-8') + b'\0')
+            try:
+                with open(path, 'rb') as f:
+                    h.update(hashlib.sha256(f.read()).digest())
+            except OSError:
+                h.update(b'missing')
+        for key in PHASE_CHOICES.get(phase, ()):
+            h.update(f'\0{key}={self.choices[key]}'.encode('utf-8'))
+        return h.hexdigest()
+
+    def fresh(self, phase):
+        return self.state.fresh(phase, self.digest(phase), result_path(self.results_dir, phase))
+
+
+class Runner:
+    """依存の終わったフェーズから実行する"""
+    __slots__ = ('pipeline', 'command', 'jobs', 'force', 'lock', 'out')
+
+    def __init__(self, pipeline, command, jobs=2, force=False, out=None):
+        self.pipeline = pipeline
+        self.command = list(command)
+        self.jobs = max(1, jobs)
+        self.force = force
+        self.lock = threading.Lock()
+        self.out = out or sys.stdout
+
+    def _print(self, text):
+        with self.lock:
+            print(text, file=self.out, flush=True)
+
+    def _execute(self, phase, foreground):
+        pipeline = self.pipeline
+        digest = pipeline.digest(phase)
+        env = dict(os.environ)
+        env.update(pipeline.choices)
+        env['CLAUDEFLOW_PHASE_INPUTS'] = ''.join(f'{label}\t{path}\n' for label, path in pipeline.inputs(phase))
+        command = self.command + [phase]
+        started = time.time()
+        if foreground:
+            self.out.flush()
+            status = subprocess.call(command, env=env)
+        else:
+            log_dir = os.path.join(pipeline.results_dir, LOG_DIR)
+            os.makedirs(log_dir, exist_ok=True)
+            log_path = os.path.join(log_dir, f'{phase}.log')
+            with open(log_path, 'wb') as log:
+                status = subprocess.call(command, env=env, stdin=subprocess.DEVNULL, stdout=log,
+                                         stderr=subprocess.STDOUT)
+            with open(log_path, 'r', encoding='utf-8', errors='replace') as log:
+                output = log.read()
+            self._print(f"--- {phase} {PHASE_NAMES[phase]} の出力 ---\n{output.rstrip()}")
+        duration = time.time() - started
+        result = result_path(pipeline.results_dir, phase)
+        if status == 0 and os.path.exists(result) and os.path.getsize(result) > 0:
+            with self.lock:
+                pipeline.state.record(phase, digest, duration)
+            self._print(f"✅ {phase} {PHASE_NAMES[phase]} ({duration:.1f}秒)")
+            return True
+        reason = f"終了コード {status}" if status else f"結果ファイルが空です: {result}"
+        self._print(f"❌ {phase} {PHASE_NAMES[phase]}: {reason}")
+        return False
+
+    def _ready(self, phase, done):
+        return all(dep == USER_INPUT or dep in done for _, dep in self.pipeline.graph[phase])
+
+    def _skip_fresh(self, pending, done):
+        """依存が終わっていて入力に変更のないフェーズを完了扱いにする（その後のフェーズも続けて見る）"""
+        if self.force:
+            return
+        for phase in list(pending):
+            if self._ready(phase, done) and self.pipeline.fresh(phase):
+                self._print(f"⏭  {phase} {PHASE_NAMES[phase]}: 入力に変更がないため省略")
+                pending.remove(phase)
+                done.add(phase)
+
+    def run(self):
+        """失敗したフェーズのリスト（空ならすべて完了）"""
+        pending = list(self.pipeline.graph)
+        done, failed, running = set(), [], {}
+        with ThreadPoolExecutor(self.jobs) as pool:
+            while True:
+                self._skip_fresh(pending, done)
+                # 失敗したら新しいフェーズは始めず、実行中のものを待つ
+                ready = [] if failed else [phase for phase in pending if self._ready(phase, done)]
+                if not ready and not running:
+                    break
+                foreground = next((phase for phase in ready if phase in INTERACTIVE_PHASES), None)
+                if foreground is None and ready and not running and (len(ready) == 1 or self.jobs == 1):
+                    foreground = ready[0]
+                if foreground and not running:
+                    pending.remove(foreground)
+                    (done.add if self._execute(foreground, True) else failed.append)(foreground)
+                    continue
+                # 前景で実行するフェーズがあれば、新しいフェーズは始めずに実行中のものを待つ
+                started = []
+                while ready and foreground is None and len(running) < self.jobs:
+                    phase = ready.pop(0)
+                    pending.remove(phase)
+                    running[pool.submit(self._execute, phase, False)] = phase
+                    started.append(phase)
+                if started:
+                    self._print(f"▶  並列実行: {', '.join(f'{p} {PHASE_NAMES[p]}' for p in started)}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    phase = running.pop(future)
+                    (done.add if future.result() else failed.append)(phase)
+        if pending:
+            self._print(f"⏸  未実行: {', '.join(pending)}（修正後に再実行すると続きから再開します）")
+        return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.pipeline', description='フェーズの依存グラフ実行')
+    parser.add_argument('--tasks', required=True, help='タスクファイルのディレクトリ')
+    parser.add_argument('--results', required=True, help='結果ファイルのディレクトリ')
+    parser.add_argument('--mode', default=os.environ.get('CLAUDEFLOW_MODE') or 'standard', choices=sorted(MODES))
+    parser.add_argument('--config', help='設定ファイル（KEY=VALUE）')
+    parser.add_argument('--input', help='ユーザー入力ファイル')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('graph', help='フェーズ・依存・状態')
+    run_parser = sub.add_parser('run', help='フェーズを実行する')
+    run_parser.add_argument('--jobs', type=int, default=int(os.environ.get('CLAUDEFLOW_PIPELINE_JOBS') or 2))
+    run_parser.add_argument('--force', action='store_true', help='入力が同じでも実行する')
+    run_parser.add_argument('phase_command', nargs=argparse.REMAINDER)
+    reset_parser = sub.add_parser('reset', help='記録を消す（次回はすべて実行）')
+    reset_parser.add_argument('phases', nargs='*')
+    args = parser.parse_args(argv)
+
+    try:
+        pipeline = Pipeline(args.tasks, args.results, args.mode, load_choices(args.config), args.input)
+        if args.command == 'graph':
+            for phase, inputs in pipeline.graph.items():
+                dependencies = ','.join(dep for _, dep in inputs) or '-'
+                print(f"{phase}\t{PHASE_NAMES[phase]}\t{dependencies}\t{'fresh' if pipeline.fresh(phase) else 'stale'}")
+            return 0
+        if args.command == 'reset':
+            pipeline.state.reset(args.phases)
+            return 0
+        command = args.phase_command[1:] if args.phase_command[:1] == ['--'] else args.phase_command
+        if not command:
+            parser.error('フェーズを実行するコマンドを -- の後に指定してください')
+        return 1 if Runner(pipeline, command, args.jobs, args.force).run() else 0
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
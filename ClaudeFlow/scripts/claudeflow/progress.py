@@ -0,0 +1,326 @@
+"""
+実装進捗の記録（SQLite、WALモード）
+機能・フェーズごとの開始／終了時刻、状態、エラー、所要時間を1行ずつ記録する。
+WALモードのため並列実装のワーカーが同時に書き込んでも行が混ざらず、読み込み中も書き込みを待たせない
+
+よく使う問い合わせには索引があり、全件を読まずに答える:
+    - 完了済みの機能（再開時に飛ばす機能）と再開位置
+    - 所要時間の長い機能・フェーズ
+    - フェーズごとの失敗率
+
+使用方法:
+    python3 -m claudeflow.progress [--db DB] start --feature F [--name N] [--phase P] [--run R] [--project D]
+    python3 -m claudeflow.progress [--db DB] finish --feature F --status S [--error E] [--start T] [--end T] \\
+                                           [--lines N] [--name N] [--phase P] [--run R] [--project D]
+    python3 -m claudeflow.progress [--db DB] completed [--project D]       # 完了した機能IDを1行ずつ
+    python3 -m claudeflow.progress [--db DB] resume --ids a,b,c [--project D]  # 最初の未完了の機能ID
+    python3 -m claudeflow.progress [--db DB] slowest [--limit N] [--phase P] [--project D]
+    python3 -m claudeflow.progress [--db DB] failures [--project D]
+    python3 -m claudeflow.progress [--db DB] show [--limit N] [--project D]
+    python3 -m claudeflow.progress [--db DB] import-csv implementation_progress.csv [--project D]
+    python3 -m claudeflow.progress [--db DB] lines                       # 機能名と生成した行数（TSV）
+
+フェーズを省略した記録は機能全体（feature）の記録として扱う。時刻はエポック秒または 'YYYY-MM-DD HH:MM:SS'
+--lines で記録した生成コードの行数は claudeflow.budget が機能の行数見積もりの学習に使う
+"""
+
+import argparse
+import contextlib
+import csv
+import os
+import sqlite3
+import sys
+import time
+
+from .eventlog import format_time, parse_time
+from .textutil import ljust
+
+DEFAULT_DB = os.environ.get('CLAUDEFLOW_PROGRESS_DB') or 'logs/implementation_progress.db'
+FEATURE_PHASE = 'feature'
+RUNNING = 'RUNNING'
+SUCCESS = 'SUCCESS'
+ERROR = 'ERROR'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS progress (
+    id INTEGER PRIMARY KEY,
+    project TEXT NOT NULL DEFAULT '',
+    run TEXT NOT NULL DEFAULT '',
+    feature_id TEXT NOT NULL,
+    feature_name TEXT NOT NULL DEFAULT '',
+    phase TEXT NOT NULL DEFAULT 'feature',
+    status TEXT NOT NULL,
+    started REAL,
+    finished REAL,
+    duration REAL,
+    error TEXT NOT NULL DEFAULT '',
+    lines INTEGER
+);
+CREATE INDEX IF NOT EXISTS progress_completed ON progress (project, phase, status, feature_id);
+CREATE INDEX IF NOT EXISTS progress_running ON progress (run, feature_id, phase, status);
+CREATE INDEX IF NOT EXISTS progress_duration ON progress (phase, duration);
+CREATE INDEX IF NOT EXISTS progress_phase_status ON progress (phase, status);
+'''
+
+
+class ProgressStore:
+    """進捗のデータベース。with で使うと抜けるときに閉じる"""
+    __slots__ = ('path', 'connection')
+
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(_SCHEMA)
+        columns = {row[1] for row in self.connection.execute('PRAGMA table_info(progress)')}
+        if 'lines' not in columns:
+            # 行数の列がない古いデータベース
+            self.connection.execute('ALTER TABLE progress ADD COLUMN lines INTEGER')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """書き込みロックを最初に取るトランザクション（読んでから更新する間に他の書き込みを入れない）"""
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        self.connection.execute('COMMIT')
+
+    def start(self, feature_id, name='', phase=FEATURE_PHASE, run='', project='', started=None):
+        """開始を記録する（状態は RUNNING）"""
+        cursor = self.connection.execute(
+            'INSERT INTO progress (project, run, feature_id, feature_name, phase, status, started) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (project, run, feature_id, name, phase, RUNNING, started if started is not None else time.time()))
+        return cursor.lastrowid
+
+    def finish(self, feature_id, status, error='', name='', phase=FEATURE_PHASE, run='', project='',
+               started=None, finished=None, lines=None):
+        """
+        終了を記録する。同じ実行・機能・フェーズの RUNNING の行があればそれを更新し、
+        なければ開始時刻（started）付きの行を追加する。lines は生成したコードの行数
+        """
+        finished = finished if finished is not None else time.time()
+        with self._transaction():
+            row = self.connection.execute(
+                'SELECT id, started FROM progress WHERE run = ? AND feature_id = ? AND phase = ? AND status = ? '
+                'ORDER BY id DESC LIMIT 1', (run, feature_id, phase, RUNNING)).fetchone()
+            if row:
+                row_id, started = row[0], started if started is not None else row[1]
+                self.connection.execute(
+                    'UPDATE progress SET status = ?, error = ?, started = ?, finished = ?, duration = ?, lines = ?, '
+                    "feature_name = CASE WHEN ? != '' THEN ? ELSE feature_name END WHERE id = ?",
+                    (status, error, started, finished, _duration(started, finished), lines, name, name, row_id))
+                return row_id
+            cursor = self.connection.execute(
+                'INSERT INTO progress (project, run, feature_id, feature_name, phase, status, started, finished, '
+                'duration, error, lines) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (project, run, feature_id, name, phase, status, started, finished, _duration(started, finished),
+                 error, lines))
+            return cursor.lastrowid
+
+    def completed(self, project=''):
+        """完了した機能IDの集合"""
+        rows = self.connection.execute(
+            'SELECT DISTINCT feature_id FROM progress WHERE project = ? AND phase = ? AND status = ?',
+            (project, FEATURE_PHASE, SUCCESS))
+        return {row[0] for row in rows}
+
+    def feature_lines(self, project=None):
+        """成功した機能の (機能名, 生成した行数)。行数を記録していない機能は除く"""
+        query = ('SELECT feature_name, lines FROM progress WHERE phase = ? AND status = ? AND lines IS NOT NULL '
+                 "AND feature_name != ''")
+        params = [FEATURE_PHASE, SUCCESS]
+        if project is not None:
+            query += ' AND project = ?'
+            params.append(project)
+        return self.connection.execute(query, params).fetchall()
+
+    def resume_point(self, feature_ids, project=''):
+        """feature_ids（実装順）のうち最初の未完了の機能ID。すべて完了していれば None"""
+        done = self.completed(project)
+        return next((feature_id for feature_id in feature_ids if feature_id not in done), None)
+
+    def slowest(self, limit=10, phase=FEATURE_PHASE, project=None):
+        query = ('SELECT feature_id, feature_name, phase, status, duration, run FROM progress '
+                 'WHERE phase = ? AND duration IS NOT NULL')
+        params = [phase]
+        if project is not None:
+            query += ' AND project = ?'
+            params.append(project)
+        query += ' ORDER BY duration DESC LIMIT ?'
+        params.append(limit)
+        return self.connection.execute(query, params).fetchall()
+
+    def failure_rates(self, project=None):
+        """フェーズごとの (フェーズ, 終了件数, 失敗件数)。実行中の行は数えない"""
+        query = 'SELECT phase, COUNT(*), SUM(status = ?) FROM progress WHERE status != ?'
+        params = [ERROR, RUNNING]
+        if project is not None:
+            query += ' AND project = ?'
+            params.append(project)
+        query += ' GROUP BY phase ORDER BY phase'
+        return self.connection.execute(query, params).fetchall()
+
+    def recent(self, limit=20, project=None):
+        query = ('SELECT feature_id, feature_name, phase, started, finished, duration, status, error '
+                 'FROM progress')
+        params = []
+        if project is not None:
+            query += ' WHERE project = ?'
+            params.append(project)
+        query += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit)
+        return self.connection.execute(query, params).fetchall()[::-1]
+
+    def counts(self, project=None):
+        """機能全体の記録の状態ごとの件数"""
+        query = 'SELECT status, COUNT(*) FROM progress WHERE phase = ?'
+        params = [FEATURE_PHASE]
+        if project is not None:
+            query += ' AND project = ?'
+            params.append(project)
+        return dict(self.connection.execute(query + ' GROUP BY status', params).fetchall())
+
+    def import_csv(self, path, project=''):
+        """旧形式の implementation_progress.csv を取り込み、取り込んだ行数を返す"""
+        count = 0
+        with open(path, 'r', encoding='utf-8', newline='') as f, self._transaction():
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                if len(row) < 5:
+                    continue
+                feature_id, name, started, finished, status = row[:5]
+                started = parse_time(started) if started else None
+                finished = parse_time(finished) if finished else None
+                self.connection.execute(
+                    'INSERT INTO progress (project, feature_id, feature_name, phase, status, started, finished, '
+                    'duration, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (project, feature_id, name, FEATURE_PHASE, status, started, finished,
+                     _duration(started, finished), row[5] if len(row) > 5 else ''))
+                count += 1
+        return count
+
+
+def _duration(started, finished):
+    if started is None or finished is None:
+        return None
+    return round(finished - started, 3)
+
+
+def _format_duration(seconds):
+    if seconds is None:
+        return '-'
+    minutes, seconds = divmod(int(seconds), 60)
+    return f'{minutes}分{seconds:02d}秒' if minutes else f'{seconds}秒'
+
+
+def _time_arg(value):
+    return parse_time(value) if value else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.progress', description='実装進捗の記録')
+    parser.add_argument('--db', default=DEFAULT_DB, help='データベースのパス')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    start_parser = sub.add_parser('start', help='開始を記録')
+    finish_parser = sub.add_parser('finish', help='終了を記録')
+    finish_parser.add_argument('--status', required=True, help='SUCCESS / ERROR など')
+    finish_parser.add_argument('--error', default='')
+    finish_parser.add_argument('--start', help='開始時刻（start を記録していない場合）')
+    finish_parser.add_argument('--end', help='終了時刻（省略時は現在）')
+    finish_parser.add_argument('--lines', type=int, help='生成したコードの行数')
+    for p in (start_parser, finish_parser):
+        p.add_argument('--feature', required=True, help='機能ID')
+        p.add_argument('--name', default='', help='機能名')
+        p.add_argument('--phase', default=FEATURE_PHASE)
+        p.add_argument('--run', default='')
+    completed_parser = sub.add_parser('completed', help='完了した機能IDを表示')
+    resume_parser = sub.add_parser('resume', help='最初の未完了の機能IDを表示（すべて完了なら終了コード1）')
+    resume_parser.add_argument('--ids', required=True, help='機能ID（実装順、カンマ区切り）')
+    slowest_parser = sub.add_parser('slowest', help='所要時間の長い順に表示')
+    slowest_parser.add_argument('--limit', type=int, default=10)
+    slowest_parser.add_argument('--phase', default=FEATURE_PHASE)
+    failures_parser = sub.add_parser('failures', help='フェーズごとの失敗率')
+    show_parser = sub.add_parser('show', help='最近の記録と統計')
+    show_parser.add_argument('--limit', type=int, default=20)
+    import_parser = sub.add_parser('import-csv', help='旧形式の進捗CSVを取り込む')
+    import_parser.add_argument('csv')
+    lines_parser = sub.add_parser('lines', help='成功した機能の機能名と生成した行数')
+    for p in (start_parser, finish_parser, completed_parser, resume_parser, import_parser):
+        p.add_argument('--project', default='', help='実装ディレクトリ（再開の判定に使う）')
+    for p in (slowest_parser, failures_parser, show_parser, lines_parser):
+        p.add_argument('--project', help='実装ディレクトリで絞り込む')
+    args = parser.parse_args(argv)
+
+    try:
+        with ProgressStore(args.db) as store:
+            if args.command == 'start':
+                store.start(args.feature, args.name, args.phase, args.run, args.project)
+            elif args.command == 'finish':
+                store.finish(args.feature, args.status, args.error, args.name, args.phase, args.run, args.project,
+                             _time_arg(args.start), _time_arg(args.end), args.lines)
+            elif args.command == 'completed':
+                for feature_id in sorted(store.completed(args.project)):
+                    print(feature_id)
+            elif args.command == 'resume':
+                feature_id = store.resume_point([i for i in args.ids.split(',') if i], args.project)
+                if feature_id is None:
+                    return 1
+                print(feature_id)
+            elif args.command == 'slowest':
+                for feature_id, name, phase, status, duration, run in store.slowest(args.limit, args.phase,
+                                                                                     args.project):
+                    print(f"{ljust(feature_id, 16)}{ljust(name, 30)}{_format_duration(duration):>10}  {status}")
+            elif args.command == 'failures':
+                print(f"{ljust('フェーズ', 24)}{'終了':>6}{'失敗':>6}{'失敗率':>8}")
+                for phase, total, failed in store.failure_rates(args.project):
+                    print(f"{ljust(phase, 24)}{total:>8}{failed:>8}{failed * 100 / total:>9.1f}%")
+            elif args.command == 'show':
+                print(f"{ljust('機能ID', 16)}{ljust('機能名', 24)}{ljust('フェーズ', 16)}"
+                      f"{ljust('開始時刻', 20)}{'所要時間':>8}  状態")
+                for feature_id, name, phase, started, _, duration, status, error in store.recent(args.limit,
+                                                                                             args.project):
+                    line = (f"{ljust(feature_id, 16)}{ljust(name, 24)}{ljust(phase, 16)}"
+                            f"{ljust(format_time(started) if started else '-', 20)}"
+                            f"{_format_duration(duration):>10}  {status}")
+                    print(f"{line}  {error}" if error else line)
+                counts = store.counts(args.project)
+                finished = sum(n for status, n in counts.items() if status != RUNNING)
+                print()
+                print('統計:')
+                print(f"  総機能数: {finished}")
+                print(f"  成功: {counts.get(SUCCESS, 0)}")
+                print(f"  エラー: {counts.get(ERROR, 0)}")
+                print(f"  実行中: {counts.get(RUNNING, 0)}")
+                if finished:
+                    print(f"  成功率: {counts.get(SUCCESS, 0) * 100 // finished}%")
+            elif args.command == 'lines':
+                for name, lines in store.feature_lines(args.project):
+                    print(f"{name}\t{lines}")
+            else:
+                print(store.import_csv(args.csv, args.project))
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Claude呼び出しの応答キャッシュ
+正規化したプロンプト・許可ツール・テンプレートのバージョンをキーに応答を保存し、
+再実行で同じプロンプトを送るときはClaudeを呼ばずに保存済みの応答を返す
+
+正規化: Unicode NFC、改行をLFに統一、行末の空白と前後の空行を除去、連続する空行を1行にまとめる
+テンプレートのバージョンは --template-dir の *.md の内容ハッシュ（テンプレートを直せば古い応答は使われない）
+保存先は検証キャッシュと同じ1エントリ1ファイル形式で、保存から TTL 秒を過ぎたエントリは使わない
+
+使用方法:
+    python3 -m claudeflow.prompt_cache get --output FILE [--tools T] [--template-dir D] < prompt
+    python3 -m claudeflow.prompt_cache put --response FILE [--tools T] [--template-dir D] < prompt
+    python3 -m claudeflow.prompt_cache stats|clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+
+from .validation.cache import ValidationCache
+
+# 既定の保存先（CLAUDEFLOW_PROMPT_CACHEで変更可能）
+DEFAULT_CACHE_DIR = os.environ.get('CLAUDEFLOW_PROMPT_CACHE') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'claudeflow', 'prompts')
+DEFAULT_TTL = int(os.environ.get('CLAUDEFLOW_PROMPT_CACHE_TTL', str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def normalize_prompt(text):
+    """空白や改行の違いだけのプロンプトが同じキーになるよう正規化する"""
+    text = unicodedata.normalize('NFC', text).replace('\r\n', '\n').replace('\r', '\n')
+    text = '\n'.join(line.rstrip() for line in text.split('\n'))
+    return _BLANK_LINES.sub('\n\n', text).strip('\n')
+
+
+def normalize_tools(tools):
+    """許可ツールの指定（空白・カンマ区切り）を順序によらない形にする"""
+    return ' '.join(sorted(set(re.split(r'[\s,]+', tools or '')) - {''}))
+
+
+def template_version(template_dir):
+    """テンプレートディレクトリの *.md の内容ハッシュ（ディレクトリがなければ空文字列）"""
+    if not template_dir or not os.path.isdir(template_dir):
+        return ''
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(template_dir)):
+        if name.endswith('.md'):
+            with open(os.path.join(template_dir, name), 'rb') as f:
+                digest.update(name.encode() + b'\0' + f.read() + b'\0')
+    return digest.hexdigest()[:16]
+
+
+class PromptCache(ValidationCache):
+    """
+    プロンプトの応答キャッシュ。保存・削除の仕組みは ValidationCache と同じで、
+    保存から ttl 秒を過ぎたエントリはミスとして扱い削除する
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(path, max_entries, max_bytes)
+        self.ttl = ttl
+
+    def prompt_key(self, prompt, tools='', version=''):
+        digest = hashlib.sha256(normalize_prompt(prompt).encode('utf-8')).hexdigest()
+        return self.make_key(f'{version}\0{normalize_tools(tools)}', digest)
+
+    def get(self, key):
+        value = super().get(key)
+        if value is None:
+            return None
+        if self.ttl and time.time() - value.get('created', 0) > self.ttl:
+            self.hits -= 1
+            self.misses += 1
+            try:
+                os.unlink(self._entry_path(key))
+            except OSError:
+                pass
+            return None
+        return value
+
+    def put_response(self, key, response):
+        self.put(key, {'response': response, 'created': time.time()})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.prompt_cache', description='Claude呼び出しの応答キャッシュ')
+    parser.add_argument('--dir', default=DEFAULT_CACHE_DIR, help='キャッシュの保存先')
+    parser.add_argument('--ttl', type=int, default=DEFAULT_TTL, help='有効期間（秒、0で無期限）')
+    sub = parser.add_subparsers(dest='command', required=True)
+    get_parser = sub.add_parser('get', help='標準入力のプロンプトの保存済み応答を書き出す（なければ終了コード1）')
+    get_parser.add_argument('--output', required=True, help='応答の書き込み先')
+    put_parser = sub.add_parser('put', help='標準入力のプロンプトの応答を保存')
+    put_parser.add_argument('--response', required=True, help='保存する応答のファイル')
+    for p in (get_parser, put_parser):
+        p.add_argument('--tools', default='', help='Claudeに許可したツール')
+        p.add_argument('--template-dir', help='プロンプトテンプレートのディレクトリ（内容がバージョンになる）')
+    sub.add_parser('stats', help='ヒット・ミス数を表示')
+    sub.add_parser('clear', help='キャッシュを削除')
+    args = parser.parse_args(argv)
+
+    cache = PromptCache(args.dir, args.ttl)
+    if args.command == 'stats':
+        json.dump(cache.stats(), sys.stdout)
+        print()
+        return 0
+    if args.command == 'clear':
+        cache.clear()
+        return 0
+
+    try:
+        key = cache.prompt_key(sys.stdin.read(), args.tools, template_version(args.template_dir))
+        with cache:
+            if args.command == 'put':
+                with open(args.response, 'r', encoding='utf-8', errors='replace') as f:
+                    cache.put_response(key, f.read())
+                return 0
+            entry = cache.get(key)
+        if entry is None:
+            return 1
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(entry['response'])
+    except OSError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
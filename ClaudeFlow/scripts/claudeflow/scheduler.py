@@ -0,0 +1,383 @@
+"""
+機能実装の並列スケジューラ
+features.json の依存関係（宣言された dependencies と、説明文に現れる他の機能名から推定したもの）で
+DAGを作り、依存する機能がすべて完了した機能から上限数まで同時に実装コマンドを実行する
+
+各機能のコマンドは作業ディレクトリ（CLAUDEFLOW_FEATURE_STAGING）に出力し、完了後に
+ファイルごとのロックを取って共有の出力ディレクトリへ統合する。失敗した機能に依存する機能は実行しない
+同時に実行した機能が同じファイルに異なる内容を書いた場合は、先に統合した内容を残し、
+後の機能の内容を <ファイル名>.<機能ID>.conflict に保存して競合として報告する
+
+コマンドに渡す環境変数:
+    FEATURE_ID / FEATURE_NAME / FEATURE_DESCRIPTION / FEATURE_INDEX（features.json 内の位置、0始まり）
+    CLAUDEFLOW_FEATURE_ID（トークン台帳の機能ID）
+    CLAUDEFLOW_FEATURE_STAGING（この機能の作業ディレクトリ）/ CLAUDEFLOW_SCHEDULER_OUTPUT（共有の出力先）
+
+使用方法:
+    python3 -m claudeflow.scheduler features.json --command 'bash implement.sh' --output-dir DIR
+                                    [--ids a,b] [--core] [--jobs 3] [--timeout 1800] [--no-infer]
+                                    [--append 'CONTEXT*.md'] [--report report.json] [--plan]
+"""
+
+import argparse
+import concurrent.futures
+import fcntl
+import fnmatch
+import hashlib
+import json
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+from .features import is_core, load_features
+
+DEFAULT_JOBS = 3
+DEFAULT_TIMEOUT = 1800
+# 推定に使う機能名の最短文字数（「UI」のような短い名前は誤検出が多い）
+_MIN_INFER_NAME = 3
+_STATE_DIR = '.claudeflow'
+
+
+class CycleError(ValueError):
+    """依存関係が循環している"""
+
+
+def build_graph(features, infer=True):
+    """
+    機能ID -> 依存する機能IDの集合 を返す
+    宣言された依存のうち対象外の機能は無視する。推定した依存は一覧で前にある機能に限るため循環しない
+    """
+    ids = [feature['id'] for feature in features]
+    known = set(ids)
+    graph = {}
+    for position, feature in enumerate(features):
+        deps = {dep for dep in feature.get('dependencies') or () if dep in known and dep != feature['id']}
+        if infer:
+            text = str(feature.get('description') or '')
+            for earlier in features[:position]:
+                name = str(earlier.get('name') or '')
+                if len(name) >= _MIN_INFER_NAME and name in text:
+                    deps.add(earlier['id'])
+        graph[feature['id']] = deps
+    order = topological_levels(graph, ids)
+    if sum(len(level) for level in order) != len(ids):
+        remaining = sorted(set(ids) - {i for level in order for i in level})
+        raise CycleError(f"依存関係が循環しています: {', '.join(remaining)}")
+    return graph
+
+
+def topological_levels(graph, ids):
+    """依存の深さごとの機能IDのリスト（同じ段の機能は同時に実行できる）。循環部分は含まれない"""
+    remaining = {i: set(graph[i]) for i in ids}
+    levels = []
+    while remaining:
+        level = [i for i in ids if i in remaining and not remaining[i]]
+        if not level:
+            break
+        levels.append(level)
+        for i in level:
+            del remaining[i]
+        for deps in remaining.values():
+            deps.difference_update(level)
+    return levels
+
+
+def _lock_path(output_dir, relative):
+    digest = hashlib.sha1(relative.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(output_dir, _STATE_DIR, 'locks', digest + '.lock')
+
+
+def merge_tree(staging, output_dir, append_patterns=(), feature_id=None, written=None, seen=()):
+    """
+    作業ディレクトリのファイルを出力先へ統合し、(統合したファイル, 競合したファイル) を返す
+    ファイルごとに排他ロックを取り、append_patterns に一致するファイルは追記、それ以外は置き換える
+    written（ファイル -> 最後に書いた機能ID）を渡すと、seen に含まれない機能（同時に実行した機能）が
+    書いたファイルと内容が異なる場合は置き換えず、<ファイル名>.<feature_id>.conflict に保存する
+    """
+    feature_id = feature_id or os.path.basename(os.path.normpath(staging))
+    merged = []
+    conflicts = []
+    os.makedirs(os.path.join(output_dir, _STATE_DIR, 'locks'), exist_ok=True)
+    for root, dirs, files in os.walk(staging):
+        dirs.sort()
+        for name in sorted(files):
+            source = os.path.join(root, name)
+            relative = os.path.relpath(source, staging)
+            target = os.path.join(output_dir, relative)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(_lock_path(output_dir, relative), 'w') as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                if any(fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(name, pattern)
+                       for pattern in append_patterns):
+                    with open(source, 'rb') as src, open(target, 'ab') as dst:
+                        shutil.copyfileobj(src, dst)
+                else:
+                    with open(source, 'rb') as src:
+                        data = src.read()
+                    writer = written.get(relative) if written is not None else None
+                    conflict = False
+                    if writer is not None and writer != feature_id and writer not in seen:
+                        try:
+                            with open(target, 'rb') as existing:
+                                conflict = existing.read() != data
+                        except FileNotFoundError:
+                            pass
+                    if conflict:
+                        conflicts.append(relative)
+                        relative = f"{relative}.{feature_id}.conflict"
+                        target = os.path.join(output_dir, relative)
+                    elif written is not None:
+                        written[relative] = feature_id
+                    temp = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+                    with open(temp, 'wb') as f:
+                        f.write(data)
+                    os.replace(temp, target)
+            merged.append(relative)
+    return merged, conflicts
+
+
+class FeatureResult:
+    __slots__ = ('id', 'status', 'returncode', 'seconds', 'log', 'files', 'conflicts', 'reason')
+
+    def __init__(self, feature_id, status, returncode=None, seconds=0.0, log=None, reason=''):
+        self.id = feature_id
+        self.status = status
+        self.returncode = returncode
+        self.seconds = seconds
+        self.log = log
+        self.files = []
+        self.conflicts = []
+        self.reason = reason
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'returncode': self.returncode,
+            'seconds': round(self.seconds, 3),
+            'log': self.log,
+            'files': self.files,
+            'conflicts': self.conflicts,
+            'reason': self.reason,
+        }
+
+
+class Scheduler:
+    """依存関係を満たした機能から jobs 件まで並列に command を実行する"""
+
+    def __init__(self, features, graph, command, output_dir, jobs=DEFAULT_JOBS, timeout=DEFAULT_TIMEOUT,
+                 append_patterns=(), env=None, on_event=None):
+        self.features = {feature['id']: feature for feature in features}
+        self.order = [feature['id'] for feature in features]
+        self.graph = graph
+        self.command = command
+        self.output_dir = os.path.realpath(output_dir)
+        self.jobs = max(1, jobs)
+        self.timeout = timeout
+        self.append_patterns = tuple(append_patterns)
+        self.env = dict(os.environ if env is None else env)
+        self.on_event = on_event or (lambda event, feature, result=None: None)
+        self.state_dir = os.path.join(self.output_dir, _STATE_DIR)
+        self._processes = {}
+        self._lock = threading.Lock()
+        # 出力先のファイル -> 最後に書いた機能ID と、統合を終えた機能（競合の判定に使う）
+        self._written = {}
+        self._merged = set()
+
+    def _run_one(self, feature_id):
+        feature = self.features[feature_id]
+        staging = os.path.join(self.state_dir, 'staging', feature_id)
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        log_path = os.path.join(self.state_dir, 'logs', f'{feature_id}.log')
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        env = dict(self.env)
+        env.update({
+            'FEATURE_ID': feature_id,
+            'FEATURE_NAME': str(feature.get('name') or ''),
+            'FEATURE_DESCRIPTION': str(feature.get('description') or ''),
+            'FEATURE_INDEX': str(feature.get('_index', self.order.index(feature_id))),
+            'CLAUDEFLOW_FEATURE_ID': feature_id,
+            'CLAUDEFLOW_FEATURE_STAGING': staging,
+            'CLAUDEFLOW_SCHEDULER_OUTPUT': self.output_dir,
+        })
+        with self._lock:
+            seen = set(self._merged)
+        start = time.monotonic()
+        with open(log_path, 'wb') as log:
+            # 中断時にコマンドが起動した claude ごと止められるよう、プロセスグループを分ける
+            process = subprocess.Popen(['bash', '-c', self.command], stdin=subprocess.DEVNULL, stdout=log,
+                                       stderr=subprocess.STDOUT, env=env, start_new_session=True)
+            with self._lock:
+                self._processes[feature_id] = process
+            try:
+                returncode = process.wait(timeout=self.timeout)
+                reason = '' if returncode == 0 else f'終了コード {returncode}'
+            except subprocess.TimeoutExpired:
+                _kill_group(process)
+                returncode = process.wait()
+                reason = f'タイムアウト（{self.timeout}秒）'
+            finally:
+                with self._lock:
+                    self._processes.pop(feature_id, None)
+        result = FeatureResult(feature_id, 'done' if returncode == 0 else 'failed', returncode,
+                               time.monotonic() - start, log_path, reason)
+        if returncode == 0:
+            result.files, result.conflicts = merge_tree(staging, self.output_dir, self.append_patterns,
+                                                        feature_id, self._written, seen)
+            with self._lock:
+                self._merged.add(feature_id)
+        shutil.rmtree(staging, ignore_errors=True)
+        return result
+
+    def _dependents(self, feature_id):
+        return [i for i in self.order if feature_id in self.graph[i]]
+
+    def run(self):
+        """すべての機能を実行し、機能IDごとの FeatureResult を features.json の順で返す"""
+        waiting = {i: set(deps) for i, deps in self.graph.items()}
+        results = {}
+        ready = [i for i in self.order if not waiting[i]]
+        running = {}
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.jobs)
+        try:
+            while ready or running:
+                while ready and len(running) < self.jobs:
+                    feature_id = ready.pop(0)
+                    self.on_event('start', self.features[feature_id])
+                    running[pool.submit(self._run_one, feature_id)] = feature_id
+                finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    feature_id = running.pop(future)
+                    try:
+                        result = future.result()
+                    except OSError as e:
+                        result = FeatureResult(feature_id, 'failed', reason=str(e))
+                    results[feature_id] = result
+                    self.on_event(result.status, self.features[feature_id], result)
+                    if result.status == 'done':
+                        for dependent in self._dependents(feature_id):
+                            waiting[dependent].discard(feature_id)
+                            if not waiting[dependent] and dependent not in results:
+                                ready.append(dependent)
+                        ready.sort(key=self.order.index)
+                    else:
+                        self._skip_dependents(feature_id, results)
+        except KeyboardInterrupt:
+            self.cancel()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+        return {i: results[i] for i in self.order if i in results}
+
+    def _skip_dependents(self, failed_id, results):
+        stack = [failed_id]
+        while stack:
+            for dependent in self._dependents(stack.pop()):
+                if dependent not in results:
+                    results[dependent] = FeatureResult(dependent, 'skipped', reason=f'{failed_id} が失敗')
+                    self.on_event('skipped', self.features[dependent], results[dependent])
+                    stack.append(dependent)
+
+    def cancel(self):
+        with self._lock:
+            for process in self._processes.values():
+                _kill_group(process)
+
+
+def _kill_group(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+    except OSError:
+        pass
+
+
+def _print_event(event, feature, result=None):
+    name = f"{feature['id']} {feature.get('name') or ''}".strip()
+    if event == 'start':
+        print(f"▶ 開始: {name}", flush=True)
+    elif event == 'done':
+        note = f"、競合 {len(result.conflicts)}件" if result.conflicts else ''
+        print(f"✓ 完了: {name}（{result.seconds:.1f}秒、{len(result.files)}ファイル{note}）", flush=True)
+        for path in result.conflicts:
+            print(f"⚠ 競合: {path} は同時に実行した機能と内容が異なります（{feature['id']} の内容は "
+                  f"{path}.{feature['id']}.conflict に保存）", file=sys.stderr, flush=True)
+    elif event == 'failed':
+        print(f"✗ 失敗: {name}（{result.reason}、ログ: {result.log}）", flush=True)
+    else:
+        print(f"- スキップ: {name}（{result.reason}）", flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.scheduler',
+                                     description='依存関係に従って機能の実装を並列に実行')
+    parser.add_argument('file', help='features.json のパス')
+    parser.add_argument('--command', help='機能ごとに bash -c で実行するコマンド')
+    parser.add_argument('--output-dir', help='各機能の出力を統合するディレクトリ')
+    parser.add_argument('--ids', help='対象の機能ID（カンマ区切り、既定: すべて）')
+    parser.add_argument('--core', action='store_true', help='コア機能のみ')
+    parser.add_argument('-j', '--jobs', type=int, default=DEFAULT_JOBS, help=f'同時に実行する数（既定: {DEFAULT_JOBS}）')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='1機能の制限時間（秒）')
+    parser.add_argument('--no-infer', action='store_true', help='説明文からの依存関係の推定を行わない')
+    parser.add_argument('--append', action='append', default=[], metavar='GLOB',
+                        help='上書きせず追記するファイル（複数指定可）')
+    parser.add_argument('--report', help='結果のJSONの出力先')
+    parser.add_argument('--plan', action='store_true', help='実行せずに依存関係の段を表示')
+    args = parser.parse_args(argv)
+
+    try:
+        features = load_features(args.file)
+    except (OSError, ValueError) as e:
+        print(f"❌ features.jsonを読み込めません: {e}", file=sys.stderr)
+        return 2
+    for index, feature in enumerate(features):
+        feature['_index'] = index
+    features = [feature for feature in features if feature.get('id')]
+    if args.ids:
+        wanted = {i.strip() for i in args.ids.split(',') if i.strip()}
+        features = [feature for feature in features if feature['id'] in wanted]
+    if args.core:
+        features = [feature for feature in features if is_core(feature)]
+
+    try:
+        graph = build_graph(features, infer=not args.no_infer)
+    except CycleError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    if args.plan:
+        for depth, level in enumerate(topological_levels(graph, [f['id'] for f in features]), 1):
+            print(f"段{depth}: {' '.join(level)}")
+        return 0
+    if not args.command or not args.output_dir:
+        parser.error('--command と --output-dir が必要です（--plan を除く）')
+
+    scheduler = Scheduler(features, graph, args.command, args.output_dir, args.jobs, args.timeout,
+                          args.append, on_event=_print_event)
+    start = time.monotonic()
+    try:
+        results = scheduler.run()
+    except KeyboardInterrupt:
+        print("\n中断しました", file=sys.stderr)
+        return 130
+    elapsed = time.monotonic() - start
+    counts = {status: sum(r.status == status for r in results.values()) for status in ('done', 'failed', 'skipped')}
+    serial = sum(r.seconds for r in results.values())
+    print(f"完了 {counts['done']} / 失敗 {counts['failed']} / スキップ {counts['skipped']}"
+          f"（経過 {elapsed:.1f}秒、逐次実行なら {serial:.1f}秒）")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'elapsed': round(elapsed, 3), 'jobs': scheduler.jobs,
+                       'graph': {i: sorted(deps) for i, deps in graph.items()},
+                       'results': [r.to_dict() for r in results.values()]}, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+    return 0 if counts['done'] == len(features) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""
+内容アドレス方式のスナップショット（clean-development.sh のバックアップ）
+ファイルを一定サイズのチャンクに分け、各チャンクを SHA-256 の値をキーに1回だけ保存する（zlib 圧縮）。
+スナップショットはファイルごとのチャンクの一覧を持つ小さなマニフェスト（JSON）だけなので、
+変更のない木を何度バックアップしても増えるのはマニフェストの分だけ。
+
+前回のスナップショットとサイズ・更新時刻・inode が同じファイルは読み直さずにチャンクの一覧を引き継ぐ。
+
+保存先の構成:
+    objects/ab/cdef...        チャンク（先頭2文字のディレクトリに分ける）
+    snapshots/<ID>.json       マニフェスト（ID は作成日時 YYYYMMDD_HHMMSS）
+
+使用方法:
+    python3 -m claudeflow.snapshot --store DIR create --base DIR [--label L] [--exclude NAME]... PATH...
+    python3 -m claudeflow.snapshot --store DIR list
+    python3 -m claudeflow.snapshot --store DIR restore ID --base DIR [--path P]...
+    python3 -m claudeflow.snapshot --store DIR diff ID [ID]      # 2つ目を省略すると base の現在の内容と比べる
+    python3 -m claudeflow.snapshot --store DIR gc [--keep N]     # 古いスナップショットと参照されないチャンクを消す
+
+PATH は --base からの相対パス（'../results' のような親ディレクトリも可）。ID には latest も指定できる
+"""
+
+import argparse
+import contextlib
+import fcntl
+import fnmatch
+import hashlib
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+import zlib
+
+from .textutil import human_size, ljust
+
+DEFAULT_STORE = os.environ.get('CLAUDEFLOW_SNAPSHOT_DIR') or '.snapshots'
+CHUNK_SIZE = 1024 * 1024
+_COMPRESS_LEVEL = 1
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(path)
+    fd, temp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp)
+        raise
+
+
+class SnapshotStore:
+    """チャンクとマニフェストの保存先"""
+    __slots__ = ('root', 'objects', 'snapshots')
+
+    def __init__(self, root=DEFAULT_STORE):
+        self.root = root
+        self.objects = os.path.join(root, 'objects')
+        self.snapshots = os.path.join(root, 'snapshots')
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """作成と gc を同時に走らせない（gc が作成中のチャンクを消さないように）"""
+        os.makedirs(self.snapshots, exist_ok=True)
+        os.makedirs(self.objects, exist_ok=True)
+        with open(os.path.join(self.root, '.lock'), 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects, digest[:2], digest[2:])
+
+    def _put(self, chunk):
+        """チャンクを保存して (ハッシュ, 新たに保存したバイト数)"""
+        digest = hashlib.sha256(chunk).hexdigest()
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return digest, 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = zlib.compress(chunk, _COMPRESS_LEVEL)
+        _write_atomic(path, data)
+        return digest, len(data)
+
+    def _get(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            chunk = zlib.decompress(f.read())
+        if hashlib.sha256(chunk).hexdigest() != digest:
+            raise ValueError(f"チャンクが壊れています: {digest}")
+        return chunk
+
+    def ids(self):
+        """スナップショットのID（古い順）"""
+        try:
+            names = os.listdir(self.snapshots)
+        except OSError:
+            return []
+        return sorted(name[:-5] for name in names if name.endswith('.json'))
+
+    def resolve(self, snapshot_id):
+        ids = self.ids()
+        if snapshot_id == 'latest':
+            if not ids:
+                raise ValueError('スナップショットがありません')
+            return ids[-1]
+        if snapshot_id not in ids:
+            raise ValueError(f"スナップショットが見つかりません: {snapshot_id}")
+        return snapshot_id
+
+    def load(self, snapshot_id):
+        with open(os.path.join(self.snapshots, f'{self.resolve(snapshot_id)}.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def create(self, base, paths, label='', excludes=()):
+        """
+        base からの相対パス paths のスナップショットを作り、マニフェストを返す。
+        マニフェストの files は {パス: [サイズ, 更新時刻(ns), inode, モード, [チャンク...]]}
+        """
+        with self._locked():
+            ids = self.ids()
+            previous = self.load(ids[-1])['files'] if ids else {}
+            manifest = {'id': '', 'created': time.time(), 'label': label, 'base': os.path.abspath(base),
+                        'paths': list(paths), 'excludes': list(excludes), 'files': {}, 'symlinks': {}, 'dirs': []}
+            stats = {'files': 0, 'bytes': 0, 'read': 0, 'stored': 0}
+            for path in paths:
+                self._add(base, os.path.normpath(path), manifest, previous, excludes, stats)
+            manifest['stats'] = stats
+            snapshot_id = time.strftime('%Y%m%d_%H%M%S', time.localtime(manifest['created']))
+            suffix = 1
+            while snapshot_id in ids or os.path.exists(os.path.join(self.snapshots, f'{snapshot_id}.json')):
+                suffix += 1
+                snapshot_id = f"{time.strftime('%Y%m%d_%H%M%S', time.localtime(manifest['created']))}_{suffix}"
+            manifest['id'] = snapshot_id
+            _write_atomic(os.path.join(self.snapshots, f'{snapshot_id}.json'),
+                          json.dumps(manifest, ensure_ascii=False).encode('utf-8'))
+            return manifest
+
+    def _add(self, base, path, manifest, previous, excludes, stats):
+        full = os.path.join(base, path)
+        try:
+            info = os.lstat(full)
+        except OSError:
+            return
+        if any(fnmatch.fnmatch(os.path.basename(path), pattern) for pattern in excludes):
+            return
+        if stat.S_ISLNK(info.st_mode):
+            manifest['symlinks'][path] = os.readlink(full)
+        elif stat.S_ISDIR(info.st_mode):
+            manifest['dirs'].append(path)
+            try:
+                names = sorted(os.listdir(full))
+            except OSError:
+                return
+            for name in names:
+                self._add(base, os.path.join(path, name), manifest, previous, excludes, stats)
+        elif stat.S_ISREG(info.st_mode):
+            key = [info.st_size, info.st_mtime_ns, info.st_ino]
+            entry = previous.get(path)
+            if entry and entry[:3] == key and all(os.path.exists(self._object_path(d)) for d in entry[4]):
+                chunks = entry[4]
+            else:
+                chunks = []
+                try:
+                    with open(full, 'rb') as f:
+                        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                            digest, stored = self._put(chunk)
+                            chunks.append(digest)
+                            stats['stored'] += stored
+                except OSError:
+                    return
+                stats['read'] += info.st_size
+            manifest['files'][path] = key + [stat.S_IMODE(info.st_mode), chunks]
+            stats['files'] += 1
+            stats['bytes'] += info.st_size
+
+    def restore(self, snapshot_id, base, only=()):
+        """スナップショットの内容を base に書き戻し、書き戻したファイル数を返す（only はパスの接頭辞）"""
+        manifest = self.load(snapshot_id)
+        prefixes = [os.path.normpath(p) for p in only]
+
+        def selected(path):
+            return not prefixes or any(path == p or path.startswith(p + os.sep) for p in prefixes)
+
+        def target(path):
+            if os.path.isabs(path):
+                raise ValueError(f"絶対パスは書き戻せません: {path}")
+            return os.path.join(base, path)
+
+        for path in manifest['dirs']:
+            if selected(path):
+                os.makedirs(target(path), exist_ok=True)
+        restored = 0
+        for path, (_, mtime_ns, _, mode, chunks) in manifest['files'].items():
+            if not selected(path):
+                continue
+            full = target(path)
+            os.makedirs(os.path.dirname(full) or '.', exist_ok=True)
+            _write_atomic(full, b''.join(self._get(digest) for digest in chunks))
+            os.chmod(full, mode)
+            os.utime(full, ns=(mtime_ns, mtime_ns))
+            restored += 1
+        for path, link in manifest['symlinks'].items():
+            if selected(path):
+                full = target(path)
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(full)
+                os.symlink(link, full)
+        return restored
+
+    def diff(self, old_id, new_id=None, base=None):
+        """[(記号, パス)]。記号は +（追加）-（削除）M（変更）。new_id が None なら base の現在の内容と比べる"""
+        old = self.load(old_id)
+        if new_id is not None:
+            new_files = self.load(new_id)['files']
+        else:
+            current = {'files': {}}
+            for path in old['paths']:
+                self._scan(base or old['base'], os.path.normpath(path), current, old['files'],
+                           old.get('excludes', ()))
+            new_files = current['files']
+        changes = []
+        for path in sorted(set(old['files']) | set(new_files)):
+            before, after = old['files'].get(path), new_files.get(path)
+            if before is None:
+                changes.append(('+', path))
+            elif after is None:
+                changes.append(('-', path))
+            elif before[4] != after[4] or before[3] != after[3]:
+                changes.append(('M', path))
+        return changes
+
+    def _scan(self, base, path, manifest, previous, excludes):
+        """チャンクを保存せずにハッシュだけ求める（diff で現在の内容と比べる）"""
+        full = os.path.join(base, path)
+        try:
+            info = os.lstat(full)
+        except OSError:
+            return
+        if any(fnmatch.fnmatch(os.path.basename(path), pattern) for pattern in excludes):
+            return
+        if stat.S_ISDIR(info.st_mode):
+            try:
+                names = sorted(os.listdir(full))
+            except OSError:
+                return
+            for name in names:
+                self._scan(base, os.path.join(path, name), manifest, previous, excludes)
+        elif stat.S_ISREG(info.st_mode):
+            key = [info.st_size, info.st_mtime_ns, info.st_ino]
+            entry = previous.get(path)
+            if entry and entry[:3] == key:
+                chunks = entry[4]
+            else:
+                chunks = []
+                with open(full, 'rb') as f:
+                    for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                        chunks.append(hashlib.sha256(chunk).hexdigest())
+            manifest['files'][path] = key + [stat.S_IMODE(info.st_mode), chunks]
+
+    def gc(self, keep=None):
+        """keep 件より古いスナップショットを消し、どのスナップショットからも参照されないチャンクを消す"""
+        with self._locked():
+            ids = self.ids()
+            removed_snapshots = 0
+            if keep is not None and len(ids) > keep:
+                for snapshot_id in ids[:len(ids) - keep]:
+                    os.unlink(os.path.join(self.snapshots, f'{snapshot_id}.json'))
+                    removed_snapshots += 1
+                ids = ids[len(ids) - keep:]
+            referenced = set()
+            for snapshot_id in ids:
+                for entry in self.load(snapshot_id)['files'].values():
+                    referenced.update(entry[4])
+            removed_objects = freed = 0
+            for prefix in os.listdir(self.objects):
+                directory = os.path.join(self.objects, prefix)
+                for name in os.listdir(directory):
+                    if prefix + name not in referenced:
+                        path = os.path.join(directory, name)
+                        freed += os.path.getsize(path)
+                        os.unlink(path)
+                        removed_objects += 1
+            return removed_snapshots, removed_objects, freed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.snapshot', description='重複を除くスナップショット')
+    parser.add_argument('--store', default=DEFAULT_STORE, help='保存先のディレクトリ')
+    sub = parser.add_subparsers(dest='command', required=True)
+    create_parser = sub.add_parser('create', help='スナップショットを作る')
+    create_parser.add_argument('paths', nargs='+')
+    create_parser.add_argument('--base', default='.')
+    create_parser.add_argument('--label', default='')
+    create_parser.add_argument('--exclude', action='append', default=[], help='除外する名前（fnmatch）')
+    sub.add_parser('list', help='スナップショットの一覧')
+    restore_parser = sub.add_parser('restore', help='スナップショットを書き戻す')
+    restore_parser.add_argument('id')
+    restore_parser.add_argument('--base', default='.')
+    restore_parser.add_argument('--path', action='append', default=[], help='書き戻すパス（省略時はすべて）')
+    diff_parser = sub.add_parser('diff', help='スナップショットの差分')
+    diff_parser.add_argument('old')
+    diff_parser.add_argument('new', nargs='?')
+    diff_parser.add_argument('--base', help='現在の内容と比べるときの基準（省略時は作成時の基準）')
+    gc_parser = sub.add_parser('gc', help='不要なチャンクを消す')
+    gc_parser.add_argument('--keep', type=int, help='残すスナップショットの数（新しい順）')
+    args = parser.parse_args(argv)
+
+    store = SnapshotStore(args.store)
+    try:
+        if args.command == 'create':
+            manifest = store.create(args.base, args.paths, args.label, args.exclude)
+            stats = manifest['stats']
+            print(f"{manifest['id']}\t{stats['files']}ファイル\t{human_size(stats['bytes'])}\t"
+                  f"読み込み {human_size(stats['read'])}\t追加保存 {human_size(stats['stored'])}")
+        elif args.command == 'list':
+            for snapshot_id in store.ids():
+                manifest = store.load(snapshot_id)
+                stats = manifest.get('stats', {})
+                print(f"{ljust(snapshot_id, 20)}{ljust(manifest.get('label') or '-', 10)}"
+                      f"{stats.get('files', 0)}ファイル\t{human_size(stats.get('bytes', 0))}\t"
+                      f"追加保存 {human_size(stats.get('stored', 0))}")
+        elif args.command == 'restore':
+            print(store.restore(args.id, args.base, args.path))
+        elif args.command == 'diff':
+            for mark, path in store.diff(args.old, args.new, args.base):
+                print(f"{mark} {path}")
+        else:
+            snapshots, objects, freed = store.gc(args.keep)
+            print(f"スナップショット {snapshots}件, チャンク {objects}件を削除 ({human_size(freed)})")
+    except (OSError, ValueError, zlib.error) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
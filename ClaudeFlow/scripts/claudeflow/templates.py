@@ -0,0 +1,183 @@
+"""
+プロンプト・プロジェクトテンプレートの展開
+テンプレートを1回だけ解析して「文字列と変数」の区間のリストにし、値を並べて1回の join で展開する
+（変数ごとに全文を置換し直さないため、大きなテンプレートでも変数の数に比例して遅くならない）
+
+変数の書き方は ${name}（prompts/*.md）と {{NAME}}（templates/）の2通り。
+値を渡さなかった変数はそのまま残す。値の中に現れた ${...} は展開しない
+解析結果はファイルのパス・更新時刻・サイズをキーにプロセス内で再利用する
+
+使用方法:
+    python3 -m claudeflow.templates render TEMPLATE|- [--var NAME=VALUE]... [--var-file NAME=PATH]... [-o OUT]
+    python3 -m claudeflow.templates batch TEMPLATE features.json --output-dir DIR \\
+                                    [--name 'implement_${feature_id}.md'] [--ids a,b] [--var ...] [--var-file ...]
+    python3 -m claudeflow.templates vars TEMPLATE       # 使われている変数名を1行ずつ表示
+
+batch では機能ごとに feature_id / feature_name / feature_description（feature_desc）と、
+features.json の各フィールド（feature_<フィールド名>）を変数として渡す
+"""
+
+import argparse
+import functools
+import os
+import re
+import sys
+
+from .features import field_value, load_features
+
+_PLACEHOLDER = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}|\{\{([A-Za-z_][A-Za-z0-9_]*)\}\}')
+DEFAULT_BATCH_NAME = '${feature_id}.md'
+
+
+class Template:
+    """
+    解析済みのテンプレート
+    literals[i] の後に変数 names[i] の値が続く（literals は names より1つ多い）
+    """
+    __slots__ = ('literals', 'names', 'placeholders')
+
+    def __init__(self, text):
+        literals = []
+        names = []
+        placeholders = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(text):
+            literals.append(text[position:match.start()])
+            names.append(match.group(1) or match.group(2))
+            placeholders.append(match.group())
+            position = match.end()
+        literals.append(text[position:])
+        self.literals = literals
+        self.names = names
+        self.placeholders = placeholders
+
+    def render(self, values):
+        parts = [self.literals[0]]
+        for name, placeholder, literal in zip(self.names, self.placeholders, self.literals[1:]):
+            parts.append(values.get(name, placeholder))
+            parts.append(literal)
+        return ''.join(parts)
+
+    @property
+    def variables(self):
+        """使われている変数名（初出順、重複なし）"""
+        return list(dict.fromkeys(self.names))
+
+
+_compiled = {}
+
+
+def load_template(path):
+    """ファイルのテンプレートを解析して返す（更新時刻とサイズが同じなら前回の解析結果を使う）"""
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _compiled.get(path)
+    if cached and cached[0] == signature:
+        return cached[1]
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        template = Template(f.read())
+    _compiled[path] = (signature, template)
+    return template
+
+
+@functools.lru_cache(maxsize=64)
+def compile_text(text):
+    return Template(text)
+
+
+def feature_values(feature):
+    """機能1件分の変数"""
+    values = {f'feature_{key}': field_value(feature, key) for key in feature if isinstance(key, str)}
+    values['feature_id'] = field_value(feature, 'id')
+    values['feature_name'] = field_value(feature, 'name')
+    values['feature_description'] = values['feature_desc'] = field_value(feature, 'description')
+    return values
+
+
+def render_batch(template, features, output_dir, name=DEFAULT_BATCH_NAME, values=None):
+    """機能ごとにテンプレートを展開して output_dir に書き出し、書き出したパスのリストを返す"""
+    name_template = compile_text(name)
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for feature in features:
+        feature_vars = dict(values or {})
+        feature_vars.update(feature_values(feature))
+        path = os.path.join(output_dir, name_template.render(feature_vars))
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(template.render(feature_vars))
+        written.append(path)
+    return written
+
+
+def _parse_values(pairs, file_pairs):
+    values = {}
+    for pair in pairs or ():
+        name, sep, value = pair.partition('=')
+        if not sep:
+            raise ValueError(f"NAME=VALUE の形式ではありません: {pair}")
+        values[name] = value
+    for pair in file_pairs or ():
+        name, sep, path = pair.partition('=')
+        if not sep:
+            raise ValueError(f"NAME=PATH の形式ではありません: {pair}")
+        # シェルの $(cat ...) と同じく末尾の改行は除く
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            values[name] = f.read().rstrip('\n')
+    return values
+
+
+def _add_value_options(parser):
+    parser.add_argument('--var', action='append', metavar='NAME=VALUE', help='変数の値')
+    parser.add_argument('--var-file', action='append', metavar='NAME=PATH',
+                        help='変数の値をファイルから読む（末尾の改行は除く）')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.templates', description='テンプレートの展開')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    render_parser = sub.add_parser('render', help='テンプレートを1つ展開')
+    render_parser.add_argument('template', help='テンプレートのファイル（- は標準入力）')
+    render_parser.add_argument('-o', '--output', help='出力先（省略時は標準出力）')
+    _add_value_options(render_parser)
+
+    batch_parser = sub.add_parser('batch', help='機能ごとにテンプレートを展開してファイルに書き出す')
+    batch_parser.add_argument('template')
+    batch_parser.add_argument('features', help='features.json')
+    batch_parser.add_argument('--output-dir', required=True)
+    batch_parser.add_argument('--name', default=DEFAULT_BATCH_NAME, help='出力ファイル名のテンプレート')
+    batch_parser.add_argument('--ids', help='対象の機能ID（カンマ区切り）')
+    _add_value_options(batch_parser)
+
+    vars_parser = sub.add_parser('vars', help='テンプレートの変数名を表示')
+    vars_parser.add_argument('template')
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'vars':
+            print('\n'.join(load_template(args.template).variables))
+            return 0
+        values = _parse_values(args.var, args.var_file)
+        if args.command == 'render':
+            template = compile_text(sys.stdin.read()) if args.template == '-' else load_template(args.template)
+            text = template.render(values)
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    f.write(text)
+            else:
+                sys.stdout.write(text)
+            return 0
+        features = load_features(args.features)
+        if args.ids:
+            wanted = set(args.ids.split(','))
+            features = [feature for feature in features if str(feature.get('id')) in wanted]
+        for path in render_batch(load_template(args.template), features, args.output_dir, args.name, values):
+            print(path)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""
+表示用の文字列整形（各モジュールの一覧表示で共通に使う）
+"""
+
+import unicodedata
+
+
+def ljust(text, width):
+    """全角文字を幅2として左寄せ（少なくとも1文字は空ける）"""
+    used = sum(2 if unicodedata.east_asian_width(c) in 'WF' else 1 for c in text)
+    return text + ' ' * max(1, width - used)
+
+
+def human_size(size):
+    """バイト数を 1.2M のように表す"""
+    for unit in ('B', 'K', 'M', 'G'):
+        if size < 1024 or unit == 'G':
+            return f"{size:.0f}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
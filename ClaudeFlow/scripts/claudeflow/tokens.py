@@ -0,0 +1,308 @@
+"""
+トークン使用量の計測と記録
+ネットワークを使わない近似トークナイザで入出力のトークン数を数え、
+追記専用の台帳（JSON Lines、flockで排他）に記録して実行・フェーズ・機能ごとに集計する
+
+近似の規則（Claudeのトークナイザの傾向に合わせた値）:
+    - 英字の連続は6文字までを1トークン、それ以上は4文字ごとに1トークン
+    - 数字は3桁ごとに1トークン、単独の空白は前後の語に含める
+    - 漢字は1文字1.1トークン、ひらがな・カタカナは1文字0.8トークン、その他の文字・記号は1トークン
+入力は64KBずつ読み込むため、巨大な応答でもメモリ使用量は一定
+
+使用方法:
+    python3 -m claudeflow.tokens count [FILE]                         # - または省略で標準入力
+    python3 -m claudeflow.tokens record --ledger L --phase P [--feature F] [--run R] [--cached] \\
+                                        [--price-input USD --price-output USD] \\
+                                        (--input FILE --output FILE | --pair)
+    python3 -m claudeflow.tokens total --ledger L [--run R]           # "トークン数 コスト(USD)"
+    python3 -m claudeflow.tokens report --ledger L [--run R] [--by phase|feature|run] [--json]
+"""
+
+import argparse
+import fcntl
+import json
+import math
+import os
+import re
+import sys
+import time
+
+from .textutil import ljust
+
+CHUNK_SIZE = 64 * 1024
+# 100万トークンあたりの価格（USD）。CLAUDEFLOW_TOKEN_PRICE_INPUT / _OUTPUT で変更可能
+# 常駐サーバーの環境変数は起動時のものなので、シェルからは --price-input / --price-output で渡す
+DEFAULT_PRICE_INPUT = 3.0
+DEFAULT_PRICE_OUTPUT = 15.0
+
+_PIECE = re.compile(
+    r'(?P<alpha>[A-Za-z]+)'
+    r'|(?P<digit>[0-9]+)'
+    r'|(?P<space>\s+)'
+    r'|(?P<kana>[぀-ヿｦ-ﾟ]+)'
+    r'|(?P<kanji>[㐀-䶿一-鿿豈-﫿]+)'
+    r'|(?P<other>.)',
+    re.DOTALL,
+)
+# 続きが次のチャンクにある可能性のある種類（チャンク末尾では確定を保留する）
+_RUNS = ('alpha', 'digit', 'space', 'kana', 'kanji')
+_MAX_CARRY = 4096
+
+
+def _piece_tokens(kind, length):
+    if kind == 'alpha':
+        return 1 if length <= 6 else math.ceil(length / 4)
+    if kind == 'digit':
+        return math.ceil(length / 3)
+    if kind == 'space':
+        return 0 if length == 1 else max(1, length // 4)
+    if kind == 'kana':
+        return length * 0.8
+    if kind == 'kanji':
+        return length * 1.1
+    return 1
+
+
+class TokenCounter:
+    """
+    ストリーム入力のトークン数を数える
+    feed() で任意の位置で区切った文字列を渡し、最後に total で結果を得る
+    """
+    __slots__ = ('_tokens', '_carry', 'characters')
+
+    def __init__(self):
+        self._tokens = 0.0
+        self._carry = ''
+        self.characters = 0
+
+    def feed(self, text):
+        if not text:
+            return
+        self.characters += len(text)
+        text = self._carry + text
+        self._carry = ''
+        last = None
+        for m in _PIECE.finditer(text):
+            if last is not None:
+                self._tokens += _piece_tokens(last.lastgroup, last.end() - last.start())
+            last = m
+        if last is None:
+            return
+        # 末尾の連続は次のチャンクに続く可能性があるため持ち越す
+        if last.lastgroup in _RUNS and last.end() == len(text) and last.end() - last.start() < _MAX_CARRY:
+            self._carry = last.group()
+        else:
+            self._tokens += _piece_tokens(last.lastgroup, last.end() - last.start())
+
+    @property
+    def total(self):
+        tokens = self._tokens
+        if self._carry:
+            tokens += _piece_tokens(_PIECE.match(self._carry).lastgroup, len(self._carry))
+        return int(round(tokens))
+
+
+def count_tokens(text):
+    """文字列の近似トークン数"""
+    counter = TokenCounter()
+    counter.feed(text)
+    return counter.total
+
+
+def count_stream(stream, chunk_size=CHUNK_SIZE):
+    """テキストストリームを chunk_size 文字ずつ読んでトークン数を返す"""
+    counter = TokenCounter()
+    for chunk in iter(lambda: stream.read(chunk_size), ''):
+        counter.feed(chunk)
+    return counter.total
+
+
+def count_file(path):
+    if path == '-':
+        return count_stream(sys.stdin)
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return count_stream(f)
+
+
+def count_pair(stream, chunk_size=CHUNK_SIZE):
+    """NULで区切った「入力\\0出力」のストリームから (入力, 出力) のトークン数を返す"""
+    counters = [TokenCounter(), TokenCounter()]
+    current = 0
+    for chunk in iter(lambda: stream.read(chunk_size), ''):
+        if current == 0:
+            head, sep, chunk = chunk.partition('\0')
+            counters[0].feed(head)
+            if not sep:
+                continue
+            current = 1
+        counters[1].feed(chunk.replace('\0', ''))
+    return counters[0].total, counters[1].total
+
+
+def prices():
+    """環境変数の (入力, 出力) の価格（呼び出しのたびに読む）"""
+    return (float(os.environ.get('CLAUDEFLOW_TOKEN_PRICE_INPUT') or DEFAULT_PRICE_INPUT),
+            float(os.environ.get('CLAUDEFLOW_TOKEN_PRICE_OUTPUT') or DEFAULT_PRICE_OUTPUT))
+
+
+def cost_usd(input_tokens, output_tokens, price=None):
+    """price は100万トークンあたりの (入力, 出力) の価格（省略時は環境変数）"""
+    price_input, price_output = price or prices()
+    return (input_tokens * price_input + output_tokens * price_output) / 1_000_000
+
+
+class Ledger:
+    """
+    追記専用のトークン使用量台帳（1行1記録のJSON Lines）
+    追記は排他ロック、読み込みは共有ロックの下で行うため、同時に実行された記録が混ざらない
+    応答キャッシュから返した呼び出し（cached）はコスト0で記録し、合計のトークン数にも含めない
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, phase, input_tokens, output_tokens, run=None, feature=None, cached=False, price=None):
+        entry = {
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'run': run or '',
+            'phase': phase or '',
+            'feature': feature or '',
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'cost': 0.0 if cached else round(cost_usd(input_tokens, output_tokens, price), 6),
+        }
+        if cached:
+            entry['cached'] = True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        line = json.dumps(entry, ensure_ascii=False) + '\n'
+        with open(self.path, 'a', encoding='utf-8') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(line)
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return entry
+
+    def entries(self, run=None):
+        """記録を順に返す（壊れた行と旧形式の合計値だけのファイルは読み飛ばす）"""
+        try:
+            f = open(self.path, 'r', encoding='utf-8', errors='replace')
+        except FileNotFoundError:
+            return
+        with f:
+            fcntl.flock(f, fcntl.LOCK_SH)
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(entry, dict):
+                    continue
+                if run and entry.get('run') != run:
+                    continue
+                yield entry
+
+    def rollup(self, by='phase', run=None):
+        """by（phase/feature/run）ごとの合計を記録順の辞書で返す（cached はキャッシュから返した回数）"""
+        groups = {}
+        for entry in self.entries(run):
+            key = entry.get(by) or '-'
+            group = groups.setdefault(key, {'calls': 0, 'cached': 0, 'input_tokens': 0, 'output_tokens': 0,
+                                            'cost': 0.0})
+            group['calls'] += 1
+            if entry.get('cached'):
+                group['cached'] += 1
+                continue
+            group['input_tokens'] += entry.get('input_tokens', 0)
+            group['output_tokens'] += entry.get('output_tokens', 0)
+            group['cost'] += entry.get('cost', 0.0)
+        return groups
+
+    def total(self, run=None):
+        tokens = 0
+        cost = 0.0
+        for entry in self.entries(run):
+            if entry.get('cached'):
+                continue
+            tokens += entry.get('input_tokens', 0) + entry.get('output_tokens', 0)
+            cost += entry.get('cost', 0.0)
+        return tokens, cost
+
+
+def print_rollup(groups, by, file=None):
+    file = file or sys.stdout
+    label = {'phase': 'フェーズ', 'feature': '機能', 'run': '実行'}[by]
+    print(f"{ljust(label, 30)}{'回数':>4} {'キャッシュ':>5} {'入力':>10} {'出力':>10}  {'コスト(USD)':>11}", file=file)
+    total = {'calls': 0, 'cached': 0, 'input_tokens': 0, 'output_tokens': 0, 'cost': 0.0}
+    rows = list(groups.items()) + [('合計', total)]
+    for key, group in rows:
+        if group is not total:
+            for name in total:
+                total[name] += group[name]
+        print(f"{ljust(key, 30)}{group['calls']:>6} {group['cached']:>10} {group['input_tokens']:>12,} "
+              f"{group['output_tokens']:>12,} "
+              f"{group['cost']:>12.4f}", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.tokens', description='トークン使用量の計測と記録')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    count_parser = sub.add_parser('count', help='トークン数を表示')
+    count_parser.add_argument('file', nargs='?', default='-')
+
+    ledger_help = '台帳ファイル（JSON Lines）'
+    record_parser = sub.add_parser('record', help='入出力のトークン数を台帳に記録し、合計を表示')
+    record_parser.add_argument('--ledger', required=True, help=ledger_help)
+    record_parser.add_argument('--phase', default='', help='フェーズ名')
+    record_parser.add_argument('--feature', default='', help='機能ID')
+    record_parser.add_argument('--run', default='', help='実行ID')
+    record_parser.add_argument('--input', help='入力（プロンプト）のファイル（- は標準入力）')
+    record_parser.add_argument('--output', help='出力（応答）のファイル（- は標準入力）')
+    record_parser.add_argument('--pair', action='store_true', help='標準入力の「入力\\0出力」を数える')
+    record_parser.add_argument('--cached', action='store_true', help='キャッシュから返した呼び出し（コスト0）として記録')
+    record_parser.add_argument('--price-input', type=float, help='入力100万トークンあたりの価格（USD、既定: 環境変数）')
+    record_parser.add_argument('--price-output', type=float, help='出力100万トークンあたりの価格（USD、既定: 環境変数）')
+
+    for name, text in (('total', '合計トークン数とコストを表示'), ('report', '集計を表示')):
+        p = sub.add_parser(name, help=text)
+        p.add_argument('--ledger', required=True, help=ledger_help)
+        p.add_argument('--run', default='', help='この実行IDの記録だけを集計')
+        if name == 'report':
+            p.add_argument('--by', choices=('phase', 'feature', 'run'), default='phase')
+            p.add_argument('--json', action='store_true', help='JSONで出力')
+
+    args = parser.parse_args(argv)
+    try:
+        if args.command == 'count':
+            print(count_file(args.file))
+        elif args.command == 'record':
+            if args.pair:
+                input_tokens, output_tokens = count_pair(sys.stdin)
+            else:
+                input_tokens = count_file(args.input) if args.input else 0
+                output_tokens = count_file(args.output) if args.output else 0
+            default_input, default_output = prices()
+            price = (default_input if args.price_input is None else args.price_input,
+                     default_output if args.price_output is None else args.price_output)
+            Ledger(args.ledger).append(args.phase, input_tokens, output_tokens, args.run, args.feature, args.cached,
+                                       price)
+            print(0 if args.cached else input_tokens + output_tokens)
+        elif args.command == 'total':
+            tokens, cost = Ledger(args.ledger).total(args.run)
+            print(f"{tokens} {cost:.4f}")
+        else:
+            groups = Ledger(args.ledger).rollup(args.by, args.run)
+            if args.json:
+                print(json.dumps(groups, ensure_ascii=False, indent=2))
+            else:
+                print_rollup(groups, args.by)
+    except OSError as e:
+        print(f"エラー: {e}", file=sys.stderr)
+        return 2
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,20 @@
+"""
+ClaudeFlow 統合検証エンジン
+
+ファイルを一度だけ読み込み・解析して共有ドキュメントモデルを構築し、
+ルールセットに登録された全ルールをその上で実行する。
+
+    from claudeflow.validation import load_document, run_rules
+    doc = load_document('index.html')
+    findings = run_rules(doc, 'fishing')
+"""
+
+from .document import Document, ScriptBlock, detect_language, load_document, stream_document
+from .engine import build_report, has_errors, run_rules, select_rules, summarize, validate_file
+from .rules import RULES, RULESETS, Finding, register_ruleset, resolve_rules, rule
+
+__all__ = [
+    'Document', 'ScriptBlock', 'detect_language', 'load_document', 'stream_document',
+    'build_report', 'has_errors', 'run_rules', 'select_rules', 'summarize', 'validate_file',
+    'RULES', 'RULESETS', 'Finding', 'register_ruleset', 'resolve_rules', 'rule',
+]
@@ -0,0 +1,164 @@
+"""
+ディレクトリ単位の一括検証
+対象ファイルを1回の走査で集め、ProcessPoolExecutorで並列に検証して1つのJSONレポートにまとめる
+レポート内の順序はファイルの相対パス順で、ワーカーの実行順序には依存しない
+
+使用方法:
+    python3 -m claudeflow.validation.batch <dir> [--ruleset implementation] [--workers N]
+                                           [--output report.json] [--report-dir DIR] [--cache]
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .cache import DEFAULT_CACHE_DIR, ValidationCache
+from .cli import print_report
+from .engine import has_errors, validate_file
+from .rules import SEVERITIES, resolve_rules
+
+DEFAULT_EXTENSIONS = ('.js', '.ts', '.jsx', '.tsx', '.html', '.py')
+# 走査しないディレクトリ（隠しディレクトリも対象外）
+SKIP_DIRS = frozenset({'node_modules', '__pycache__', 'validation-reports'})
+
+
+def find_files(root, extensions=DEFAULT_EXTENSIONS):
+    """root以下の検証対象ファイルを相対パス順に列挙"""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.')]
+        for name in filenames:
+            if name.endswith(extensions):
+                found.append(os.path.relpath(os.path.join(dirpath, name), root))
+    return sorted(found)
+
+
+def _validate_one(task):
+    # ワーカープロセスで実行される（pickle可能なようにモジュールのトップレベルに置く）
+    root, rel_path, ruleset, cache_dir = task
+    cache = ValidationCache(cache_dir) if cache_dir else None
+    try:
+        report = validate_file(os.path.join(root, rel_path), ruleset, cache=cache)
+    except (OSError, UnicodeDecodeError) as e:
+        return {'file': rel_path, 'error': str(e)}, 0, 0, 0
+    report['file'] = rel_path
+    if cache is None:
+        return report, 0, 0, 0
+    return report, cache.hits, cache.misses, cache.stores
+
+
+def validate_directory(root, ruleset='implementation', workers=None, cache_dir=None,
+                       extensions=DEFAULT_EXTENSIONS):
+    """
+    ディレクトリ内のファイルを並列に検証し、統合レポートを返す
+    workers: ワーカー数（None/0はCPU数、1はプロセスを起動せずに順に検証）
+    cache_dir: 指定するとValidationCacheで変更のないファイルの結果を再利用する
+    """
+    resolve_rules(ruleset)
+    files = find_files(root, extensions)
+    workers = min(workers or os.cpu_count() or 1, max(len(files), 1))
+    tasks = [(root, rel_path, ruleset, cache_dir) for rel_path in files]
+
+    if workers == 1:
+        results = [_validate_one(task) for task in tasks]
+    else:
+        # 1タスクが小さいため、まとめて渡してプロセス間通信の回数を減らす
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_validate_one, tasks, chunksize=chunksize))
+
+    reports = []
+    errors = []
+    summary = {severity: 0 for severity in SEVERITIES}
+    hits = misses = stores = 0
+    for report, file_hits, file_misses, file_stores in results:
+        hits += file_hits
+        misses += file_misses
+        stores += file_stores
+        if 'error' in report:
+            errors.append(report)
+            continue
+        for severity, count in report['summary'].items():
+            summary[severity] += count
+        reports.append(report)
+
+    merged = {
+        'root': root,
+        'ruleset': ruleset,
+        'files': len(files),
+        'summary': summary,
+        'failed_files': [report['file'] for report in reports if has_errors(report)],
+        'reports': reports,
+        'errors': errors,
+    }
+    if cache_dir:
+        cache = ValidationCache(cache_dir)
+        cache.hits, cache.misses, cache.stores = hits, misses, stores
+        cache.close()
+        merged['cache'] = {'hits': hits, 'misses': misses}
+    return merged
+
+
+def report_file_name(rel_path):
+    """ファイルごとのテキストレポート名（サブディレクトリは _ でつなぐ）"""
+    return 'validation_' + rel_path.replace(os.sep, '_') + '.txt'
+
+
+def write_text_reports(merged, report_dir):
+    """ファイルごとのテキストレポートを書き出す"""
+    os.makedirs(report_dir, exist_ok=True)
+    for report in merged['reports']:
+        with open(os.path.join(report_dir, report_file_name(report['file'])), 'w', encoding='utf-8') as f:
+            print_report(report, color=False, file=f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.validation.batch',
+                                     description='ディレクトリ内のファイルを並列に検証')
+    parser.add_argument('root', help='検証するディレクトリ')
+    parser.add_argument('-r', '--ruleset', default='implementation', help='ルールセット名（カンマ区切り可）')
+    parser.add_argument('-j', '--workers', type=int, default=0, help='ワーカー数（0はCPU数）')
+    parser.add_argument('-o', '--output', help='統合JSONレポートの出力先（省略時は標準出力）')
+    parser.add_argument('--report-dir', help='ファイルごとのテキストレポートの出力先')
+    parser.add_argument('--cache', action='store_true', help='内容が変わっていないファイルは前回の結果を再利用する')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='キャッシュの保存先')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        parser.error(f'ディレクトリが見つかりません: {args.root}')
+    try:
+        resolve_rules(args.ruleset)
+    except KeyError as e:
+        parser.error(e.args[0])
+    if args.workers < 0:
+        parser.error('--workers には0以上を指定してください')
+
+    merged = validate_directory(args.root, args.ruleset, args.workers,
+                                args.cache_dir if args.cache else None)
+    if args.report_dir:
+        write_text_reports(merged, args.report_dir)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        for report in merged['reports']:
+            status = '❌ エラーあり' if has_errors(report) else '✅ 検証合格'
+            print(f"{report['file']}: {status}")
+        for error in merged['errors']:
+            print(f"{error['file']}: ❌ 読み込みエラー: {error['error']}")
+        summary = merged['summary']
+        print(f"検証ファイル数: {merged['files']}, Critical: {summary['critical']}, Error: {summary['error']}, "
+              f"Warning: {summary['warning']}, Info: {summary['info']}")
+        if 'cache' in merged:
+            print(f"キャッシュ: ヒット {merged['cache']['hits']} / ミス {merged['cache']['misses']}")
+    else:
+        json.dump(merged, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    return 1 if merged['failed_files'] or merged['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,343 @@
+"""
+検証処理のベンチマーク
+シード固定の合成HTML/JSコーパス（深いネスト・長い行・多数の<script>ブロック）を
+10KB/100KB/1MB/10MBで生成し、検証スクリプト・ルールセット・各ルールの処理時間とピークRSSを計測する。
+結果は保存済みのベースラインと比較し、許容範囲を超えて遅く（大きく）なったものがあれば終了コード1を返す。
+
+計測は1件ごとに新しいプロセスで行い、ピークRSSはそのプロセスの ru_maxrss を使う
+
+使用方法:
+    python3 -m claudeflow.validation.bench [--sizes 10K,100K,1M,10M] [--baseline FILE]
+                                           [--update-baseline] [--tolerance 1.5] [--output result.json]
+"""
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SIZES = {'10K': 10 * 1024, '100K': 100 * 1024, '1M': 1024 * 1024, '10M': 10 * 1024 * 1024}
+DEFAULT_SEED = 20240101
+RULESETS = ('core', 'fishing', 'pacman', 'implementation')
+_SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(_SCRIPTS_DIR), 'validation', 'benchmarks', 'baseline.json')
+DEFAULT_TOLERANCE = 1.5
+DEFAULT_RSS_TOLERANCE = 1.3
+# 計測のばらつきで小さな値が判定に引っかからないよう、許容範囲に加える絶対量
+TIME_SLACK = 0.05
+RSS_SLACK_KB = 5 * 1024
+DEFAULT_TIMEOUT = 300
+
+
+def validator_scripts():
+    """ベンチマーク対象の検証スクリプト（scripts/check_*.py, validate_*.py）"""
+    paths = glob.glob(os.path.join(_SCRIPTS_DIR, 'check_*.py')) + glob.glob(os.path.join(_SCRIPTS_DIR, 'validate_*.py'))
+    return sorted(paths)
+
+
+def _nested_block(rng, index):
+    depth = rng.randint(20, 60)
+    opening = ''.join(f'<div class="level-{d}" id="n{index}-{d}"><span>{d}</span>' for d in range(depth))
+    return f'{opening}<img src="img/{index}.png" alt=""><br>\n' + '</div>' * depth + '\n'
+
+
+def _long_line_block(rng, index):
+    words = ' '.join(f'<span class="w{rng.randint(0, 9)}">語{k}word</span>' for k in range(rng.randint(200, 400)))
+    return f'<p id="p{index}">{words}</p>\n'
+
+
+def _script_block(rng, index):
+    numbers = ', '.join(str(rng.randint(0, 9999)) for _ in range(rng.randint(200, 400)))
+    functions = []
+    for k in range(rng.randint(3, 8)):
+        name = f'update{index}_{k}'
+        functions.append(
+            f'function {name}(state) {{\n'
+            f'    const label = "({{[ " + state.name + " ]}})";\n'
+            f"    const quoted = 'it\\'s ) ] }}';\n"
+            f'    const pattern = /[(\\[{{]+\\)/g;\n'
+            f'    const ratio = state.total / 2 / (state.count || 1);\n'
+            f'    const message = `${{state.items.map((item) => `${{item.id}}:${{item.value}}`).join(", ")}}`;\n'
+            f'    // 括弧を含むコメント ) ] }}\n'
+            f'    /* ブロックコメント {{ [ ( */\n'
+            f'    if (state.ready) {{\n'
+            f'        for (let k = 0; k < state.items.length; k++) {{\n'
+            f'            state.items[k].value += ratio * {rng.randint(1, 9)};\n'
+            f'        }}\n'
+            f'    }}\n'
+            f'    return {{ label: label, pattern: pattern, message: message }};\n'
+            f'}}\n'
+        )
+    return f'<script>\nconst table{index} = [{numbers}];\n' + ''.join(functions) + '</script>\n'
+
+
+_BLOCKS = (_nested_block, _long_line_block, _script_block)
+
+
+def iter_corpus(size, seed=DEFAULT_SEED):
+    """size バイト程度の合成HTMLをブロック単位で生成（同じシードなら常に同じ内容）"""
+    rng = random.Random(f'{seed}:{size}')
+    header = ('<!DOCTYPE html>\n<html lang="ja">\n<head>\n<meta charset="UTF-8">\n'
+              '<title>benchmark</title>\n</head>\n<body>\n<canvas id="gameCanvas"></canvas>\n')
+    footer = '</body>\n</html>\n'
+    yield header
+    total = len(header.encode()) + len(footer.encode())
+    for index in itertools.count():
+        block = rng.choice(_BLOCKS)(rng, index)
+        length = len(block.encode())
+        if total + length > size and index:
+            break
+        yield block
+        total += length
+    yield footer
+
+
+def generate_corpus(size, seed=DEFAULT_SEED):
+    """size バイト程度の合成HTMLを文字列で返す"""
+    return ''.join(iter_corpus(size, seed))
+
+
+def write_corpus(directory, labels, seed=DEFAULT_SEED):
+    """
+    コーパスをファイルに書き出す（同じ名前のファイルがあれば再利用）
+    Linuxでは親プロセスのピークRSSがfork/exec後の子に引き継がれるため、全体を文字列にせず逐次書き込む
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for label in labels:
+        path = os.path.join(directory, f'corpus-{label}-{seed}.html')
+        if not os.path.exists(path):
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                for block in iter_corpus(SIZES[label], seed):
+                    f.write(block)
+            os.replace(path + '.tmp', path)
+        paths[label] = path
+    return paths
+
+
+def _peak_rss_kb(rusage):
+    # macOSの ru_maxrss はバイト、Linuxはキロバイト
+    return rusage.ru_maxrss // 1024 if sys.platform == 'darwin' else rusage.ru_maxrss
+
+
+def run_measured(command, timeout=DEFAULT_TIMEOUT, env=None):
+    """コマンドを実行し (経過秒, ピークRSS(KB), 終了コード, 標準出力) を返す（時間切れは経過秒がNone）"""
+    start = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                               stdin=subprocess.DEVNULL, env=env)
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        stdout = process.stdout.read()
+        _, status, rusage = os.wait4(process.pid, 0)
+    finally:
+        timer.cancel()
+        process.stdout.close()
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode == -9 and elapsed >= timeout:
+        return None, _peak_rss_kb(rusage), process.returncode, stdout
+    return elapsed, _peak_rss_kb(rusage), process.returncode, stdout
+
+
+def profile_rules(path, ruleset, stream=False):
+    """解析と各ルールの処理時間を計測する（--worker で別プロセスから呼ばれる）"""
+    from .document import load_document, stream_document
+    from .engine import select_rules
+
+    start = time.perf_counter()
+    doc = stream_document(path) if stream else load_document(path)
+    parsed = time.perf_counter()
+    rules = {}
+    findings = 0
+    for rule in select_rules(doc, ruleset)[0]:
+        rule_start = time.perf_counter()
+        findings += len(rule.check(doc))
+        rules[rule.name] = time.perf_counter() - rule_start
+    return {
+        'seconds': time.perf_counter() - start,
+        'parse': parsed - start,
+        'rules': rules,
+        'findings': findings,
+    }
+
+
+def _python_env():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = _SCRIPTS_DIR + (os.pathsep + env['PYTHONPATH'] if env.get('PYTHONPATH') else '')
+    return env
+
+
+def _measure_best(command, runs, timeout, env, worker=False):
+    """
+    コマンドを runs 回（毎回新しいプロセスで）実行し、最も速かった回の結果を返す
+    worker=True ではプロセスが出力した計測値を、それ以外は起動を含む経過時間を使う
+    """
+    best = None
+    for _ in range(runs):
+        elapsed, rss, status, stdout = run_measured(command, timeout, env)
+        if elapsed is None:
+            return {'error': 'timeout', 'peak_rss_kb': rss}
+        if worker:
+            if status != 0:
+                return {'error': f'exit {status}', 'peak_rss_kb': rss}
+            entry = {'peak_rss_kb': rss, **json.loads(stdout)}
+        else:
+            # 検証スクリプトは問題を検出すると終了コード1を返すため、終了コードは記録するだけにする
+            entry = {'seconds': elapsed, 'peak_rss_kb': rss, 'exit': status}
+        if best is None or entry['seconds'] < best['seconds']:
+            best = entry
+    return best
+
+
+def run_benchmarks(labels, corpus_dir, seed=DEFAULT_SEED, repeat=3, timeout=DEFAULT_TIMEOUT,
+                   include_scripts=True, progress=None):
+    """全サイズ・全検証処理を計測して結果の辞書を返す"""
+    corpora = write_corpus(corpus_dir, labels, seed)
+    env = _python_env()
+    results = {
+        'seed': seed,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sizes': {},
+    }
+    for label in labels:
+        path = corpora[label]
+        # 大きなコーパスは1回の計測で十分に安定する
+        runs = repeat if SIZES[label] <= 1024 * 1024 else 1
+        targets = [(f'ruleset:{ruleset}', ruleset, False) for ruleset in RULESETS]
+        targets.append(('ruleset:core+stream', 'core', True))
+        commands = [
+            (name, [sys.executable, '-m', 'claudeflow.validation.bench', '--worker', path, '--ruleset', ruleset]
+             + (['--stream'] if stream else []), True)
+            for name, ruleset, stream in targets
+        ]
+        if include_scripts:
+            commands += [(f'script:{os.path.basename(script)}', [sys.executable, script, path], False)
+                         for script in validator_scripts()]
+        entries = {}
+        for name, command, worker in commands:
+            entries[name] = _measure_best(command, runs, timeout, env, worker)
+            if progress:
+                progress(label, name, entries[name])
+        results['sizes'][label] = {'bytes': os.path.getsize(path), 'validators': entries}
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, rss_tolerance=DEFAULT_RSS_TOLERANCE):
+    """
+    ベースラインと比較し (性能劣化のリスト, 注意事項のリスト) を返す
+    処理時間は tolerance 倍 + TIME_SLACK、ピークRSSは rss_tolerance 倍 + RSS_SLACK_KB を超えると劣化とする
+    """
+    regressions = []
+    notes = []
+    for label, size in results['sizes'].items():
+        base_size = baseline.get('sizes', {}).get(label)
+        if base_size is None:
+            notes.append(f"{label}: ベースラインなし")
+            continue
+        for name, entry in size['validators'].items():
+            base = base_size['validators'].get(name)
+            if base is None or 'error' in base:
+                continue
+            where = f"{label} {name}"
+            if 'error' in entry:
+                regressions.append(f"{where}: {entry['error']}（ベースライン {base['seconds'] * 1000:.1f}ms）")
+                continue
+            if entry['seconds'] > base['seconds'] * tolerance + TIME_SLACK:
+                regressions.append(f"{where}: {base['seconds'] * 1000:.1f}ms → {entry['seconds'] * 1000:.1f}ms "
+                                   f"({entry['seconds'] / base['seconds']:.2f}倍)")
+            if entry['peak_rss_kb'] > base['peak_rss_kb'] * rss_tolerance + RSS_SLACK_KB:
+                regressions.append(f"{where}: ピークRSS {base['peak_rss_kb'] / 1024:.1f}MB → "
+                                   f"{entry['peak_rss_kb'] / 1024:.1f}MB")
+            for rule, seconds in entry.get('rules', {}).items():
+                base_rule = base.get('rules', {}).get(rule)
+                if base_rule is not None and seconds > base_rule * tolerance + TIME_SLACK:
+                    regressions.append(f"{where} {rule}: {base_rule * 1000:.1f}ms → {seconds * 1000:.1f}ms")
+            if 'findings' in base and entry.get('findings') != base['findings']:
+                notes.append(f"{where}: 検出件数が変化 {base['findings']} → {entry.get('findings')}")
+    return regressions, notes
+
+
+def _format_entry(label, name, entry):
+    if 'error' in entry:
+        return f"{label:>5}  {name:<36} {entry['error']}"
+    return (f"{label:>5}  {name:<36} {entry['seconds'] * 1000:>10.1f}ms  "
+            f"{entry['peak_rss_kb'] / 1024:>8.1f}MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.validation.bench',
+                                     description='検証処理のベンチマーク')
+    parser.add_argument('--sizes', default=','.join(SIZES), help=f"コーパスのサイズ（既定: {','.join(SIZES)}）")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='コーパス生成のシード')
+    parser.add_argument('--repeat', type=int, default=3, help='1MB以下で計測する回数（最速値を採用）')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='ベースラインのJSON')
+    parser.add_argument('--update-baseline', action='store_true', help='結果をベースラインとして保存')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='処理時間の許容倍率')
+    parser.add_argument('--rss-tolerance', type=float, default=DEFAULT_RSS_TOLERANCE, help='ピークRSSの許容倍率')
+    parser.add_argument('--no-scripts', action='store_true', help='検証スクリプト（*.py）の計測を省く')
+    parser.add_argument('--corpus-dir', help='コーパスの保存先（既定: 一時ディレクトリ）')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='1回の計測の制限時間（秒）')
+    parser.add_argument('-o', '--output', help='結果のJSONの出力先')
+    parser.add_argument('--worker', metavar='FILE', help=argparse.SUPPRESS)
+    parser.add_argument('--ruleset', default='core', help=argparse.SUPPRESS)
+    parser.add_argument('--stream', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        print(json.dumps(profile_rules(args.worker, args.ruleset, args.stream)))
+        return 0
+
+    labels = [label.strip() for label in args.sizes.split(',') if label.strip()]
+    unknown = [label for label in labels if label not in SIZES]
+    if unknown:
+        parser.error(f"不明なサイズ: {', '.join(unknown)}（{', '.join(SIZES)} から選択）")
+
+    print(f"{'サイズ':>4}  {'検証':<36} {'処理時間':>10}  {'ピークRSS':>8}")
+    progress = lambda label, name, entry: print(_format_entry(label, name, entry), flush=True)  # noqa: E731
+    with tempfile.TemporaryDirectory(prefix='claudeflow-bench-') as temp_dir:
+        results = run_benchmarks(labels, args.corpus_dir or temp_dir, args.seed, args.repeat, args.timeout,
+                                 not args.no_scripts, progress)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"\n✅ ベースラインを保存しました: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️  ベースラインがありません（--update-baseline で作成）: {args.baseline}")
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions, notes = compare(results, baseline, args.tolerance, args.rss_tolerance)
+    print()
+    for note in notes:
+        print(f"ℹ️  {note}")
+    if regressions:
+        print(f"❌ 性能劣化を検出しました（{len(regressions)}件、許容: 時間{args.tolerance}倍・RSS{args.rss_tolerance}倍）")
+        for regression in regressions:
+            print(f"  ❌ {regression}")
+        return 1
+    print("✅ ベースラインからの性能劣化はありません")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
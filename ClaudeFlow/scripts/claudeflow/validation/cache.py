@@ -0,0 +1,268 @@
+"""
+検証結果のキャッシュ
+ファイル内容のハッシュとルールセットのバージョンをキーに結果を保存し、
+変更のないファイルの再検証を省く
+
+1エントリ1ファイルで保存するため、複数プロセスから同時に読み書きできる。
+最終利用時刻（mtime）の古い順にエントリ数・合計サイズの上限まで削除する（LRU）
+
+使用方法:
+    python3 -m claudeflow.validation.cache get <file> --namespace <ns> [--output <path>]
+    python3 -m claudeflow.validation.cache put <file> --namespace <ns> [--status N] < report
+    python3 -m claudeflow.validation.cache stats|clear
+"""
+
+import argparse
+import fcntl
+import functools
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# 既定の保存先（CLAUDEFLOW_VALIDATION_CACHEで変更可能）
+DEFAULT_CACHE_DIR = os.environ.get('CLAUDEFLOW_VALIDATION_CACHE') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'claudeflow', 'validation')
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+_STATS_FILE = 'stats.json'
+
+
+def file_digest(path):
+    """ファイル内容のSHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def _source_digest():
+    # ルールや解析器の実装が変わればキャッシュ済みの結果は使えない
+    digest = hashlib.sha256()
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for root, dirs, files in os.walk(package_dir):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            if name.endswith('.py') and name != 'cache.py' or name.endswith('.json'):
+                with open(os.path.join(root, name), 'rb') as f:
+                    digest.update(name.encode() + b'\0' + f.read())
+    return digest.hexdigest()
+
+
+def ruleset_version(ruleset):
+    """ルールセットのバージョン（構成ルール・重要度・実装のハッシュ）"""
+    from .rules import resolve_rules
+
+    digest = hashlib.sha256(_source_digest().encode())
+    for rule in resolve_rules(ruleset):
+        digest.update(f'\0{rule.name}:{rule.severity}:{",".join(rule.languages)}'.encode())
+        for path in rule.depends_on:
+            try:
+                digest.update(b'\0' + file_digest(path).encode())
+            except OSError:
+                digest.update(b'\0-')
+    return digest.hexdigest()[:16]
+
+
+class ValidationCache:
+    """
+    内容ハッシュをキーにした検証結果の永続キャッシュ
+    hits/misses/storesはこのインスタンスでの回数（他プロセスの回数を加算してもよい）。
+    close()で上限を超えた分を削除し、累計の統計を更新する
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._entries_dir = os.path.join(path, 'entries')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def make_key(namespace, digest):
+        """名前空間（ルールセットとバージョン）と内容ハッシュからキーを作る"""
+        return hashlib.sha256(f'{namespace}\0{digest}'.encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self._entries_dir, key[:2], key + '.json')
+
+    def get(self, key):
+        """保存済みの値を返す（なければNone）。ヒットしたエントリは最終利用時刻を更新する"""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        """値を保存（一時ファイルに書いてから置き換えるため読み込み中のプロセスに影響しない）"""
+        entry_path = self._entry_path(key)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(entry_path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, entry_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.stores += 1
+
+    def _scan_entries(self):
+        entries = []
+        if not os.path.isdir(self._entries_dir):
+            return entries
+        for shard in os.scandir(self._entries_dir):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith('.json'):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        """エントリ数・合計サイズが上限を超えていれば最終利用の古い順に削除し、削除数を返す"""
+        entries = self._scan_entries()
+        total = sum(size for _, size, _ in entries)
+        if len(entries) <= self.max_entries and total <= self.max_bytes:
+            return 0
+        entries.sort()
+        removed = 0
+        for _, size, entry_path in entries:
+            if len(entries) - removed <= self.max_entries and total <= self.max_bytes:
+                break
+            try:
+                os.unlink(entry_path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+    def close(self):
+        """上限を超えた分の削除と累計統計の更新"""
+        if self.stores:
+            self.evict()
+            self.stores = 0
+        if self.hits or self.misses:
+            self._update_stats(self.hits, self.misses)
+            self.hits = self.misses = 0
+
+    def _update_stats(self, hits, misses):
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, _STATS_FILE), 'a+', encoding='utf-8') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.seek(0)
+            try:
+                stats = json.loads(f.read() or '{}')
+            except ValueError:
+                stats = {}
+            stats['hits'] = stats.get('hits', 0) + hits
+            stats['misses'] = stats.get('misses', 0) + misses
+            stats['updated'] = time.time()
+            f.seek(0)
+            f.truncate()
+            json.dump(stats, f)
+
+    def stats(self):
+        """累計のヒット・ミス数と現在のエントリ数・合計サイズ"""
+        try:
+            with open(os.path.join(self.path, _STATS_FILE), 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+        except (OSError, ValueError):
+            stats = {}
+        hits = stats.get('hits', 0) + self.hits
+        misses = stats.get('misses', 0) + self.misses
+        entries = self._scan_entries()
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+        }
+
+    def clear(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.hits = self.misses = self.stores = 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.validation.cache',
+                                     description='検証結果キャッシュ')
+    parser.add_argument('--dir', default=DEFAULT_CACHE_DIR, help='キャッシュの保存先')
+    sub = parser.add_subparsers(dest='command', required=True)
+    get_parser = sub.add_parser('get', help='キャッシュ済みの結果を出力（なければ終了コード1）')
+    get_parser.add_argument('file')
+    get_parser.add_argument('--namespace', required=True, help='検証内容のバージョンを含む名前空間')
+    get_parser.add_argument('--output', help='結果の書き込み先（省略時は標準出力、ステータスは出力しない）')
+    put_parser = sub.add_parser('put', help='標準入力の結果を保存')
+    put_parser.add_argument('file')
+    put_parser.add_argument('--namespace', required=True)
+    put_parser.add_argument('--status', type=int, default=0, help='結果と一緒に保存する終了ステータス')
+    sub.add_parser('stats', help='ヒット・ミス数を表示')
+    sub.add_parser('clear', help='キャッシュを削除')
+    args = parser.parse_args(argv)
+
+    cache = ValidationCache(args.dir)
+    if args.command == 'stats':
+        json.dump(cache.stats(), sys.stdout)
+        print()
+        return 0
+    if args.command == 'clear':
+        cache.clear()
+        return 0
+
+    try:
+        key = cache.make_key(args.namespace, file_digest(args.file))
+    except OSError as e:
+        print(f"❌ ファイル読み込みエラー: {args.file}: {e}", file=sys.stderr)
+        return 2
+    with cache:
+        if args.command == 'put':
+            cache.put(key, {'text': sys.stdin.read(), 'status': args.status})
+            return 0
+        entry = cache.get(key)
+    if entry is None:
+        return 1
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(entry['text'])
+        # 出力先を指定した場合は保存時のステータスを標準出力に返す
+        print(entry['status'])
+    else:
+        sys.stdout.write(entry['text'])
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+検証エンジンのコマンドラインインターフェース
+
+使用方法:
+    python3 -m claudeflow.validation <file>... [--ruleset core] [--json] [--stream] [--cache]
+"""
+
+import argparse
+import json
+import sys
+
+from .cache import DEFAULT_CACHE_DIR, ValidationCache
+from .document import DEFAULT_CHUNK_SIZE
+from .engine import has_errors, validate_file
+from .rules import RULES, RULESETS, resolve_rules
+
+SEVERITY_COLORS = {
+    'critical': '\033[0;31m',
+    'error': '\033[0;31m',
+    'warning': '\033[0;33m',
+    'info': '\033[0;36m',
+}
+NC = '\033[0m'
+
+
+def print_report(report, color=True, file=None):
+    file = file or sys.stdout
+    print(f"=== {report['file']} ({report['language']}, ルールセット: {report['ruleset']}) ===", file=file)
+    for finding in report['findings']:
+        severity = finding['severity']
+        prefix = f"{SEVERITY_COLORS[severity]}[{severity.upper()}]{NC}" if color else f"[{severity.upper()}]"
+        location = f"Line {finding['line']}: " if finding['line'] else ''
+        print(f"{prefix} {location}{finding['message']} ({finding['rule']})", file=file)
+
+    if report.get('skipped_rules'):
+        print(f"ℹ️  ストリーミングモードのため省略: {', '.join(report['skipped_rules'])}", file=file)
+
+    summary = report['summary']
+    if report['findings']:
+        print(f"\n検出された問題: Critical: {summary['critical']}, Error: {summary['error']}, "
+              f"Warning: {summary['warning']}, Info: {summary['info']}", file=file)
+    else:
+        print("✅ 問題は検出されませんでした", file=file)
+
+
+def list_rules():
+    resolve_rules('core')
+    for name, rule_names in sorted(RULESETS.items()):
+        print(f"{name}: {', '.join(rule_names)}")
+    print()
+    for name, rule in sorted(RULES.items()):
+        print(f"  {name:28} [{rule.severity}] {rule.description}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.validation',
+                                     description='ClaudeFlow 統合検証エンジン')
+    parser.add_argument('files', nargs='*', help='検証するファイル')
+    parser.add_argument('-r', '--ruleset', default='core', help='ルールセット名（カンマ区切り可）')
+    parser.add_argument('-l', '--language', help='言語を指定（既定は拡張子から判定）')
+    parser.add_argument('--stream', action='store_true',
+                        help='チャンク単位で読み込む（巨大ファイル向け、本文全体が必要なルールは省略）')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f'ストリーミング時のチャンクサイズ（文字数、既定: {DEFAULT_CHUNK_SIZE}）')
+    parser.add_argument('--cache', action='store_true',
+                        help='内容が変わっていないファイルは前回の結果を再利用する')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'キャッシュの保存先（既定: {DEFAULT_CACHE_DIR}）')
+    parser.add_argument('--json', action='store_true', help='JSONで出力')
+    parser.add_argument('--no-color', action='store_true', help='色付けしない')
+    parser.add_argument('--list-rules', action='store_true', help='ルール一覧を表示')
+    args = parser.parse_args(argv)
+
+    if args.list_rules:
+        list_rules()
+        return 0
+    if not args.files:
+        parser.error('ファイルを指定してください')
+
+    try:
+        resolve_rules(args.ruleset)
+    except KeyError as e:
+        parser.error(e.args[0])
+
+    reports = []
+    exit_code = 0
+    cache = ValidationCache(args.cache_dir) if args.cache else None
+    for path in args.files:
+        try:
+            report = validate_file(path, args.ruleset, args.language,
+                                   stream=args.stream, chunk_size=args.chunk_size, cache=cache)
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ ファイル読み込みエラー: {path}: {e}", file=sys.stderr)
+            exit_code = 2
+            continue
+        if has_errors(report):
+            exit_code = max(exit_code, 1)
+        reports.append(report)
+    if cache is not None:
+        hits, misses = cache.hits, cache.misses
+        cache.close()
+        print(f"ℹ️  キャッシュ: ヒット {hits} / ミス {misses}", file=sys.stderr)
+
+    if args.json:
+        json.dump(reports if len(reports) != 1 else reports[0], sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for report in reports:
+            print_report(report, color=not args.no_color and sys.stdout.isatty())
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,375 @@
+"""
+検証対象ファイルの共有ドキュメントモデル
+ファイルを一度だけ読み込み・トークン化し、全ルールで共有する
+"""
+
+import os
+from bisect import bisect_right
+from collections import defaultdict
+from html.parser import HTMLParser
+
+from .javascript import BracketScanner, check_brackets
+
+# ストリーミングモードで1回に読み込む文字数
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+})
+
+LANGUAGES = {
+    '.html': 'html', '.htm': 'html',
+    '.js': 'javascript', '.jsx': 'javascript', '.mjs': 'javascript',
+    '.ts': 'typescript', '.tsx': 'typescript',
+    '.py': 'python',
+}
+
+
+def detect_language(path):
+    """拡張子から言語を判定"""
+    return LANGUAGES.get(os.path.splitext(path)[1].lower(), 'unknown')
+
+
+class Node:
+    """タグツリーのノード"""
+
+    __slots__ = ('tag', 'attrs', 'line', 'col', 'end_line', 'children', 'parent')
+
+    def __init__(self, tag, attrs=(), line=0, col=0, parent=None):
+        self.tag = tag
+        self.attrs = dict(attrs)
+        self.line = line
+        self.col = col
+        self.end_line = None
+        self.children = []
+        self.parent = parent
+
+    def iter(self, tag=None):
+        """自身と子孫ノードを文書順に列挙"""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if tag is None or node.tag == tag:
+                yield node
+            stack.extend(reversed(node.children))
+
+
+class ScriptBlock:
+    """
+    <script>ブロック（line/colはスクリプト本文の開始位置）
+    ストリーミング時は本文を受信と同時にBracketScannerへ流し、textを保持しない
+    """
+
+    __slots__ = ('index', 'line', 'col', 'attrs', 'text', 'length', 'bracket_issues',
+                 '_scanner', '_parts')
+
+    def __init__(self, index, line, col, attrs, keep_text=True):
+        self.index = index
+        self.line = line
+        self.col = col
+        self.attrs = dict(attrs)
+        self.text = None
+        self.length = 0
+        self.bracket_issues = []
+        self._scanner = None if keep_text else BracketScanner()
+        self._parts = [] if keep_text else None
+
+    def feed(self, data):
+        self.length += len(data)
+        if self._parts is not None:
+            self._parts.append(data)
+        else:
+            self._scanner.feed(data)
+
+    def close(self):
+        if self._parts is not None:
+            self.text = ''.join(self._parts)
+            self._parts = None
+            # 本文がそろっていれば、まず位置を記録しない高速な検査で済ませる
+            self.bracket_issues = check_brackets(self.text)
+        else:
+            self.bracket_issues = self._scanner.close()
+            self._scanner = None
+
+    @property
+    def is_javascript(self):
+        script_type = (self.attrs.get('type') or 'text/javascript').lower()
+        return script_type in ('text/javascript', 'application/javascript', 'module')
+
+    def file_line(self, line):
+        """スクリプト内の行番号をファイル上の行番号に変換"""
+        return self.line + line - 1
+
+
+class TagIssue:
+    """タグ構造の問題（不一致・開始タグなし・未閉じ）"""
+
+    __slots__ = ('kind', 'tag', 'line', 'col', 'expected', 'expected_line')
+
+    def __init__(self, kind, tag, line, col, expected=None, expected_line=None):
+        self.kind = kind
+        self.tag = tag
+        self.line = line
+        self.col = col
+        self.expected = expected
+        self.expected_line = expected_line
+
+
+class _DocumentBuilder(HTMLParser):
+    """HTMLを1パスで解析してタグツリー・スクリプト・IDを構築"""
+
+    def __init__(self, doc):
+        super().__init__(convert_charrefs=True)
+        self.doc = doc
+        self.stack = [doc.root]
+        self.script = None
+
+    def feed(self, data):
+        if self.cdata_elem is None:
+            super().feed(data)
+            return
+        rawdata = self.rawdata + data
+        if self.interesting.search(rawdata):
+            super().feed(data)
+            return
+        # <script>の終了タグが未着の間、HTMLParserは本文を全て溜め込むため
+        # 終了タグの先頭になり得る末尾の'<'以降だけを残して本文を流す
+        keep = rawdata.rfind('<')
+        if keep < 0:
+            keep = len(rawdata)
+        self.rawdata = rawdata
+        if keep:
+            self.handle_data(rawdata[:keep])
+            self.updatepos(0, keep)
+            self.rawdata = rawdata[keep:]
+
+    def handle_decl(self, decl):
+        if decl.lower().startswith('doctype'):
+            self.doc.doctype = decl
+
+    def handle_starttag(self, tag, attrs):
+        line, col = self.getpos()
+        doc = self.doc
+        doc.tag_count[tag] += 1
+
+        for name, value in attrs:
+            if name == 'id' and value is not None:
+                if value in doc.ids:
+                    doc.duplicate_ids.append((value, line, doc.ids[value]))
+                else:
+                    doc.ids[value] = line
+
+        if tag == 'meta' and doc.charset is None:
+            attr_map = dict(attrs)
+            if attr_map.get('charset'):
+                doc.charset = attr_map['charset']
+            elif (attr_map.get('http-equiv') or '').lower() == 'content-type':
+                doc.charset = (attr_map.get('content') or '').partition('charset=')[2] or None
+
+        node = Node(tag, attrs, line, col, self.stack[-1])
+        if doc.keep_tree:
+            self.stack[-1].children.append(node)
+        if tag in VOID_ELEMENTS:
+            node.end_line = line
+            return
+        self.stack.append(node)
+
+        if tag == 'script':
+            # スクリプト本文の開始位置 = 開始タグの直後
+            start_tag = self.get_starttag_text() or ''
+            newlines = start_tag.count('\n')
+            if newlines:
+                body_line = line + newlines
+                body_col = len(start_tag) - start_tag.rfind('\n') - 1
+            else:
+                body_line = line
+                body_col = col + len(start_tag)
+            self.script = ScriptBlock(len(doc.scripts), body_line, body_col, attrs,
+                                      keep_text=doc.keep_text)
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self._close(self.stack.pop())
+
+    def handle_endtag(self, tag):
+        if tag in VOID_ELEMENTS:
+            return
+        line, col = self.getpos()
+        if tag == 'script' and self.script is not None:
+            self._close_script()
+
+        if len(self.stack) == 1:
+            self.doc.tag_issues.append(TagIssue('stray', tag, line, col))
+            return
+
+        node = self.stack.pop()
+        self._close(node, line)
+        if node.tag != tag:
+            self.doc.tag_issues.append(
+                TagIssue('mismatch', tag, line, col, node.tag, node.line))
+            # 対応する開始タグを探してスタックから外す
+            for i in range(len(self.stack) - 1, 0, -1):
+                if self.stack[i].tag == tag:
+                    self._close(self.stack.pop(i), line)
+                    break
+
+    def handle_data(self, data):
+        if self.script is not None:
+            self.script.feed(data)
+
+    def _close(self, node, line=None):
+        node.end_line = line if line is not None else node.line
+
+    def _close_script(self):
+        self.script.close()
+        self.doc.scripts.append(self.script)
+        self.script = None
+
+    def finish(self):
+        self.close()
+        if self.script is not None:
+            # 閉じられていない<script>も本文は検証対象にする
+            self._close_script()
+        for node in self.stack[1:]:
+            self.doc.tag_issues.append(
+                TagIssue('unclosed', node.tag, node.line, node.col))
+
+
+class Document:
+    """
+    1ファイル分の解析結果（全ルールで共有）
+    textを渡すと一括で解析し、Noneの場合はfeed()/finish()で逐次解析する
+    ストリーミング時（keep_text=False）は本文とタグツリーを保持しない
+    """
+
+    def __init__(self, path, text=None, language=None, keep_text=True):
+        self.path = path
+        self.text = text
+        self.language = language or detect_language(path)
+        self.keep_text = keep_text
+        self.keep_tree = keep_text
+        self.size = 0
+        self.root = Node('#document')
+        self.doctype = None
+        self.scripts = []
+        self.ids = {}
+        self.duplicate_ids = []
+        self.tag_count = defaultdict(int)
+        self.tag_issues = []
+        self.parse_error = None
+        self.charset = None
+        self._newlines = 0
+        self._chunks = []
+        self._line_offsets = None
+        self._script_text = None
+        self._builder = None
+        self._script = None
+
+        if self.language == 'html':
+            self._builder = _DocumentBuilder(self)
+        elif self.language in ('javascript', 'typescript'):
+            self._script = ScriptBlock(0, 1, 0, {}, keep_text=keep_text)
+
+        if text is not None:
+            self._feed(text)
+            self.finish()
+            self.size = len(text.encode('utf-8'))
+
+    @property
+    def streamed(self):
+        """本文を保持していない（ストリーミングで構築された）か"""
+        return self.text is None
+
+    def feed(self, chunk):
+        """チャンクを1つ解析（ストリーミング用）"""
+        self.size += len(chunk.encode('utf-8'))
+        if self.keep_text:
+            self._chunks.append(chunk)
+        self._feed(chunk)
+
+    def _feed(self, chunk):
+        self._newlines += chunk.count('\n')
+        if self.parse_error:
+            return
+        try:
+            if self._builder is not None:
+                self._builder.feed(chunk)
+            elif self._script is not None:
+                self._script.feed(chunk)
+        except Exception as e:
+            self.parse_error = str(e)
+
+    def finish(self):
+        """解析を完了する"""
+        if self._builder is not None:
+            if not self.parse_error:
+                try:
+                    self._builder.finish()
+                except Exception as e:
+                    self.parse_error = str(e)
+            self._builder = None
+        elif self._script is not None:
+            self._script.close()
+            self.scripts.append(self._script)
+            self._script = None
+        if self.text is None and self.keep_text:
+            self.text = ''.join(self._chunks)
+            self._chunks = []
+        return self
+
+    @property
+    def line_offsets(self):
+        """各行の先頭オフセット（遅延構築、本文を保持している場合のみ）"""
+        if self._line_offsets is None:
+            offsets = [0]
+            find = self.text.find
+            pos = find('\n')
+            while pos != -1:
+                offsets.append(pos + 1)
+                pos = find('\n', pos + 1)
+            self._line_offsets = offsets
+        return self._line_offsets
+
+    @property
+    def line_count(self):
+        return self._newlines + 1
+
+    def position(self, offset):
+        """文字オフセットを(行, 列)に変換"""
+        line = bisect_right(self.line_offsets, offset)
+        return line, offset - self.line_offsets[line - 1]
+
+    @property
+    def script_text(self):
+        """JavaScriptブロックを連結したテキスト"""
+        if self._script_text is None:
+            self._script_text = '\n'.join(block.text or '' for block in self.scripts
+                                          if block.is_javascript)
+        return self._script_text
+
+    def has_id(self, element_id):
+        return element_id in self.ids
+
+
+def load_document(path, language=None):
+    """ファイルを一度だけ読み込んでDocumentを構築"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    return Document(path, text, language)
+
+
+def stream_document(path, language=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    ファイルを固定サイズのチャンクで読みながらDocumentを構築
+    本文・タグツリーは保持しないため、ピークメモリはファイルサイズに依存しない
+    """
+    doc = Document(path, language=language, keep_text=False)
+    with open(path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            doc.feed(chunk)
+    return doc.finish()
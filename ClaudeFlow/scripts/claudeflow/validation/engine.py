@@ -0,0 +1,96 @@
+"""
+検証エンジン
+Documentを1回構築し、ルールセットの全ルールをその上で実行する
+"""
+
+from .document import DEFAULT_CHUNK_SIZE, detect_language, load_document, stream_document
+from .rules import SEVERITIES, SEVERITY_ORDER, resolve_rules
+
+
+def select_rules(doc, ruleset='core'):
+    """
+    Documentに適用できるルールを選ぶ
+    戻り値: (実行するRuleのリスト, ストリーミングのため実行できないルール名のリスト)
+    """
+    selected = []
+    skipped = []
+    for rule in resolve_rules(ruleset):
+        if not rule.applies_to(doc):
+            continue
+        if rule.needs_text and doc.streamed:
+            skipped.append(rule.name)
+            continue
+        selected.append(rule)
+    return selected, skipped
+
+
+def _apply(doc, rules):
+    findings = []
+    for rule in rules:
+        findings.extend(rule.check(doc))
+    findings.sort(key=lambda f: (f.line or 0, SEVERITY_ORDER[f.severity]))
+    return findings
+
+
+def run_rules(doc, ruleset='core'):
+    """Documentに対してルールセットを実行しFindingのリストを返す"""
+    return _apply(doc, select_rules(doc, ruleset)[0])
+
+
+def summarize(findings):
+    """重要度別の件数"""
+    summary = {severity: 0 for severity in SEVERITIES}
+    for finding in findings:
+        summary[finding.severity] += 1
+    return summary
+
+
+def build_report(doc, findings, ruleset, skipped=()):
+    """JSONに変換可能なレポート"""
+    report = {
+        'file': doc.path,
+        'language': doc.language,
+        'ruleset': ruleset,
+        'size': doc.size,
+        'lines': doc.line_count,
+        'scripts': len(doc.scripts),
+        'summary': summarize(findings),
+        'findings': [finding.to_dict() for finding in findings],
+    }
+    if doc.streamed:
+        report['streamed'] = True
+        report['skipped_rules'] = list(skipped)
+    return report
+
+
+def validate_file(path, ruleset='core', language=None, stream=False, chunk_size=DEFAULT_CHUNK_SIZE,
+                  cache=None):
+    """
+    ファイルを読み込んで検証しレポートを返す
+    stream=Trueの場合はチャンク単位で読み、本文全体を必要とするルールは省略する
+    cache（ValidationCache）を渡すと、内容とルールセットが同じファイルは保存済みの結果を返す
+    """
+    if cache is not None:
+        from .cache import file_digest, ruleset_version
+
+        namespace = (f"{ruleset}:{ruleset_version(ruleset)}:{language or detect_language(path)}:"
+                     f"{'stream' if stream else 'full'}")
+        key = cache.make_key(namespace, file_digest(path))
+        cached = cache.get(key)
+        if cached is not None:
+            return {'file': path, **cached}
+
+    if stream:
+        doc = stream_document(path, language, chunk_size)
+    else:
+        doc = load_document(path, language)
+    rules, skipped = select_rules(doc, ruleset)
+    report = build_report(doc, _apply(doc, rules), ruleset, skipped)
+    if cache is not None:
+        cache.put(key, {name: value for name, value in report.items() if name != 'file'})
+    return report
+
+
+def has_errors(report):
+    summary = report['summary']
+    return summary.get('critical', 0) + summary.get('error', 0) > 0
@@ -0,0 +1,336 @@
+"""
+JavaScriptの括弧バランス・セミコロン検査
+括弧の検査は文字列・コメント・正規表現・テンプレートリテラルを読み飛ばす字句解析器で行う
+"""
+
+import re
+import string
+
+BRACKET_PAIRS = {'(': ')', '[': ']', '{': '}'}
+CLOSING = {v: k for k, v in BRACKET_PAIRS.items()}
+
+_LINE_COMMENT = re.compile(r'//.*$')
+_BLOCK_COMMENT = re.compile(r'/\*.*?\*/')
+_CONTINUATIONS = ('.', '[', '(', ')', ']', '}', '&&', '||', '?', ':', '+')
+_STATEMENT_HEAD = re.compile(
+    r'^\s*(function|if|else|for|while|switch|case|default|try|catch|finally)')
+
+
+def _chars_except(excluded):
+    """excluded以外の全文字にマッチする文字クラス（否定クラスより照合が速いため範囲を列挙する）"""
+    ranges = []
+    start = 0
+    for code in sorted(map(ord, excluded)) + [0x110000]:
+        if code > start:
+            ranges.append(re.escape(chr(start)) if code - 1 == start
+                          else f'{re.escape(chr(start))}-{re.escape(chr(code - 1))}')
+        start = code + 1
+    return f"[{''.join(ranges)}]"
+
+
+def _string_literal(quote, excluded='', closed=True):
+    body = _chars_except(quote + '\\\n' + excluded)
+    escaped = _chars_except(excluded) if excluded else r'[\s\S]'
+    return rf'{quote}{body}*(?:\\{escaped}{body}*)*{quote}' + ('' if closed else '?')
+
+
+# 字句の表（上から順に試す）。コードと、括弧を含まない文字列リテラル・コメントの並びは1トークン（run）として
+# 正規表現エンジン内で読み進め、スラッシュ・テンプレートリテラル・括弧を含む文字列やコメントだけをPython側で処理する
+# テンプレートリテラルの ${ } 内では対応する } を見つけるため波括弧を個別のトークンにする
+_STRING = '|'.join(_string_literal(quote, closed=False) for quote in '\'"')
+_PLAIN_STRING = '|'.join(_string_literal(quote, '()[]{}') for quote in '\'"')
+_LINE_COMMENT_CHARS = _chars_except('\n()[]{}')
+_BLOCK_COMMENT_CHARS = _chars_except('*()[]{}')
+_PLAIN_COMMENT = (rf'//{_LINE_COMMENT_CHARS}*\n'
+                  rf'|/\*{_BLOCK_COMMENT_CHARS}*(?:\*+(?!/){_BLOCK_COMMENT_CHARS}*)*\*+/')
+_CODE_EXCLUDED = {'top': '\'"`/', 'expr': '\'"`/{}'}
+# runの要素。コメントと空白を除いた最後の要素を last に残し、直後のスラッシュの解釈に使う
+_RUN_ELEMENT = {
+    mode: (f'(?P<last>{_chars_except(excluded)}*{_chars_except(excluded + string.whitespace)}'
+           f'|{_PLAIN_STRING})|\\s+|{_PLAIN_COMMENT}')
+    for mode, excluded in _CODE_EXCLUDED.items()
+}
+_TOKEN_TABLE = (
+    ('run', '(?:{run_element})+'),
+    ('string', _STRING),
+    ('open', r'\{'),
+    ('close', r'\}'),
+    ('comment', rf'//{_chars_except(chr(10))}*|/\*{_chars_except("*")}*(?:\*+(?!/){_chars_except("*")}*)*(?:\*+/)?'),
+    ('template', r'`'),
+    ('slash', r'/'),
+)
+
+
+def _compile_tokens(mode):
+    return re.compile('|'.join(f'(?P<{name}>{pattern.replace("{run_element}", _RUN_ELEMENT[mode])})'
+                               for name, pattern in _TOKEN_TABLE))
+
+
+_TOKEN = _compile_tokens('top')
+_EXPR_TOKEN = _compile_tokens('expr')
+# lastindexからトークン種別を引く表（runの内側のグループがあるため番号は連番にならない）
+_TOKEN_KINDS = [None] * (_TOKEN.groups + 1)
+for _name, _index in _TOKEN.groupindex.items():
+    _TOKEN_KINDS[_index] = _name
+# runの最後の要素の開始位置（チャンク末尾で切る位置を決める）
+_RUN_LAST_ELEMENT = {mode: re.compile(f'(?:({element}))+') for mode, element in _RUN_ELEMENT.items()}
+_BRACKET_OR_NEWLINE = re.compile(r'[()\[\]{}\n]')
+_NOT_BRACKET_BYTES = bytes(c for c in range(256) if c not in b'()[]{}')
+_REGEX_CHARS = _chars_except('/\\[\n')
+_CLASS_CHARS = _chars_except(']\\\n')
+_REGEX = re.compile(rf'/(?![*/]){_REGEX_CHARS}*(?:(?:\\.|\[{_CLASS_CHARS}*(?:\\.{_CLASS_CHARS}*)*\]){_REGEX_CHARS}*)*/[\w$]*')
+# テンプレートリテラルの本文（終端の ` か ${ まで）
+# 括弧・引用符・スラッシュを含まない単純な ${式} は結果に影響しないため本文の一部として読み進める
+_TEMPLATE_CHARS = _chars_except('`\\$')
+_SIMPLE_EXPR_CHARS = _chars_except('`\'"/\\()[]{}')
+_SIMPLE_EXPR = rf'\$\{{{_SIMPLE_EXPR_CHARS}*\}}'
+_TEMPLATE_BODY = re.compile(
+    rf'{_TEMPLATE_CHARS}*(?:(?:\\[\s\S]|{_SIMPLE_EXPR}|\$(?!\{{)){_TEMPLATE_CHARS}*)*(`|\$\{{)?')
+# 直後のスラッシュを正規表現の開始とみなすキーワード
+_KEYWORDS_BEFORE_EXPR = frozenset((
+    'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'case', 'do', 'else', 'yield', 'await',
+))
+_IDENTIFIER_CHARS = string.ascii_letters + string.digits + '_$'
+# 対になった括弧を取り除く回数の上限（これを超える深い入れ子は位置付きの解析に任せる）
+_MAX_REDUCE_PASSES = 64
+
+
+class BracketScanner:
+    """
+    括弧の対応を逐次チェックする字句解析器
+    feed()でチャンク単位に受け取り、close()で問題のリストを返す
+    チャンク境界をまたぐトークンだけを保持するため、メモリは最長トークンの長さで頭打ちになる
+
+    positions=Falseの場合は位置を記録せず括弧の並びだけを集め、close()後のbalancedで対応の有無を返す
+    """
+
+    def __init__(self, positions=True):
+        self.positions = positions
+        self.issues = []
+        self.stack = []        # (括弧, 行, 列)
+        self.balanced = None
+        self.line_num = 1
+        self._line_start = 0   # 現在行の先頭の絶対位置
+        self._offset = 0       # _bufの先頭の絶対位置
+        self._buf = ''
+        self._code = []        # positions=False の時、括弧を取り出す前のコード片
+        self._brackets = []    # positions=False の時に集めた括弧（bytes）
+        self._templates = []   # 読んでいる ${ } ごとの波括弧の深さ
+        self._in_template = False
+        # 直前のトークンの後でスラッシュが正規表現の開始になり得るか
+        self._regex_ok = True
+
+    def feed(self, chunk):
+        buf = self._buf + chunk if self._buf else chunk
+        self._buf = buf[self._scan(buf, False):]
+
+    def close(self):
+        """
+        残りを処理して結果を返す
+        戻り値: (種別, 括弧, 行, 列, 対応する開き括弧, その行) のリスト
+        """
+        self._scan(self._buf, True)
+        self._buf = ''
+        if self.positions:
+            for char, line_num, col in self.stack:
+                self.issues.append(('unclosed', char, line_num, col, None, None))
+            self.stack = []
+            self.balanced = not self.issues
+        else:
+            self.balanced = _reduces_to_empty(b''.join(self._brackets))
+            self._brackets = []
+        return self.issues
+
+    def _newlines(self, buf, start, end):
+        count = buf.count('\n', start, end)
+        if count:
+            self.line_num += count
+            self._line_start = self._offset + buf.rfind('\n', start, end) + 1
+
+    def _bracket(self, char, pos):
+        if not self.positions:
+            self._code.append(char)
+            return
+        col = self._offset + pos - self._line_start
+        if char in BRACKET_PAIRS:
+            self.stack.append((char, self.line_num, col))
+        elif not self.stack:
+            self.issues.append(('stray', char, self.line_num, col, None, None))
+        else:
+            open_char, open_line, _ = self.stack.pop()
+            if open_char != CLOSING[char]:
+                self.issues.append(('mismatch', char, self.line_num, col, open_char, open_line))
+
+    def _run(self, buf, start, end):
+        # run内の文字列リテラルは括弧を含まないため、run内の括弧はすべてコード上の括弧
+        if not self.positions:
+            self._code.append(buf[start:end])
+            return
+        for m in _BRACKET_OR_NEWLINE.finditer(buf, start, end):
+            char = m.group()
+            if char == '\n':
+                self.line_num += 1
+                self._line_start = self._offset + m.end()
+            else:
+                self._bracket(char, m.start())
+
+    def _scan(self, buf, final):
+        """bufを先頭から解析し、処理済みの位置を返す（残りは次のチャンクと連結して再解析）"""
+        size = len(buf)
+        pos = 0
+        run = None
+        run_end = -1
+        positions = self.positions
+        code = self._code
+        while pos < size:
+            if self._in_template:
+                m = _TEMPLATE_BODY.match(buf, pos)
+                end = m.end()
+                terminator = m.group(1)
+                if not terminator and not final:
+                    break
+                if positions:
+                    self._newlines(buf, pos, end)
+                pos = end
+                self._in_template = False
+                self._regex_ok = terminator == '${'
+                if self._regex_ok:
+                    self._templates.append(0)
+                    self._bracket('{', pos - 2)
+                continue
+
+            m = (_EXPR_TOKEN if self._templates else _TOKEN).match(buf, pos)
+            kind = _TOKEN_KINDS[m.lastindex]
+            end = m.end()
+            # 末尾が \ だけ残っている場合も、エスケープの途中で切れているので次のチャンクを待つ
+            if not final and (end == size or (end == size - 1 and buf[end] == '\\')):
+                if kind == 'run':
+                    # 途中で切れている可能性のある末尾だけを残し、長いrunを次のチャンクで再解析しないようにする
+                    cut = self._safe_cut(buf, pos)
+                    if cut > pos:
+                        self._run(buf, pos, cut)
+                        self._regex_ok = _regex_allowed_after(m.re.match(buf, pos, cut), self._regex_ok)
+                        pos = cut
+                break
+
+            if kind == 'run':
+                if positions:
+                    self._run(buf, pos, end)
+                else:
+                    code.append(buf[pos:end])
+                run, run_end = m, end
+            elif kind == 'slash':
+                if run_end == pos:
+                    self._regex_ok = _regex_allowed_after(run, self._regex_ok)
+                regex = _REGEX.match(buf, pos) if self._regex_ok else None
+                if regex and (regex.end() < size or final):
+                    end = regex.end()
+                    self._regex_ok = False
+                elif self._regex_ok and not final and buf.find('\n', pos) < 0:
+                    # 正規表現の途中でチャンクが切れている可能性があるため次のチャンクを待つ
+                    break
+                else:
+                    self._regex_ok = True
+            elif kind == 'string':
+                if positions:
+                    self._newlines(buf, pos, end)
+                self._regex_ok = False
+            elif kind == 'comment':
+                if positions:
+                    self._newlines(buf, pos, end)
+                if run_end == pos:
+                    self._regex_ok = _regex_allowed_after(run, self._regex_ok)
+            elif kind == 'template':
+                self._in_template = True
+            elif kind == 'open':
+                self._templates[-1] += 1
+                self._bracket('{', pos)
+                self._regex_ok = True
+            else:
+                if self._templates[-1]:
+                    self._templates[-1] -= 1
+                else:
+                    self._templates.pop()
+                    self._in_template = True
+                self._bracket('}', pos)
+                self._regex_ok = True
+            pos = end
+
+        if run_end == pos:
+            self._regex_ok = _regex_allowed_after(run, self._regex_ok)
+        if code:
+            code = ''.join(code).encode('utf-8', 'surrogatepass')
+            self._brackets.append(code.translate(None, _NOT_BRACKET_BYTES))
+            self._code = []
+        self._offset += pos
+        return pos
+
+    def _safe_cut(self, buf, pos):
+        """チャンク末尾のrunのうち、次のチャンクを待たずに処理してよい範囲の終端"""
+        run = _RUN_LAST_ELEMENT['expr' if self._templates else 'top'].match(buf, pos)
+        if not run:
+            return pos
+        last = run.start(1)
+        if buf[last] in '\'"/':
+            # 閉じた文字列・コメントで終わっていればrun全体が確定している
+            return run.end()
+        # コードの途中なら最後の空白の直後で切る（末尾の単語はキーワード判定に必要）
+        space = max(buf.rfind(' ', last), buf.rfind('\n', last))
+        return space + 1 if space >= 0 else last
+
+
+def _regex_allowed_after(run, default):
+    """runの末尾からスラッシュが正規表現の開始か判定する（空白とコメントのみならdefaultを返す）"""
+    code = (run and run.group('last') or '').rstrip()
+    if not code:
+        return default
+    last = code[-1]
+    if last in '\'")]':
+        return False
+    if last in '([{}':
+        return True
+    if last.isalnum() or last in '_$':
+        return code[len(code.rstrip(_IDENTIFIER_CHARS)):] in _KEYWORDS_BEFORE_EXPR
+    return not code.endswith(('++', '--'))
+
+
+def _reduces_to_empty(brackets):
+    for _ in range(_MAX_REDUCE_PASSES):
+        reduced = brackets.replace(b'()', b'').replace(b'[]', b'').replace(b'{}', b'')
+        if len(reduced) == len(brackets):
+            return not reduced
+        brackets = reduced
+    return not brackets
+
+
+def check_brackets(js_code):
+    """括弧の対応をチェック（BracketScanner.closeと同じ形式で返す）"""
+    # 大半のスクリプトは対応が取れているため、まず位置を記録せずに確認する
+    scanner = BracketScanner(positions=False)
+    scanner.feed(js_code)
+    scanner.close()
+    if scanner.balanced:
+        return []
+    scanner = BracketScanner()
+    scanner.feed(js_code)
+    return scanner.close()
+
+
+def missing_semicolons(js_code):
+    """セミコロンが欠けている可能性のある行番号を列挙"""
+    lines = js_code.split('\n')
+    for line_num, line in enumerate(lines, 1):
+        line_clean = _LINE_COMMENT.sub('', line).strip()
+        if not line_clean:
+            continue
+        if line_clean.endswith((';', '{', '}', ':', ',', ')', ']', '(', '[')):
+            continue
+        if line_clean.startswith(('*', '/*', '//', '.', '<')):
+            continue
+        if _STATEMENT_HEAD.match(line_clean):
+            continue
+        # 次の行が式の継続や閉じ括弧で始まる場合は対象外
+        if line_num < len(lines) and lines[line_num].lstrip().startswith(_CONTINUATIONS):
+            continue
+        yield line_num
@@ -0,0 +1,379 @@
+"""
+エラーパターン検出エンジン（validation/patterns/error-patterns.json）
+
+- パターンは読み込み時に1回だけコンパイル・検査し、ファイルが変わるまでプロセス内で再利用する
+- 各パターンから必ず現れるリテラル文字列を取り出し、それを含む行だけに正規表現を適用する
+- 一致した行・列・文字列を報告する
+- パターンごとの時間予算を超えたパターンはそのファイルでの検査を打ち切り、timeoutsに記録する
+
+使用方法:
+    python3 -m claudeflow.validation.patterns <file>... [--language javascript] [--json]
+    python3 -m claudeflow.validation.patterns --check   # パターンファイルの検査
+"""
+
+import argparse
+import json
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from bisect import bisect_right
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python 3.10以前
+    import sre_parse
+
+from .document import detect_language
+
+# ClaudeFlow/validation/patterns/error-patterns.json（CLAUDEFLOW_ERROR_PATTERNSで変更可能）
+DEFAULT_PATTERNS_FILE = os.environ.get('CLAUDEFLOW_ERROR_PATTERNS') or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    'validation', 'patterns', 'error-patterns.json')
+# 1ファイルにつき1パターンが使える時間（秒）
+DEFAULT_BUDGET = 0.25
+SEVERITIES = ('critical', 'error', 'warning', 'info')
+
+_OPS = sre_parse
+_CASE_FLAGS = re.IGNORECASE
+# 1回以上の繰り返し・アトミックグループ（Python 3.11以降）も中身のリテラルが必ず現れる
+_REPEATS = tuple(op for op in (getattr(_OPS, name, None) for name in
+                               ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT')) if op is not None)
+_ATOMIC_GROUP = getattr(_OPS, 'ATOMIC_GROUP', None)
+
+
+class PatternTimeout(Exception):
+    """パターンの時間予算超過"""
+
+
+def _literal_alternatives(items, flags=0):
+    """
+    連結された要素から、一致に必ず含まれるリテラルの候補を返す（どれか1つは必ず現れる）
+    判定できない場合はNone。複数の要素から選べる場合は最短候補が最も長いものを選ぶ
+    """
+    best = None
+    run = []
+
+    def consider(candidates):
+        nonlocal best
+        if candidates and (best is None or min(map(len, candidates)) > min(map(len, best))):
+            best = candidates
+
+    for op, av in items:
+        if op is _OPS.LITERAL and not flags & _CASE_FLAGS:
+            run.append(chr(av))
+            continue
+        if run:
+            consider([''.join(run)])
+            run = []
+        if op is _OPS.SUBPATTERN:
+            _, add_flags, del_flags, sub_items = av
+            consider(_literal_alternatives(sub_items, (flags | add_flags) & ~del_flags))
+        elif op is _OPS.BRANCH:
+            branches = [_literal_alternatives(branch, flags) for branch in av[1]]
+            if all(branches):
+                consider(sorted({literal for branch in branches for literal in branch}))
+        elif op in _REPEATS and av[0] >= 1:
+            consider(_literal_alternatives(av[2], flags))
+        elif _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+            consider(_literal_alternatives(av, flags))
+    if run:
+        consider([''.join(run)])
+    return best
+
+
+def required_literals(regex):
+    """正規表現の一致に必ず含まれるリテラルの候補（取り出せない場合はNone）"""
+    parsed = sre_parse.parse(regex.pattern, regex.flags)
+    if parsed.state.flags & _CASE_FLAGS:
+        return None
+    return _literal_alternatives(parsed)
+
+
+class Pattern:
+    """コンパイル済みのエラーパターン"""
+
+    __slots__ = ('category', 'name', 'regex', 'severity', 'message', 'fix_template', 'literals')
+
+    def __init__(self, category, name, regex, severity='warning', message='エラー検出', fix_template=None):
+        self.category = category
+        self.name = name
+        self.regex = regex
+        self.severity = severity
+        self.message = message
+        self.fix_template = fix_template
+        self.literals = required_literals(regex)
+
+
+class PatternMatch:
+    """パターンに一致した箇所"""
+
+    __slots__ = ('pattern', 'line', 'col', 'text', 'code')
+
+    def __init__(self, pattern, line, col, text, code):
+        self.pattern = pattern
+        self.line = line
+        self.col = col
+        self.text = text
+        self.code = code
+
+    def to_dict(self):
+        return {
+            'category': self.pattern.category,
+            'name': self.pattern.name,
+            'severity': self.pattern.severity,
+            'message': self.pattern.message,
+            'line': self.line,
+            'col': self.col,
+            'text': self.text,
+            'code': self.code,
+        }
+
+
+class ScanResult:
+    """1ファイル分の検出結果"""
+
+    __slots__ = ('matches', 'timeouts', 'prefiltered')
+
+    def __init__(self):
+        self.matches = []
+        self.timeouts = []      # 時間予算を超えて打ち切ったパターン名
+        self.prefiltered = []   # リテラルが含まれないため正規表現を実行しなかったパターン名
+
+
+class _TimeLimit:
+    """
+    SIGALRMで正規表現の実行を中断する（メインスレッドのみ）
+    それ以外では行ごとに経過時間を確認する
+    """
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.deadline = None
+        self.hard = (seconds > 0 and hasattr(signal, 'setitimer')
+                     and threading.current_thread() is threading.main_thread())
+        self._previous = None
+        self._outer_timer = (0, 0)
+
+    @staticmethod
+    def _expired(signum, frame):
+        raise PatternTimeout()
+
+    def __enter__(self):
+        self.deadline = time.monotonic() + self.seconds if self.seconds > 0 else None
+        if self.hard:
+            self._previous = signal.signal(signal.SIGALRM, self._expired)
+            self._outer_timer = signal.setitimer(signal.ITIMER_REAL, self.seconds)
+        return self
+
+    def check(self):
+        if self.deadline is not None and time.monotonic() > self.deadline:
+            raise PatternTimeout()
+
+    def __exit__(self, *exc):
+        if self.hard:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous)
+            # 外側で設定されていたタイマーを戻す（経過分は差し引かない）
+            if self._outer_timer[0]:
+                signal.setitimer(signal.ITIMER_REAL, *self._outer_timer)
+        return False
+
+
+class PatternSet:
+    """
+    パターンファイル全体（カテゴリ→名前→定義）
+    不正なパターンは例外を握りつぶさずerrorsに記録する
+    """
+
+    _cache = {}
+
+    def __init__(self, data, path=None):
+        self.path = path
+        self.patterns = []
+        self.errors = []   # (カテゴリ, 名前, 理由)
+        for category, entries in data.items():
+            if not isinstance(entries, dict):
+                continue
+            for name, info in entries.items():
+                if not isinstance(info, dict) or 'pattern' not in info:
+                    continue
+                severity = info.get('severity', 'warning')
+                if severity not in SEVERITIES:
+                    self.errors.append((category, name, f"不明な重要度: {severity}"))
+                    continue
+                try:
+                    regex = re.compile(info['pattern'])
+                except re.error as e:
+                    self.errors.append((category, name, f"正規表現エラー: {e}"))
+                    continue
+                self.patterns.append(Pattern(category, name, regex, severity,
+                                             info.get('message', 'エラー検出'), info.get('fix_template')))
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATTERNS_FILE):
+        """パターンファイルを読み込む（更新時刻とサイズが同じ間はコンパイル済みのものを返す）"""
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        pattern_set = cls._cache.get(key[0])
+        if pattern_set is None or pattern_set[0] != key:
+            with open(path, 'r', encoding='utf-8') as f:
+                pattern_set = (key, cls(json.load(f), path))
+            cls._cache[key[0]] = pattern_set
+        return pattern_set[1]
+
+    def for_language(self, language):
+        """言語別パターンと共通パターン"""
+        return [pattern for pattern in self.patterns if pattern.category in (language, 'general')]
+
+    def scan(self, text, language, budget=DEFAULT_BUDGET):
+        """テキストを行単位で検査（1行につき各パターンの最初の一致を報告）"""
+        result = ScanResult()
+        lines = None
+        offsets = None
+        for pattern in self.for_language(language):
+            candidates = None
+            if pattern.literals is not None:
+                if not any(literal in text for literal in pattern.literals):
+                    result.prefiltered.append(pattern.name)
+                    continue
+                if offsets is None:
+                    offsets = _line_offsets(text)
+                candidates = _lines_containing(text, pattern.literals, offsets)
+            if lines is None:
+                lines = text.split('\n')
+            search = pattern.regex.search
+            found = []
+            try:
+                with _TimeLimit(budget) as limit:
+                    for index in candidates if candidates is not None else range(len(lines)):
+                        line = lines[index]
+                        m = search(line)
+                        if m:
+                            found.append(PatternMatch(pattern, index + 1, m.start(), m.group(), line.strip()))
+                        limit.check()
+            except PatternTimeout:
+                result.timeouts.append(pattern.name)
+            result.matches.extend(found)
+        result.matches.sort(key=lambda m: (m.line, m.col, SEVERITIES.index(m.pattern.severity)))
+        return result
+
+
+def _line_offsets(text):
+    offsets = [0]
+    find = text.find
+    pos = find('\n')
+    while pos != -1:
+        offsets.append(pos + 1)
+        pos = find('\n', pos + 1)
+    return offsets
+
+
+def _lines_containing(text, literals, offsets):
+    """いずれかのリテラルを含む行番号（0始まり、昇順）"""
+    indexes = set()
+    find = text.find
+    for literal in literals:
+        pos = find(literal)
+        while pos != -1:
+            index = bisect_right(offsets, pos) - 1
+            indexes.add(index)
+            # 同じ行の残りは調べる必要がない
+            next_line = offsets[index + 1] if index + 1 < len(offsets) else len(text)
+            pos = find(literal, max(pos + 1, next_line))
+    return sorted(indexes)
+
+
+def scan_file(path, language=None, patterns_file=DEFAULT_PATTERNS_FILE, budget=DEFAULT_BUDGET):
+    """ファイルを読み込んで検査"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    return PatternSet.load(patterns_file).scan(text, language or detect_language(path), budget)
+
+
+def print_matches(result, color=True):
+    colors = {'critical': '\033[0;31m', 'error': '\033[0;31m', 'warning': '\033[0;33m', 'info': '\033[0;36m'}
+    nc = '\033[0m'
+    for m in sorted(result.matches, key=lambda m: (SEVERITIES.index(m.pattern.severity), m.line, m.col)):
+        severity = m.pattern.severity
+        prefix = f"{colors[severity]}[{severity.upper()}]{nc}" if color else f"[{severity.upper()}]"
+        print(f"{prefix} Line {m.line}:{m.col + 1}: {m.pattern.message}")
+        print(f"  コード: {m.code[:80]}{'...' if len(m.code) > 80 else ''}")
+        print()
+    for name in result.timeouts:
+        print(f"⚠️  時間予算を超えたため検査を打ち切りました: {name}")
+
+    counts = {severity: 0 for severity in SEVERITIES}
+    for m in result.matches:
+        counts[m.pattern.severity] += 1
+    if result.matches:
+        print(f"\n検出された問題: Critical: {counts['critical']}, Error: {counts['error']}, "
+              f"Warning: {counts['warning']}, Info: {counts['info']}")
+    else:
+        print("\n問題は検出されませんでした。")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.validation.patterns',
+                                     description='エラーパターン検出')
+    parser.add_argument('files', nargs='*', help='検査するファイル')
+    parser.add_argument('-l', '--language', help='言語を指定（既定は拡張子から判定）')
+    parser.add_argument('-p', '--patterns', default=DEFAULT_PATTERNS_FILE, help='パターンファイル')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET,
+                        help=f'1ファイル・1パターンあたりの時間予算（秒、0で無制限、既定: {DEFAULT_BUDGET}）')
+    parser.add_argument('--check', action='store_true', help='パターンファイルを検査して終了')
+    parser.add_argument('--json', action='store_true', help='JSONで出力')
+    parser.add_argument('--no-color', action='store_true', help='色付けしない')
+    args = parser.parse_args(argv)
+
+    try:
+        pattern_set = PatternSet.load(args.patterns)
+    except (OSError, ValueError) as e:
+        print(f"❌ パターンファイルを読み込めません: {args.patterns}: {e}", file=sys.stderr)
+        return 2
+
+    if args.check:
+        for pattern in pattern_set.patterns:
+            literals = ', '.join(repr(literal) for literal in pattern.literals or ()) or '(なし)'
+            print(f"✅ {pattern.category}.{pattern.name}: 前処理リテラル {literals}")
+        for category, name, reason in pattern_set.errors:
+            print(f"❌ {category}.{name}: {reason}")
+        return 1 if pattern_set.errors else 0
+    if not args.files:
+        parser.error('ファイルを指定してください')
+
+    for category, name, reason in pattern_set.errors:
+        print(f"⚠️  パターン {category}.{name} を無視しました: {reason}", file=sys.stderr)
+
+    exit_code = 0
+    reports = []
+    color = not args.no_color and sys.stdout.isatty()
+    for path in args.files:
+        language = args.language or detect_language(path)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"❌ ファイル読み込みエラー: {path}: {e}", file=sys.stderr)
+            exit_code = 2
+            continue
+        result = pattern_set.scan(text, language, args.budget)
+        if any(m.pattern.severity in ('critical', 'error') for m in result.matches):
+            exit_code = max(exit_code, 1)
+        if args.json:
+            reports.append({'file': path, 'language': language,
+                            'matches': [m.to_dict() for m in result.matches],
+                            'timeouts': result.timeouts, 'prefiltered': result.prefiltered})
+        else:
+            print_matches(result, color)
+
+    if args.json:
+        json.dump(reports if len(reports) != 1 else reports[0], sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
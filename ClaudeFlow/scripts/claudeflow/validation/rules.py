@@ -0,0 +1,122 @@
+"""
+検証ルールの登録と実行
+ルールはDocumentを受け取りFindingを返すプラグイン関数
+"""
+
+SEVERITIES = ('critical', 'error', 'warning', 'info')
+SEVERITY_ORDER = {name: i for i, name in enumerate(SEVERITIES)}
+
+RULES = {}
+RULESETS = {}
+
+
+class Finding:
+    """ルールが検出した1件の問題"""
+
+    __slots__ = ('rule', 'severity', 'message', 'line', 'col')
+
+    def __init__(self, message, line=None, col=None, severity=None, rule=None):
+        self.rule = rule
+        self.severity = severity
+        self.message = message
+        self.line = line
+        self.col = col
+
+    @property
+    def is_error(self):
+        return self.severity in ('critical', 'error')
+
+    def to_dict(self):
+        return {
+            'rule': self.rule,
+            'severity': self.severity,
+            'message': self.message,
+            'line': self.line,
+            'col': self.col,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['message'], data.get('line'), data.get('col'),
+                   data.get('severity'), data.get('rule'))
+
+    def format(self):
+        location = f"Line {self.line}: " if self.line else ''
+        return f"[{self.severity.upper()}] {location}{self.message}"
+
+    def __repr__(self):
+        return f"Finding({self.rule!r}, {self.severity!r}, line={self.line}, {self.message!r})"
+
+
+class Rule:
+    """登録済みルール"""
+
+    def __init__(self, name, func, severity='error', languages=('html',), description='',
+                 needs_text=False, depends_on=()):
+        self.name = name
+        self.func = func
+        self.severity = severity
+        self.languages = tuple(languages)
+        self.description = description or (func.__doc__ or '').strip()
+        # 本文全体を参照するルールはストリーミングモードでは実行できない
+        self.needs_text = needs_text
+        # 結果に影響する外部ファイル（キャッシュのバージョンに含める）
+        self.depends_on = tuple(depends_on)
+
+    def applies_to(self, doc):
+        return doc.language in self.languages
+
+    def check(self, doc):
+        findings = []
+        for finding in self.func(doc) or ():
+            finding.rule = self.name
+            if finding.severity is None:
+                finding.severity = self.severity
+            findings.append(finding)
+        return findings
+
+
+def rule(name, severity='error', languages=('html',), description='', needs_text=False, depends_on=()):
+    """ルール登録デコレータ"""
+    if severity not in SEVERITY_ORDER:
+        raise ValueError(f"不明な重要度: {severity}")
+
+    def decorator(func):
+        RULES[name] = Rule(name, func, severity, languages, description, needs_text, depends_on)
+        return func
+    return decorator
+
+
+def register_ruleset(name, rules, extends=None):
+    """ルールセットを登録（extendsで既存セットを継承）"""
+    names = list(RULESETS[extends]) if extends else []
+    for rule_name in rules:
+        if rule_name not in names:
+            names.append(rule_name)
+    RULESETS[name] = names
+    return names
+
+
+def resolve_rules(ruleset):
+    """ルールセット名（カンマ区切り可）をRuleのリストに解決"""
+    _load_builtin_rulesets()
+    names = []
+    for part in ruleset.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if part in RULESETS:
+            candidates = RULESETS[part]
+        elif part in RULES:
+            candidates = [part]
+        else:
+            raise KeyError(f"不明なルールセット: {part}")
+        for rule_name in candidates:
+            if rule_name not in names:
+                names.append(rule_name)
+    return [RULES[rule_name] for rule_name in names]
+
+
+def _load_builtin_rulesets():
+    # 組み込みルールセットは登録時の副作用で読み込まれる
+    from . import rulesets  # noqa: F401
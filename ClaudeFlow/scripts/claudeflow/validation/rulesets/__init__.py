@@ -0,0 +1,6 @@
+"""
+組み込みルールセット
+インポート時に各モジュールのルールが登録される
+"""
+
+from . import core, fishing, implementation, pacman  # noqa: F401
@@ -0,0 +1,112 @@
+"""
+共通ルール（HTML構造・ID・JavaScript構文）
+"""
+
+import re
+
+from ..javascript import missing_semicolons
+from ..rules import Finding, register_ruleset, rule
+
+JS_LANGUAGES = ('html', 'javascript', 'typescript')
+BRACKET_NAMES = {'(': '丸括弧', ')': '丸括弧', '[': '角括弧', ']': '角括弧', '{': '波括弧', '}': '波括弧'}
+
+
+@rule('html.parse', severity='critical')
+def html_parse(doc):
+    """HTMLパーサーが例外で停止していないか"""
+    if doc.parse_error:
+        yield Finding(f"HTML解析エラー: {doc.parse_error}")
+
+
+@rule('html.doctype', severity='error')
+def html_doctype(doc):
+    """DOCTYPE宣言の有無"""
+    if not doc.doctype or doc.doctype.lower() != 'doctype html':
+        yield Finding("DOCTYPE宣言が見つかりません", line=1)
+
+
+@rule('html.skeleton', severity='error')
+def html_skeleton(doc):
+    """head/body/titleタグの有無"""
+    for tag in ('head', 'body', 'title'):
+        if not doc.tag_count.get(tag):
+            yield Finding(f"<{tag}>タグが見つかりません")
+
+
+@rule('html.tags', severity='error')
+def html_tags(doc):
+    """開始タグと終了タグの対応"""
+    for issue in doc.tag_issues:
+        if issue.kind == 'stray':
+            message = f"開始タグのない終了タグ: </{issue.tag}>"
+        elif issue.kind == 'mismatch':
+            message = f"タグの不一致: <{issue.expected}> (Line {issue.expected_line}) と </{issue.tag}>"
+        else:
+            message = f"未閉じタグ: <{issue.tag}>"
+        yield Finding(message, issue.line, issue.col)
+
+
+@rule('html.duplicate_ids', severity='error')
+def html_duplicate_ids(doc):
+    """ID属性の重複"""
+    for element_id, line, first_line in doc.duplicate_ids:
+        yield Finding(f"重複ID検出: '{element_id}' (最初の定義: Line {first_line})", line)
+
+
+@rule('js.brackets', severity='error', languages=JS_LANGUAGES)
+def js_brackets(doc):
+    """スクリプト内の括弧の対応"""
+    for block in doc.scripts:
+        if not block.is_javascript:
+            continue
+        for kind, char, line, col, open_char, open_line in block.bracket_issues:
+            name = BRACKET_NAMES[char]
+            if kind == 'stray':
+                message = f"対応する開き括弧がない閉じ括弧: {char}"
+            elif kind == 'mismatch':
+                message = (f"括弧の不一致: {open_char} (Line {block.file_line(open_line)}) と {char}")
+            else:
+                message = f"未閉じ{name}: {char}"
+            file_col = col + block.col if line == 1 else col
+            yield Finding(message, block.file_line(line), file_col)
+
+
+@rule('js.semicolons', severity='warning', languages=JS_LANGUAGES, needs_text=True)
+def js_semicolons(doc):
+    """セミコロンが欠けている可能性のある行"""
+    for block in doc.scripts:
+        if not block.is_javascript:
+            continue
+        for line in missing_semicolons(block.text):
+            yield Finding("セミコロンが欠けている可能性", block.file_line(line))
+
+
+@rule('js.eval', severity='warning', languages=JS_LANGUAGES, needs_text=True)
+def js_eval(doc):
+    """eval()の使用"""
+    for block in doc.scripts:
+        for match in re.finditer(r'\beval\s*\(', block.text):
+            line = block.text.count('\n', 0, match.start()) + 1
+            yield Finding("eval()の使用 - セキュリティリスクの可能性", block.file_line(line))
+
+
+@rule('js.inner_html', severity='warning', languages=JS_LANGUAGES, needs_text=True)
+def js_inner_html(doc):
+    """textContentを使わずinnerHTMLのみで更新していないか"""
+    js_code = doc.script_text
+    if 'innerHTML' in js_code and 'textContent' not in js_code:
+        yield Finding("innerHTMLのみ使用 - XSSリスクの可能性")
+
+
+@rule('js.dom_access', severity='info', languages=JS_LANGUAGES, needs_text=True)
+def js_dom_access(doc):
+    """getElementByIdの呼び出し回数"""
+    count = doc.script_text.count('getElementById')
+    if count > 50:
+        yield Finding(f"DOM要素への頻繁なアクセス ({count}回) - パフォーマンスに影響の可能性")
+
+
+register_ruleset('core', [
+    'html.parse', 'html.doctype', 'html.skeleton', 'html.tags', 'html.duplicate_ids',
+    'js.brackets', 'js.semicolons', 'js.eval', 'js.inner_html', 'js.dom_access',
+])
@@ -0,0 +1,46 @@
+"""
+魚釣りゲーム用ルール
+"""
+
+from ..rules import Finding, register_ruleset, rule
+
+CORE_IDS = ['gameContainer', 'pond', 'castBtn', 'modals', 'tutorial', 'fishingLine', 'hook', 'bite']
+GAME_FUNCTIONS = ['init', 'cast', 'reel', 'startBiting', 'showCatchResult', 'showCollection', 'saveData', 'loadData']
+
+
+def missing_elements(doc):
+    """存在しない必須要素のID"""
+    return [element_id for element_id in CORE_IDS if not doc.has_id(element_id)]
+
+
+def missing_functions(doc):
+    """定義・呼び出しが見つからないゲーム関数"""
+    js_code = doc.script_text
+    return [func for func in GAME_FUNCTIONS if f'{func}(' not in js_code and f'{func}:' not in js_code]
+
+
+@rule('fishing.core_elements', severity='error')
+def core_elements(doc):
+    """必須要素（ID）の存在"""
+    for element_id in missing_elements(doc):
+        yield Finding(f"必須要素が不足: #{element_id}")
+
+
+@rule('fishing.game_functions', severity='warning', needs_text=True)
+def game_functions(doc):
+    """ゲーム関数の存在"""
+    for func in missing_functions(doc):
+        yield Finding(f"関数が見つかりません: {func}()")
+
+
+@rule('fishing.compat', severity='info', needs_text=True)
+def compat(doc):
+    """ブラウザ互換性・ストレージ利用の注意点"""
+    if 'localStorage' in doc.text:
+        yield Finding("localStorageを使用 - プライベートブラウジングで動作しない可能性")
+    if 'AudioContext' in doc.text and 'webkitAudioContext' not in doc.text:
+        yield Finding("AudioContext - Safari旧バージョンで動作しない可能性", severity='warning')
+
+
+register_ruleset('fishing', ['fishing.core_elements', 'fishing.game_functions', 'fishing.compat'],
+                 extends='core')
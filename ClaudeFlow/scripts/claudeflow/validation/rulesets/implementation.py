@@ -0,0 +1,120 @@
+"""
+実装ディレクトリ検証用ルール（common-functions.sh の validate_implementation 相当）
+構文・ランタイムエラーパターン・セキュリティ・ベストプラクティスを検査する
+"""
+
+import re
+import shutil
+import subprocess
+
+from ..patterns import DEFAULT_PATTERNS_FILE, PatternSet
+from ..rules import Finding, register_ruleset, rule
+
+CODE_LANGUAGES = ('html', 'javascript', 'typescript', 'python')
+
+_CREDENTIALS = re.compile(r'''(password|secret|key|token)\s*=\s*["'][^"']+["']''')
+_SQL_CONCAT = re.compile(r'query.*\+')
+_INNER_HTML_ASSIGN = re.compile(r'innerHTML\s*=')
+_ANY_TYPE = re.compile(r':\s*any')
+
+
+def _matching_lines(text, pattern):
+    for line_num, line in enumerate(text.split('\n'), 1):
+        if pattern.search(line):
+            yield line_num
+
+
+@rule('syntax.python', severity='error', languages=('python',), needs_text=True)
+def python_syntax(doc):
+    """Pythonの構文（py_compile相当、プロセスを起動しない）"""
+    try:
+        compile(doc.text, doc.path, 'exec', dont_inherit=True)
+    except SyntaxError as e:
+        yield Finding(f"Python構文エラー: {e.msg}", e.lineno, e.offset)
+    except ValueError as e:
+        yield Finding(f"Python構文エラー: {e}")
+
+
+@rule('syntax.javascript', severity='error', languages=('javascript',))
+def javascript_syntax(doc):
+    """node --check による構文チェック（nodeがない場合とJSXは省略）"""
+    node = shutil.which('node')
+    if not node or doc.path.endswith('.jsx'):
+        return
+    try:
+        result = subprocess.run([node, '--check', doc.path], capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        yield Finding(f"構文チェックを実行できません: {e}", severity='warning')
+        return
+    if result.returncode != 0:
+        detail = next((line for line in result.stderr.splitlines() if 'Error' in line), '')
+        yield Finding(f"JavaScript構文エラー{': ' + detail if detail else ''}")
+
+
+@rule('syntax.html', severity='error', needs_text=True)
+def html_syntax(doc):
+    """DOCTYPE宣言と終了タグの有無"""
+    if '<!DOCTYPE' not in doc.text or '</html>' not in doc.text:
+        yield Finding("HTML構造エラー: DOCTYPEまたは終了タグが見つかりません")
+
+
+@rule('runtime.patterns', severity='warning', languages=CODE_LANGUAGES, needs_text=True,
+      depends_on=(DEFAULT_PATTERNS_FILE,))
+def runtime_patterns(doc):
+    """error-patterns.json のランタイムエラーパターン（エラー数には数えない）"""
+    try:
+        pattern_set = PatternSet.load()
+    except (OSError, ValueError) as e:
+        yield Finding(f"エラーパターンファイルを読み込めません: {e}", severity='info')
+        return
+    result = pattern_set.scan(doc.text, doc.language)
+    for match in result.matches:
+        severity = match.pattern.severity
+        # 従来どおり指摘のみとし、エラー・クリティカルも警告として報告する
+        yield Finding(f"[{severity}] {match.pattern.message} ({match.pattern.name})", match.line,
+                      match.col, severity='info' if severity == 'info' else 'warning')
+    for name in result.timeouts:
+        yield Finding(f"時間予算を超えたためパターン {name} の検査を打ち切りました", severity='info')
+
+
+@rule('security.credentials', severity='critical', languages=CODE_LANGUAGES, needs_text=True)
+def hardcoded_credentials(doc):
+    """ハードコードされた認証情報"""
+    for line_num in _matching_lines(doc.text, _CREDENTIALS):
+        yield Finding("ハードコードされた認証情報が検出されました", line_num)
+
+
+@rule('security.sql_injection', severity='error', languages=CODE_LANGUAGES, needs_text=True)
+def sql_injection(doc):
+    """文字列連結で組み立てたクエリ"""
+    for line_num in _matching_lines(doc.text, _SQL_CONCAT):
+        yield Finding("SQLインジェクションの可能性があります", line_num)
+
+
+@rule('security.xss', severity='error', languages=CODE_LANGUAGES, needs_text=True)
+def inner_html_assignment(doc):
+    """innerHTMLへの代入"""
+    for line_num in _matching_lines(doc.text, _INNER_HTML_ASSIGN):
+        yield Finding("XSSの可能性があります", line_num)
+
+
+@rule('practices.console_log', severity='info', languages=CODE_LANGUAGES, needs_text=True)
+def console_log(doc):
+    """console.logの使用"""
+    if 'console.log' in doc.text:
+        yield Finding("console.logが使用されています - 本番環境では削除してください")
+
+
+@rule('practices.any_type', severity='warning', languages=('typescript',), needs_text=True)
+def any_type(doc):
+    """any型の使用（TypeScript）"""
+    if _ANY_TYPE.search(doc.text):
+        yield Finding("any型が使用されています - 具体的な型を指定してください")
+
+
+register_ruleset('implementation', [
+    'syntax.python', 'syntax.javascript', 'syntax.html', 'js.brackets',
+    'runtime.patterns',
+    'security.credentials', 'security.sql_injection', 'security.xss',
+    'practices.console_log', 'practices.any_type',
+])
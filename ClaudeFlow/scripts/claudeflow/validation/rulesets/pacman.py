@@ -0,0 +1,106 @@
+"""
+パックマンゲーム用ルール
+"""
+
+import re
+
+from ..rules import Finding, register_ruleset, rule
+
+REQUIRED_IDS = [
+    ('gameCanvas', 'Canvas要素'),
+    ('score', 'スコア表示'),
+    ('lives', 'ライフ表示'),
+    ('menu', 'メニュー'),
+    ('gameOver', 'ゲームオーバー画面'),
+]
+
+REQUIRED_IDENTIFIERS = [
+    'canvas', 'ctx', 'gameState', 'score', 'level', 'lives',
+    'pacman', 'ghosts', 'maze', 'startGame', 'gameLoop', 'updatePacman'
+]
+
+REQUIRED_FUNCTIONS = [
+    'initAudio', 'createSounds', 'playSound', 'drawMaze', 'drawPacman',
+    'drawGhosts', 'canMove', 'getNextPos', 'updatePacman', 'updateGhosts',
+    'checkCollisions', 'resetPositions', 'gameLoop', 'updateUI', 'initLevel',
+    'startGame', 'gameOver', 'resetGame', 'showMenu'
+]
+
+GAME_FEATURES = {
+    'パックマン描画': ['drawPacman'],
+    'ゴースト描画': ['drawGhosts'],
+    '迷路描画': ['drawMaze'],
+    'キーボード操作': ['keydown'],
+    'タッチ操作': ['touchstart'],
+    'スコア管理': ['score', 'updateUI'],
+    'ライフ管理': ['lives'],
+    'レベル進行': ['level'],
+    'サウンド': ['AudioContext'],
+    'ローカルストレージ': ['localStorage'],
+    '衝突判定': ['checkCollisions'],
+    'パワーモード': ['powerMode'],
+}
+
+
+@rule('html.charset', severity='error')
+def charset(doc):
+    """文字エンコーディング指定"""
+    if not doc.charset:
+        yield Finding("文字エンコーディング指定がありません")
+
+
+@rule('pacman.canvas', severity='error')
+def canvas(doc):
+    """canvasタグの存在"""
+    if not doc.tag_count.get('canvas'):
+        yield Finding("canvasタグがありません")
+
+
+@rule('pacman.required_ids', severity='warning')
+def required_ids(doc):
+    """ゲーム画面の要素"""
+    for element_id, description in REQUIRED_IDS:
+        if not doc.has_id(element_id):
+            yield Finding(f"{description} (#{element_id}) が見つかりません")
+
+
+@rule('pacman.required_identifiers', severity='error', needs_text=True)
+def required_identifiers(doc):
+    """重要な変数/関数の存在"""
+    js_code = doc.script_text
+    for name in REQUIRED_IDENTIFIERS:
+        if name not in js_code:
+            yield Finding(f'必須の変数/関数 "{name}" が見つかりません')
+
+
+def missing_functions(doc):
+    """宣言が見つからない必須関数"""
+    js_code = doc.script_text
+    return [func for func in REQUIRED_FUNCTIONS
+            if not re.search(rf'\bfunction\s+{func}\s*\(|\b{func}\s*=\s*(function|\()', js_code)]
+
+
+@rule('pacman.required_functions', severity='warning', needs_text=True)
+def required_functions(doc):
+    """関数宣言の存在"""
+    for func in missing_functions(doc):
+        yield Finding(f"関数が見つかりません: {func}")
+
+
+def missing_features(doc):
+    """キーワードが見つからないゲーム機能名"""
+    return [name for name, keywords in GAME_FEATURES.items()
+            if not all(keyword in doc.text for keyword in keywords)]
+
+
+@rule('pacman.features', severity='warning', needs_text=True)
+def features(doc):
+    """ゲーム機能の実装"""
+    for name in missing_features(doc):
+        yield Finding(f"機能が見つかりません: {name}")
+
+
+register_ruleset('pacman', [
+    'html.charset', 'pacman.canvas', 'pacman.required_ids', 'pacman.required_identifiers',
+    'pacman.required_functions', 'pacman.features',
+], extends='core')
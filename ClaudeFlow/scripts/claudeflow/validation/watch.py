@@ -0,0 +1,415 @@
+"""
+ファイル変更の監視による差分検証
+起動時に全ファイルを検証してDocumentとルールごとの結果をメモリに保持し、
+保存されたファイルだけを再解析する。ルールが依存する外部ファイル（error-patterns.json など）が
+変わった場合は、保持しているDocumentに対してそのルールだけを再実行する。
+結果は前回との差分（新規・修正済み・変化なし）として出力する。
+
+変更の検出はLinuxではinotify（ctypes経由、追加パッケージ不要）、それ以外はstatのポーリング
+
+使用方法:
+    python3 -m claudeflow.validation.watch <dir> [--ruleset implementation] [--jsonl deltas.jsonl]
+                                           [--poll] [--interval 0.5] [--once]
+"""
+
+import argparse
+import collections
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import time
+
+from .batch import DEFAULT_EXTENSIONS, SKIP_DIRS, find_files
+from .cli import NC, SEVERITY_COLORS
+from .document import load_document
+from .engine import select_rules, summarize
+from .rules import SEVERITY_ORDER, resolve_rules
+
+DEFAULT_INTERVAL = 0.5
+# 保存直後の連続したイベント（一時ファイル作成→リネームなど）をまとめる時間
+DEFAULT_DEBOUNCE = 0.02
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _finding_key(finding):
+    # 行番号は前後の編集でずれるため、同じ問題かどうかはルール・重要度・メッセージで判定する
+    return finding.rule, finding.severity, finding.message
+
+
+def diff_findings(old, new):
+    """2つのFindingリストを比較し (新規, 修正済み, 変化なしの件数) を返す"""
+    remaining = collections.Counter(_finding_key(finding) for finding in old)
+    added = []
+    for finding in new:
+        key = _finding_key(finding)
+        if remaining[key]:
+            remaining[key] -= 1
+        else:
+            added.append(finding)
+    current = collections.Counter(_finding_key(finding) for finding in new)
+    fixed = []
+    for finding in old:
+        key = _finding_key(finding)
+        if current[key]:
+            current[key] -= 1
+        else:
+            fixed.append(finding)
+    return added, fixed, len(new) - len(added)
+
+
+def _sort_findings(findings):
+    return sorted(findings, key=lambda f: (f.line or 0, SEVERITY_ORDER[f.severity]))
+
+
+class _FileState:
+    """1ファイル分の保持データ（Documentとルールごとの検出結果）"""
+
+    __slots__ = ('stamp', 'doc', 'rules', 'results', 'error')
+
+    def __init__(self, stamp):
+        self.stamp = stamp
+        self.doc = None
+        self.rules = []
+        self.results = {}
+        self.error = None
+
+    def findings(self):
+        return _sort_findings(finding for rule in self.rules for finding in self.results.get(rule.name, ()))
+
+
+class WatchSession:
+    """ディレクトリ内の検証結果を保持し、変更されたファイル・ルールだけを再検証する"""
+
+    def __init__(self, root, ruleset='implementation', extensions=DEFAULT_EXTENSIONS):
+        self.root = root
+        self.ruleset = ruleset
+        self.extensions = tuple(extensions)
+        self.files = {}
+        # 依存ファイル → それを参照するルール名
+        self.dependencies = collections.defaultdict(set)
+        for rule in resolve_rules(ruleset):
+            for path in rule.depends_on:
+                self.dependencies[os.path.abspath(path)].add(rule.name)
+        self.dependency_stamps = {path: _stamp(path) for path in self.dependencies}
+
+    def is_target(self, rel_path):
+        parts = rel_path.split(os.sep)
+        if any(part in SKIP_DIRS or part.startswith('.') for part in parts[:-1]):
+            return False
+        return rel_path.endswith(self.extensions)
+
+    def _load(self, rel_path, stamp):
+        state = _FileState(stamp)
+        try:
+            state.doc = load_document(os.path.join(self.root, rel_path))
+        except (OSError, UnicodeDecodeError) as e:
+            state.error = str(e)
+            return state
+        state.rules = select_rules(state.doc, self.ruleset)[0]
+        for rule in state.rules:
+            state.results[rule.name] = rule.check(state.doc)
+        return state
+
+    def scan(self):
+        """全ファイルを検証して保持（起動時・inotifyのイベント取りこぼし時）"""
+        previous = self.files
+        self.files = {}
+        for rel_path in find_files(self.root, self.extensions):
+            self.files[rel_path] = self._load(rel_path, _stamp(os.path.join(self.root, rel_path)))
+        return self._deltas(previous, self.files)
+
+    def _deltas(self, previous, current):
+        deltas = []
+        for rel_path in sorted(set(previous) | set(current)):
+            old = previous.get(rel_path)
+            new = current.get(rel_path)
+            delta = self._delta(rel_path, old, new)
+            if delta['status'] != 'modified' or delta['new'] or delta['fixed']:
+                deltas.append(delta)
+        return deltas
+
+    def _delta(self, rel_path, old, new, rules=None):
+        old_findings = old.findings() if old else []
+        new_findings = new.findings() if new else []
+        added, fixed, unchanged = diff_findings(old_findings, new_findings)
+        delta = {
+            'file': rel_path,
+            'status': 'deleted' if new is None else ('added' if old is None else 'modified'),
+            'new': [finding.to_dict() for finding in added],
+            'fixed': [finding.to_dict() for finding in fixed],
+            'unchanged': unchanged,
+            'summary': summarize(new_findings),
+        }
+        if rules is not None:
+            delta['rules'] = sorted(rules)
+        if new is not None and new.error:
+            delta['error'] = new.error
+        return delta
+
+    def refresh(self, paths):
+        """
+        変更された可能性のあるパス（絶対パスまたはrootからの相対パス）を再検証し差分のリストを返す
+        内容（更新時刻・サイズ）が変わっていないファイルは何もしない
+        """
+        deltas = []
+        for path in sorted(set(paths)):
+            rel_path = os.path.relpath(path, self.root) if os.path.isabs(path) else path
+            if rel_path.startswith(os.pardir) or not self.is_target(rel_path):
+                continue
+            stamp = _stamp(os.path.join(self.root, rel_path))
+            old = self.files.get(rel_path)
+            if stamp is None or not os.path.isfile(os.path.join(self.root, rel_path)):
+                if old is not None:
+                    del self.files[rel_path]
+                    deltas.append(self._delta(rel_path, old, None))
+                continue
+            if old is not None and old.stamp == stamp:
+                continue
+            new = self._load(rel_path, stamp)
+            self.files[rel_path] = new
+            deltas.append(self._delta(rel_path, old, new))
+        return deltas + self.refresh_dependencies()
+
+    def refresh_dependencies(self):
+        """依存ファイルが変わったルールだけを、保持しているDocumentに対して再実行する"""
+        changed_rules = set()
+        for path, rule_names in self.dependencies.items():
+            stamp = _stamp(path)
+            if stamp != self.dependency_stamps[path]:
+                self.dependency_stamps[path] = stamp
+                changed_rules |= rule_names
+        if not changed_rules:
+            return []
+        deltas = []
+        for rel_path, state in sorted(self.files.items()):
+            rules = [rule for rule in state.rules if rule.name in changed_rules]
+            if not rules:
+                continue
+            old = _FileState(state.stamp)
+            old.rules = state.rules
+            old.results = dict(state.results)
+            for rule in rules:
+                state.results[rule.name] = rule.check(state.doc)
+            delta = self._delta(rel_path, old, state, rules=[rule.name for rule in rules])
+            if delta['new'] or delta['fixed']:
+                deltas.append(delta)
+        return deltas
+
+    def totals(self):
+        summary = summarize(finding for state in self.files.values() for finding in state.findings())
+        return {'files': len(self.files), 'summary': summary}
+
+
+class InotifyWatcher:
+    """inotifyでディレクトリツリーの変更を受け取る（Linuxのみ）"""
+
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _EVENT = struct.Struct('iIII')
+
+    name = 'inotify'
+
+    def __init__(self, root):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        if not hasattr(libc, 'inotify_init1'):
+            raise OSError('inotifyが利用できません')
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1に失敗しました')
+        self.directories = {}
+        self.overflowed = False
+        self.add_tree(root)
+
+    def add_tree(self, top):
+        """ディレクトリ以下を監視対象に加え、その中の既存ファイルを返す"""
+        found = []
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.')]
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dirpath), self.MASK)
+            if wd >= 0:
+                self.directories[wd] = dirpath
+            found.extend(os.path.join(dirpath, name) for name in filenames)
+        return found
+
+    def wait(self, timeout, debounce=DEFAULT_DEBOUNCE):
+        """変更されたパスの集合を返す（timeout秒以内に変更がなければ空集合）"""
+        changed = set()
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return changed
+        while True:
+            changed |= self._read()
+            if not select.select([self.fd], [], [], debounce)[0]:
+                return changed
+
+    def _read(self):
+        changed = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+            directory = self.directories.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO) and os.path.basename(path) not in SKIP_DIRS:
+                    changed.update(self.add_tree(path))
+                continue
+            if not mask & self.IN_CREATE:
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingWatcher:
+    """更新時刻とサイズを定期的に比較する（inotifyが使えない環境向け）"""
+
+    name = 'poll'
+
+    def __init__(self, root, extensions=DEFAULT_EXTENSIONS):
+        self.root = root
+        self.extensions = tuple(extensions)
+        self.overflowed = False
+        self.stamps = self._snapshot()
+
+    def _snapshot(self):
+        stamps = {}
+        for rel_path in find_files(self.root, self.extensions):
+            path = os.path.join(self.root, rel_path)
+            stamps[path] = _stamp(path)
+        return stamps
+
+    def wait(self, timeout, debounce=DEFAULT_DEBOUNCE):
+        time.sleep(timeout)
+        current = self._snapshot()
+        changed = {path for path in set(current) | set(self.stamps)
+                   if current.get(path) != self.stamps.get(path)}
+        self.stamps = current
+        return changed
+
+    def close(self):
+        pass
+
+
+def make_watcher(root, extensions=DEFAULT_EXTENSIONS, poll=False):
+    """inotifyが使えればInotifyWatcher、使えなければPollingWatcherを返す"""
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(root)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, extensions)
+
+
+def print_delta(delta, elapsed_ms=None, color=True, file=None):
+    file = file or sys.stdout
+    label = {'added': '追加', 'modified': '変更', 'deleted': '削除'}[delta['status']]
+    timing = f" ({elapsed_ms:.1f}ms)" if elapsed_ms is not None else ''
+    rules = f" [ルール再実行: {', '.join(delta['rules'])}]" if delta.get('rules') else ''
+    print(f"🔄 {delta['file']}: {label}{rules}{timing}", file=file)
+    if delta.get('error'):
+        print(f"  ❌ 読み込みエラー: {delta['error']}", file=file)
+    for mark, key in (('＋ 新規', 'new'), ('✓ 修正済み', 'fixed')):
+        for finding in delta[key]:
+            severity = finding['severity']
+            prefix = f"{SEVERITY_COLORS[severity]}[{severity.upper()}]{NC}" if color else f"[{severity.upper()}]"
+            location = f"Line {finding['line']}: " if finding['line'] else ''
+            print(f"  {mark} {prefix} {location}{finding['message']} ({finding['rule']})", file=file)
+    print(f"  変化なし: {delta['unchanged']}件", file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python3 -m claudeflow.validation.watch',
+                                     description='ファイルの変更を監視して差分を検証')
+    parser.add_argument('root', help='監視するディレクトリ')
+    parser.add_argument('-r', '--ruleset', default='implementation', help='ルールセット名（カンマ区切り可）')
+    parser.add_argument('--jsonl', help='差分を1行1件のJSONで追記するファイル')
+    parser.add_argument('--poll', action='store_true', help='inotifyを使わずにポーリングする')
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f'ポーリング・依存ファイル確認の間隔（秒、既定: {DEFAULT_INTERVAL}）')
+    parser.add_argument('--once', action='store_true', help='初回の検証結果を出力して終了')
+    parser.add_argument('--no-color', action='store_true', help='色を付けない')
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.root):
+        parser.error(f'ディレクトリが見つかりません: {args.root}')
+    try:
+        session = WatchSession(args.root, args.ruleset)
+    except KeyError as e:
+        parser.error(e.args[0])
+    color = not args.no_color
+    jsonl = open(args.jsonl, 'a', encoding='utf-8') if args.jsonl else None
+
+    def emit(deltas, elapsed_ms=None):
+        for delta in deltas:
+            print_delta(delta, elapsed_ms, color)
+            if jsonl:
+                jsonl.write(json.dumps({**delta, 'elapsed_ms': elapsed_ms}, ensure_ascii=False) + '\n')
+        if jsonl:
+            jsonl.flush()
+        sys.stdout.flush()
+
+    watcher = None if args.once else make_watcher(args.root, session.extensions, args.poll)
+    start = time.perf_counter()
+    session.scan()
+    totals = session.totals()
+    summary = totals['summary']
+    print(f"監視開始: {args.root} ({totals['files']}ファイル, {(time.perf_counter() - start) * 1000:.0f}ms"
+          f"{', ' + watcher.name if watcher else ''}) "
+          f"Critical: {summary['critical']}, Error: {summary['error']}, "
+          f"Warning: {summary['warning']}, Info: {summary['info']}")
+    sys.stdout.flush()
+    if watcher is None:
+        return 1 if summary['critical'] + summary['error'] else 0
+
+    try:
+        while True:
+            changed = watcher.wait(args.interval)
+            start = time.perf_counter()
+            if watcher.overflowed:
+                # イベントを取りこぼした場合は全体を検証し直す
+                watcher.overflowed = False
+                deltas = session.scan()
+            else:
+                deltas = session.refresh(changed)
+            if deltas:
+                emit(deltas, round((time.perf_counter() - start) * 1000, 1))
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        watcher.close()
+        if jsonl:
+            jsonl.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -68,6 +68,10 @@ show_help() {
     echo "  --force, -f       確認なしで削除を実行"
     echo "  --backup, -b      削除前にバックアップを作成"
     echo "  --minimal-backup  node_modulesを除外した最小バックアップ"
+    echo "  --list-backups    バックアップの一覧を表示"
+    echo "  --restore-backup ID  バックアップを復元（ID は latest も可）"
+    echo "  --diff-backups ID [ID]  バックアップ間の差分（ID が1つなら現在の内容と比較）"
+    echo "  --gc-backups [N]  新しいN件を残して古いバックアップと不要なデータを削除"
     echo "  --help, -h        このヘルプを表示"
     echo ""
     echo "削除対象（ClaudeFlowフォルダ内）:"
@@ -86,172 +90,104 @@ show_help() {
     done
 }
 
+# バックアップ先（内容アドレス方式のスナップショット）
+SNAPSHOT_DIR="${CLAUDEFLOW_SNAPSHOT_DIR:-$PROJECT_ROOT/.snapshots}"
+
+claudeflow_snapshot() {
+    claudeflow_call snapshot --store "$SNAPSHOT_DIR" "$@"
+}
+
 # バックアップ作成
+# 同じ内容のファイルは一度しか保存しないので、変更のない木のバックアップはマニフェストの分しか増えない
 create_backup() {
     local backup_type="${1:-full}"
-    local backup_dir="$PROJECT_ROOT/backup_$(date +%Y%m%d_%H%M%S)"
-    local parent_dir="$(dirname "$PROJECT_ROOT")"
+    local -a paths=()
+    local -a excludes=()
     
-    log_info "バックアップを作成中: $backup_dir (タイプ: $backup_type)"
-    mkdir -p "$backup_dir"
-    mkdir -p "$backup_dir/parent"
+    log_info "バックアップを作成中: $SNAPSHOT_DIR (タイプ: $backup_type)"
     
-    # ClaudeFlowフォルダ内のファイル
-    for target in "${CLEANUP_TARGETS[@]}"; do
-        local target_path="$PROJECT_ROOT/$target"
-        if [ -e "$target_path" ]; then
-            cp -r "$target_path" "$backup_dir/" 2>/dev/null || true
-            log_info "バックアップ: $target -> $backup_dir/"
-        fi
-    done
+    # 削除対象の計画と同じパス（*.log も展開済み）
+    [ -n "$CLEANUP_PLAN" ] || build_cleanup_plan
+    while IFS=$'\t' read -r _ _ path; do
+        paths+=("$path")
+    done < <(cleanup_plan_paths)
     
-    # 親フォルダレベルのファイル
-    for target in "${LARGE_CLEANUP_TARGETS[@]}"; do
-        local target_path="$PROJECT_ROOT/$target"
-        if [ -e "$target_path" ]; then
-            # *.logパターンの処理
-            if [[ "$target" == *"*.log"* ]]; then
-                find "$parent_dir" -name "*.log" -maxdepth 1 2>/dev/null | while read -r logfile; do
-                    cp "$logfile" "$backup_dir/parent/" 2>/dev/null || true
-                done
-            else
-                local basename=$(basename "$target")
-                if [ "$backup_type" = "minimal" ]; then
-                    # node_modulesを除外してバックアップ
-                    log_info "最小バックアップ: $target (node_modules除外)"
-                    rsync -av --exclude='node_modules' --exclude='package-lock.json' "$target_path" "$backup_dir/parent/" 2>/dev/null || {
-                        # rsyncがない場合はtarを使用
-                        tar --exclude='node_modules' --exclude='package-lock.json' -cf - -C "$(dirname "$target_path")" "$(basename "$target_path")" 2>/dev/null | tar -xf - -C "$backup_dir/parent/" 2>/dev/null || {
-                            # tarでも失敗する場合は手動でコピー（node_modules以外）
-                            mkdir -p "$backup_dir/parent/$(basename "$target_path")"
-                            find "$target_path" -type f ! -path "*/node_modules/*" ! -name "package-lock.json" 2>/dev/null | while read -r file; do
-                                local rel_path="${file#$target_path/}"
-                                local dest_dir="$backup_dir/parent/$(basename "$target_path")/$(dirname "$rel_path")"
-                                mkdir -p "$dest_dir" 2>/dev/null
-                                cp "$file" "$dest_dir/" 2>/dev/null || true
-                            done
-                        }
-                    }
-                else
-                    # 完全バックアップ
-                    cp -r "$target_path" "$backup_dir/parent/" 2>/dev/null || true
-                    log_info "バックアップ: $target -> $backup_dir/parent/"
-                fi
-            fi
-        fi
-    done
+    if [ ${#paths[@]} -eq 0 ]; then
+        log_info "バックアップするファイルがありません"
+        return 0
+    fi
     
-    # バックアップサイズを表示
-    local backup_size=$(du -sh "$backup_dir" 2>/dev/null | cut -f1 || echo "不明")
-    log_success "バックアップ完了: $backup_dir (サイズ: $backup_size)"
-}
-
-# 削除対象のサイズを計算
-calculate_cleanup_size() {
-    local total_size=0
-    local total_files=0
-    local parent_dir="$(dirname "$PROJECT_ROOT")"
+    if [ "$backup_type" = "minimal" ]; then
+        # node_modulesを除外してバックアップ
+        log_info "最小バックアップ: node_modules, package-lock.json を除外"
+        excludes=(--exclude node_modules --exclude package-lock.json)
+    fi
     
-    # ClaudeFlowフォルダ内のファイル
-    for target in "${CLEANUP_TARGETS[@]}"; do
-        local target_path="$PROJECT_ROOT/$target"
-        if [ -e "$target_path" ]; then
-            if [ -d "$target_path" ]; then
-                local dir_size=$(du -sb "$target_path" 2>/dev/null | cut -f1 || echo "0")
-                local file_count=$(find "$target_path" -type f 2>/dev/null | wc -l || echo "0")
-                total_size=$((total_size + dir_size))
-                total_files=$((total_files + file_count))
-            elif [ -f "$target_path" ]; then
-                local file_size=$(stat -c%s "$target_path" 2>/dev/null || echo "0")
-                total_size=$((total_size + file_size))
-                total_files=$((total_files + 1))
-            fi
-        fi
-    done
+    local result
+    if ! result=$(claudeflow_snapshot create --base "$PROJECT_ROOT" --label "$backup_type" "${excludes[@]}" "${paths[@]}"); then
+        log_error "バックアップに失敗しました"
+        return 1
+    fi
     
-    # 親フォルダレベルのファイル
-    for target in "${LARGE_CLEANUP_TARGETS[@]}"; do
-        local target_path="$PROJECT_ROOT/$target"
-        if [ -e "$target_path" ]; then
-            if [[ "$target" == *"*.log"* ]]; then
-                # *.logファイルのサイズを計算
-                find "$parent_dir" -name "*.log" -maxdepth 1 2>/dev/null | while read -r logfile; do
-                    local file_size=$(stat -c%s "$logfile" 2>/dev/null || echo "0")
-                    total_size=$((total_size + file_size))
-                    total_files=$((total_files + 1))
-                done
-            elif [ -d "$target_path" ]; then
-                local dir_size=$(du -sb "$target_path" 2>/dev/null | cut -f1 || echo "0")
-                local file_count=$(find "$target_path" -type f 2>/dev/null | wc -l || echo "0")
-                total_size=$((total_size + dir_size))
-                total_files=$((total_files + file_count))
-            elif [ -f "$target_path" ]; then
-                local file_size=$(stat -c%s "$target_path" 2>/dev/null || echo "0")
-                total_size=$((total_size + file_size))
-                total_files=$((total_files + 1))
-            fi
-        fi
+    local snapshot_id=$(echo "$result" | cut -f1)
+    log_success "バックアップ完了: $snapshot_id ($(echo "$result" | cut -f2-))"
+    log_info "復元するには: $0 --restore-backup $snapshot_id"
+}
+
+# バックアップの一覧
+list_backups() {
+    local snapshots=$(claudeflow_snapshot list)
+    if [ -z "$snapshots" ]; then
+        log_info "バックアップはありません: $SNAPSHOT_DIR"
+        return 0
+    fi
+    echo -e "${CYAN}=== バックアップ一覧 ($SNAPSHOT_DIR) ===${NC}"
+    echo "$snapshots"
+}
+
+# バックアップの復元（ID は latest も可）
+restore_backup() {
+    local snapshot_id="$1"
+    log_info "バックアップを復元中: $snapshot_id"
+    local restored
+    if ! restored=$(claudeflow_snapshot restore "$snapshot_id" --base "$PROJECT_ROOT"); then
+        log_error "復元に失敗しました: $snapshot_id"
+        return 1
+    fi
+    log_success "復元完了: $restored ファイル"
+}
+
+# 削除対象の計画（全対象を1回だけ走査した結果。表示・バックアップ・削除で共有する）
+CLEANUP_PLAN=""
+
+build_cleanup_plan() {
+    if [ -z "$CLEANUP_PLAN" ]; then
+        CLEANUP_PLAN=$(mktemp "${TMPDIR:-/tmp}/claudeflow_cleanup_plan.XXXXXX")
+        trap 'rm -f "$CLEANUP_PLAN"' EXIT
+    fi
+    local -a protect_args=()
+    for protected in "${PROTECTED_DIRS[@]}"; do
+        protect_args+=(--protect "$protected")
     done
-    
-    echo "$total_files:$total_size"
+    claudeflow_call cleanplan plan --base "$PROJECT_ROOT" "${protect_args[@]}" --output "$CLEANUP_PLAN" \
+        "${CLEANUP_TARGETS[@]}" "${LARGE_CLEANUP_TARGETS[@]}"
+}
+
+# 削除するパス（区分\t対象\tパス、パスは PROJECT_ROOT からの相対パス）
+cleanup_plan_paths() {
+    claudeflow_call cleanplan paths "$CLEANUP_PLAN"
+}
+
+# 削除対象のサイズを計算（ファイル数:バイト数）
+calculate_cleanup_size() {
+    [ -n "$CLEANUP_PLAN" ] || build_cleanup_plan
+    claudeflow_call cleanplan total "$CLEANUP_PLAN"
 }
 
 # 削除対象を表示
 show_cleanup_targets() {
-    echo -e "\n${CYAN}=== 削除対象の確認 ===${NC}"
-    
-    local found_targets=()
-    local total_info=$(calculate_cleanup_size)
-    local total_files=$(echo "$total_info" | cut -d: -f1)
-    local total_size=$(echo "$total_info" | cut -d: -f2)
-    local parent_dir="$(dirname "$PROJECT_ROOT")"
-    
-    echo -e "${BLUE}ClaudeFlowフォルダ内:${NC}"
-    for target in "${CLEANUP_TARGETS[@]}"; do
-        local target_path="$PROJECT_ROOT/$target"
-        if [ -e "$target_path" ]; then
-            found_targets+=("$target")
-            if [ -d "$target_path" ]; then
-                local file_count=$(find "$target_path" -type f 2>/dev/null | wc -l || echo "0")
-                local dir_size=$(du -sh "$target_path" 2>/dev/null | cut -f1 || echo "不明")
-                echo -e "${YELLOW}  📁 $target/${NC} ($file_count ファイル, $dir_size)"
-            elif [ -f "$target_path" ]; then
-                local file_size=$(du -sh "$target_path" 2>/dev/null | cut -f1 || echo "不明")
-                echo -e "${YELLOW}  📄 $target${NC} ($file_size)"
-            fi
-        fi
-    done
-    
-    echo -e "\n${BLUE}親フォルダレベル:${NC}"
-    for target in "${LARGE_CLEANUP_TARGETS[@]}"; do
-        local target_path="$PROJECT_ROOT/$target"
-        if [ -e "$target_path" ]; then
-            found_targets+=("$target")
-            if [[ "$target" == *"*.log"* ]]; then
-                local log_count=$(find "$parent_dir" -name "*.log" -maxdepth 1 2>/dev/null | wc -l || echo "0")
-                if [ "$log_count" -gt 0 ]; then
-                    echo -e "${YELLOW}  📄 *.log ファイル${NC} ($log_count ファイル)"
-                fi
-            elif [ -d "$target_path" ]; then
-                local file_count=$(find "$target_path" -type f 2>/dev/null | wc -l || echo "0")
-                local dir_size=$(du -sh "$target_path" 2>/dev/null | cut -f1 || echo "不明")
-                echo -e "${YELLOW}  📁 $(basename "$target")/${NC} ($file_count ファイル, $dir_size)"
-            elif [ -f "$target_path" ]; then
-                local file_size=$(du -sh "$target_path" 2>/dev/null | cut -f1 || echo "不明")
-                echo -e "${YELLOW}  📄 $(basename "$target")${NC} ($file_size)"
-            fi
-        fi
-    done
-    
-    if [ ${#found_targets[@]} -eq 0 ]; then
-        echo -e "${GREEN}削除対象のファイル・フォルダは見つかりませんでした${NC}"
-        echo -e "${GREEN}プロジェクトは既にクリーンな状態です${NC}"
-        return 1
-    else
-        echo -e "\n${MAGENTA}合計: $total_files ファイル, $(numfmt --to=iec --suffix=B $total_size)${NC}"
-        echo -e "${CYAN}========================${NC}"
-        return 0
-    fi
+    build_cleanup_plan || return 1
+    claudeflow_call cleanplan show "$CLEANUP_PLAN"
 }
 
 # 安全性チェック
@@ -284,47 +220,28 @@ perform_cleanup() {
     
     local deleted_count=0
     local error_count=0
+    local current_section=""
     
-    echo -e "${BLUE}ClaudeFlowフォルダ内のクリーンアップ:${NC}"
-    for target in "${CLEANUP_TARGETS[@]}"; do
-        local target_path="$PROJECT_ROOT/$target"
-        if [ -e "$target_path" ]; then
-            echo -n "  削除中: $target ... "
-            if rm -rf "$target_path" 2>/dev/null; then
-                echo -e "${GREEN}完了${NC}"
-                deleted_count=$((deleted_count + 1))
+    # 計画に載ったパスだけを削除する（表示した内容と削除する内容が一致する）
+    while IFS=$'\t' read -r section target path; do
+        if [ "$section" != "$current_section" ]; then
+            [ -z "$current_section" ] || echo ""
+            if [ "$section" = "local" ]; then
+                echo -e "${BLUE}ClaudeFlowフォルダ内のクリーンアップ:${NC}"
             else
-                echo -e "${RED}失敗${NC}"
-                error_count=$((error_count + 1))
+                echo -e "${BLUE}親フォルダレベルのクリーンアップ:${NC}"
             fi
+            current_section="$section"
         fi
-    done
-    
-    echo -e "\n${BLUE}親フォルダレベルのクリーンアップ:${NC}"
-    for target in "${LARGE_CLEANUP_TARGETS[@]}"; do
-        local target_path="$PROJECT_ROOT/$target"
-        if [ -e "$target_path" ]; then
-            if [[ "$target" == *"*.log"* ]]; then
-                echo -n "  削除中: *.log ファイル ... "
-                local log_deleted=0
-                find "$parent_dir" -name "*.log" -maxdepth 1 2>/dev/null | while read -r logfile; do
-                    rm -f "$logfile" 2>/dev/null && log_deleted=$((log_deleted + 1))
-                done
-                echo -e "${GREEN}完了${NC}"
-                deleted_count=$((deleted_count + 1))
-            else
-                local basename=$(basename "$target")
-                echo -n "  削除中: $basename ... "
-                if rm -rf "$target_path" 2>/dev/null; then
-                    echo -e "${GREEN}完了${NC}"
-                    deleted_count=$((deleted_count + 1))
-                else
-                    echo -e "${RED}失敗${NC}"
-                    error_count=$((error_count + 1))
-                fi
-            fi
+        echo -n "  削除中: $path ... "
+        if rm -rf "${PROJECT_ROOT:?}/$path" 2>/dev/null; then
+            echo -e "${GREEN}完了${NC}"
+            deleted_count=$((deleted_count + 1))
+        else
+            echo -e "${RED}失敗${NC}"
+            error_count=$((error_count + 1))
         fi
-    done
+    done < <(cleanup_plan_paths)
     
     # 一時ファイルも削除
     echo -e "\n${BLUE}一時ファイルのクリーンアップ:${NC}"
@@ -375,6 +292,27 @@ main() {
                 backup_type="minimal"
                 shift
                 ;;
+            --list-backups)
+                list_backups
+                exit 0
+                ;;
+            --restore-backup)
+                restore_backup "${2:-latest}"
+                exit $?
+                ;;
+            --diff-backups)
+                shift
+                claudeflow_snapshot diff "$@"
+                exit $?
+                ;;
+            --gc-backups)
+                local gc_args=()
+                if [[ "${2:-}" =~ ^[0-9]+$ ]]; then
+                    gc_args=(--keep "$2")
+                fi
+                claudeflow_snapshot gc "${gc_args[@]}"
+                exit $?
+                ;;
             --help|-h)
                 show_help
                 exit 0
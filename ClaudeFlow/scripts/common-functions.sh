@@ -24,6 +24,89 @@ NC='\033[0m' # No Color
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 PROJECT_ROOT="$(dirname "$SCRIPT_DIR")"
 PROMPTS_DIR="$PROJECT_ROOT/prompts"
+CLAUDEFLOW_PY_DIR="$SCRIPT_DIR"
+
+# Pythonユーティリティ（scripts/claudeflow パッケージ）の実行
+# 使用例: claudeflow_py validation index.html --ruleset core
+claudeflow_py() {
+    local module="$1"
+    shift
+    PYTHONPATH="$CLAUDEFLOW_PY_DIR${PYTHONPATH:+:$PYTHONPATH}" python3 -m "claudeflow.$module" "$@"
+}
+
+# 常駐サーバー（claudeflow.daemon）の設定
+# 検証・JSONクエリの小さな呼び出しでは、毎回python3を起動する代わりにUnixソケット経由で実行する
+CLAUDEFLOW_DAEMON="${CLAUDEFLOW_DAEMON:-true}"
+CLAUDEFLOW_DAEMON_IDLE="${CLAUDEFLOW_DAEMON_IDLE:-600}"
+CLAUDEFLOW_DAEMON_SOCKET="${CLAUDEFLOW_DAEMON_SOCKET:-${TMPDIR:-/tmp}/claudeflow-$UID/$(printf '%s' "$CLAUDEFLOW_PY_DIR" | cksum | cut -d' ' -f1).sock}"
+
+# ソケットのクライアント（perlは起動が速いため、python3の起動時間をまるごと省ける）
+# サーバーに接続できない・終了コード255（ソース更新などで実行できない）の場合は通常のpython3で実行する
+CLAUDEFLOW_DAEMON_CLIENT='
+my ($path, $forward, $py_dir, @args) = @ARGV;
+my $stdin;
+if ($forward) { local $/; binmode STDIN; $stdin = <STDIN>; $stdin = "" unless defined $stdin; }
+# モジュールの読み込み（IO::Socket・Socket）は起動を遅くするため、AF_UNIX=1, SOCK_STREAM=1 を直接使う
+my $addr = $^O =~ /bsd|darwin/ ? pack("CCa104", 0, 1, $path) : pack("Sa108", 1, $path);
+my $sock;
+if (socket($sock, 1, 1, 0) && connect($sock, $addr)) {
+    binmode $sock;
+    my $cwd = $ENV{PWD} // ".";
+    my $request = length($cwd) . "\n" . $cwd . scalar(@args) . "\n";
+    $request .= length($_) . "\n" . $_ for @args;
+    $request .= defined $stdin ? length($stdin) . "\n" . $stdin : "-1\n";
+    while (length $request) {
+        my $sent = syswrite($sock, $request) or last;
+        substr($request, 0, $sent) = "";
+    }
+    shutdown($sock, 1);
+    my $status = <$sock>;
+    if (defined $status && $status =~ /^\d+$/ && $status != 255) {
+        for my $fh (\*STDOUT, \*STDERR) {
+            my $len = <$sock>;
+            next unless defined $len && $len > 0;
+            read($sock, my $buf, $len);
+            binmode $fh;
+            print $fh $buf;
+        }
+        exit $status;
+    }
+}
+$ENV{PYTHONPATH} = length($ENV{PYTHONPATH} // "") ? "$py_dir:$ENV{PYTHONPATH}" : $py_dir;
+my $module = shift @args;
+exec "python3", "-m", "claudeflow.$module", @args unless defined $stdin;
+open(my $pipe, "|-", "python3", "-m", "claudeflow.$module", @args) or exit 127;
+print $pipe $stdin;
+close $pipe;
+exit($? >> 8);
+'
+
+# 常駐サーバーをバックグラウンドで起動（起動済みなら何もしない）
+claudeflow_daemon_start() {
+    [ -S "$CLAUDEFLOW_DAEMON_SOCKET" ] && return 0
+    mkdir -p "$(dirname "$CLAUDEFLOW_DAEMON_SOCKET")" && chmod 700 "$(dirname "$CLAUDEFLOW_DAEMON_SOCKET")"
+    # python3 を直接起動する（関数経由だと待機する bash が呼び出し元のパイプを開いたまま残る）
+    (PYTHONPATH="$CLAUDEFLOW_PY_DIR${PYTHONPATH:+:$PYTHONPATH}" python3 -m claudeflow.daemon \
+        --socket "$CLAUDEFLOW_DAEMON_SOCKET" serve --idle "$CLAUDEFLOW_DAEMON_IDLE" </dev/null >/dev/null 2>&1 &)
+}
+
+# claudeflow_py と同じ引数で、常駐サーバー経由で実行する（-i で標準入力を渡す）
+# 使用例: claudeflow_call validation.patterns app.js --no-color
+#         echo "$feature" | claudeflow_call -i jsonquery -r .id
+claudeflow_call() {
+    local forward_stdin=""
+    if [ "$1" = "-i" ]; then
+        forward_stdin=1
+        shift
+    fi
+    if [ "$CLAUDEFLOW_DAEMON" != "true" ] || ! command -v perl &> /dev/null; then
+        claudeflow_py "$@"
+        return
+    fi
+    # 初回はサーバーを起動し、その呼び出し自体は通常のpython3で実行される
+    claudeflow_daemon_start
+    perl -e "$CLAUDEFLOW_DAEMON_CLIENT" "$CLAUDEFLOW_DAEMON_SOCKET" "$forward_stdin" "$CLAUDEFLOW_PY_DIR" "$@"
+}
 
 # ClaudeFlow設定のデフォルト値
 CLAUDEFLOW_REQ_LEVEL="${CLAUDEFLOW_REQ_LEVEL:-B}"
@@ -41,10 +124,16 @@ CLAUDEFLOW_WARNING_THRESHOLD="${CLAUDEFLOW_WARNING_THRESHOLD:-80}"  # 80%で警
 # ログファイル設定
 LOG_DIR="$PROJECT_ROOT/logs"
 LOG_FILE=""
-PROGRESS_CSV=""
+# 構造化イベントログ（claudeflow.eventlog、view-logs.sh の絞り込みに使う）
+EVENT_LOG_DIR="${CLAUDEFLOW_EVENT_LOG:-$LOG_DIR/events}"
+# 実装進捗の記録（claudeflow.progress、SQLite）。PROGRESS_PROJECT は再開時に完了済みの機能を探す単位
+PROGRESS_DB="${CLAUDEFLOW_PROGRESS_DB:-$LOG_DIR/implementation_progress.db}"
+PROGRESS_PROJECT=""
 
 # 結果ディレクトリ設定
 RESULTS_DIR="$PROJECT_ROOT/results"
+# アプリ名→フォルダ名の変換キャッシュ（claudeflow.appname。空なら ~/.cache/claudeflow/appname.json）
+APPNAME_CACHE="${CLAUDEFLOW_APPNAME_CACHE:-}"
 
 # プロンプトローダー関数
 load_prompt() {
@@ -59,89 +148,186 @@ load_prompt() {
     cat "$prompt_file"
 }
 
-# プロンプトに変数を埋め込む関数
+# プロンプトに変数を埋め込む関数（claudeflow.templates）
+# 使い方: apply_prompt_vars "プロンプト" [変数名 値]...
+# テンプレートを1回だけ解析し、すべての ${変数名} を1回で置き換える（値の中の ${...} は置き換えない）
 apply_prompt_vars() {
     local prompt_content="$1"
     shift
     
-    # 引数を2つずつ処理（変数名と値のペア）
+    local options=()
     while [ $# -gt 0 ]; do
-        local var_name="$1"
-        local var_value="$2"
+        options+=(--var "$1=$2")
+        shift 2
+    done
+    printf '%s\n' "$prompt_content" | claudeflow_call -i templates render - "${options[@]}"
+}
+
+# プロンプトファイルを読み込んで変数を埋め込む（load_prompt と apply_prompt_vars を1回で行う）
+# 使い方: render_prompt プロンプト名 [変数名 値]...
+render_prompt() {
+    local prompt_file="$PROMPTS_DIR/$1.md"
+    shift
+    
+    if [ ! -f "$prompt_file" ]; then
+        echo -e "${RED}プロンプトファイルが見つかりません: $prompt_file${NC}" >&2
+        return 1
+    fi
+    local options=()
+    while [ $# -gt 0 ]; do
+        options+=(--var "$1=$2")
         shift 2
-        
-        # 変数値のエスケープ処理
-        # バックスラッシュ、アンパサンド、スラッシュ、改行をエスケープ
-        local escaped_value=$(echo "$var_value" | sed 's/\\/\\\\/g; s/&/\\&/g; s/\//\\\//g')
-        
-        # 変数を置換
-        prompt_content=$(echo "$prompt_content" | sed "s/\${$var_name}/$escaped_value/g")
     done
+    claudeflow_call templates render "$prompt_file" "${options[@]}"
+}
+
+# 全機能のプロンプトを1回の呼び出しで展開し、機能ごとのファイルに書き出す
+# 使い方: render_prompts_batch プロンプト名 features.json 出力ディレクトリ ファイル名 [変数名 値]...
+# ファイル名には ${feature_id} などの機能の変数を使える（例: 'implement_${feature_id}.md'）
+render_prompts_batch() {
+    local prompt_file="$PROMPTS_DIR/$1.md"
+    local features_json="$2"
+    local output_dir="$3"
+    local name="$4"
+    shift 4
     
-    echo "$prompt_content"
+    local options=()
+    while [ $# -gt 0 ]; do
+        options+=(--var "$1=$2")
+        shift 2
+    done
+    claudeflow_call templates batch "$prompt_file" "$features_json" --output-dir "$output_dir" \
+        --name "$name" "${options[@]}" > /dev/null
 }
 
 # トークン使用量計測関数
+# 日本語を含むテキストの近似トークン数（claudeflow.tokens、入力は標準入力で渡す）
 estimate_tokens() {
-    local text="$1"
-    # 簡易的なトークン推定（1トークン ≈ 4文字）
-    # 日本語は1文字で1トークン程度と仮定
-    local char_count=$(echo -n "$text" | wc -m)
-    local token_estimate=$((char_count / 3))
-    echo $token_estimate
+    printf '%s' "$1" | claudeflow_call -i tokens count
+}
+
+# パターンライブラリから機能に関係するパターンだけを選ぶ（claudeflow.patternindex、BM25）
+# 使い方: select_patterns パターンファイル 問い合わせ（機能名・仕様・コードなど）
+# ライブラリ全体が予算（CLAUDEFLOW_PATTERN_BUDGET トークン）に収まるうちは全体を返す。索引は追記分だけ更新される
+select_patterns() {
+    local patterns_file="$1"
+    local query="$2"
+    
+    [ -f "$patterns_file" ] || return 0
+    printf '%s' "$query" | claudeflow_call -i patternindex select "$patterns_file" \
+        --top-k "${CLAUDEFLOW_PATTERN_TOP_K:-5}" --budget "${CLAUDEFLOW_PATTERN_BUDGET:-2000}"
 }
 
 # トークン使用量を記録
-TOKEN_LOG_FILE="${CONTEXT_DIR:-/tmp}/.token_usage.log"
+# 台帳はJSON Linesの追記専用ファイルで、同時に実行された記録もロックで排他される
+TOKEN_LOG_FILE="${CONTEXT_DIR:-/tmp}/.token_usage.jsonl"
 TOTAL_TOKENS=0
 
-# トークン使用量を初期化
+# トークン使用量を初期化（新しい実行IDを発行し、以降の累計はこの実行の分だけ数える）
 init_token_tracking() {
-    echo "0" > "$TOKEN_LOG_FILE"
+    export CLAUDEFLOW_RUN_ID="$(date +%Y%m%d%H%M%S)-$$"
     TOTAL_TOKENS=0
 }
 
 # トークン使用量を追加
+# 使い方: add_token_usage "入力" "出力" [フェーズ名]
+# 機能IDは並列実装のワーカーでは CLAUDEFLOW_FEATURE_ID、順次実装では CURRENT_FEATURE_ID
+# 常駐サーバーの環境変数は起動時のものなので、単価は呼び出しのたびに引数で渡す
 add_token_usage() {
     local input_text="$1"
     local output_text="$2"
+    local phase_name="${3:-}"
     
-    local input_tokens=$(estimate_tokens "$input_text")
-    local output_tokens=$(estimate_tokens "$output_text")
-    local total=$((input_tokens + output_tokens))
-    
-    # ファイルから現在の合計を読み込む
-    if [ -f "$TOKEN_LOG_FILE" ]; then
-        TOTAL_TOKENS=$(cat "$TOKEN_LOG_FILE")
-    fi
-    
-    TOTAL_TOKENS=$((TOTAL_TOKENS + total))
-    echo $TOTAL_TOKENS > "$TOKEN_LOG_FILE"
+    # 入力と出力をNUL区切りで1回だけ渡し、今回の使用量を返す
+    printf '%s\0%s' "$input_text" "$output_text" | claudeflow_call -i tokens record --pair \
+        --ledger "$TOKEN_LOG_FILE" --run "${CLAUDEFLOW_RUN_ID:-}" --phase "$phase_name" \
+        --feature "${CLAUDEFLOW_FEATURE_ID:-${CURRENT_FEATURE_ID:-}}" \
+        --price-input "${CLAUDEFLOW_TOKEN_PRICE_INPUT:-3}" --price-output "${CLAUDEFLOW_TOKEN_PRICE_OUTPUT:-15}"
+}
+
+# 出力ファイルのトークン使用量を追加（応答をシェル変数に読み込まずに数える）
+# 使い方: add_token_usage_file "入力" 出力ファイル [フェーズ名] [cached]
+# 4番目に cached を渡すと応答キャッシュから返した呼び出しとしてコスト0で記録する
+add_token_usage_file() {
+    local input_text="$1"
+    local output_file="$2"
+    local phase_name="${3:-}"
+    local cached_flag=""
+    [ "$4" = "cached" ] && cached_flag="--cached"
     
-    # 返り値として今回の使用量を返す
-    echo $total
+    printf '%s' "$input_text" | claudeflow_call -i tokens record --input - --output "$output_file" \
+        --ledger "$TOKEN_LOG_FILE" --run "${CLAUDEFLOW_RUN_ID:-}" --phase "$phase_name" \
+        --feature "${CLAUDEFLOW_FEATURE_ID:-${CURRENT_FEATURE_ID:-}}" \
+        --price-input "${CLAUDEFLOW_TOKEN_PRICE_INPUT:-3}" --price-output "${CLAUDEFLOW_TOKEN_PRICE_OUTPUT:-15}" $cached_flag
 }
 
 # トークン使用量を表示
 show_token_usage() {
-    local phase_tokens=$1
+    local phase_tokens=${1:-0}
     local phase_name="$2"
+    local cost_estimate
     
-    if [ -f "$TOKEN_LOG_FILE" ]; then
-        TOTAL_TOKENS=$(cat "$TOKEN_LOG_FILE")
-    fi
+    # 台帳からこの実行の累計とコスト（入力・出力を別単価で計算）を集計
+    read -r TOTAL_TOKENS cost_estimate < <(claudeflow_call tokens total --ledger "$TOKEN_LOG_FILE" \
+        --run "${CLAUDEFLOW_RUN_ID:-}" 2>/dev/null || echo "0 0.0000")
     
     echo -e "${MAGENTA}トークン使用量:${NC}"
     echo -e "  今回の$phase_name: $(printf "%'d" $phase_tokens) トークン"
     echo -e "  累計: $(printf "%'d" $TOTAL_TOKENS) トークン"
-    
-    # コスト推定（Claude-3.5-Sonnetの価格を仮定）
-    # Input: $3 per 1M tokens, Output: $15 per 1M tokens
-    # 平均して$9/1Mトークンと仮定
-    local cost_estimate=$(awk "BEGIN {printf \"%.4f\", $TOTAL_TOKENS * 0.000009}")
     echo -e "  推定コスト: \$$cost_estimate USD"
 }
 
+# フェーズ・機能ごとのトークン使用量の集計を表示
+# 使い方: show_token_report [phase|feature|run]
+show_token_report() {
+    claudeflow_call tokens report --ledger "$TOKEN_LOG_FILE" --by "${1:-phase}" --run "${CLAUDEFLOW_RUN_ID:-}"
+}
+
+# Claudeに許可するツール
+CLAUDE_ALLOWED_TOOLS='Bash Write Edit MultiEdit Read LS Glob Grep'
+
+# 応答キャッシュ（claudeflow.prompt_cache）
+# 同じプロンプト・許可ツール・テンプレートの応答は保存済みのものを返す
+# CLAUDEFLOW_PROMPT_CACHE_BYPASS=true で保存済みの応答を使わずに呼び出す（応答は保存し直す）
+# 常駐サーバーの環境変数は起動時のものなので、保存先と有効期間は引数で渡す
+PROMPT_CACHE_OPTIONS=(--ttl "${CLAUDEFLOW_PROMPT_CACHE_TTL:-604800}")
+[ -n "$CLAUDEFLOW_PROMPT_CACHE" ] && PROMPT_CACHE_OPTIONS+=(--dir "$CLAUDEFLOW_PROMPT_CACHE")
+prompt_cache_get() {
+    local prompt="$1"
+    local output_file="$2"
+    
+    [ "${CLAUDEFLOW_PROMPT_CACHE_BYPASS:-false}" = "true" ] && return 1
+    printf '%s' "$prompt" | claudeflow_call -i prompt_cache "${PROMPT_CACHE_OPTIONS[@]}" get --output "$output_file" \
+        --tools "$CLAUDE_ALLOWED_TOOLS" --template-dir "$PROMPTS_DIR" 2>/dev/null
+}
+
+prompt_cache_put() {
+    local prompt="$1"
+    local response_file="$2"
+    
+    [ -s "$response_file" ] || return 0
+    printf '%s' "$prompt" | claudeflow_call -i prompt_cache "${PROMPT_CACHE_OPTIONS[@]}" put --response "$response_file" \
+        --tools "$CLAUDE_ALLOWED_TOOLS" --template-dir "$PROMPTS_DIR" 2>/dev/null || true
+}
+
+# プロンプトを実行して応答を出力ファイルに保存する（キャッシュにあればClaudeを呼ばない）
+# 使い方: claude_cached "プロンプト" 出力ファイル
+# CLAUDE_CACHE_HIT にキャッシュから返したかどうか（true/false）が入る
+claude_cached() {
+    local prompt="$1"
+    local output_file="$2"
+    
+    CLAUDE_CACHE_HIT=false
+    if prompt_cache_get "$prompt" "$output_file"; then
+        CLAUDE_CACHE_HIT=true
+        return 0
+    fi
+    echo "$prompt" | LANG=C.UTF-8 LC_ALL=C.UTF-8 claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$output_file"
+    local status=$?
+    [ $status -eq 0 ] && prompt_cache_put "$prompt" "$output_file"
+    return $status
+}
+
 # Claude実行ラッパー関数
 run_claude_with_tracking() {
     local input="$1"
@@ -151,7 +337,7 @@ run_claude_with_tracking() {
     # 実行（権限確認をスキップ、UTF-8で保存）
     # WSL環境での文字化けを防ぐための処理
     temp_output=$(mktemp)
-    echo "$input" | LANG=C.UTF-8 LC_ALL=C.UTF-8 claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$temp_output"
+    claude_cached "$input" "$temp_output"
     
     # バイナリデータと制御文字を除去してUTF-8に変換
     cat "$temp_output" | \
@@ -167,9 +353,10 @@ run_claude_with_tracking() {
     # 一時ファイルを削除
     rm -f "$temp_output"
     
-    # 出力を読み込んでトークンを計測（null byteを除去）
-    local output=$(cat "$output_file" 2>/dev/null | tr -d '\0' || echo "")
-    local tokens_used=$(add_token_usage "$input" "$output")
+    # 出力ファイルを直接数えてトークンを計測（キャッシュから返した場合はコスト0）
+    local cached=""
+    [ "$CLAUDE_CACHE_HIT" = "true" ] && cached="cached"
+    local tokens_used=$(add_token_usage_file "$input" "$output_file" "$phase_name" "$cached")
     
     # トークン使用量を表示
     show_token_usage $tokens_used "$phase_name"
@@ -272,7 +459,8 @@ init_log_file() {
     local log_name="${1:-execution}"
     mkdir -p "$LOG_DIR"
     LOG_FILE="$LOG_DIR/${log_name}_$(date +%Y%m%d_%H%M%S).log"
-    PROGRESS_CSV="$LOG_DIR/implementation_progress.csv"
+    # イベントログの実行ID（トークン計測と共通）
+    export CLAUDEFLOW_RUN_ID="${CLAUDEFLOW_RUN_ID:-$(date +%Y%m%d%H%M%S)-$$}"
     
     # ログファイルヘッダー
     cat > "$LOG_FILE" << EOF
@@ -285,15 +473,27 @@ init_log_file() {
 
 EOF
     
-    # 進捗CSVヘッダー（存在しない場合のみ）
-    if [ ! -f "$PROGRESS_CSV" ]; then
-        echo "機能ID,機能名,開始時刻,終了時刻,状態,エラーメッセージ" > "$PROGRESS_CSV"
+    # 旧形式の進捗CSVがあれば最初の1回だけ取り込む
+    if [ ! -f "$PROGRESS_DB" ] && [ -f "$LOG_DIR/implementation_progress.csv" ]; then
+        claudeflow_call progress --db "$PROGRESS_DB" import-csv "$LOG_DIR/implementation_progress.csv" > /dev/null || true
     fi
     
     # ログファイルパスを表示
     echo -e "${CYAN}ログファイル: $LOG_FILE${NC}"
 }
 
+# イベントログに1件追記（機能IDは CURRENT_FEATURE_ID から取る）
+# 使い方: log_event 種類 状態 ステップ名 [append のオプション]...
+log_event() {
+    local kind="$1"
+    local status="$2"
+    local step_name="$3"
+    shift 3
+    
+    claudeflow_call eventlog --dir "$EVENT_LOG_DIR" append --kind "$kind" --status "$status" --step "$step_name" \
+        --run "${CLAUDEFLOW_RUN_ID:-}" --feature "${CURRENT_FEATURE_ID:-}" "$@" 2>/dev/null || true
+}
+
 # ステップログ記録
 log_step() {
     local step_name="$1"
@@ -302,6 +502,7 @@ log_step() {
     
     if [ -n "$LOG_FILE" ]; then
         echo "[$(date +%Y-%m-%d\ %H:%M:%S)] [$status] $step_name $message" >> "$LOG_FILE"
+        log_event step "$status" "$step_name" --message "$message"
     fi
 }
 
@@ -311,15 +512,22 @@ log_error_detail() {
     local error_msg="$2"
     
     if [ -n "$LOG_FILE" ]; then
-        echo "[$(date +%Y-%m-%d\ %H:%M:%S)] [ERROR] $context" >> "$LOG_FILE"
-        echo "  詳細: $error_msg" >> "$LOG_FILE"
-        echo "  スタックトレース:" >> "$LOG_FILE"
         # Bashのスタックトレースを記録
+        local stack=""
         local frame=0
-        while caller $frame >> "$LOG_FILE" 2>/dev/null; do
+        local line
+        while line=$(caller $frame 2>/dev/null); do
+            stack+="$line"$'\n'
             ((frame++))
         done
-        echo "" >> "$LOG_FILE"
+        {
+            echo "[$(date +%Y-%m-%d\ %H:%M:%S)] [ERROR] $context"
+            echo "  詳細: $error_msg"
+            echo "  スタックトレース:"
+            printf '%s' "$stack"
+            echo ""
+        } >> "$LOG_FILE"
+        log_event error ERROR "$context" --detail "$error_msg" --stack "$stack"
     fi
 }
 
@@ -337,10 +545,19 @@ log_claude_call() {
             echo "  エラー内容: $(head -n 5 "$response_file")" >> "$LOG_FILE"
         fi
         echo "" >> "$LOG_FILE"
+        log_event claude "$status" "$prompt_summary" --response "$response_file"
     fi
 }
 
-# 進捗記録
+# 進捗記録の開始（状態は RUNNING。中断した機能は RUNNING のまま残る）
+# 使い方: log_progress_start 機能ID 機能名 [フェーズ]
+log_progress_start() {
+    claudeflow_call progress --db "$PROGRESS_DB" start --feature "$1" --name "$2" --phase "${3:-feature}" \
+        --run "${CLAUDEFLOW_RUN_ID:-}" --project "$PROGRESS_PROJECT" 2>/dev/null || true
+}
+
+# 進捗記録（log_progress_start の行を終了時刻・状態で更新する。開始の記録がなければ追加する）
+# 使い方: log_progress 機能ID 機能名 開始時刻 終了時刻 状態 [エラーメッセージ] [フェーズ] [生成した行数]
 log_progress() {
     local feature_id="$1"
     local feature_name="$2"
@@ -348,10 +565,13 @@ log_progress() {
     local end_time="$4"
     local status="$5"
     local error_msg="${6:-}"
+    local phase="${7:-feature}"
+    local lines="${8:-}"
     
-    if [ -n "$PROGRESS_CSV" ]; then
-        echo "$feature_id,\"$feature_name\",$start_time,$end_time,$status,\"$error_msg\"" >> "$PROGRESS_CSV"
-    fi
+    claudeflow_call progress --db "$PROGRESS_DB" finish --feature "$feature_id" --name "$feature_name" \
+        --phase "$phase" --status "$status" --error "$error_msg" ${start_time:+--start "$start_time"} \
+        ${end_time:+--end "$end_time"} ${lines:+--lines "$lines"} --run "${CLAUDEFLOW_RUN_ID:-}" \
+        --project "$PROGRESS_PROJECT" 2>/dev/null || true
 }
 
 # プログレスバー表示
@@ -619,7 +839,7 @@ run_claude_auto_auth() {
         
         # 権限確認をスキップして実行
         temp_output=$(mktemp)
-        echo "$input" | LANG=C.UTF-8 LC_ALL=C.UTF-8 claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$temp_output"
+        claude_cached "$input" "$temp_output"
         
         # バイナリデータと制御文字を除去してUTF-8に変換
         cat "$temp_output" | \
@@ -635,6 +855,11 @@ run_claude_auto_auth() {
         # 一時ファイルを削除
         rm -f "$temp_output"
         
+        # トークン使用量を台帳に記録
+        local cached=""
+        [ "$CLAUDE_CACHE_HIT" = "true" ] && cached="cached"
+        add_token_usage_file "$input" "$output_file" "$phase_name" "$cached" > /dev/null
+        
         # 自動生成された認証情報をチェック・記録
         detect_and_log_credentials "$output_file" "$phase_name"
         
@@ -740,17 +965,19 @@ extract_project_name() {
     local fallback_name="${2:-app}"
     local app_name="${3:-}"
     
-    # アプリ名が明示的に渡された場合は、それをケバブケースに変換して使用
+    # アプリ名が明示的に渡された場合は、それをケバブケースに変換して使用（claudeflow.appname）
+    # キャッシュ済みの名前・辞書だけで訳せる名前はすぐに返し、それ以外はClaudeの翻訳を試してから
+    # かな・漢字のローマ字読みに頼る。Claudeの翻訳結果はキャッシュして次回から使う
     if [ -n "$app_name" ]; then
-        # 日本語を英語に変換するための包括的マッピング
-        local english_name="$app_name"
+        local kebab_name
+        kebab_name=$(claudeflow_call appname ${APPNAME_CACHE:+--cache "$APPNAME_CACHE"} slug --strict "$app_name" 2>/dev/null)
         
-        # Claudeを使った高度な変換を試みる（日本語が含まれている場合）
-        if [ "${CLAUDEFLOW_USE_CLAUDE_TRANSLATION:-true}" = "true" ] && echo "$app_name" | grep -q '[ぁ-んァ-ヶー一-龠]'; then
-            if command -v claude >/dev/null 2>&1; then
-                log_info "Claudeを使用して日本語アプリ名を変換中..."
-                
-                local claude_prompt="以下の日本語のアプリ名を適切な英語のプロジェクトフォルダ名に変換してください。
+        # Claudeを使った高度な変換を試みる（辞書で訳せない日本語が含まれている場合）
+        if [ -z "$kebab_name" ] && [ "${CLAUDEFLOW_USE_CLAUDE_TRANSLATION:-true}" = "true" ] && \
+            command -v claude >/dev/null 2>&1; then
+            log_info "Claudeを使用して日本語アプリ名を変換中..."
+            
+            local claude_prompt="以下の日本語のアプリ名を適切な英語のプロジェクトフォルダ名に変換してください。
 
 アプリ名: $app_name
 
@@ -771,155 +998,22 @@ extract_project_name() {
 - 料理レシピ → recipe-manager
 
 変換結果のみを1行で出力してください。説明は不要です。"
-                
-                # Claudeで変換を実行（タイムアウトとエラーハンドリング付き）
-                local claude_result=$(echo "$claude_prompt" | timeout 10 claude --no-conversation --dangerously-skip-permissions 2>/dev/null | tail -1 | tr -d '\n' | sed 's/[^a-zA-Z0-9-]//g' | tr '[:upper:]' '[:lower:]')
-                
-                if [ -n "$claude_result" ] && [ "$claude_result" != "$app_name" ]; then
-                    english_name="$claude_result"
-                    log_success "Claude変換成功: $app_name → $english_name"
-                else
-                    log_warning "Claude変換に失敗しました。既存の変換方法を使用します。"
-                fi
-            fi
-        fi
-        
-        # ゲーム関連
-        english_name=$(echo "$english_name" | sed 's/オセロ/othello/g')
-        english_name=$(echo "$english_name" | sed 's/魚釣り/fishing/g')
-        english_name=$(echo "$english_name" | sed 's/釣り/fishing/g')
-        english_name=$(echo "$english_name" | sed 's/ボーリング/bowling/g')
-        english_name=$(echo "$english_name" | sed 's/ボウリング/bowling/g')
-        english_name=$(echo "$english_name" | sed 's/テトリス/tetris/g')
-        english_name=$(echo "$english_name" | sed 's/パズル/puzzle/g')
-        english_name=$(echo "$english_name" | sed 's/クイズ/quiz/g')
-        english_name=$(echo "$english_name" | sed 's/シューティング/shooting/g')
-        english_name=$(echo "$english_name" | sed 's/レース/racing/g')
-        english_name=$(echo "$english_name" | sed 's/カード/card/g')
-        english_name=$(echo "$english_name" | sed 's/将棋/shogi/g')
-        english_name=$(echo "$english_name" | sed 's/囲碁/go/g')
-        english_name=$(echo "$english_name" | sed 's/マージャン/mahjong/g')
-        english_name=$(echo "$english_name" | sed 's/麻雀/mahjong/g')
-        english_name=$(echo "$english_name" | sed 's/ゲーム/game/g')
-        
-        # アプリケーション関連
-        english_name=$(echo "$english_name" | sed 's/計算機/calculator/g')
-        english_name=$(echo "$english_name" | sed 's/電卓/calculator/g')
-        english_name=$(echo "$english_name" | sed 's/メモ帳/notepad/g')
-        english_name=$(echo "$english_name" | sed 's/メモ/memo/g')
-        english_name=$(echo "$english_name" | sed 's/カレンダー/calendar/g')
-        english_name=$(echo "$english_name" | sed 's/時計/clock/g')
-        english_name=$(echo "$english_name" | sed 's/タイマー/timer/g')
-        english_name=$(echo "$english_name" | sed 's/ストップウォッチ/stopwatch/g')
-        english_name=$(echo "$english_name" | sed 's/天気/weather/g')
-        english_name=$(echo "$english_name" | sed 's/ニュース/news/g')
-        english_name=$(echo "$english_name" | sed 's/地図/map/g')
-        english_name=$(echo "$english_name" | sed 's/写真/photo/g')
-        english_name=$(echo "$english_name" | sed 's/動画/video/g')
-        english_name=$(echo "$english_name" | sed 's/音楽/music/g')
-        english_name=$(echo "$english_name" | sed 's/チャット/chat/g')
-        english_name=$(echo "$english_name" | sed 's/ブログ/blog/g')
-        english_name=$(echo "$english_name" | sed 's/アプリ/app/g')
-        
-        # システム関連
-        english_name=$(echo "$english_name" | sed 's/管理/admin/g')
-        english_name=$(echo "$english_name" | sed 's/設定/settings/g')
-        english_name=$(echo "$english_name" | sed 's/ツール/tool/g')
-        english_name=$(echo "$english_name" | sed 's/ユーティリティ/utility/g')
-        english_name=$(echo "$english_name" | sed 's/エディタ/editor/g')
-        english_name=$(echo "$english_name" | sed 's/エディター/editor/g')
-        english_name=$(echo "$english_name" | sed 's/ビューア/viewer/g')
-        english_name=$(echo "$english_name" | sed 's/ビューアー/viewer/g')
-        english_name=$(echo "$english_name" | sed 's/プレーヤー/player/g')
-        english_name=$(echo "$english_name" | sed 's/プレイヤー/player/g')
-        english_name=$(echo "$english_name" | sed 's/ブラウザ/browser/g')
-        english_name=$(echo "$english_name" | sed 's/ブラウザー/browser/g')
-        
-        # 一般的な単語
-        english_name=$(echo "$english_name" | sed 's/簡単/simple/g')
-        english_name=$(echo "$english_name" | sed 's/かんたん/simple/g')
-        english_name=$(echo "$english_name" | sed 's/高速/fast/g')
-        english_name=$(echo "$english_name" | sed 's/新しい/new/g')
-        english_name=$(echo "$english_name" | sed 's/新/new/g')
-        english_name=$(echo "$english_name" | sed 's/私の/my/g')
-        english_name=$(echo "$english_name" | sed 's/俺の/my/g')
-        english_name=$(echo "$english_name" | sed 's/テスト/test/g')
-        english_name=$(echo "$english_name" | sed 's/サンプル/sample/g')
-        english_name=$(echo "$english_name" | sed 's/デモ/demo/g')
-        english_name=$(echo "$english_name" | sed 's/練習/practice/g')
-        english_name=$(echo "$english_name" | sed 's/学習/learning/g')
-        english_name=$(echo "$english_name" | sed 's/勉強/study/g')
-        
-        # ローマ字変換フォールバック（日本語が残っている場合）
-        if echo "$english_name" | grep -q '[ぁ-んァ-ヶー一-龠]'; then
-            # Pythonでローマ字変換を実行（多くの環境で利用可能）
-            if command -v python3 >/dev/null 2>&1; then
-                english_name=$(python3 -c "
-import sys
-text = '$english_name'
-
-# 簡易的なひらがな→ローマ字変換テーブル
-hiragana_to_romaji = {
-    'あ': 'a', 'い': 'i', 'う': 'u', 'え': 'e', 'お': 'o',
-    'か': 'ka', 'き': 'ki', 'く': 'ku', 'け': 'ke', 'こ': 'ko',
-    'が': 'ga', 'ぎ': 'gi', 'ぐ': 'gu', 'げ': 'ge', 'ご': 'go',
-    'さ': 'sa', 'し': 'shi', 'す': 'su', 'せ': 'se', 'そ': 'so',
-    'ざ': 'za', 'じ': 'ji', 'ず': 'zu', 'ぜ': 'ze', 'ぞ': 'zo',
-    'た': 'ta', 'ち': 'chi', 'つ': 'tsu', 'て': 'te', 'と': 'to',
-    'だ': 'da', 'ぢ': 'ji', 'づ': 'zu', 'で': 'de', 'ど': 'do',
-    'な': 'na', 'に': 'ni', 'ぬ': 'nu', 'ね': 'ne', 'の': 'no',
-    'は': 'ha', 'ひ': 'hi', 'ふ': 'fu', 'へ': 'he', 'ほ': 'ho',
-    'ば': 'ba', 'び': 'bi', 'ぶ': 'bu', 'べ': 'be', 'ぼ': 'bo',
-    'ぱ': 'pa', 'ぴ': 'pi', 'ぷ': 'pu', 'ぺ': 'pe', 'ぽ': 'po',
-    'ま': 'ma', 'み': 'mi', 'む': 'mu', 'め': 'me', 'も': 'mo',
-    'や': 'ya', 'ゆ': 'yu', 'よ': 'yo',
-    'ら': 'ra', 'り': 'ri', 'る': 'ru', 'れ': 're', 'ろ': 'ro',
-    'わ': 'wa', 'を': 'wo', 'ん': 'n',
-    'ー': '-', '〜': '-'
-}
-
-# カタカナ→ひらがな変換
-result = []
-for char in text:
-    if 'ァ' <= char <= 'ヶ':
-        # カタカナをひらがなに変換
-        hiragana = chr(ord(char) - ord('ァ') + ord('ぁ'))
-        result.append(hiragana_to_romaji.get(hiragana, char))
-    elif char in hiragana_to_romaji:
-        result.append(hiragana_to_romaji[char])
-    elif 'A' <= char <= 'Z' or 'a' <= char <= 'z' or '0' <= char <= '9' or char in ' -_':
-        result.append(char)
-    # 漢字や未知の文字は無視
-
-print(''.join(result))
-" 2>/dev/null)
-            fi
             
-            # Pythonが使えない場合は基本的な変換のみ
-            if [ -z "$english_name" ] || echo "$english_name" | grep -q '[ぁ-んァ-ヶー一-龠]'; then
-                # 最低限のカタカナのみ変換
-                english_name=$(echo "$english_name" | \
-                    sed 's/ア/a/g;s/イ/i/g;s/ウ/u/g;s/エ/e/g;s/オ/o/g' | \
-                    sed 's/カ/ka/g;s/キ/ki/g;s/ク/ku/g;s/ケ/ke/g;s/コ/ko/g' | \
-                    sed 's/サ/sa/g;s/シ/shi/g;s/ス/su/g;s/セ/se/g;s/ソ/so/g' | \
-                    sed 's/タ/ta/g;s/チ/chi/g;s/ツ/tsu/g;s/テ/te/g;s/ト/to/g' | \
-                    sed 's/ナ/na/g;s/ニ/ni/g;s/ヌ/nu/g;s/ネ/ne/g;s/ノ/no/g' | \
-                    sed 's/ハ/ha/g;s/ヒ/hi/g;s/フ/fu/g;s/ヘ/he/g;s/ホ/ho/g' | \
-                    sed 's/マ/ma/g;s/ミ/mi/g;s/ム/mu/g;s/メ/me/g;s/モ/mo/g' | \
-                    sed 's/ヤ/ya/g;s/ユ/yu/g;s/ヨ/yo/g' | \
-                    sed 's/ラ/ra/g;s/リ/ri/g;s/ル/ru/g;s/レ/re/g;s/ロ/ro/g' | \
-                    sed 's/ワ/wa/g;s/ヲ/wo/g;s/ン/n/g' | \
-                    sed 's/ー/-/g')
+            # Claudeで変換を実行（タイムアウトとエラーハンドリング付き）
+            local claude_result=$(echo "$claude_prompt" | timeout 10 claude --no-conversation --dangerously-skip-permissions 2>/dev/null | tail -1 | tr -d '\n' | sed 's/[^a-zA-Z0-9-]//g' | tr '[:upper:]' '[:lower:]')
+            
+            if [ -n "$claude_result" ] && [ "$claude_result" != "$app_name" ]; then
+                kebab_name=$(claudeflow_call appname ${APPNAME_CACHE:+--cache "$APPNAME_CACHE"} remember "$app_name" "$claude_result" 2>/dev/null)
+                log_success "Claude変換成功: $app_name → $kebab_name"
+            else
+                log_warning "Claude変換に失敗しました。既存の変換方法を使用します。"
             fi
         fi
         
-        # ケバブケースに変換
-        local kebab_name=$(echo "$english_name" | \
-            sed 's/[[:space:]]\+/-/g' | \
-            sed 's/[^a-zA-Z0-9-]//g' | \
-            sed 's/--\+/-/g' | \
-            sed 's/^-//;s/-$//' | \
-            tr '[:upper:]' '[:lower:]')
+        # ローマ字変換フォールバック（辞書にない日本語はかな・漢字の読みで変換）
+        if [ -z "$kebab_name" ]; then
+            kebab_name=$(claudeflow_call appname ${APPNAME_CACHE:+--cache "$APPNAME_CACHE"} slug "$app_name" 2>/dev/null)
+        fi
         
         # 変換結果が空でない場合は使用
         if [ -n "$kebab_name" ]; then
@@ -1057,12 +1151,11 @@ apply_template_vars() {
     local project_description="${3:-Generated by ClaudeFlow}"
     local cli_command="${4:-$project_name}"
     
-    # テンプレート変数を実際の値に置換
-    template_content=$(echo "$template_content" | sed "s/{{PROJECT_NAME}}/$project_name/g")
-    template_content=$(echo "$template_content" | sed "s/{{PROJECT_DESCRIPTION}}/$project_description/g")
-    template_content=$(echo "$template_content" | sed "s/{{CLI_COMMAND}}/$cli_command/g")
-    
-    echo "$template_content"
+    # テンプレート変数を実際の値に置換（値に / や & を含んでもよい）
+    printf '%s\n' "$template_content" | claudeflow_call -i templates render - \
+        --var "PROJECT_NAME=$project_name" \
+        --var "PROJECT_DESCRIPTION=$project_description" \
+        --var "CLI_COMMAND=$cli_command"
 }
 
 # プロジェクトファイルを生成
@@ -1698,7 +1791,9 @@ count_file_lines() {
     fi
 }
 
-# プロジェクト全体の行数チェック
+# プロジェクト全体の行数チェック（claudeflow.linecount）
+# 出力ディレクトリを1回だけ走査し、変更のないファイルは前回数えた行数を使う
+# 戻り値: 0 制限内、1 制限超過、2 警告
 check_project_line_limit() {
     local output_dir="$1"
     local max_lines="${CLAUDEFLOW_MAX_LINES:-2000}"
@@ -1708,144 +1803,16 @@ check_project_line_limit() {
         return 0  # 制限チェック無効時はスキップ
     fi
     
-    local total_lines=0
-    local file_count=0
-    local detailed_report=""
-    
-    echo -e "${BLUE}📏 行数制限チェック開始 (最大: ${max_lines}行)${NC}"
-    
-    # 対象ファイル拡張子
-    local extensions=("html" "js" "css" "ts" "jsx" "tsx" "vue" "py" "java" "cpp" "c")
-    
-    for ext in "${extensions[@]}"; do
-        for file in "$output_dir"/*."$ext" "$output_dir"/**/*."$ext"; do
-            if [ -f "$file" ]; then
-                local lines=$(count_file_lines "$file")
-                total_lines=$((total_lines + lines))
-                file_count=$((file_count + 1))
-                local relative_path=$(basename "$file")
-                detailed_report="${detailed_report}  📄 $relative_path: ${lines}行\n"
-            fi
-        done
-    done
-    
-    # 結果表示
-    local percent=$((total_lines * 100 / max_lines))
-    local warning_limit=$((max_lines * warning_threshold / 100))
-    
-    echo -e "${BLUE}検出ファイル数: ${file_count}${NC}"
-    echo -e "$detailed_report"
-    echo -e "${CYAN}総行数: ${total_lines} / ${max_lines} (${percent}%)${NC}"
-    
-    # 進捗バー表示
-    local bar_width=40
-    local filled=$((percent * bar_width / 100))
-    local empty=$((bar_width - filled))
-    
-    printf "["
-    printf "%*s" $filled '' | tr ' ' '█'
-    printf "%*s" $empty '' | tr ' ' '░'
-    printf "] %d%%\n" $percent
-    
-    # 状況判定と警告
-    if [ "$total_lines" -gt "$max_lines" ]; then
-        echo -e "${RED}🚨 エラー: ${total_lines}行 > ${max_lines}行制限を超過しています${NC}"
-        echo -e "${YELLOW}💡 提案: 機能削減または最適化が必要です${NC}"
-        return 1
-    elif [ "$total_lines" -gt "$warning_limit" ]; then
-        echo -e "${YELLOW}⚠️  警告: ${total_lines}行 > ${warning_limit}行 (${warning_threshold}%制限)${NC}"
-        echo -e "${BLUE}💡 提案: コードの最適化を検討してください${NC}"
-        return 2
-    else
-        echo -e "${GREEN}✅ 制限内: ${total_lines}行 ≤ ${max_lines}行${NC}"
-        local remaining=$((max_lines - total_lines))
-        echo -e "${CYAN}📈 残り: ${remaining}行利用可能${NC}"
-        return 0
-    fi
+    claudeflow_call linecount check "$output_dir" --max-lines "$max_lines" --warning-threshold "$warning_threshold"
 }
 
-# 行数制限の詳細レポート生成
+# 行数制限の詳細レポート生成（check_project_line_limit と同じファイルを数える）
 generate_line_limit_report() {
     local output_dir="$1"
     local report_file="$output_dir/LINE_LIMIT_REPORT.md"
     local max_lines="${CLAUDEFLOW_MAX_LINES:-2000}"
     
-    cat > "$report_file" << EOF
-# 📏 行数制限レポート
-
-**作成日時**: $(date '+%Y-%m-%d %H:%M:%S')  
-**制限設定**: ${max_lines}行  
-**プロジェクト**: $(basename "$output_dir")  
-
-## 📊 ファイル別行数
-
-| ファイル | 行数 | 割合 |
-|---------|------|------|
-EOF
-    
-    local total_lines=0
-    local extensions=("html" "js" "css" "ts" "jsx" "tsx")
-    
-    for ext in "${extensions[@]}"; do
-        for file in "$output_dir"/*."$ext"; do
-            if [ -f "$file" ]; then
-                local lines=$(count_file_lines "$file")
-                local filename=$(basename "$file")
-                local percent=$((lines * 100 / max_lines))
-                total_lines=$((total_lines + lines))
-                echo "| $filename | $lines | ${percent}% |" >> "$report_file"
-            fi
-        done
-    done
-    
-    local total_percent=$((total_lines * 100 / max_lines))
-    
-    cat >> "$report_file" << EOF
-
-## 📈 サマリー
-
-- **総行数**: ${total_lines}行
-- **制限**: ${max_lines}行
-- **使用率**: ${total_percent}%
-- **残り**: $((max_lines - total_lines))行
-
-## 💡 最適化提案
-
-EOF
-    
-    if [ "$total_lines" -gt "$max_lines" ]; then
-        cat >> "$report_file" << EOF
-### 🚨 制限超過 - 緊急対応必要
-
-- **削減が必要**: $((total_lines - max_lines))行
-- **推奨アクション**:
-  1. 不要なコメント削除
-  2. CSS/JS最小化
-  3. 冗長な機能削除
-  4. アルゴリズム効率化
-
-EOF
-    elif [ "$total_lines" -gt "$((max_lines * 80 / 100))" ]; then
-        cat >> "$report_file" << EOF
-### ⚠️ 警告レベル - 最適化推奨
-
-- **推奨アクション**:
-  1. コードレビューと効率化
-  2. 重複コード削除
-  3. 関数の統合
-  4. 変数名の短縮化
-
-EOF
-    else
-        cat >> "$report_file" << EOF
-### ✅ 制限内 - 良好な状態
-
-- **状況**: 制限内で適切に実装されています
-- **余裕**: $((max_lines - total_lines))行の余裕があります
-
-EOF
-    fi
-    
+    claudeflow_call linecount report "$output_dir" --max-lines "$max_lines" --output "$report_file" > /dev/null || return 1
     echo -e "${GREEN}📄 詳細レポート生成: $report_file${NC}"
 }
 
@@ -1877,48 +1844,18 @@ apply_mode_line_limits() {
 # CodeFit Design ユーザー協働システム
 # ====================================
 
-# 機能の行数見積もり
+# 行数見積もりの学習（claudeflow.budget）。進捗の記録の生成行数と、
+# 過去に生成したアプリ（codefit_features.json のあるディレクトリ）の実際の行数から種類ごとの倍率を学習する
+claudeflow_budget() {
+    claudeflow_call budget --db "$PROGRESS_DB" --history "$RESULTS_DIR" --history "$PROJECT_ROOT/implementation" "$@"
+}
+
+# 機能の行数見積もり（実績がなければ種類・複雑さごとの固定値）
 estimate_feature_lines() {
     local feature_type="$1"
     local complexity="$2"
     
-    case "$feature_type" in
-        "ui")
-            case "$complexity" in
-                "simple") echo 30 ;;
-                "medium") echo 60 ;;
-                "complex") echo 100 ;;
-                *) echo 50 ;;
-            esac
-            ;;
-        "logic")
-            case "$complexity" in
-                "simple") echo 50 ;;
-                "medium") echo 100 ;;
-                "complex") echo 200 ;;
-                *) echo 80 ;;
-            esac
-            ;;
-        "data")
-            case "$complexity" in
-                "simple") echo 40 ;;
-                "medium") echo 80 ;;
-                "complex") echo 150 ;;
-                *) echo 60 ;;
-            esac
-            ;;
-        "animation")
-            case "$complexity" in
-                "simple") echo 20 ;;
-                "medium") echo 50 ;;
-                "complex") echo 100 ;;
-                *) echo 40 ;;
-            esac
-            ;;
-        *)
-            echo 50
-            ;;
-    esac
+    claudeflow_budget estimate "$feature_type" "$complexity"
 }
 
 # インタラクティブ機能選択システム
@@ -2165,43 +2102,51 @@ auto_select_features() {
         "マルチユーザー:logic:complex:複数ユーザー対応"
     )
     
-    # 基本機能を自動追加
-    echo -e "${GREEN}📋 基本機能を追加中...${NC}"
+    # 基本機能は必ず入れ、残りの行数で優先度（並び順）の合計が最大になる拡張機能を選ぶ
+    local budget_args=(--max-lines "$max_lines")
     for feature in "${basic_features[@]}"; do
-        IFS=':' read -r name type complexity desc <<< "$feature"
-        lines=$(estimate_feature_lines "$type" "$complexity")
+        budget_args+=(--required "$feature")
+    done
+    for feature in "${extended_features[@]}"; do
+        budget_args+=(--optional "$feature")
+    done
+    # features.json も同時に書き出す（種類・複雑さ付き。生成後にアプリへ写して行数見積もりの学習に使う）
+    mkdir -p "$RESULTS_DIR"
+    local selection
+    selection=$(claudeflow_budget select "${budget_args[@]}" --features-json "$RESULTS_DIR/features.json" \
+        --app-name "$app_name" --generated-at "$(date -u +%Y-%m-%dT%H:%M:%SZ)") || return 1
+    
+    echo -e "${GREEN}📋 基本機能を追加中...${NC}"
+    local status name lines desc
+    while IFS=$'\t' read -r status name lines desc; do
+        [ "$status" = "required" ] || continue
         features+=("$name")
         feature_lines+=("$lines")
         feature_priorities+=("高")
         total_estimated_lines=$((total_estimated_lines + lines))
         echo -e "${BLUE}  ✓ $name ($lines行) - $desc${NC}"
-    done
+    done <<< "$selection"
     
     echo ""
     echo -e "${CYAN}基本機能小計: ${total_estimated_lines}行 / ${max_lines}行${NC}"
     show_line_usage_bar "$total_estimated_lines" "$max_lines"
     echo ""
     
-    # 拡張機能を制限内で自動追加
     echo -e "${YELLOW}🚀 拡張機能を自動選択中...${NC}"
     local added_count=0
-    for feature in "${extended_features[@]}"; do
-        IFS=':' read -r name type complexity desc <<< "$feature"
-        lines=$(estimate_feature_lines "$type" "$complexity")
-        projected_total=$((total_estimated_lines + lines))
-        
-        if [ "$projected_total" -le "$max_lines" ]; then
+    while IFS=$'\t' read -r status name lines desc; do
+        if [ "$status" = "selected" ]; then
             features+=("$name")
             feature_lines+=("$lines")
             feature_priorities+=("中")
-            total_estimated_lines=$projected_total
+            total_estimated_lines=$((total_estimated_lines + lines))
             added_count=$((added_count + 1))
             echo -e "${GREEN}  ✓ $name ($lines行) - $desc [自動追加]${NC}"
             echo -e "${CYAN}     現在: ${total_estimated_lines}行 / ${max_lines}行${NC}"
-        else
+        elif [ "$status" = "skipped" ]; then
             echo -e "${YELLOW}  ⏭️ $name ($lines行) - 制限超過のためスキップ${NC}"
         fi
-    done
+    done <<< "$selection"
     
     if [ "$added_count" -eq 0 ]; then
         echo -e "${YELLOW}  ⚠️ 追加可能な拡張機能はありませんでした${NC}"
@@ -2222,8 +2167,7 @@ auto_select_features() {
     # 選択結果をファイルに保存
     save_feature_selection "$app_name" "$total_estimated_lines" "$max_lines" "features" "feature_lines" "feature_priorities"
     
-    # features.jsonも生成
-    generate_features_json "$app_name" "features" "feature_lines" "feature_priorities"
+    echo -e "${GREEN}📄 features.json生成: $RESULTS_DIR/features.json${NC}"
     
     echo ""
     echo -e "${GREEN}✅ 自動機能選択が完了しました${NC}"
@@ -2413,6 +2357,7 @@ validate_syntax() {
 }
 
 # ランタイムエラー検出
+# パターンはプロセス内で1回だけコンパイルし、リテラルを含む行だけを検査する（一致した行と列を報告）
 validate_runtime() {
     local file="$1"
     local validation_dir="$PROJECT_ROOT/validation"
@@ -2423,31 +2368,7 @@ validate_runtime() {
         return 1
     fi
     
-    # Pythonでパターンマッチング
-    python3 -c "
-import json
-import re
-
-with open('$patterns_file', 'r') as f:
-    patterns = json.load(f)
-
-with open('$file', 'r') as f:
-    content = f.read()
-
-errors = 0
-for category in patterns.values():
-    for pattern_info in category.values():
-        if isinstance(pattern_info, dict) and 'pattern' in pattern_info:
-            try:
-                if re.search(pattern_info['pattern'], content):
-                    print(f\"[{pattern_info.get('severity', 'warning')}] {pattern_info.get('message', 'エラー検出')}]\")
-                    if pattern_info.get('severity') in ['error', 'critical']:
-                        errors += 1
-            except:
-                pass
-
-exit(errors)
-"
+    claudeflow_call validation.patterns "$file" --patterns "$patterns_file" --no-color
 }
 
 # セキュリティチェック
@@ -2509,56 +2430,37 @@ validate_implementation() {
     
     local total_errors=0
     local total_warnings=0
-    
-    # すべてのコードファイルを検証
-    for file in "$impl_dir"/**/*.{js,ts,jsx,tsx,html,py} "$impl_dir"/*.{js,ts,jsx,tsx,html,py}; do
-        if [ -f "$file" ]; then
-            local basename=$(basename "$file")
-            local report_file="$report_dir/validation_${basename%.}.txt"
-            
-            echo "検証中: $file"
-            
-            # 各種検証を実行
-            {
-                echo "=== 検証レポート: $basename ==="
-                echo "実行日時: $(date)"
-                echo ""
-                
-                echo "## 構文チェック"
-                if validate_syntax "$file"; then
-                    echo "✅ 構文エラーなし"
-                else
-                    echo "❌ 構文エラーあり"
-                    ((total_errors++))
-                fi
-                echo ""
-                
-                echo "## ランタイムエラーチェック"
-                validate_runtime "$file"
-                echo ""
-                
-                echo "## セキュリティチェック"
-                if validate_security "$file"; then
-                    echo "✅ セキュリティ問題なし"
-                else
-                    ((total_errors++))
-                fi
-                echo ""
-                
-                echo "## ベストプラクティスチェック"
-                validate_best_practices "$file"
-                
-            } > "$report_file"
-            
-            # サマリー表示
-            if grep -q "❌\|ERROR\|CRITICAL" "$report_file"; then
-                echo -e "${RED}  ❌ エラーあり${NC}"
-            else
-                echo -e "${GREEN}  ✅ 検証合格${NC}"
-            fi
-        fi
+    local cache_hits=0
+    local cache_misses=0
+    local report_json="$report_dir/validation_report.json"
+    
+    # すべてのコードファイルを1プロセスで集め、ワーカープロセスで並列に検証
+    # （CLAUDEFLOW_VALIDATION_WORKERS=0 はCPU数、内容が変わっていないファイルはキャッシュを再利用）
+    local batch_options=(--workers "${CLAUDEFLOW_VALIDATION_WORKERS:-0}" --output "$report_json" --report-dir "$report_dir")
+    if [ "${CLAUDEFLOW_VALIDATION_CACHE_ENABLED:-true}" = "true" ]; then
+        batch_options+=(--cache)
+    fi
+    rm -f "$report_json"
+    claudeflow_py validation.batch "$impl_dir" "${batch_options[@]}" | while IFS= read -r line; do
+        case "$line" in
+            *❌*) echo -e "${RED}  $line${NC}" ;;
+            *✅*) echo -e "${GREEN}  $line${NC}" ;;
+            *) echo "  $line" ;;
+        esac
     done
     
+    if [ -f "$report_json" ]; then
+        read -r total_errors total_warnings cache_hits cache_misses < <(python3 -c "
+import json
+with open('$report_json', encoding='utf-8') as f:
+    report = json.load(f)
+summary = report['summary']
+cache = report.get('cache', {})
+print(summary['critical'] + summary['error'] + len(report['errors']), summary['warning'],
+      cache.get('hits', 0), cache.get('misses', 0))
+")
+    fi
+    
     # 総合レポート作成
     local summary_file="$report_dir/validation_summary.md"
     {
@@ -2567,6 +2469,8 @@ validate_implementation() {
         echo "- 実行日時: $(date)"
         echo "- エラー数: $total_errors"
         echo "- 警告数: $total_warnings"
+        echo "- キャッシュ: ヒット $cache_hits / ミス $cache_misses"
+        echo "- 統合レポート: [$(basename "$report_json")]($(basename "$report_json"))"
         echo ""
         echo "## 詳細レポート"
         for report in "$report_dir"/validation_*.txt; do
@@ -2578,7 +2482,110 @@ validate_implementation() {
     
     log_success "検証完了: $summary_file"
     
-    return $total_errors
+    # 終了ステータスは255までのため件数を丸める
+    return $(( total_errors > 255 ? 255 : total_errors ))
+}
+
+# 変更監視による差分検証をバックグラウンドで開始
+# 保存されたファイルだけを再検証し、新規・修正済みの問題をログに追記する
+start_validation_watch() {
+    local watch_dir="$1"
+    local log_file="${2:-$watch_dir/validation-watch.log}"
+
+    if [ "${CLAUDEFLOW_VALIDATION_WATCH:-true}" != "true" ] || [ -n "$VALIDATION_WATCH_PID" ]; then
+        return 0
+    fi
+
+    # claudeflow_py（シェル関数）を & で起動すると $! はサブシェルになり、停止してもpython3が残るため直接起動する
+    PYTHONPATH="$CLAUDEFLOW_PY_DIR${PYTHONPATH:+:$PYTHONPATH}" python3 -m claudeflow.validation.watch "$watch_dir" \
+        --no-color > "$log_file" 2>&1 &
+    VALIDATION_WATCH_PID=$!
+    VALIDATION_WATCH_LOG="$log_file"
+}
+
+# 差分検証の監視を停止
+stop_validation_watch() {
+    if [ -n "$VALIDATION_WATCH_PID" ]; then
+        kill "$VALIDATION_WATCH_PID" 2>/dev/null
+        wait "$VALIDATION_WATCH_PID" 2>/dev/null
+        VALIDATION_WATCH_PID=""
+    fi
+}
+
+# 監視ログの現在の行数（ファイルを書き換える前に記録し、show_validation_deltaに渡す）
+validation_watch_mark() {
+    if [ -n "$VALIDATION_WATCH_PID" ] && [ -f "$VALIDATION_WATCH_LOG" ]; then
+        wc -l < "$VALIDATION_WATCH_LOG" | tr -d ' '
+    else
+        echo 0
+    fi
+}
+
+# 記録した行以降の差分を表示（監視が反映するまで最大1秒待つ）
+show_validation_delta() {
+    local mark="${1:-0}"
+
+    [ -n "$VALIDATION_WATCH_PID" ] || return 0
+    for _ in $(seq 20); do
+        [ "$(validation_watch_mark)" -gt "$mark" ] && break
+        sleep 0.05
+    done
+    tail -n +"$((mark + 1))" "$VALIDATION_WATCH_LOG"
+}
+
+# 機能の並列実装（claudeflow.scheduler）
+# CLAUDEFLOW_PARALLEL_JOBS が2以上なら、依存関係のない機能を同時に実装する
+CLAUDEFLOW_PARALLEL_JOBS="${CLAUDEFLOW_PARALLEL_JOBS:-1}"
+
+# 依存関係の順に機能ごとの関数を別プロセスで並列に実行する
+# 使い方: run_features_parallel features.json 出力ディレクトリ 関数名 機能ID(カンマ区切り) [引き継ぐ変数...]
+# 関数は (機能ID 機能名 説明 features.json内の位置) を引数に呼ばれる。引き継いだ変数のうち
+# 出力ディレクトリ以下のディレクトリを指すものは機能ごとの作業ディレクトリに置き換えられ、完了後に統合される
+# （ファイルを指す変数は共有のまま。入力ファイルの読み込みや追記のログに使う）
+run_features_parallel() {
+    local features_json="$1"
+    local output_dir="$2"
+    local worker="$3"
+    local ids="$4"
+    shift 4
+
+    local state_dir
+    state_dir=$(mktemp -d "${TMPDIR:-/tmp}/claudeflow-parallel.XXXXXX") || return 1
+    {
+        declare -f
+        declare -p "$@" 2>/dev/null
+    } > "$state_dir/state.sh"
+
+    local command
+    command="source $(printf '%q' "$SCRIPT_DIR/common-functions.sh") && source $(printf '%q' "$state_dir/state.sh")"
+    command+=" && _claudeflow_feature_worker $(printf '%q' "$worker") $*"
+
+    local status=0
+    claudeflow_py scheduler "$features_json" --ids "$ids" --jobs "$CLAUDEFLOW_PARALLEL_JOBS" \
+        --output-dir "$output_dir" --command "$command" \
+        --report "$output_dir/.claudeflow/scheduler_report.json" || status=$?
+    rm -rf "$state_dir"
+    return $status
+}
+
+# run_features_parallel の各プロセスで実行される（出力先を作業ディレクトリに切り替えて関数を呼ぶ）
+_claudeflow_feature_worker() {
+    local worker="$1"
+    shift
+    local var value absolute
+    for var in "$@"; do
+        value="${!var}"
+        [ -n "$value" ] && [ -d "$value" ] || continue
+        # 相対パスやシンボリックリンクを含んでいても出力ディレクトリと比較できるよう絶対パスにする
+        absolute="$(cd "$value" && pwd -P)"
+        case "$absolute" in
+            "$CLAUDEFLOW_SCHEDULER_OUTPUT"|"$CLAUDEFLOW_SCHEDULER_OUTPUT"/*)
+                printf -v "$var" '%s' "$CLAUDEFLOW_FEATURE_STAGING${absolute#"$CLAUDEFLOW_SCHEDULER_OUTPUT"}"
+                mkdir -p "${!var}"
+                ;;
+        esac
+    done
+    "$worker" "$FEATURE_ID" "$FEATURE_NAME" "$FEATURE_DESCRIPTION" "$FEATURE_INDEX"
 }
 
 # 自動修正提案
@@ -108,7 +108,7 @@ extract_features() {
     
     echo "$prompt" > "$IMPLEMENTATION_DIR/extract_features.md"
     
-    cat "$IMPLEMENTATION_DIR/extract_features.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/features.json"
+    cat "$IMPLEMENTATION_DIR/extract_features.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/features.json"
     
     echo -e "${GREEN}✅ 機能リスト抽出完了${NC}"
 }
@@ -117,17 +117,20 @@ extract_features() {
 analyze_feature() {
     local feature_name=$1
     
-    # プロンプトを読み込んで変数を適用
+    local requirements=$(grep -A 20 "$feature_name" "$REQUIREMENTS_FILE" || echo "要件を抽出できません")
+    
+    # プロンプトを読み込んで変数を適用（パターンは機能に関係するものだけ）
     local prompt=$(load_prompt "14_analyze_feature")
     prompt=$(apply_prompt_vars "$prompt" \
         "feature_name" "$feature_name" \
         "context_content" "$(cat "$CONTEXT_FILE")" \
-        "patterns_content" "$(cat "$PATTERNS_FILE")" \
-        "requirements_content" "$(grep -A 20 "$feature_name" "$REQUIREMENTS_FILE" || echo "要件を抽出できません")")
+        "patterns_content" "$(select_patterns "$PATTERNS_FILE" "$feature_name
+$requirements")" \
+        "requirements_content" "$requirements")
     
     echo "$prompt" > "$CONTEXT_DIR/analyze_${feature_name}.md"
     
-    cat "$CONTEXT_DIR/analyze_${feature_name}.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$CONTEXT_DIR/analysis_${feature_name}.json"
+    cat "$CONTEXT_DIR/analyze_${feature_name}.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$CONTEXT_DIR/analysis_${feature_name}.json"
 }
 
 # 関数仕様書の生成
@@ -138,16 +141,19 @@ generate_function_spec() {
     echo ""
     echo -e "${BLUE}📋 関数仕様書生成: ${feature_name}${NC}"
     
-    # プロンプトを読み込んで変数を適用
+    local requirements=$(grep -A 30 "$feature_name" "$REQUIREMENTS_FILE" || echo "")
+    
+    # プロンプトを読み込んで変数を適用（パターンは機能に関係するものだけ）
     local prompt=$(load_prompt "15_generate_function_spec")
     prompt=$(apply_prompt_vars "$prompt" \
         "feature_name" "$feature_name" \
-        "requirements_content" "$(grep -A 30 "$feature_name" "$REQUIREMENTS_FILE" || echo "")" \
-        "patterns_content" "$(cat "$PATTERNS_FILE")")
+        "requirements_content" "$requirements" \
+        "patterns_content" "$(select_patterns "$PATTERNS_FILE" "$feature_name
+$requirements")")
     
     echo "$prompt" > "$IMPLEMENTATION_DIR/spec_${feature_id}.md"
     
-    cat "$IMPLEMENTATION_DIR/spec_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/${feature_id}_spec.md"
+    cat "$IMPLEMENTATION_DIR/spec_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/${feature_id}_spec.md"
     
     echo -e "${GREEN}✅ 関数仕様書生成完了${NC}"
 }
@@ -172,7 +178,7 @@ minimal_implementation() {
     echo "$prompt" > "$IMPLEMENTATION_DIR/implement_${feature_id}_minimal.md"
     
     echo -e "${YELLOW}最小実装を生成中...${NC}"
-    cat "$IMPLEMENTATION_DIR/implement_${feature_id}_minimal.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/${feature_id}_v1.ts"
+    cat "$IMPLEMENTATION_DIR/implement_${feature_id}_minimal.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/${feature_id}_v1.ts"
     
     # コード行数を計測
     local loc=$(wc -l < "$IMPLEMENTATION_DIR/${feature_id}_v1.ts")
@@ -193,12 +199,13 @@ refactor_implementation() {
     prompt=$(apply_prompt_vars "$prompt" \
         "feature_name" "$feature_name" \
         "current_implementation" "$(cat "$IMPLEMENTATION_DIR/${feature_id}_v1.ts")" \
-        "patterns_content" "$(cat "$PATTERNS_FILE")")
+        "patterns_content" "$(select_patterns "$PATTERNS_FILE" "$feature_name
+$(cat "$IMPLEMENTATION_DIR/${feature_id}_v1.ts")")")
     
     echo "$prompt" > "$IMPLEMENTATION_DIR/refactor_${feature_id}.md"
     
     echo -e "${YELLOW}リファクタリング中...${NC}"
-    cat "$IMPLEMENTATION_DIR/refactor_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/${feature_id}_v2.ts"
+    cat "$IMPLEMENTATION_DIR/refactor_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/${feature_id}_v2.ts"
     
     # リファクタリング後の行数
     local loc=$(wc -l < "$IMPLEMENTATION_DIR/${feature_id}_v2.ts")
@@ -225,12 +232,11 @@ extract_new_patterns() {
     
     echo "$prompt" > "$CONTEXT_DIR/extract_patterns_${feature_id}.md"
     
-    local new_patterns=$(cat "$CONTEXT_DIR/extract_patterns_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep')
+    local new_patterns=$(cat "$CONTEXT_DIR/extract_patterns_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS")
     
     if [ -n "$new_patterns" ]; then
-        echo "" >> "$PATTERNS_FILE"
-        echo "## From ${feature_name}" >> "$PATTERNS_FILE"
-        echo "$new_patterns" >> "$PATTERNS_FILE"
+        printf '\n## From %s\n%s\n' "$feature_name" "$new_patterns" \
+            | claudeflow_call -i patternindex append "$PATTERNS_FILE" > /dev/null || true
         echo -e "${GREEN}✅ 新しいパターンを追加しました${NC}"
     fi
 }
@@ -251,7 +257,7 @@ generate_tests() {
     
     echo "$prompt" > "$IMPLEMENTATION_DIR/test_${feature_id}.md"
     
-    cat "$IMPLEMENTATION_DIR/test_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/${feature_id}_test.ts"
+    cat "$IMPLEMENTATION_DIR/test_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/${feature_id}_test.ts"
     
     echo -e "${GREEN}✅ テスト生成完了${NC}"
 }
@@ -279,44 +285,19 @@ main() {
     # 機能リストの抽出
     extract_features
     
-    # JSONから機能リストを読み込み
-    if command -v jq &> /dev/null; then
-        # jqが利用可能な場合
-        features=$(jq -r '.features[]' "$IMPLEMENTATION_DIR/features.json")
-        total_features=$(echo "$features" | jq -s 'length')
-    else
-        # jqが利用できない場合はPythonを使用
-        echo -e "${YELLOW}jqが見つかりません。Pythonを使用してJSONを解析します...${NC}"
-        features=$(python3 -c "
-import json
-with open('$IMPLEMENTATION_DIR/features.json', 'r') as f:
-    data = json.load(f)
-    for feature in data['features']:
-        print(json.dumps(feature))
-")
-        total_features=$(python3 -c "
-import json
-with open('$IMPLEMENTATION_DIR/features.json', 'r') as f:
-    data = json.load(f)
-    print(len(data['features']))
-")
-    fi
+    # features.jsonを1回だけ解析し、全機能のIDと名前を配列に読み込む
+    eval "$(claudeflow_call features "$IMPLEMENTATION_DIR/features.json" --format declare --fields id,name)"
+    total_features=${features_count:-0}
     current=0
     
     echo ""
     echo -e "${GREEN}実装する機能数: ${total_features}${NC}"
     echo ""
     
-    # 各機能を処理
-    echo "$features" | while read -r feature; do
-        if command -v jq &> /dev/null; then
-            feature_id=$(echo "$feature" | jq -r '.id')
-            feature_name=$(echo "$feature" | jq -r '.name')
-        else
-            # Pythonを使用してJSONを解析
-            feature_id=$(echo "$feature" | python3 -c "import json,sys; print(json.load(sys.stdin)['id'])")
-            feature_name=$(echo "$feature" | python3 -c "import json,sys; print(json.load(sys.stdin)['name'])")
-        fi
+    # 各機能を処理（パイプを使わないため、確認の read は端末から読む）
+    for i in "${!features_id[@]}"; do
+        feature_id="${features_id[$i]}"
+        feature_name="${features_name[$i]}"
         
         current=$((current + 1))
         
@@ -342,7 +323,7 @@ with open('$IMPLEMENTATION_DIR/features.json', 'r') as f:
         # 次の機能に進むか確認
         if [ $current -lt $total_features ]; then
             echo -e "${YELLOW}次の機能に進みますか？ (y/n)${NC}"
-            read -n 1 continue_confirm
+            read -n 1 continue_confirm || true
             echo ""
             
             if [[ ! $continue_confirm =~ ^[Yy]$ ]]; then
@@ -47,52 +47,58 @@ safe_claude_exec() {
     
     echo -e "${CYAN}  ⏳ $step_name を実行中...${NC}"
     log_step "$step_name" "START"
+    # フェーズ（ステップ名の「:」より前）ごとの所要時間と成否を進捗に記録する
+    local phase="${step_name%%:*}"
+    log_progress_start "${CURRENT_FEATURE_ID:-}" "" "$phase"
     
-    local retry_count=0
-    local success=false
-    local response=""
+    # 同じプロンプトの応答が保存済みならClaudeを呼ばない（トークン台帳にはコスト0で記録）
+    if prompt_cache_get "$prompt" "$output_file"; then
+        echo -e "${GREEN}  ✓ 保存済みの応答を使用します${NC}"
+        add_token_usage_file "$prompt" "$output_file" "$step_name" cached > /dev/null
+        log_claude_call "$step_name" "$output_file" "SUCCESS"
+        log_step "$step_name" "SUCCESS" "キャッシュ"
+        log_progress "${CURRENT_FEATURE_ID:-}" "" "" "" "SUCCESS" "" "$phase"
+        return 0
+    fi
     
-    while [ $retry_count -lt $max_retries ] && [ "$success" = "false" ]; do
-        if [ $retry_count -gt 0 ]; then
-            echo -e "${YELLOW}  リトライ $retry_count/$max_retries...${NC}"
-            log_step "$step_name" "RETRY" "試行 $retry_count"
-            sleep $((retry_count * 5))  # リトライ間隔を徐々に延長
-        fi
-        
-        # プロンプトを一時ファイルに保存（特殊文字のエスケープ問題を回避）
-        local temp_prompt=$(mktemp)
-        echo "$prompt" > "$temp_prompt"
-        
-        # タイムアウト付きでClaudeを実行
-        if response=$(timeout $timeout bash -c "cat '$temp_prompt' | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' 2>&1"); then
-            echo "$response" > "$output_file"
-            log_claude_call "$step_name" "$output_file" "SUCCESS"
-            log_step "$step_name" "SUCCESS"
-            success=true
-            rm -f "$temp_prompt"  # 一時ファイルを削除
-            return 0
-        else
-            local exit_code=$?
-            if [ $exit_code -eq 124 ]; then
-                echo -e "${RED}  ⚠ $step_name がタイムアウトしました（${timeout}秒）${NC}"
-                log_error_detail "$step_name" "タイムアウト（${timeout}秒）"
-                response="// Timeout after ${timeout} seconds"
-            else
-                echo -e "${RED}  ⚠ $step_name でエラーが発生しました${NC}"
-                echo -e "${YELLOW}  エラー: $response${NC}"
-                log_error_detail "$step_name" "$response"
-            fi
-            rm -f "$temp_prompt"  # エラー時も一時ファイルを削除
-        fi
-        
-        ((retry_count++))
-    done
+    # プロンプトを一時ファイルに保存（特殊文字のエスケープ問題を回避）
+    local temp_prompt=$(mktemp)
+    local error_file=$(mktemp)
+    echo "$prompt" > "$temp_prompt"
+    
+    # 揺らぎ付きバックオフで再試行する（CLAUDEFLOW_IDLE_TIMEOUT を設定すると、出力が止まった試行は制限時間を待たずに打ち切る）
+    # CLAUDEFLOW_HEDGE_PERCENTILE を設定すると、過去のレイテンシより遅い試行と並行して2つ目を起動する
+    local exit_code=0
+    claudeflow_py claude_exec run --prompt-file "$temp_prompt" --output "$output_file" --step "$step_name" \
+        --retries "$max_retries" --timeout "$timeout" --tools "$CLAUDE_ALLOWED_TOOLS" --error-file "$error_file" \
+        --hedge-percentile "${CLAUDEFLOW_HEDGE_PERCENTILE:-0}" \
+        --histogram "${CLAUDE_LATENCY_FILE:-${CONTEXT_DIR:-/tmp}/.claude_latency.json}" || exit_code=$?
+    local response=$(cat "$error_file" 2>/dev/null)
+    rm -f "$temp_prompt" "$error_file"
+    
+    if [ $exit_code -eq 0 ]; then
+        prompt_cache_put "$prompt" "$output_file"
+        add_token_usage_file "$prompt" "$output_file" "$step_name" > /dev/null
+        log_claude_call "$step_name" "$output_file" "SUCCESS"
+        log_step "$step_name" "SUCCESS"
+        log_progress "${CURRENT_FEATURE_ID:-}" "" "" "" "SUCCESS" "" "$phase"
+        return 0
+    fi
     
-    # すべてのリトライが失敗した場合
-    rm -f "$temp_prompt"  # 一時ファイルを削除
+    if [ $exit_code -eq 124 ]; then
+        echo -e "${RED}  ⚠ $step_name が応答しませんでした: $response${NC}"
+        log_error_detail "$step_name" "$response"
+    else
+        echo -e "${RED}  ⚠ $step_name でエラーが発生しました${NC}"
+        echo -e "${YELLOW}  エラー: $response${NC}"
+        log_error_detail "$step_name" "$response"
+    fi
+    
+    # すべてのリトライが失敗した場合（途中までの出力は ${output_file}.partial に残る）
     echo "// Error in $step_name after $max_retries attempts: $response" > "$output_file"
     log_claude_call "$step_name" "$output_file" "ERROR"
     log_step "$step_name" "ERROR" "最大リトライ回数到達"
+    log_progress "${CURRENT_FEATURE_ID:-}" "" "" "" "ERROR" "$response" "$phase"
     return 1
 }
 
@@ -370,7 +376,18 @@ $(cat "$DESIGN_FILE")
 
     # features.jsonを直接生成
     debug_info "Claudeに機能生成を依頼中..."
-    features_json_response=$(echo "$features_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' 2>&1)
+    # 同じ要件・設計で再実行した場合は保存済みの応答を使う（妥当なJSONだった応答だけを保存する）
+    features_cache_file=$(mktemp)
+    if prompt_cache_get "$features_prompt" "$features_cache_file"; then
+        debug_info "保存済みの応答を使用します"
+        features_json_response=$(cat "$features_cache_file")
+        add_token_usage_file "$features_prompt" "$features_cache_file" "機能リスト生成" cached > /dev/null
+    else
+        features_json_response=$(echo "$features_prompt" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" 2>&1)
+        printf '%s\n' "$features_json_response" > "$features_cache_file"
+        add_token_usage_file "$features_prompt" "$features_cache_file" "機能リスト生成" > /dev/null
+    fi
+    rm -f "$features_cache_file"
     
     # 応答の検証
     if [ -z "$features_json_response" ]; then
@@ -385,6 +402,7 @@ $(cat "$DESIGN_FILE")
         if command -v jq &> /dev/null; then
             if jq empty "$temp_json" 2>/dev/null && jq '.features' "$temp_json" >/dev/null 2>&1; then
                 cp "$temp_json" "$FEATURES_JSON_PATH"
+                prompt_cache_put "$features_prompt" "$temp_json"
                 echo -e "${GREEN}features.jsonを正常に生成しました${NC}" >&2
             else
                 echo -e "${RED}エラー: 生成されたJSONが無効です${NC}" >&2
@@ -401,6 +419,7 @@ $(cat "$DESIGN_FILE")
             # Python でのチェック
             if python3 -c "import json; json.load(open('$temp_json'))" 2>/dev/null; then
                 cp "$temp_json" "$FEATURES_JSON_PATH"
+                prompt_cache_put "$features_prompt" "$temp_json"
                 echo -e "${GREEN}features.jsonを正常に生成しました${NC}" >&2
             else
                 echo -e "${RED}エラー: 生成されたJSONが無効です${NC}" >&2
@@ -634,6 +653,45 @@ if [ ${#selected_indices[@]} -eq 0 ]; then
     done
 fi
 
+# features 配列の位置の機能ID（features.json の機能はそのID、旧形式は位置から作る）
+feature_id_at() {
+    local feature="${features[$1]}"
+    if [[ "$feature" =~ ^feature_[0-9]+: ]]; then
+        echo "${feature%%:*}"
+    else
+        printf "feature_%03d\n" $(($1 + 1))
+    fi
+}
+
+# 再開: 進捗の記録で完了済みの機能を飛ばす（RESUME_FROM_FEATURE を指定した場合はそれより前の機能も飛ばす）
+PROGRESS_PROJECT="$IMPLEMENTATION_DIR"
+if [ "${CLAUDEFLOW_RESUME:-false}" = "true" ] || [ -n "${RESUME_FROM_FEATURE:-}" ]; then
+    declare -A completed_features=()
+    while read -r completed_id; do
+        [ -n "$completed_id" ] && completed_features[$completed_id]=1
+    done < <(claudeflow_call progress --db "$PROGRESS_DB" completed --project "$PROGRESS_PROJECT" 2>/dev/null)
+    
+    before_resume_point=""
+    for idx in "${selected_indices[@]}"; do
+        [ "$(feature_id_at "$idx")" = "${RESUME_FROM_FEATURE:-}" ] && before_resume_point=true
+    done
+    resumed_indices=()
+    for idx in "${selected_indices[@]}"; do
+        resume_id=$(feature_id_at "$idx")
+        [ "$resume_id" = "${RESUME_FROM_FEATURE:-}" ] && before_resume_point=""
+        if [ -n "$before_resume_point" ] || [ -n "${completed_features[$resume_id]:-}" ]; then
+            echo -e "${YELLOW}スキップ（完了済み）: $resume_id${NC}"
+            continue
+        fi
+        resumed_indices+=("$idx")
+    done
+    selected_indices=("${resumed_indices[@]}")
+    if [ ${#selected_indices[@]} -eq 0 ]; then
+        echo -e "${GREEN}すべての機能が完了しています${NC}"
+        exit 0
+    fi
+fi
+
 echo -e "${CYAN}=== 実装予定機能一覧 ===${NC}"
 for idx in "${selected_indices[@]}"; do
     feature="${features[$idx]}"
@@ -647,24 +705,13 @@ done
 echo -e "${GREEN}合計 ${#selected_indices[@]}個の機能を実装します${NC}"
 echo ""
 
-# 各機能の実装
-feature_index=0
-selected_count=${#selected_indices[@]}
-processed_count=0
-# 環境変数が設定されていても、クリーン実行を強制
-skip_until_feature=""
-
-for i in "${!features[@]}"; do
+# 1機能の実装（仕様生成からメトリクス記録まで）
+# 4番目の引数が features 配列内の位置。並列実装では機能ごとのプロセスで呼ばれる
+implement_feature_at() {
+    local i=$4
     feature="${features[$i]}"
     feature_index=$((i + 1))
     
-    # 選択された機能でない場合はスキップ
-    if [[ ! " ${selected_indices[@]} " =~ " ${i} " ]]; then
-        continue
-    fi
-    
-    processed_count=$((processed_count + 1))
-    
     # features.jsonから読み込んだ場合はIDを使用
     if [[ "$feature" =~ ^feature_[0-9]+: ]]; then
         feature_id=$(echo "$feature" | cut -d: -f1)
@@ -688,12 +735,14 @@ for i in "${!features[@]}"; do
     #     fi
     # fi
     
-    # 機能の開始時刻を記録
+    # 機能の開始時刻を記録（以降のイベントログはこの機能のものとして記録）
     feature_start_time=$(date +"%Y-%m-%d %H:%M:%S")
+    CURRENT_FEATURE_ID="$feature_id"
     
     # 機能実装開始表示
     show_feature_start "$processed_count" "$selected_count" "$feature_name"
     log_step "機能実装: $feature_id - $feature_name" "START"
+    log_progress_start "$feature_id" "$feature_name"
     
     # ステップ1: 機能仕様生成
     show_step "1" "機能仕様生成"
@@ -715,7 +764,7 @@ $(cat "$REQUIREMENTS_FILE")
 $(cat "$DESIGN_FILE")
 
 既存パターン:
-$(cat "$PATTERNS_FILE")"
+$(select_patterns "$PATTERNS_FILE" "$feature")"
 
     # コア機能モードの場合の追加指示
     if [ "$is_core_mode" = true ]; then
@@ -888,7 +937,7 @@ ${quality_criteria}とします。
 ## 改善提案
 （具体的な改善内容）"
 
-        validation_response=$(echo "$validation_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep')
+        validation_response=$(echo "$validation_prompt" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS")
         echo "$validation_response" > "$IMPLEMENTATION_DIR/${feature_id}_validation_$iteration.md"
         
         # 合格判定をチェック
@@ -913,8 +962,10 @@ $(cat "$IMPLEMENTATION_DIR/${feature_id}_validation_$iteration.md")
 
 改善されたコード全体を出力してください。"
 
-            improvement_response=$(echo "$improvement_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep')
+            improvement_response=$(echo "$improvement_prompt" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS")
+            watch_mark=$(validation_watch_mark)
             echo "$improvement_response" > "$IMPLEMENTATION_DIR/${feature_id}_impl.ts"
+            show_validation_delta "$watch_mark"
         fi
     done
     
@@ -998,7 +1049,8 @@ $test_requirements"
 $(cat "$IMPLEMENTATION_DIR/${feature_id}_impl.ts")
 
 既存パターン:
-$(cat "$PATTERNS_FILE")
+$(select_patterns "$PATTERNS_FILE" "$feature
+$(cat "$IMPLEMENTATION_DIR/${feature_id}_impl.ts")")
 
 品質検証結果:
 $(cat "$IMPLEMENTATION_DIR/${feature_id}_validation_$iteration.md")
@@ -1008,7 +1060,7 @@ $(cat "$IMPLEMENTATION_DIR/${feature_id}_validation_$iteration.md")
 - パフォーマンス最適化
 - 既存パターンの活用"
 
-    refactor_response=$(echo "$refactor_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep')
+    refactor_response=$(echo "$refactor_prompt" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS")
     echo "$refactor_response" > "$IMPLEMENTATION_DIR/${feature_id}_refactored.ts"
     show_step_complete "リファクタリング" "リファクタリング完了"
     fi  # リファクタリングのif文を閉じる
@@ -1029,7 +1081,7 @@ $(cat "$TESTS_DIR/${feature_id}_test.ts")
 - パフォーマンステスト
 - セキュリティテスト（該当する場合）"
 
-    comprehensive_test_response=$(echo "$comprehensive_test_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep')
+    comprehensive_test_response=$(echo "$comprehensive_test_prompt" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS")
     echo "$comprehensive_test_response" > "$TESTS_DIR/${feature_id}_comprehensive_test.ts"
     show_step_complete "包括的テスト" "包括的テスト完了"
     else
@@ -1054,7 +1106,7 @@ $(cat "$IMPLEMENTATION_DIR/${feature_id}_refactored.ts")
 - 使用例"
 
     # エラーハンドリング付きで実行
-    if optimize_response=$(echo "$optimize_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' 2>&1); then
+    if optimize_response=$(echo "$optimize_prompt" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" 2>&1); then
         echo "$optimize_response" > "$IMPLEMENTATION_DIR/${feature_id}_final.ts"
         show_step_complete "最適化とAPI仕様生成" "最適化完了"
     else
@@ -1094,10 +1146,10 @@ $(cat "$IMPLEMENTATION_DIR/${feature_id}_final.ts")
 コード例
 \`\`\`"
 
-    pattern_response=$(echo "$pattern_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep')
-    echo "" >> "$PATTERNS_FILE"
-    echo "### $feature のパターン" >> "$PATTERNS_FILE"
-    echo "$pattern_response" >> "$PATTERNS_FILE"
+    pattern_response=$(echo "$pattern_prompt" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS")
+    # 並列実装では他の機能も同じライブラリに追記するため、節をまとめて1回で（ロックして）書き込む
+    printf '\n### %s のパターン\n%s\n' "$feature" "$pattern_response" \
+        | claudeflow_call -i patternindex append "$PATTERNS_FILE" > /dev/null || true
     show_step_complete "パターンライブラリ更新" "パターン更新完了"
     else
         show_step "8" "パターンライブラリ更新 - スキップ（${IMPLEMENTATION_LEVEL}レベル）"
@@ -1132,36 +1184,76 @@ $(cat "$IMPLEMENTATION_DIR/${feature_id}_final.ts")
     show_feature_complete "$feature_name"
     
     # 進捗を記録
-    log_progress "$feature_id" "$feature_name" "$feature_start_time" "$feature_end_time" "SUCCESS" ""
+    log_progress "$feature_id" "$feature_name" "$feature_start_time" "$feature_end_time" "SUCCESS" "" "feature" "$loc"
     log_step "機能実装: $feature_id - $feature_name" "SUCCESS"
-    
-    # 自動継続（環境変数で制御可能）
-    if [ "${AUTO_CONTINUE:-true}" = "false" ]; then
-        # 確認モード（環境変数で明示的に無効化された場合）
-        if [ $feature_index -lt ${#features[@]} ]; then
-            echo -n "次の機能に進みますか？ (y/n/p[ause]): "
-            read -r continue_choice
-            if [ "$continue_choice" = "n" ]; then
-                echo "実装を中断しました。"
-                break
-            elif [ "$continue_choice" = "p" ]; then
-                echo "一時停止します。続行するにはEnterを押してください..."
-                read -r
-            fi
+    CURRENT_FEATURE_ID=""
+}
+
+# 各機能の実装
+feature_index=0
+selected_count=${#selected_indices[@]}
+processed_count=0
+# 環境変数が設定されていても、クリーン実行を強制
+skip_until_feature=""
+
+# 改善ループで書き換えられたファイルだけを再検証する（CLAUDEFLOW_VALIDATION_WATCH=falseで無効）
+start_validation_watch "$IMPLEMENTATION_DIR"
+trap stop_validation_watch EXIT
+
+if [ "$CLAUDEFLOW_PARALLEL_JOBS" -gt 1 ] 2>/dev/null && [ -f "$FEATURES_JSON_PATH" ] && [ "$selected_count" -gt 1 ]; then
+    # 依存関係のない機能を同時に実装する（各機能のログは .claudeflow/logs）
+    echo -e "${BLUE}${CLAUDEFLOW_PARALLEL_JOBS}並列で実装します${NC}"
+    selected_ids=""
+    for i in "${selected_indices[@]}"; do
+        selected_ids+="${selected_ids:+,}$(echo "${features[$i]}" | cut -d: -f1)"
+    done
+    run_features_parallel "$FEATURES_JSON_PATH" "$(dirname "$IMPLEMENTATION_DIR")" implement_feature_at "$selected_ids" \
+        features feature_selection selected_count IMPLEMENTATION_DIR TESTS_DIR IMPLEMENTATION_LEVEL \
+        REQUIREMENTS_FILE DESIGN_FILE CONTEXT_FILE PATTERNS_FILE METRICS_FILE || \
+        echo -e "${YELLOW}一部の機能の実装に失敗しました${NC}"
+    processed_count=$selected_count
+else
+    for i in "${!features[@]}"; do
+        feature="${features[$i]}"
+        feature_index=$((i + 1))
+        
+        # 選択された機能でない場合はスキップ
+        if [[ ! " ${selected_indices[@]} " =~ " ${i} " ]]; then
+            continue
         fi
-    else
-        # 自動実行モード（デフォルト）
-        if [ $feature_index -lt ${#features[@]} ]; then
-            remaining=$((${#features[@]} - feature_index))
-            if [ "$CLAUDEFLOW_QUIET_MODE" != "true" ]; then
-                echo -e "${CYAN}→ 自動的に次の機能へ進みます（残り: $remaining 機能）${NC}"
-                echo ""
-                # 短い遅延を入れて進捗を確認しやすくする
-                sleep 2
+        
+        processed_count=$((processed_count + 1))
+        implement_feature_at "" "" "" "$i"
+        
+        # 自動継続（環境変数で制御可能）
+        if [ "${AUTO_CONTINUE:-true}" = "false" ]; then
+            # 確認モード（環境変数で明示的に無効化された場合）
+            if [ $feature_index -lt ${#features[@]} ]; then
+                echo -n "次の機能に進みますか？ (y/n/p[ause]): "
+                read -r continue_choice
+                if [ "$continue_choice" = "n" ]; then
+                    echo "実装を中断しました。"
+                    break
+                elif [ "$continue_choice" = "p" ]; then
+                    echo "一時停止します。続行するにはEnterを押してください..."
+                    read -r
+                fi
+            fi
+        else
+            # 自動実行モード（デフォルト）
+            if [ $feature_index -lt ${#features[@]} ]; then
+                remaining=$((${#features[@]} - feature_index))
+                if [ "$CLAUDEFLOW_QUIET_MODE" != "true" ]; then
+                    echo -e "${CYAN}→ 自動的に次の機能へ進みます（残り: $remaining 機能）${NC}"
+                    echo ""
+                    # 短い遅延を入れて進捗を確認しやすくする
+                    sleep 2
+                fi
             fi
         fi
-    fi
-done
+    done
+fi
+stop_validation_watch
 
 # 最終統合
 echo -e "${CYAN}================================================${NC}"
@@ -1203,7 +1295,7 @@ $(cat "$IMPLEMENTATION_DIR/integrated_implementation.ts")
 - データフロー
 - エンドツーエンドシナリオ"
 
-integration_test_response=$(echo "$integration_test_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep')
+integration_test_response=$(echo "$integration_test_prompt" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS")
 echo "$integration_test_response" > "$TESTS_DIR/integration_test.ts"
 
 # 最終レポート
@@ -49,7 +49,7 @@ generate_feature_list() {
     echo "$prompt" > "$IMPLEMENTATION_DIR/extract_features.md"
     
     # AIに機能リストを生成させる
-    cat "$IMPLEMENTATION_DIR/extract_features.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/features.json"
+    cat "$IMPLEMENTATION_DIR/extract_features.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/features.json"
 }
 
 # 個別機能の実装
@@ -63,19 +63,18 @@ implement_feature() {
     echo -e "${GREEN}実装開始: ${feature_name}${NC}"
     echo -e "${BLUE}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━${NC}"
     
-    # プロンプトを読み込んで変数を適用
-    local prompt=$(load_prompt "10_implement_feature")
-    prompt=$(apply_prompt_vars "$prompt" \
-        "feature_name" "$feature_name" \
-        "feature_description" "$feature_desc" \
-        "feature_id" "$feature_id" \
-        "design_content" "$(cat "$DESIGN_FILE")")
-    
-    echo "$prompt" > "$IMPLEMENTATION_DIR/implement_${feature_id}.md"
+    # プロンプトは main でまとめて展開済み（なければここで展開する）
+    if [ ! -f "$IMPLEMENTATION_DIR/implement_${feature_id}.md" ]; then
+        render_prompt "10_implement_feature" \
+            "feature_name" "$feature_name" \
+            "feature_description" "$feature_desc" \
+            "feature_id" "$feature_id" \
+            "design_content" "$(cat "$DESIGN_FILE")" > "$IMPLEMENTATION_DIR/implement_${feature_id}.md"
+    fi
     
     # AIに実装させる
     echo -e "${YELLOW}実装中...${NC}"
-    cat "$IMPLEMENTATION_DIR/implement_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/${feature_id}_implementation.md"
+    cat "$IMPLEMENTATION_DIR/implement_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/${feature_id}_implementation.md"
     
     # 構文エラーチェック
     if [ "${CLAUDEFLOW_AUTO_VALIDATE:-true}" = "true" ]; then
@@ -105,7 +104,7 @@ $(cat "$IMPLEMENTATION_DIR/${feature_id}_implementation.md")
 - エラーパターンを避ける（DOM要素チェック、配列境界チェックなど）
 - 元の機能を保持"
             
-            echo "$fix_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/${feature_id}_implementation.md"
+            echo "$fix_prompt" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/${feature_id}_implementation.md"
             log_success "構文エラーを修正しました"
         else
             log_success "検証合格"
@@ -133,7 +132,7 @@ run_feature_tests() {
     
     # テスト実行
     echo -e "${YELLOW}テスト実行中...${NC}"
-    cat "$TESTS_DIR/test_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$TESTS_DIR/${feature_id}_test_result.md"
+    cat "$TESTS_DIR/test_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$TESTS_DIR/${feature_id}_test_result.md"
     
     # テスト結果の確認
     if grep -q "FAIL" "$TESTS_DIR/${feature_id}_test_result.md"; then
@@ -142,7 +141,7 @@ run_feature_tests() {
         
         # 修正するか確認
         echo -e "${YELLOW}修正を試みますか？ (y/n)${NC}"
-        read -n 1 fix_confirm
+        read -n 1 fix_confirm || true
         echo ""
         
         if [[ $fix_confirm =~ ^[Yy]$ ]]; then
@@ -170,13 +169,23 @@ fix_implementation() {
     echo "$prompt" > "$IMPLEMENTATION_DIR/fix_${feature_id}.md"
     
     # 修正実行
-    cat "$IMPLEMENTATION_DIR/fix_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$IMPLEMENTATION_DIR/${feature_id}_implementation_fixed.md"
+    cat "$IMPLEMENTATION_DIR/fix_${feature_id}.md" | claude --print --dangerously-skip-permissions --allowedTools "$CLAUDE_ALLOWED_TOOLS" > "$IMPLEMENTATION_DIR/${feature_id}_implementation_fixed.md"
     mv "$IMPLEMENTATION_DIR/${feature_id}_implementation_fixed.md" "$IMPLEMENTATION_DIR/${feature_id}_implementation.md"
     
     # 再テスト
     run_feature_tests "$feature_id" "$feature_name"
 }
 
+# 1機能の実装とテスト（並列実装では機能ごとのプロセスで呼ばれ、確認の入力は行わない）
+implement_and_test_feature() {
+    local feature_id=$1
+    local feature_name=$2
+    local feature_desc=$3
+    
+    implement_feature "$feature_id" "$feature_name" "$feature_desc"
+    run_feature_tests "$feature_id" "$feature_name" < /dev/null
+}
+
 # 進捗表示
 show_progress() {
     local current=$1
@@ -202,45 +211,40 @@ main() {
     echo -e "${BLUE}機能リストを生成中...${NC}"
     generate_feature_list
     
-    # JSONから機能リストを抽出
-    if command -v jq &> /dev/null; then
-        # jqが利用可能な場合
-        features=$(jq -r '.features[]' "$IMPLEMENTATION_DIR/features.json")
-        total_features=$(echo "$features" | jq -s 'length')
-    else
-        # jqが利用できない場合はPythonを使用
-        echo -e "${YELLOW}jqが見つかりません。Pythonを使用してJSONを解析します...${NC}"
-        features=$(python3 -c "
-import json
-with open('$IMPLEMENTATION_DIR/features.json', 'r') as f:
-    data = json.load(f)
-    for feature in data['features']:
-        print(json.dumps(feature))
-")
-        total_features=$(python3 -c "
-import json
-with open('$IMPLEMENTATION_DIR/features.json', 'r') as f:
-    data = json.load(f)
-    print(len(data['features']))
-")
-    fi
+    # features.jsonを1回だけ解析し、全機能のID・名前・説明を配列に読み込む
+    eval "$(claudeflow_call features "$IMPLEMENTATION_DIR/features.json" --format declare --fields id,name,description)"
+    total_features=${features_count:-0}
     current=0
     
     echo -e "${GREEN}実装する機能数: ${total_features}${NC}"
     echo ""
     
-    # 各機能を実装
-    echo "$features" | while read -r feature; do
-        if command -v jq &> /dev/null; then
-            feature_id=$(echo "$feature" | jq -r '.id')
-            feature_name=$(echo "$feature" | jq -r '.name')
-            feature_desc=$(echo "$feature" | jq -r '.description')
-        else
-            # Pythonを使用してJSONを解析
-            feature_id=$(echo "$feature" | python3 -c "import json,sys; print(json.load(sys.stdin)['id'])")
-            feature_name=$(echo "$feature" | python3 -c "import json,sys; print(json.load(sys.stdin)['name'])")
-            feature_desc=$(echo "$feature" | python3 -c "import json,sys; print(json.load(sys.stdin)['description'])")
-        fi
+    # 全機能の実装プロンプトを1回の呼び出しで展開する（テンプレートの解析も1回）
+    rm -f "$IMPLEMENTATION_DIR"/implement_*.md
+    render_prompts_batch "10_implement_feature" "$IMPLEMENTATION_DIR/features.json" "$IMPLEMENTATION_DIR" \
+        'implement_${feature_id}.md' "design_content" "$(cat "$DESIGN_FILE")" || \
+        log_warning "実装プロンプトの一括展開に失敗しました（機能ごとに展開します）"
+    
+    # 並列実装: 依存関係のない機能を同時に実装する（各機能のログは $PROJECT_DIR/.claudeflow/logs）
+    if [ "$CLAUDEFLOW_PARALLEL_JOBS" -gt 1 ] 2>/dev/null && [ "$total_features" -gt 1 ]; then
+        echo -e "${BLUE}${CLAUDEFLOW_PARALLEL_JOBS}並列で実装します${NC}"
+        local ids
+        ids=$(IFS=,; echo "${features_id[*]}")
+        run_features_parallel "$IMPLEMENTATION_DIR/features.json" "$PROJECT_DIR" implement_and_test_feature "$ids" \
+            PROJECT_DIR IMPLEMENTATION_DIR TESTS_DIR REQUIREMENTS_FILE DESIGN_FILE || \
+            log_warning "一部の機能の実装に失敗しました"
+        echo ""
+        echo -e "${CYAN}=====================================${NC}"
+        echo -e "${GREEN}インクリメンタル実装完了！${NC}"
+        echo -e "${CYAN}=====================================${NC}"
+        return
+    fi
+    
+    # 各機能を実装（パイプを使わないため、確認の read は端末から読む）
+    for i in "${!features_id[@]}"; do
+        feature_id="${features_id[$i]}"
+        feature_name="${features_name[$i]}"
+        feature_desc="${features_description[$i]}"
         
         current=$((current + 1))
         
@@ -256,7 +260,7 @@ with open('$IMPLEMENTATION_DIR/features.json', 'r') as f:
         # 次の機能に進むか確認
         if [ $current -lt $total_features ]; then
             echo -e "${YELLOW}次の機能に進みますか？ (y/n/a=全自動)${NC}"
-            read -n 1 continue_confirm
+            read -n 1 continue_confirm || true
             echo ""
             
             if [[ $continue_confirm =~ ^[Nn]$ ]]; then
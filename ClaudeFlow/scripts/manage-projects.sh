@@ -63,6 +63,12 @@ list_projects() {
         backup_name=$(basename "$backup_dir")
         echo "  $backup_name"
     done || echo "  なし"
+
+    # clean-development.sh --backup のスナップショット
+    local snapshot_dir="${CLAUDEFLOW_SNAPSHOT_DIR:-$PROJECT_ROOT/.snapshots}"
+    if [ -d "$snapshot_dir/snapshots" ]; then
+        claudeflow_call snapshot --store "$snapshot_dir" list | sed 's/^/  /'
+    fi
 }
 
 show_current() {
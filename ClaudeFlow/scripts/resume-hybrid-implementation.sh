@@ -4,8 +4,8 @@
 
 set -e
 
-# デフォルトは feature_002 から開始
-START_FEATURE="${1:-feature_002}"
+# 開始機能を省略すると、進捗の記録で完了済みの機能を飛ばして未完了の最初の機能から再開する
+START_FEATURE="${1:-}"
 REQUIREMENTS_FILE="${2:-../results/03_requirements_result.md}"
 DESIGN_FILE="${3:-../results/05_design_result.md}"
 
@@ -13,10 +13,11 @@ echo "================================================"
 echo "    ハイブリッド実装の再開"
 echo "================================================"
 echo ""
-echo "開始機能: $START_FEATURE"
+echo "開始機能: ${START_FEATURE:-未完了の最初の機能}"
 echo ""
 
 # 環境変数を設定して実行
+export CLAUDEFLOW_RESUME=true
 export RESUME_FROM_FEATURE="$START_FEATURE"
 
 # hybrid-implementation.sh を実行
@@ -44,7 +44,7 @@ log_error() {
 }
 
 # プロジェクトルート
-PROJECT_ROOT="$(dirname "$0")/.."
+PROJECT_ROOT="$(cd "$(dirname "$0")/.." && pwd)"
 TASKS_DIR="$PROJECT_ROOT/tasks"
 RESULTS_DIR="$PROJECT_ROOT/results"
 
@@ -59,7 +59,8 @@ case "${CLAUDEFLOW_MODE:-standard}" in
             "03_requirements:要件定義フェーズ"
             "06_implementation:実装フェーズ"
         )
-        echo -e "${YELLOW}🚀 超軽量モード: 3フェーズで実行${NC}"
+        pipeline_mode="ultra_light"
+        mode_message="${YELLOW}🚀 超軽量モード: 3フェーズで実行${NC}"
         ;;
     "light")
         phases=(
@@ -69,7 +70,8 @@ case "${CLAUDEFLOW_MODE:-standard}" in
             "06_implementation:実装フェーズ"
             "07_testing:テストフェーズ"
         )
-        echo -e "${BLUE}⚡ 軽量モード: 5フェーズで実行${NC}"
+        pipeline_mode="light"
+        mode_message="${BLUE}⚡ 軽量モード: 5フェーズで実行${NC}"
         ;;
     *)
         phases=(
@@ -83,41 +85,32 @@ case "${CLAUDEFLOW_MODE:-standard}" in
             "08_code_review:コードレビューフェーズ"
             "09_documentation:ドキュメント生成フェーズ"
         )
-        echo -e "${GREEN}📋 標準モード: 9フェーズで実行${NC}"
+        pipeline_mode="standard"
+        mode_message="${GREEN}📋 標準モード: 9フェーズで実行${NC}"
         ;;
 esac
 
-# 初期入力ファイル（プロジェクトアイデアなど）
-INITIAL_INPUT="${1:-}"
-
-# トークン追跡を初期化
-init_token_tracking
-
-# 初期入力がある場合は、まずプロジェクトを分析してタスクファイルを生成
-if [ -n "$INITIAL_INPUT" ] && [ -f "$INITIAL_INPUT" ]; then
-    log_info "プロジェクトを分析してタスクファイルを生成中..."
-    "$PROJECT_ROOT/scripts/analyze-and-generate.sh" "$INITIAL_INPUT"
-    
-    if [ $? -ne 0 ]; then
-        log_error "タスクファイルの生成に失敗しました"
-        exit 1
-    fi
-    log_success "タスクファイルの生成が完了しました"
-    echo ""
-fi
-
-# 各フェーズを実行
-current_phase=0
-total_phases=${#phases[@]}
+# 依存するフェーズの結果を入力ファイルに追加する
+# claudeflow.pipeline が CLAUDEFLOW_PHASE_INPUTS に「見出し\tパス」を1行ずつ渡す（tasks/*.md の「## 入力」から決まる）
+append_phase_inputs() {
+    local temp_input="$1"
+    local label path
+    while IFS=$'\t' read -r label path; do
+        [ -n "$path" ] && [ -f "$path" ] || continue
+        echo -e "\n\n---\n# $label\n" >> "$temp_input"
+        cat "$path" >> "$temp_input"
+    done <<< "${CLAUDEFLOW_PHASE_INPUTS:-}"
+}
 
-for phase in "${phases[@]}"; do
-    IFS=':' read -r phase_file phase_name <<< "$phase"
-    current_phase=$((current_phase + 1))
+# 1つのフェーズを実行する（claudeflow.pipeline から run-pipeline.sh --phase ID で呼ばれる）
+run_phase() {
+    local phase_file="$1"
+    local phase_name="$2"
     
     phase_start "$phase_name"
     
-    task_file="$TASKS_DIR/${phase_file}.md"
-    result_file="$RESULTS_DIR/${phase_file}_result.md"
+    local task_file="$TASKS_DIR/${phase_file}.md"
+    local result_file="$RESULTS_DIR/${phase_file}_result.md"
     
     # タスクファイルの存在確認
     if [ ! -f "$task_file" ]; then
@@ -127,23 +120,12 @@ for phase in "${phases[@]}"; do
     
     # 要件定義フェーズの場合は特別な処理
     if [ "$phase_file" = "03_requirements" ]; then
-        # 環境変数が設定されている場合はそれを使用
-        if [ -n "$CLAUDEFLOW_REQ_LEVEL" ]; then
-            req_level="$CLAUDEFLOW_REQ_LEVEL"
-            echo -e "${GREEN}要件レベル「$req_level」を使用します（環境変数から設定済み）${NC}"
-        else
-            # 要件レベルを確認
-            echo -e "${YELLOW}要件定義フェーズです。どのレベルで実行しますか？${NC}"
-            echo "A) 最小要件（MVP最優先）- 必須機能のみ、簡潔な仕様書"
-            echo "B) 標準要件（バランス重視）- 基本機能 + 一部拡張機能"
-            echo "C) 詳細要件（品質重視）- 全機能の詳細定義、包括的な仕様書"
-            echo "D) カスタム要件 - 具体的な要件を手動指定"
-            echo -n "選択 (A-D): "
-            read req_level
-        fi
+        # 要件レベルは実行前に決めた設定（環境変数 > .claudeflow_config > 既定値）
+        local req_level="$CLAUDEFLOW_REQ_LEVEL"
+        echo -e "${GREEN}要件レベル「$req_level」を使用します${NC}"
         
         # 選択された要件レベルを入力に追加
-        temp_input=$(mktemp)
+        local temp_input=$(mktemp)
         cat "$task_file" > "$temp_input"
         echo -e "\n\n---\n# 選択された要件レベル: $req_level\n" >> "$temp_input"
         
@@ -170,19 +152,12 @@ for phase in "${phases[@]}"; do
                 ;;
         esac
         
-        # 前フェーズの結果を追加
-        if [ -f "$RESULTS_DIR/01_planning_result.md" ]; then
-            echo -e "\n\n---\n# 企画書\n" >> "$temp_input"
-            cat "$RESULTS_DIR/01_planning_result.md" >> "$temp_input"
-        fi
-        if [ -f "$RESULTS_DIR/02_research_result.md" ]; then
-            echo -e "\n\n---\n# 技術調査結果\n" >> "$temp_input"
-            cat "$RESULTS_DIR/02_research_result.md" >> "$temp_input"
-        fi
+        # 依存するフェーズの結果を追加
+        append_phase_inputs "$temp_input"
         
         # 実行（自動認証トークン追跡付き）
         log_info "実行中: $phase_name (要件レベル: $req_level)"
-        input_content=$(cat "$temp_input" | tr -d '\0')
+        local input_content=$(cat "$temp_input" | tr -d '\0')
         run_claude_auto_auth "$input_content" "$result_file" "$phase_name"
         
         # 一時ファイルを削除
@@ -205,26 +180,14 @@ for phase in "${phases[@]}"; do
             exit 1
         fi
         
-        continue
+        return 0
     fi
     
     # 実装フェーズの場合は特別な処理
     if [ "$phase_file" = "06_implementation" ]; then
-        # 環境変数が設定されている場合はそれを使用
-        if [ -n "$CLAUDEFLOW_IMPL_MODE" ]; then
-            impl_mode="$CLAUDEFLOW_IMPL_MODE"
-            echo -e "${GREEN}実装モード「$impl_mode」を使用します（環境変数から設定済み）${NC}"
-        else
-            # 実装モードを確認
-            echo -e "${YELLOW}実装フェーズです。どのモードで実行しますか？${NC}"
-            echo "1) コンテキストエンジニアリング（実装→リファクタ→テスト）"
-            echo "2) インクリメンタル（機能ごとに実装・テスト）"
-            echo "3) 自動インクリメンタル（完全自動修正）"
-            echo "4) ハイブリッド（CE + インクリメンタル）- 推奨"
-            echo "5) 通常モード（すべて一度に実装）"
-            echo -n "選択 (1-5): "
-            read impl_mode
-        fi
+        # 実装モードは実行前に決めた設定（環境変数 > .claudeflow_config > 既定値）
+        local impl_mode="$CLAUDEFLOW_IMPL_MODE"
+        echo -e "${GREEN}実装モード「$impl_mode」を使用します${NC}"
         
         if [ "$impl_mode" = "1" ]; then
             log_info "コンテキストエンジニアリング実装モードで実行"
@@ -250,7 +213,7 @@ for phase in "${phases[@]}"; do
                 log_error "実装結果ファイルが見つかりません"
                 exit 1
             fi
-            continue
+            return 0
         elif [ "$impl_mode" = "2" ]; then
             log_info "インクリメンタル実装モードで実行"
             # インクリメンタル実装スクリプトを実行
@@ -275,7 +238,7 @@ for phase in "${phases[@]}"; do
                 log_error "実装結果ファイルが見つかりません"
                 exit 1
             fi
-            continue
+            return 0
         elif [ "$impl_mode" = "3" ]; then
             log_info "自動インクリメンタル実装モードで実行"
             # 自動インクリメンタル実装スクリプトを実行
@@ -298,7 +261,7 @@ for phase in "${phases[@]}"; do
                 log_error "実装結果ファイルが見つかりません"
                 exit 1
             fi
-            continue
+            return 0
         elif [ "$impl_mode" = "4" ]; then
             log_info "ハイブリッド実装モードで実行"
             # ハイブリッド実装スクリプトを実行
@@ -334,33 +297,24 @@ for phase in "${phases[@]}"; do
                 echo "// Integration pending - no implementation files found" > "$result_file"
                 # エラーで終了せず、処理を継続
             fi
-            continue
+            return 0
         fi
     fi
     
     # Claudeコマンドの構築
     # ファイルを結合してClaudeに渡す
-    temp_input="$RESULTS_DIR/.temp_input_${phase_file}.md"
+    local temp_input="$RESULTS_DIR/.temp_input_${phase_file}.md"
     cat "$task_file" > "$temp_input"
     
-    # 前のフェーズの結果を入力として追加
-    if [ -n "$previous_result" ] && [ -f "$previous_result" ]; then
-        echo -e "\n\n---\n# 前のフェーズの結果\n" >> "$temp_input"
-        cat "$previous_result" >> "$temp_input"
-    fi
-    
-    # 初期入力ファイルがある場合（最初のフェーズのみ）
-    if [ -n "$INITIAL_INPUT" ] && [ "$phase_file" = "01_planning" ] && [ -f "$INITIAL_INPUT" ]; then
-        echo -e "\n\n---\n# ユーザー入力\n" >> "$temp_input"
-        cat "$INITIAL_INPUT" >> "$temp_input"
-    fi
+    # 依存するフェーズの結果（最初のフェーズはユーザー入力）を入力として追加
+    append_phase_inputs "$temp_input"
     
     # 実行（自動認証トークン追跡付き）
     if [ "$CLAUDEFLOW_QUIET_MODE" = "false" ]; then
         log_info "実行中: $phase_name"
     fi
     
-    input_content=$(cat "$temp_input" | tr -d '\0')
+    local input_content=$(cat "$temp_input" | tr -d '\0')
     run_claude_auto_auth "$input_content" "$result_file" "$phase_name"
     
     # 一時ファイルを削除
@@ -369,7 +323,7 @@ for phase in "${phases[@]}"; do
     # 結果確認
     if [ -s "$result_file" ]; then
         # 結果サマリを取得（最初の3行）
-        summary=$(head -n 3 "$result_file" | tr -d '\0' | tr '\n' ' ' | cut -c1-80)
+        local summary=$(head -n 3 "$result_file" | tr -d '\0' | tr '\n' ' ' | cut -c1-80)
         phase_complete "$phase_name" "$summary"
         
         # 詳細表示（通常モードのみ）
@@ -381,17 +335,84 @@ for phase in "${phases[@]}"; do
             fi
             echo -e "${CYAN}========================${NC}\n"
         fi
-        
-        previous_result="$result_file"
     else
         log_error "結果ファイルが空です: $result_file"
         exit 1
     fi
-    
-    # フェーズ間の待機（必要に応じて）
-    sleep 2
+}
+
+# フェーズ単体の実行
+if [ "${1:-}" = "--phase" ]; then
+    for phase in "${phases[@]}"; do
+        IFS=':' read -r phase_file phase_name <<< "$phase"
+        if [ "$phase_file" = "$2" ]; then
+            run_phase "$phase_file" "$phase_name"
+            exit $?
+        fi
+    done
+    log_error "不明なフェーズ: $2"
+    exit 1
+fi
+
+# 引数解析
+INITIAL_INPUT=""
+pipeline_jobs="${CLAUDEFLOW_PIPELINE_JOBS:-2}"
+pipeline_force=""
+while [[ $# -gt 0 ]]; do
+    case $1 in
+        --jobs|-j)
+            pipeline_jobs="$2"
+            shift 2
+            ;;
+        --force)
+            pipeline_force="--force"
+            shift
+            ;;
+        --status)
+            show_status="true"
+            shift
+            ;;
+        *)
+            # 初期入力ファイル（プロジェクトアイデアなど）
+            INITIAL_INPUT="$1"
+            shift
+            ;;
+    esac
 done
 
+echo -e "$mode_message"
+
+# フェーズの依存グラフ（設定は実行前に環境変数 > .claudeflow_config > 既定値の順で決める）
+PIPELINE_ARGS=(--tasks "$TASKS_DIR" --results "$RESULTS_DIR" --mode "$pipeline_mode"
+    --config "$PROJECT_ROOT/.claudeflow_config")
+[ -n "$INITIAL_INPUT" ] && [ -f "$INITIAL_INPUT" ] && PIPELINE_ARGS+=(--input "$INITIAL_INPUT")
+
+if [ "${show_status:-false}" = "true" ]; then
+    claudeflow_py pipeline "${PIPELINE_ARGS[@]}" graph
+    exit $?
+fi
+
+# トークン追跡を初期化
+init_token_tracking
+
+# 初期入力がある場合は、まずプロジェクトを分析してタスクファイルを生成
+if [ -n "$INITIAL_INPUT" ] && [ -f "$INITIAL_INPUT" ]; then
+    log_info "プロジェクトを分析してタスクファイルを生成中..."
+    if ! "$PROJECT_ROOT/scripts/analyze-and-generate.sh" "$INITIAL_INPUT"; then
+        log_error "タスクファイルの生成に失敗しました"
+        exit 1
+    fi
+    log_success "タスクファイルの生成が完了しました"
+    echo ""
+fi
+
+# 依存の終わったフェーズから実行する（入力の変わっていないフェーズは省略、独立したフェーズは並列）
+if ! claudeflow_py pipeline "${PIPELINE_ARGS[@]}" run --jobs "$pipeline_jobs" $pipeline_force \
+        -- bash "$SCRIPT_DIR/run-pipeline.sh" --phase; then
+    log_error "失敗したフェーズがあります。修正後に再実行すると完了したフェーズを省略して再開します"
+    exit 1
+fi
+
 log_success "すべてのフェーズが完了しました！"
 log_info "結果は $RESULTS_DIR に保存されています"
 
@@ -410,6 +431,7 @@ fi
 echo ""
 echo -e "${CYAN}=== 最終トークン使用量 ===${NC}"
 show_token_usage 0 "合計"
+show_token_report phase
 echo -e "${CYAN}========================${NC}"
 
 # セキュリティサマリー表示
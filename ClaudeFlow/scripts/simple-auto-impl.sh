@@ -65,6 +65,8 @@ init_token_tracking
 for feature in "${features[@]}"; do
     IFS=':' read -r feature_id feature_name <<< "$feature"
     current_feature=$((current_feature + 1))
+    # トークン使用量を機能ごとに集計するため、台帳の記録に機能IDを付ける
+    export CLAUDEFLOW_FEATURE_ID="$feature_id"
     
     echo -e "\n${BLUE}実装中: ${feature_name}${NC}"
     
@@ -172,6 +174,7 @@ echo ""
 echo ""
 echo -e "${CYAN}=== 最終トークン使用量 ===${NC}"
 show_token_usage 0 "合計"
+show_token_report feature
 echo -e "${CYAN}========================${NC}"
 
 # セキュリティサマリー表示
@@ -58,7 +58,7 @@ echo "✅ safe_claude_execモックテスト完了"
 echo ""
 echo "=== テスト結果 ==="
 echo "ログファイル: $LOG_FILE"
-echo "進捗CSV: $PROGRESS_CSV"
+echo "進捗の記録: $PROGRESS_DB"
 
 echo ""
 echo "ログ内容の確認:"
@@ -73,19 +73,10 @@ done
 echo ""
 echo -e "${BLUE}ローマ字変換フォールバックテスト:${NC}"
 
-# Python3が利用可能かチェック
-if command -v python3 >/dev/null 2>&1; then
-    echo -e "${GREEN}✓ Python3が利用可能です${NC}"
-else
-    echo -e "${YELLOW}⚠ Python3が利用できません。基本的なsed変換のみ使用されます${NC}"
-fi
-echo ""
-
-# ローマ字変換のテスト
-for test_name in "${test_cases[@]}"; do
-    result=$(extract_project_name "" "test" "$test_name")
+# ローマ字変換のテスト（1回の呼び出しでまとめて変換する）
+while IFS=$'\t' read -r test_name result; do
     echo -e "  \"$test_name\" → ${CYAN}\"$result\"${NC}"
-done
+done < <(printf '%s\n' "${test_cases[@]}" | claudeflow_call -i appname batch)
 
 echo ""
 echo -e "${BLUE}特殊なケースのテスト:${NC}"
@@ -106,10 +97,9 @@ special_cases=(
     "🎮絵文字入り"
 )
 
-for test_name in "${special_cases[@]}"; do
-    result=$(extract_project_name "" "test" "$test_name")
+while IFS=$'\t' read -r test_name result; do
     echo -e "  \"$test_name\" → ${YELLOW}\"$result\"${NC}"
-done
+done < <(printf '%s\n' "${special_cases[@]}" | claudeflow_call -i appname batch)
 
 echo ""
 echo -e "${CYAN}=== テスト完了 ===${NC}"
\ No newline at end of file
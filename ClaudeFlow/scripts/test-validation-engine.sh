@@ -0,0 +1,1026 @@
+#!/bin/bash
+
+# 統合検証エンジン（claudeflow.validation）のテスト
+# 一時ディレクトリにHTMLを生成してCLIの検出結果を確認します
+
+# カラー定義
+RED='\033[0;31m'
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+NC='\033[0m'
+
+SCRIPTS_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+source "$SCRIPTS_DIR/common-functions.sh"
+
+TEST_DIR="/tmp/claudeflow_validation_test_$$"
+mkdir -p "$TEST_DIR"
+trap 'rm -rf "$TEST_DIR"' EXIT
+
+PASSED=0
+FAILED=0
+
+test_function() {
+    local test_name="$1"
+    local test_code="$2"
+
+    echo -ne "テスト: $test_name ... "
+    if eval "$test_code" >/dev/null 2>&1; then
+        echo -e "${GREEN}合格${NC}"
+        ((PASSED++))
+    else
+        echo -e "${RED}失敗${NC}"
+        ((FAILED++))
+    fi
+}
+
+cat > "$TEST_DIR/good.html" << 'EOF'
+<!DOCTYPE html>
+<html>
+<head><meta charset="UTF-8"><title>ok</title></head>
+<body>
+<div id="app"></div>
+<script>
+const text = "ok";
+function start() {
+    document.getElementById('app').textContent = text;
+}
+</script>
+</body>
+</html>
+EOF
+
+cat > "$TEST_DIR/broken.html" << 'EOF'
+<!DOCTYPE html>
+<html>
+<head><title>ng</title></head>
+<body>
+<div id="a"><span></div>
+<p id="a"></p>
+<script>
+function start() {
+    if (true) {
+        console.log('x');
+}
+</script>
+</body>
+</html>
+EOF
+
+cat > "$TEST_DIR/literals.js" << 'EOF'
+const open = "({[";
+const close = ')}]';
+// コメント内の括弧 ) }
+/* ブロックコメント ] */
+const re = /[(\/]+\)/g;
+const half = total / 2 / (count || 1);
+const message = `${items.map((item) => `${item.name})`).join(', ')} {`;
+EOF
+
+cat > "$TEST_DIR/mismatch.js" << 'EOF'
+const label = "(";
+function draw() {
+    ctx.fillRect(0, 0, [width, height);
+}
+EOF
+
+echo -e "${YELLOW}=== 統合検証エンジン テスト ===${NC}\n"
+
+test_function "正常なHTMLはエラーなし" "
+    claudeflow_py validation '$TEST_DIR/good.html' --ruleset core,html.charset
+"
+
+test_function "エラーがあると終了コード1" "
+    ! claudeflow_py validation '$TEST_DIR/broken.html'
+"
+
+test_function "タグの不一致を検出" "
+    claudeflow_py validation '$TEST_DIR/broken.html' --json | grep -q '\"rule\": \"html.tags\"'
+"
+
+test_function "ID重複を検出" "
+    claudeflow_py validation '$TEST_DIR/broken.html' --json | grep -q 'html.duplicate_ids'
+"
+
+test_function "未閉じ括弧をファイル上の行番号で報告" "
+    claudeflow_py validation '$TEST_DIR/broken.html' --ruleset js.brackets --json \
+        | python3 -c 'import json,sys; r=json.load(sys.stdin); assert [f[\"line\"] for f in r[\"findings\"]] == [8]'
+"
+
+test_function "文字列・コメント・正規表現・テンプレート内の括弧は無視" "
+    claudeflow_py validation '$TEST_DIR/literals.js' --ruleset js.brackets
+"
+
+test_function "括弧の不一致を行と列で報告" "
+    claudeflow_py validation '$TEST_DIR/mismatch.js' --ruleset js.brackets --json \
+        | python3 -c 'import json,sys; r=json.load(sys.stdin); assert (3, 37) in [(f[\"line\"], f[\"col\"]) for f in r[\"findings\"]]'
+"
+
+test_function "ストリーミングでもチャンク境界をまたぐリテラルを解析" "
+    (cd '$SCRIPTS_DIR' && python3 -c '
+from claudeflow.validation import validate_file
+for name in (\"literals.js\", \"mismatch.js\"):
+    path = \"$TEST_DIR/\" + name
+    full = validate_file(path, \"js.brackets\")
+    for size in (1, 3, 7):
+        assert validate_file(path, \"js.brackets\", stream=True, chunk_size=size)[\"findings\"] == full[\"findings\"]
+')
+"
+
+test_function "既存スクリプトがエンジン経由で動作" "
+    (cd '$SCRIPTS_DIR' && python3 check_syntax.py '$TEST_DIR/good.html' | grep -q 'JavaScript基本構文は正常です')
+"
+
+test_function "ストリーミングでも同じ構造エラーを検出" "
+    (cd '$SCRIPTS_DIR' && python3 -c '
+from claudeflow.validation import validate_file
+rules = \"html.tags,html.duplicate_ids,js.brackets\"
+full = validate_file(\"$TEST_DIR/broken.html\", rules)
+streamed = validate_file(\"$TEST_DIR/broken.html\", rules, stream=True, chunk_size=5)
+assert full[\"findings\"] and full[\"findings\"] == streamed[\"findings\"]
+')
+"
+
+test_function "ストリーミングでは本文全体が必要なルールを省略" "
+    claudeflow_py validation '$TEST_DIR/good.html' --stream --json \
+        | python3 -c 'import json,sys; r=json.load(sys.stdin); assert r[\"streamed\"] and \"js.semicolons\" in r[\"skipped_rules\"]'
+"
+
+test_function "キャッシュ: 2回目は保存済みの結果を返す" "
+    claudeflow_py validation '$TEST_DIR/broken.html' --cache --cache-dir '$TEST_DIR/cache' --json > '$TEST_DIR/first.json' 2>/dev/null
+    claudeflow_py validation '$TEST_DIR/broken.html' --cache --cache-dir '$TEST_DIR/cache' --json 2>&1 >'$TEST_DIR/second.json' \
+        | grep -q 'ヒット 1 / ミス 0' && cmp -s '$TEST_DIR/first.json' '$TEST_DIR/second.json'
+"
+
+test_function "キャッシュ: 内容が変われば再検証" "
+    cp '$TEST_DIR/good.html' '$TEST_DIR/changing.html'
+    claudeflow_py validation '$TEST_DIR/changing.html' --cache --cache-dir '$TEST_DIR/cache' >/dev/null 2>&1
+    echo '<!-- changed -->' >> '$TEST_DIR/changing.html'
+    claudeflow_py validation '$TEST_DIR/changing.html' --cache --cache-dir '$TEST_DIR/cache' 2>&1 | grep -q 'ヒット 0 / ミス 1'
+"
+
+test_function "キャッシュ: 上限を超えると最終利用の古い順に削除" "
+    (cd '$SCRIPTS_DIR' && python3 -c '
+import os
+from claudeflow.validation.cache import ValidationCache
+cache = ValidationCache(\"$TEST_DIR/lru\", max_entries=2)
+for i, key in enumerate((\"a\" * 64, \"b\" * 64, \"c\" * 64)):
+    cache.put(key, i)
+    os.utime(cache._entry_path(key), (i, i))
+cache.get(\"a\" * 64)
+cache.close()
+assert cache.get(\"b\" * 64) is None and cache.get(\"a\" * 64) == 0 and cache.get(\"c\" * 64) == 2
+')
+"
+
+mkdir -p "$TEST_DIR/project/src" "$TEST_DIR/project/node_modules/lib"
+cp "$TEST_DIR/good.html" "$TEST_DIR/project/index.html"
+cp "$TEST_DIR/mismatch.js" "$TEST_DIR/project/src/draw.js"
+printf 'def broken(:\n    pass\n' > "$TEST_DIR/project/src/tool.py"
+echo 'const a = 1;' > "$TEST_DIR/project/node_modules/lib/ignored.js"
+
+test_function "一括検証: ワーカー数によらず同じレポート" "
+    claudeflow_py validation.batch '$TEST_DIR/project' --workers 1 > '$TEST_DIR/batch1.json'
+    claudeflow_py validation.batch '$TEST_DIR/project' --workers 3 > '$TEST_DIR/batch3.json'
+    cmp -s '$TEST_DIR/batch1.json' '$TEST_DIR/batch3.json'
+"
+
+test_function "一括検証: 相対パス順に統合しnode_modulesは対象外" "
+    python3 -c 'import json,sys; r=json.load(open(sys.argv[1])); assert [x[\"file\"] for x in r[\"reports\"]] == [\"index.html\", \"src/draw.js\", \"src/tool.py\"]' '$TEST_DIR/batch1.json'
+"
+
+test_function "一括検証: Python構文エラーをプロセスを起動せずに検出" "
+    python3 -c 'import json,sys; r=json.load(open(sys.argv[1])); assert r[\"failed_files\"] == [\"src/draw.js\", \"src/tool.py\"]' '$TEST_DIR/batch1.json'
+"
+
+test_function "validate_implementationが統合レポートを出力" "
+    CLAUDEFLOW_VALIDATION_CACHE='$TEST_DIR/impl-cache' bash -c 'source \"$SCRIPTS_DIR/common-functions.sh\"; validate_implementation \"$TEST_DIR/project\" \"$TEST_DIR/impl-reports\"'
+    [ -f '$TEST_DIR/impl-reports/validation_report.json' ] && [ -f '$TEST_DIR/impl-reports/validation_src_tool.py.txt' ] \
+        && grep -q 'エラー数: [1-9]' '$TEST_DIR/impl-reports/validation_summary.md'
+"
+
+cat > "$TEST_DIR/patterns.json" << 'EOF'
+{
+  "javascript": {
+    "eval_call": {"pattern": "\\beval\\(", "message": "evalの使用", "severity": "error"},
+    "slow": {"pattern": "\\[\\d+\\](?!.*?\\s*&&\\s*.*?\\[)", "message": "遅いパターン", "severity": "warning"}
+  },
+  "general": {
+    "broken": {"pattern": "([a-z]", "message": "不正なパターン", "severity": "error"}
+  }
+}
+EOF
+printf 'const a = 1;\nconst b = eval(code);\n' > "$TEST_DIR/eval.js"
+
+test_function "エラーパターン: 一致した行と列を報告" "
+    claudeflow_py validation.patterns '$TEST_DIR/eval.js' --patterns '$TEST_DIR/patterns.json' --json 2>/dev/null \
+        | python3 -c 'import json,sys; r=json.load(sys.stdin); assert [(m[\"name\"], m[\"line\"], m[\"col\"]) for m in r[\"matches\"]] == [(\"eval_call\", 2, 10)]'
+"
+
+test_function "エラーパターン: 不正なパターンを--checkで報告" "
+    claudeflow_py validation.patterns --check --patterns '$TEST_DIR/patterns.json' | grep -q '❌ general.broken'
+"
+
+test_function "エラーパターン: 時間予算を超えたパターンを打ち切る" "
+    python3 -c 'print(\"x = arr[1]\" + \" a &&\" * 3000)' > '$TEST_DIR/slow.js'
+    claudeflow_py validation.patterns '$TEST_DIR/slow.js' --patterns '$TEST_DIR/patterns.json' --budget 0.05 --json 2>/dev/null \
+        | python3 -c 'import json,sys; r=json.load(sys.stdin); assert r[\"timeouts\"] == [\"slow\"]'
+"
+
+test_function "差分検証: 変更されたファイルの新規・修正済みを報告" "
+    mkdir -p '$TEST_DIR/watch' && printf 'x = 1\n' > '$TEST_DIR/watch/a.py' && cp '$TEST_DIR/mismatch.js' '$TEST_DIR/watch/b.js'
+    (cd '$SCRIPTS_DIR' && python3 -c '
+import os
+from claudeflow.validation.watch import WatchSession
+session = WatchSession(\"$TEST_DIR/watch\", \"core,implementation\")
+session.scan()
+assert session.refresh([\"a.py\", \"b.js\"]) == []
+with open(\"$TEST_DIR/watch/a.py\", \"w\") as f:
+    f.write(\"def f(:\n\")
+os.utime(\"$TEST_DIR/watch/a.py\", ns=(1, 1))
+delta, = session.refresh([\"$TEST_DIR/watch/a.py\"])
+assert delta[\"file\"] == \"a.py\" and [f[\"rule\"] for f in delta[\"new\"]] == [\"syntax.python\"] and not delta[\"fixed\"]
+os.remove(\"$TEST_DIR/watch/a.py\")
+delta, = session.refresh([\"a.py\"])
+assert delta[\"status\"] == \"deleted\" and [f[\"rule\"] for f in delta[\"fixed\"]] == [\"syntax.python\"]
+')
+"
+
+test_function "差分検証: 依存ファイルの変更では該当ルールだけを再実行" "
+    cp '$TEST_DIR/patterns.json' '$TEST_DIR/watch-patterns.json'
+    printf 'const b = eval(code);\n' > '$TEST_DIR/watch/c.js'
+    (cd '$SCRIPTS_DIR' && CLAUDEFLOW_ERROR_PATTERNS='$TEST_DIR/watch-patterns.json' python3 -c '
+import json, os
+from claudeflow.validation.watch import WatchSession
+session = WatchSession(\"$TEST_DIR/watch\")
+session.scan()
+assert any(f.rule == \"runtime.patterns\" for f in session.files[\"c.js\"].findings())
+with open(\"$TEST_DIR/watch-patterns.json\", \"w\") as f:
+    json.dump({\"javascript\": {}}, f)
+os.utime(\"$TEST_DIR/watch-patterns.json\", ns=(1, 1))
+deltas = session.refresh([])
+assert [d[\"file\"] for d in deltas] == [\"c.js\"] and deltas[0][\"rules\"] == [\"runtime.patterns\"]
+assert [f[\"rule\"] for f in deltas[0][\"fixed\"]] == [\"runtime.patterns\"] and not deltas[0][\"new\"]
+')
+"
+
+test_function "差分検証: 監視中に保存すると差分をJSONで追記（ポーリング）" "
+    rm -f '$TEST_DIR/deltas.jsonl'
+    (cd '$SCRIPTS_DIR' && exec python3 -m claudeflow.validation.watch '$TEST_DIR/watch' --poll --interval 0.1 \
+        --jsonl '$TEST_DIR/deltas.jsonl' >/dev/null) &
+    watch_pid=\$!
+    sleep 1
+    printf 'def g(:\n' > '$TEST_DIR/watch/d.py'
+    for _ in \$(seq 50); do [ -s '$TEST_DIR/deltas.jsonl' ] && break; sleep 0.1; done
+    kill \$watch_pid
+    python3 -c 'import json,sys; d=json.loads(open(sys.argv[1]).readline()); assert d[\"file\"] == \"d.py\" and d[\"status\"] == \"added\" and d[\"new\"]' '$TEST_DIR/deltas.jsonl'
+"
+
+test_function "差分検証: show_validation_deltaが保存後の差分を表示" "
+    start_validation_watch '$TEST_DIR/watch' '$TEST_DIR/watch.log'
+    for _ in \$(seq 50); do grep -q '監視開始' '$TEST_DIR/watch.log' && break; sleep 0.1; done
+    mark=\$(validation_watch_mark)
+    printf 'x = 2\n' > '$TEST_DIR/watch/d.py'
+    show_validation_delta \"\$mark\" > '$TEST_DIR/delta.txt'
+    watch_pid=\$VALIDATION_WATCH_PID
+    stop_validation_watch
+    grep -q 'd.py: 変更' '$TEST_DIR/delta.txt' && grep -q '修正済み' '$TEST_DIR/delta.txt' && ! kill -0 \$watch_pid 2> /dev/null
+"
+
+export CLAUDEFLOW_DAEMON_SOCKET="$TEST_DIR/daemon/claudeflow.sock"
+CLAUDEFLOW_DAEMON_IDLE=30
+trap 'claudeflow_py daemon stop >/dev/null 2>&1; rm -rf "$TEST_DIR"' EXIT
+
+# ソケットが作られる（消える）まで最大5秒待つ
+wait_socket() {
+    local expected="$1" path="$2"
+    for _ in $(seq 50); do
+        if [ -S "$path" ] && [ "$expected" = "up" ]; then return 0; fi
+        if [ ! -S "$path" ] && [ "$expected" = "down" ]; then return 0; fi
+        sleep 0.1
+    done
+    return 1
+}
+
+test_function "常駐サーバー: 起動してJSONクエリに応答" "
+    claudeflow_daemon_start && wait_socket up '$CLAUDEFLOW_DAEMON_SOCKET'
+    [ \"\$(echo '{\"id\": \"F1\", \"name\": \"ログイン\"}' | claudeflow_call -i jsonquery -r .name)\" = 'ログイン' ]
+"
+
+test_function "常駐サーバー: 相対パスと終了コードを引き継ぐ" "
+    (cd '$TEST_DIR' && claudeflow_call validation good.html --ruleset core,html.charset)
+    (cd '$TEST_DIR' && claudeflow_call validation broken.html --no-color | grep -q 'html.tags'); [ \$? -eq 0 ]
+    (cd '$TEST_DIR' && claudeflow_call validation broken.html >/dev/null); [ \$? -eq 1 ]
+"
+
+test_function "常駐サーバー: 接続できなければ通常起動で実行" "
+    (
+        claudeflow_daemon_start() { :; }
+        CLAUDEFLOW_DAEMON_SOCKET='$TEST_DIR/missing.sock'
+        [ \"\$(echo '{\"list\": [1, 2]}' | claudeflow_call -i jsonquery -c .list)\" = '[1,2]' ]
+    )
+"
+
+test_function "常駐サーバー: 要求がなければアイドル時間後に終了" "
+    claudeflow_py daemon --socket '$TEST_DIR/idle.sock' serve --idle 1 &
+    wait_socket up '$TEST_DIR/idle.sock' && wait_socket down '$TEST_DIR/idle.sock'
+"
+
+mkdir -p "$TEST_DIR/plan"
+cat > "$TEST_DIR/plan/features.json" << 'EOF'
+{
+  "features": [
+    {"id": "feature_001", "name": "ログイン", "description": "説明に 'quote' と $HOME を含む", "core": false, "dependencies": []},
+    {"id": "feature_002", "name": "一覧 表示", "description": "複数行の\n説明", "core": true, "dependencies": ["feature_001"]},
+    {"id": "feature_003", "name": "検索", "description": "", "core": true, "dependencies": ["feature_002"]}
+  ]
+}
+EOF
+
+test_function "機能リスト: declare形式で全フィールドを1回で読み込む" "
+    eval \"\$(claudeflow_call features '$TEST_DIR/plan/features.json' --format declare)\"
+    [ \"\$features_count\" = 3 ] && [ \"\${features_name[1]}\" = '一覧 表示' ] \
+        && [ \"\${features_description[0]}\" = \"説明に 'quote' と \\\$HOME を含む\" ] \
+        && [ \"\${features_description[1]}\" = \$'複数行の\\n説明' ]
+"
+
+test_function "機能リスト: NUL区切りでコア機能のみ" "
+    ids=()
+    while IFS= read -r -d '' id && IFS= read -r -d '' name; do ids+=(\"\$id:\$name\"); done \
+        < <(claudeflow_call features '$TEST_DIR/plan/features.json' --core --fields id,name)
+    [ \"\${ids[*]}\" = 'feature_002:一覧 表示 feature_003:検索' ]
+"
+
+test_function "機能リスト: 依存関係を満たす次の未実装機能" "
+    [ \"\$(claudeflow_call features '$TEST_DIR/plan/features.json' --next --fields id | tr -d '\\0')\" = feature_001 ]
+    touch '$TEST_DIR/plan/feature_001_final.ts'
+    [ \"\$(claudeflow_call features '$TEST_DIR/plan/features.json' --next --core --fields id | tr -d '\\0')\" = feature_002 ] \
+        && [ \"\$(claudeflow_call features '$TEST_DIR/plan/features.json' --pending --count)\" = 2 ]
+"
+
+# コードブロック抽出
+mkdir -p "$TEST_DIR/extract"
+cat > "$TEST_DIR/extract/result.md" << 'EOF'
+実装しました。
+
+**index.html**
+```html
+<!DOCTYPE html>
+<html><body><script>const s = `x`;</script></body></html>
+```
+
+### `js/app.js`
+```javascript
+console.log("```");
+```
+
+**README.md**
+```markdown
+# アプリ
+
+```bash
+open index.html
+```
+
+終わり
+```
+
+**../outside.sh**
+```sh
+echo ng
+```
+EOF
+
+test_function "コードブロック抽出: 見出しのファイル名で全ファイルを書き出す" "
+    claudeflow_call codeblocks '$TEST_DIR/extract/result.md' -o '$TEST_DIR/extract/out' \
+        --manifest '$TEST_DIR/extract/manifest.json'
+    [ \"\$(claudeflow_call jsonquery -r '.files[].path' '$TEST_DIR/extract/manifest.json' | tr '\\n' ' ')\" = 'README.md index.html js/app.js ' ] \
+        && grep -q '^open index.html' '$TEST_DIR/extract/out/README.md' && grep -q '^終わり' '$TEST_DIR/extract/out/README.md' \
+        && [ \"\$(cat '$TEST_DIR/extract/out/js/app.js')\" = 'console.log(\"\`\`\`\");' ] \
+        && [ ! -e '$TEST_DIR/extract/outside.sh' ]
+"
+
+test_function "コードブロック抽出: 名前のないブロックとフェンス外のHTML" "
+    printf '%s\n' '説明' '\`\`\`html' '<p>小</p>' '\`\`\`' '\`\`\`html' '<p>大きいブロック</p>' '\`\`\`' \
+        | claudeflow_call -i codeblocks - -o '$TEST_DIR/extract/unnamed' > /dev/null
+    grep -q '大きいブロック' '$TEST_DIR/extract/unnamed/index.html'
+    printf '%s\n' 'コード:' '<!DOCTYPE html>' '<html><body></body></html>' '以上' \
+        | claudeflow_call -i codeblocks - -o '$TEST_DIR/extract/raw' > /dev/null
+    [ \"\$(head -1 '$TEST_DIR/extract/raw/index.html')\" = '<!DOCTYPE html>' ] && ! grep -q 以上 '$TEST_DIR/extract/raw/index.html'
+"
+
+# トークン使用量
+test_function "トークン計測: 日本語は1文字あたり約1トークン、分割して読んでも同じ値" "
+    [ \"\$(estimate_tokens 'これは日本語のプロンプトです。機能要件を満たす実装を生成してください。')\" -ge 30 ] \
+        && [ \"\$(estimate_tokens 'Hello, world! This is a simple sentence.')\" -le 12 ]
+    cd '$SCRIPTS_DIR' && python3 -c '
+import io
+from claudeflow.tokens import count_tokens, count_stream
+text = open(\"ultra-light.sh\", encoding=\"utf-8\").read()
+assert all(count_stream(io.StringIO(text), size) == count_tokens(text) for size in (1, 13, 4096))
+'
+"
+
+test_function "トークン計測: 同時に記録しても台帳の行が欠けず、実行・機能ごとに集計" "
+    TOKEN_LOG_FILE='$TEST_DIR/tokens/ledger.jsonl'
+    init_token_tracking
+    for i in \$(seq 1 20); do
+        CLAUDEFLOW_FEATURE_ID=feature_\$((i % 2)) add_token_usage 'プロンプト' 'response text' 実装 > /dev/null &
+    done
+    wait
+    CLAUDEFLOW_RUN_ID=other add_token_usage '別の実行' 'x' 企画 > /dev/null
+    [ \$(wc -l < \"\$TOKEN_LOG_FILE\") -eq 21 ] \
+        && [ \"\$(claudeflow_call tokens report --ledger \"\$TOKEN_LOG_FILE\" --run \"\$CLAUDEFLOW_RUN_ID\" --by feature --json \
+            | claudeflow_call -i jsonquery -r .feature_1.calls)\" = 10 ] \
+        && show_token_usage 0 合計 | grep -q '累計: 140 '
+"
+
+test_function "トークン計測: 順次実装の機能IDで記録し、単価は記録する時点の環境変数を使う" "
+    TOKEN_LOG_FILE='$TEST_DIR/tokens/price.jsonl'
+    (unset CLAUDEFLOW_FEATURE_ID; CURRENT_FEATURE_ID=feature_007 CLAUDEFLOW_TOKEN_PRICE_INPUT=1000000 \
+        CLAUDEFLOW_TOKEN_PRICE_OUTPUT=0 add_token_usage 'abc' '出力' 実装 > /dev/null) \
+        && [ \"\$(claudeflow_call tokens report --ledger \"\$TOKEN_LOG_FILE\" --by feature --json \
+            | claudeflow_call -i jsonquery -r .feature_007.cost)\" = 1.0 ]
+"
+
+# 並列スケジューラ（claudeを模したスタブで1機能0.5秒の実装時間を再現する）
+mkdir -p "$TEST_DIR/sched/bin"
+cat > "$TEST_DIR/sched/bin/claude" << 'STUB'
+#!/bin/bash
+cat > /dev/null
+sleep 0.5
+echo "// implemented $FEATURE_ID"
+STUB
+chmod +x "$TEST_DIR/sched/bin/claude"
+cat > "$TEST_DIR/sched/features.json" << 'JSON'
+{"features": [
+  {"id": "feature_001", "name": "ユーザー登録", "description": "アカウントを作成する", "core": true},
+  {"id": "feature_002", "name": "商品一覧", "description": "商品を表示する"},
+  {"id": "feature_003", "name": "お問い合わせ", "description": "フォームを送信する"},
+  {"id": "feature_004", "name": "ログイン", "description": "登録したアカウントで認証する", "dependencies": ["feature_001"]}
+]}
+JSON
+
+test_function "並列スケジューラ: 独立した機能を同時に実装し、依存先の統合後に依存元を実行" "
+    export PATH='$TEST_DIR/sched/bin':\$PATH
+    start=\$(date +%s%N)
+    claudeflow_py scheduler '$TEST_DIR/sched/features.json' --jobs 3 --output-dir '$TEST_DIR/sched/out1' \
+        --command 'mkdir -p \"\$CLAUDEFLOW_FEATURE_STAGING/src\"
+            if [ \"\$FEATURE_ID\" = feature_004 ]; then test -f \"\$CLAUDEFLOW_SCHEDULER_OUTPUT/src/feature_001.ts\" || exit 1; fi
+            claude --print < /dev/null > \"\$CLAUDEFLOW_FEATURE_STAGING/src/\$FEATURE_ID.ts\"' > /dev/null
+    elapsed=\$(( (\$(date +%s%N) - start) / 1000000 ))
+    [ \$elapsed -lt 1900 ] \
+        && [ \$(ls '$TEST_DIR/sched/out1/src' | wc -l) -eq 4 ] \
+        && grep -q 'implemented feature_004' '$TEST_DIR/sched/out1/src/feature_004.ts' \
+        && claudeflow_py scheduler '$TEST_DIR/sched/features.json' --plan | grep -q '段2: feature_004'
+"
+
+test_function "並列スケジューラ: 失敗した機能に依存する機能はスキップし、循環はエラー" "
+    ! claudeflow_py scheduler '$TEST_DIR/sched/features.json' --jobs 2 --output-dir '$TEST_DIR/sched/out2' \
+        --command 'test \"\$FEATURE_ID\" != feature_001' --report '$TEST_DIR/sched/report2.json' > '$TEST_DIR/sched/out2.txt'
+    sed 's/\"core\": true}/\"dependencies\": [\"feature_004\"]}/' '$TEST_DIR/sched/features.json' > '$TEST_DIR/sched/cycle.json'
+    claudeflow_py scheduler '$TEST_DIR/sched/cycle.json' --plan 2> '$TEST_DIR/sched/cycle.txt'
+    [ \$? -eq 2 ] && grep -q feature_004 '$TEST_DIR/sched/cycle.txt' \
+        && grep -q 'スキップ: feature_004 .*feature_001 が失敗' '$TEST_DIR/sched/out2.txt' \
+        && grep -q '\"status\": \"skipped\"' '$TEST_DIR/sched/report2.json'
+"
+
+test_function "並列スケジューラ: 同時に実行した機能の異なる内容は上書きせず .conflict に残し、依存元の更新は置き換える" "
+    claudeflow_py scheduler '$TEST_DIR/sched/features.json' --jobs 4 --output-dir '$TEST_DIR/sched/out4' \\
+        --report '$TEST_DIR/sched/report4.json' --command 'mkdir -p \"\$CLAUDEFLOW_FEATURE_STAGING/src\" && sleep 0.3
+            case \"\$FEATURE_ID\" in
+                feature_001) echo v1 > \"\$CLAUDEFLOW_FEATURE_STAGING/src/base.ts\" ;;
+                feature_004) echo v2 > \"\$CLAUDEFLOW_FEATURE_STAGING/src/base.ts\" ;;
+                *) echo \"\$FEATURE_ID\" > \"\$CLAUDEFLOW_FEATURE_STAGING/src/shared.ts\" ;;
+            esac' > /dev/null 2> '$TEST_DIR/sched/err4.txt' \\
+        && grep -qx v2 '$TEST_DIR/sched/out4/src/base.ts' \\
+        && [ \$(ls '$TEST_DIR/sched/out4/src' | grep -c '^shared.ts.feature_00[23].conflict\$') -eq 1 ] \\
+        && [ \"\$(cat '$TEST_DIR/sched/out4/src/shared.ts' '$TEST_DIR/sched/out4/src/'shared.ts.*.conflict | sort | tr '\\n' ' ')\" = 'feature_002 feature_003 ' ] \\
+        && grep -q '競合: src/shared.ts' '$TEST_DIR/sched/err4.txt' && ! grep -q base.ts '$TEST_DIR/sched/err4.txt' \\
+        && [ \$(grep -c '\"src/shared.ts\"\$' '$TEST_DIR/sched/report4.json') -eq 2 ] \\
+        && grep -q '\"src/shared.ts.feature_00[23].conflict\"' '$TEST_DIR/sched/report4.json'
+"
+
+test_function "並列スケジューラ: run_features_parallelがシェル関数を作業ディレクトリで実行して統合" "
+    export PATH='$TEST_DIR/sched/bin':\$PATH
+    OUT_DIR='$TEST_DIR/sched/out3'
+    SRC_DIR=\"\$OUT_DIR/src\"
+    SHARED_LOG='$TEST_DIR/sched/shared.log'
+    mkdir -p \"\$SRC_DIR\"
+    write_feature() {
+        echo \"\$1 \$4 \$SRC_DIR\" >> \"\$SHARED_LOG\"
+        echo \"\$2\" | claude --print > \"\$SRC_DIR/\$1.ts\"
+    }
+    CLAUDEFLOW_PARALLEL_JOBS=4 run_features_parallel '$TEST_DIR/sched/features.json' \"\$OUT_DIR\" write_feature \
+        feature_002,feature_003 SRC_DIR SHARED_LOG > /dev/null
+    [ \$(ls \"\$SRC_DIR\" | wc -l) -eq 2 ] && [ -f \"\$OUT_DIR/.claudeflow/scheduler_report.json\" ] \
+        && grep -q '^feature_003 2 .*/staging/feature_003/src$' \"\$SHARED_LOG\"
+"
+
+# Claude実行ラッパー（呼び出し回数で振る舞いを変えるスタブで再現する）
+mkdir -p "$TEST_DIR/exec/bin"
+cat > "$TEST_DIR/exec/bin/claude" << 'STUB'
+#!/bin/bash
+n=$(( $(cat "$STUB_DIR/count" 2>/dev/null || echo 0) + 1 ))
+echo $n > "$STUB_DIR/count"
+cat > /dev/null
+case "$STUB_MODE:$n" in
+    hang:1) echo "途中までの出力"; sleep 30 ;;
+    slow:1) sleep 10 ;;
+    stubborn:*) trap "" TERM; sleep 30 ;;
+    fail:*) echo "途中までの出力"; echo "rate limited" >&2; exit 1 ;;
+esac
+echo "応答 $n"
+STUB
+chmod +x "$TEST_DIR/exec/bin/claude"
+echo "プロンプト" > "$TEST_DIR/exec/prompt.txt"
+
+# 何も出力せずに1秒かけて終わり、受け取った引数を1行ずつ返すスタブ
+mkdir -p "$TEST_DIR/exec/args/bin"
+cat > "$TEST_DIR/exec/args/bin/claude" << 'STUB'
+#!/bin/bash
+cat > /dev/null
+sleep 1
+printf '%s\n' "$@"
+STUB
+chmod +x "$TEST_DIR/exec/args/bin/claude"
+
+test_function "Claude実行: 出力が止まった試行を制限時間を待たずに打ち切って再試行" "
+    export PATH='$TEST_DIR/exec/bin':\$PATH STUB_DIR='$TEST_DIR/exec/hang'
+    mkdir -p \"\$STUB_DIR\"
+    start=\$(date +%s)
+    STUB_MODE=hang claudeflow_py claude_exec run --prompt-file '$TEST_DIR/exec/prompt.txt' --output '$TEST_DIR/exec/out1.txt' \
+        --step '最小実装: feature_001' --idle 1 --timeout 20 --base-delay 0.2 2> /dev/null \
+        && [ \$((\$(date +%s) - start)) -lt 5 ] && grep -qx '応答 2' '$TEST_DIR/exec/out1.txt'
+"
+
+test_function "Claude実行: SIGTERM を無視する試行も SIGKILL で止めて制限時間を大きく超えない" "
+    export PATH='$TEST_DIR/exec/bin':\$PATH STUB_DIR='$TEST_DIR/exec/stubborn'
+    mkdir -p \"\$STUB_DIR\"
+    start=\$(date +%s)
+    STUB_MODE=stubborn claudeflow_py claude_exec run --prompt-file '$TEST_DIR/exec/prompt.txt' \\
+        --output '$TEST_DIR/exec/stubborn.txt' --timeout 1 --retries 1 2> /dev/null
+    [ \$? -eq 124 ] && [ \$((\$(date +%s) - start)) -lt 10 ] && [ ! -f '$TEST_DIR/exec/stubborn.txt' ]
+"
+
+test_function "Claude実行: 既定のコマンドに許可ツールを渡し、出力のない試行を既定では打ち切らない" "
+    (unset CLAUDEFLOW_IDLE_TIMEOUT; PATH='$TEST_DIR/exec/args/bin':\$PATH claudeflow_py claude_exec run \
+        --prompt-file '$TEST_DIR/exec/prompt.txt' --output '$TEST_DIR/exec/args.txt' --tools \"\$CLAUDE_ALLOWED_TOOLS\") \
+        && grep -qx -- --allowedTools '$TEST_DIR/exec/args.txt' && grep -qx \"\$CLAUDE_ALLOWED_TOOLS\" '$TEST_DIR/exec/args.txt' \
+        && (unset CLAUDEFLOW_IDLE_TIMEOUT; cd '$SCRIPTS_DIR' && python3 -c 'from claudeflow.claude_exec import DEFAULT_IDLE; assert DEFAULT_IDLE == 0')
+"
+
+test_function "Claude実行: すべて失敗したら最後のエラーを返し、途中までの出力を残す" "
+    export PATH='$TEST_DIR/exec/bin':\$PATH STUB_DIR='$TEST_DIR/exec/fail'
+    mkdir -p \"\$STUB_DIR\"
+    STUB_MODE=fail claudeflow_py claude_exec run --prompt-file '$TEST_DIR/exec/prompt.txt' --output '$TEST_DIR/exec/out2.txt' \
+        --step 'テスト生成' --retries 2 --base-delay 0.1 --error-file '$TEST_DIR/exec/error.txt' 2> /dev/null
+    [ \$? -eq 1 ] && [ ! -f '$TEST_DIR/exec/out2.txt' ] && grep -qx 'rate limited' '$TEST_DIR/exec/error.txt' \
+        && grep -q '途中までの出力' '$TEST_DIR/exec/out2.txt.partial' && [ \$(cat \"\$STUB_DIR/count\") -eq 2 ]
+"
+
+test_function "Claude実行: 遅い試行にヘッジして先に成功した出力を使い、レイテンシを記録" "
+    export PATH='$TEST_DIR/exec/bin':\$PATH STUB_DIR='$TEST_DIR/exec/slow'
+    mkdir -p \"\$STUB_DIR\"
+    for i in 1 2 3 4 5; do
+        echo 0 > \"\$STUB_DIR/count\"
+        claudeflow_py claude_exec run --prompt-file '$TEST_DIR/exec/prompt.txt' --output '$TEST_DIR/exec/warm.txt' \
+            --step '機能仕様生成: feature_00\$i' --histogram '$TEST_DIR/exec/slow/latency.json'
+    done
+    rm \"\$STUB_DIR/count\"
+    start=\$(date +%s)
+    STUB_MODE=slow claudeflow_py claude_exec run --prompt-file '$TEST_DIR/exec/prompt.txt' --output '$TEST_DIR/exec/out3.txt' \
+        --step '機能仕様生成: feature_009' --hedge-percentile 90 --histogram '$TEST_DIR/exec/slow/latency.json' 2> /dev/null
+    [ \$((\$(date +%s) - start)) -lt 5 ] && grep -qx '応答 2' '$TEST_DIR/exec/out3.txt' \
+        && claudeflow_py claude_exec stats --histogram '$TEST_DIR/exec/slow/latency.json' | grep -q '^機能仕様生成 *6 '
+"
+
+test_function "応答キャッシュ: 空白の違いは同じキー、ツール・テンプレート・有効期限で無効" "
+    mkdir -p '$TEST_DIR/pcache/templates'
+    echo 'v1' > '$TEST_DIR/pcache/templates/01.md'
+    echo '応答' > '$TEST_DIR/pcache/response.txt'
+    pc() { claudeflow_py prompt_cache --dir '$TEST_DIR/pcache/store' \"\$@\"; }
+    printf '要件:\r\n  機能A  \n\n\n\n' | pc put --response '$TEST_DIR/pcache/response.txt' --tools 'Read Bash' \
+        --template-dir '$TEST_DIR/pcache/templates'
+    printf '要件:\n  機能A\n' | pc get --output '$TEST_DIR/pcache/hit.txt' --tools 'Bash,Read' \
+        --template-dir '$TEST_DIR/pcache/templates' \
+        && cmp -s '$TEST_DIR/pcache/response.txt' '$TEST_DIR/pcache/hit.txt' \
+        && ! printf '要件:\n  機能A\n' | pc get --output '$TEST_DIR/pcache/miss.txt' --tools 'Bash' \
+            --template-dir '$TEST_DIR/pcache/templates' \
+        && echo 'v2' > '$TEST_DIR/pcache/templates/01.md' \
+        && ! printf '要件:\n  機能A\n' | pc get --output '$TEST_DIR/pcache/miss.txt' --tools 'Bash Read' \
+            --template-dir '$TEST_DIR/pcache/templates' \
+        && echo 'v1' > '$TEST_DIR/pcache/templates/01.md' && sleep 1.1 \
+        && ! printf '要件:\n  機能A\n' | pc --ttl 1 get --output '$TEST_DIR/pcache/miss.txt' --tools 'Bash Read' \
+            --template-dir '$TEST_DIR/pcache/templates'
+"
+
+test_function "応答キャッシュ: 2回目はClaudeを呼ばずにコスト0で記録し、バイパス指定で呼び直す" "
+    export PATH='$TEST_DIR/exec/bin':\$PATH STUB_DIR='$TEST_DIR/pcache/stub'
+    mkdir -p \"\$STUB_DIR\"
+    PROMPT_CACHE_OPTIONS=(--dir '$TEST_DIR/pcache/shell')
+    TOKEN_LOG_FILE='$TEST_DIR/pcache/ledger.jsonl'
+    init_token_tracking
+    run_claude_with_tracking '同じプロンプト' '$TEST_DIR/pcache/out1.md' plan > /dev/null
+    run_claude_with_tracking '同じプロンプト' '$TEST_DIR/pcache/out2.md' plan > /dev/null
+    [ \"\$CLAUDE_CACHE_HIT\" = true ] && [ \$(cat \"\$STUB_DIR/count\") -eq 1 ] \
+        && cmp -s '$TEST_DIR/pcache/out1.md' '$TEST_DIR/pcache/out2.md' \
+        && [ \"\$(claudeflow_call tokens report --ledger \"\$TOKEN_LOG_FILE\" --json | claudeflow_call -i jsonquery -r .plan.cached)\" = 1 ] \
+        && [ \"\$(tail -n 1 \"\$TOKEN_LOG_FILE\" | claudeflow_call -i jsonquery -r .cost)\" = 0.0 ] \
+        && CLAUDEFLOW_PROMPT_CACHE_BYPASS=true run_claude_with_tracking '同じプロンプト' '$TEST_DIR/pcache/out3.md' plan > /dev/null \
+        && [ \$(cat \"\$STUB_DIR/count\") -eq 2 ] && grep -qx '応答 2' '$TEST_DIR/pcache/out3.md'
+"
+
+# テンプレート展開
+test_function "テンプレート: 特殊文字・複数行の値を1回で埋め込み、未指定の変数と値の中の変数は残す" "
+    mkdir -p '$TEST_DIR/tpl'
+    out=\$(apply_prompt_vars '# \${feature_name}
+\${feature_description}
+パス: src/\${feature_id}/ \${unknown}' feature_name 'a/b & c\\\\d' feature_description '1行目
+2行目 \${feature_id}' feature_id F1)
+    [ \"\$out\" = '# a/b & c\\\\d
+1行目
+2行目 \${feature_id}
+パス: src/F1/ \${unknown}' ] \
+        && [ \"\$(apply_template_vars 'name={{PROJECT_NAME}} cli={{CLI_COMMAND}}' 'my/app&1')\" = 'name=my/app&1 cli=my/app&1' ]
+"
+
+test_function "テンプレート: 一括展開で機能ごとにファイルを書き出す" "
+    mkdir -p '$TEST_DIR/tpl/prompts'
+    printf '# \${feature_name}\n\${feature_description}\n\${design_content}\n' > '$TEST_DIR/tpl/prompts/impl.md'
+    printf '設計\n' > '$TEST_DIR/tpl/design.md'
+    echo '{\"features\":[{\"id\":\"f1\",\"name\":\"ログイン\",\"description\":\"認証\"},{\"id\":\"f2\",\"name\":\"一覧\",\"description\":\"表示\"}]}' > '$TEST_DIR/tpl/features.json'
+    PROMPTS_DIR='$TEST_DIR/tpl/prompts' render_prompts_batch impl '$TEST_DIR/tpl/features.json' '$TEST_DIR/tpl/out' \
+        'implement_\${feature_id}.md' design_content \"\$(cat '$TEST_DIR/tpl/design.md')\" \
+        && [ \"\$(cat '$TEST_DIR/tpl/out/implement_f2.md')\" = \"\$(printf '# 一覧\n表示\n設計')\" ] \
+        && grep -qx '# ログイン' '$TEST_DIR/tpl/out/implement_f1.md' \
+        && [ \"\$(claudeflow_py templates vars '$TEST_DIR/tpl/prompts/impl.md' | tr '\n' ' ')\" = 'feature_name feature_description design_content ' ]
+"
+
+# イベントログ
+test_function "イベントログ: ステップ・エラー・Claude呼び出しを記録し、機能ID・状態・実行IDで絞り込む" "
+    LOG_FILE='$TEST_DIR/evt/text.log' EVENT_LOG_DIR='$TEST_DIR/evt/events'
+    mkdir -p '$TEST_DIR/evt' && echo 'エラー応答' > '$TEST_DIR/evt/response.txt'
+    CLAUDEFLOW_RUN_ID=run-a CURRENT_FEATURE_ID=feature_001 log_step '機能実装: feature_001' START
+    CLAUDEFLOW_RUN_ID=run-b CURRENT_FEATURE_ID=feature_001 log_step '機能実装: feature_001' START
+    CLAUDEFLOW_RUN_ID=run-b CURRENT_FEATURE_ID=feature_002 log_step '機能実装: feature_002' START
+    CLAUDEFLOW_RUN_ID=run-b CURRENT_FEATURE_ID=feature_002 log_error_detail '最小実装' 'API呼び出しに失敗'
+    CLAUDEFLOW_RUN_ID=run-b CURRENT_FEATURE_ID=feature_002 log_claude_call '最小実装' '$TEST_DIR/evt/response.txt' ERROR
+    CLAUDEFLOW_RUN_ID=run-b CURRENT_FEATURE_ID=feature_001 log_step '機能実装: feature_001' SUCCESS
+    ev() { claudeflow_call eventlog --dir '$TEST_DIR/evt/events' \"\$@\"; }
+    [ \$(ev query --feature feature_001 | wc -l) -eq 3 ] \
+        && [ \$(ev query --run latest --feature feature_001 | wc -l) -eq 2 ] \
+        && [ \$(ev query --run run-b --status ERROR --json | wc -l) -eq 2 ] \
+        && ev query --status ERROR --kind claude | grep -q 'エラー内容: エラー応答' \
+        && ev query --status ERROR --kind error | grep -q '詳細: API呼び出しに失敗' \
+        && ev summary --run latest | grep -q '完了: 1' \
+        && ev summary --run latest | grep -q '進行中: 1' \
+        && grep -q '\[CLAUDE_API\] ERROR' '$TEST_DIR/evt/text.log'
+"
+
+test_function "イベントログ: ローテーション済みのgzipセグメントも索引で該当ブロックだけを読む" "
+    ev() { claudeflow_py eventlog --dir '$TEST_DIR/evt/rotate' --block-bytes 1024 --segment-bytes 8192 \"\$@\"; }
+    for i in \$(seq 1 120); do
+        ev append --status SUCCESS --step \"ステップ \$i\" --run r1 --feature \"feature_\$((i % 6))\" || break
+    done
+    ev rotate > /dev/null
+    ls '$TEST_DIR/evt/rotate'/events-*.jsonl.gz > /dev/null \
+        && [ \$(ev query --feature feature_3 | wc -l) -eq 20 ] \
+        && [ \"\$(ev query --feature feature_3 --tail 1)\" != \"\" ] \
+        && ev query --feature feature_3 --tail 1 | grep -q 'ステップ 117' \
+        && [ \$(ev query --run r1 | wc -l) -eq 120 ] \
+        && [ \$(ev query --since 2099-01-01 | wc -l) -eq 0 ]
+"
+
+# 実装進捗
+test_function "実装進捗: 並列に記録しても行が混ざらず、完了済み・再開位置・失敗率を答える" "
+    pg() { claudeflow_call progress --db '$TEST_DIR/progress/progress.db' \"\$@\"; }
+    mkdir -p '$TEST_DIR/progress'
+    for i in 1 2 3 4 5 6; do
+        (PROGRESS_DB='$TEST_DIR/progress/progress.db' PROGRESS_PROJECT=/p CLAUDEFLOW_RUN_ID=r1
+         log_progress_start feature_00\$i \"機能 \$i\"
+         log_progress_start feature_00\$i '' 最小実装
+         log_progress feature_00\$i '' '' '' \$([ \$i -le 2 ] && echo ERROR || echo SUCCESS) 'API エラー' 最小実装
+         [ \$i -le 4 ] && log_progress feature_00\$i \"機能 \$i\" '' '' SUCCESS) &
+    done
+    wait
+    [ \"\$(pg completed --project /p | tr '\n' ' ')\" = 'feature_001 feature_002 feature_003 feature_004 ' ] \
+        && [ \"\$(pg resume --ids feature_001,feature_002,feature_003,feature_004,feature_005,feature_006 --project /p)\" = feature_005 ] \
+        && ! pg resume --ids feature_001,feature_003 --project /p \
+        && pg failures | grep '最小実装' | grep -q '33.3%' \
+        && pg show | grep -q '実行中: 2' \
+        && [ \$(pg slowest --limit 3 | wc -l) -eq 3 ]
+"
+
+test_function "実装進捗: 旧形式の進捗CSVを取り込み、開始を記録しない終了は所要時間付きで追加" "
+    pg() { claudeflow_call progress --db '$TEST_DIR/progress/import.db' \"\$@\"; }
+    printf '機能ID,機能名,開始時刻,終了時刻,状態,エラーメッセージ\nfeature_001,\"ログイン\",2024-01-15 10:00:00,2024-01-15 10:15:00,SUCCESS,\"\"\nfeature_002,\"一覧\",2024-01-15 10:15:00,2024-01-15 10:20:00,ERROR,\"API呼び出しエラー\"\n' \
+        > '$TEST_DIR/progress/old.csv'
+    [ \"\$(pg import-csv '$TEST_DIR/progress/old.csv' --project /p)\" = 2 ] \
+        && PROGRESS_DB='$TEST_DIR/progress/import.db' PROGRESS_PROJECT=/p \
+            log_progress feature_003 '検索' '2024-01-15 11:00:00' '2024-01-15 11:30:00' SUCCESS \
+        && [ \"\$(pg slowest --limit 1 | awk '{print \$1}')\" = feature_003 ] \
+        && pg slowest | grep 'feature_001' | grep -q '15分00秒' \
+        && [ \"\$(pg completed --project /p | tr '\n' ' ')\" = 'feature_001 feature_003 ' ]
+"
+
+# 行数集計
+test_function "行数集計: 1回の走査で wc -l と同じ行数を数え、制限超過・警告・制限内を終了コードで返す" "
+    mkdir -p '$TEST_DIR/lines/app/src/deep/er' '$TEST_DIR/lines/app/node_modules/x' '$TEST_DIR/lines/app/.git'
+    printf 'a\nb\nc\n' > '$TEST_DIR/lines/app/index.html'
+    printf 'x\ny' > '$TEST_DIR/lines/app/src/deep/er/main.ts'
+    : > '$TEST_DIR/lines/app/src/empty.js'
+    printf '1\n2\n' > '$TEST_DIR/lines/app/README.md'
+    seq 1 500 > '$TEST_DIR/lines/app/node_modules/x/lib.js'
+    seq 1 500 > '$TEST_DIR/lines/app/.git/hook.js'
+    export CLAUDEFLOW_LINE_CHECK=true
+    lc() { claudeflow_call linecount --cache-dir '$TEST_DIR/lines/cache' \"\$@\"; }
+    [ \"\$(lc scan '$TEST_DIR/lines/app' | claudeflow_call -i jsonquery -r .total_lines)\" = 4 ] \
+        && [ \"\$(lc scan '$TEST_DIR/lines/app' | claudeflow_call -i jsonquery -r .file_count)\" = 3 ] \
+        && lc check '$TEST_DIR/lines/app' --no-color | grep -q 'src/deep/er/main.ts: 1行' \
+        && CLAUDEFLOW_MAX_LINES=100 check_project_line_limit '$TEST_DIR/lines/app' > /dev/null \
+        && { CLAUDEFLOW_MAX_LINES=3 check_project_line_limit '$TEST_DIR/lines/app' > /dev/null; [ \$? -eq 1 ]; } \
+        && { CLAUDEFLOW_MAX_LINES=5 check_project_line_limit '$TEST_DIR/lines/app' > /dev/null; [ \$? -eq 2 ]; } \
+        && CLAUDEFLOW_MAX_LINES=3 generate_line_limit_report '$TEST_DIR/lines/app' > /dev/null \
+        && grep -q '削減が必要\*\*: 1行' '$TEST_DIR/lines/app/LINE_LIMIT_REPORT.md' \
+        && ! lc scan '$TEST_DIR/lines/app' --max-lines 0 2> '$TEST_DIR/lines/zero.txt' \
+        && grep -q -- '--max-lines: 1以上の整数を指定してください: 0' '$TEST_DIR/lines/zero.txt' \
+        && ! CLAUDEFLOW_MAX_LINES=0 claudeflow_py linecount scan '$TEST_DIR/lines/app' 2> /dev/null
+    unset CLAUDEFLOW_LINE_CHECK
+"
+
+test_function "行数集計: 変更・削除したファイルだけを数え直し、進捗バーの値をJSONで返す" "
+    mkdir -p '$TEST_DIR/lines/tree'
+    for i in \$(seq 1 20); do seq 1 \$i > '$TEST_DIR/lines/tree/f'\$i.js; done
+    lc() { claudeflow_py linecount --cache-dir '$TEST_DIR/lines/cache2' scan '$TEST_DIR/lines/tree' --max-lines 400; }
+    lc > /dev/null
+    seq 1 100 > '$TEST_DIR/lines/tree/f1.js' && rm '$TEST_DIR/lines/tree/f2.js'
+    out=\$(lc)
+    [ \"\$(echo \"\$out\" | claudeflow_call -i jsonquery -r .total_lines)\" = \$((210 - 1 - 2 + 100)) ] \
+        && [ \"\$(echo \"\$out\" | claudeflow_call -i jsonquery -r .bar.filled)\" = 30 ] \
+        && [ \"\$(echo \"\$out\" | claudeflow_call -i jsonquery -r .status)\" = ok ] \
+        && ! grep -q 'f2.js' '$TEST_DIR/lines/cache2'/*.json
+"
+
+# 機能選択の行数見積もり
+test_function "機能選択: 過去のアプリと進捗の記録の生成行数から種類ごとの見積もりを学習する" "
+    mkdir -p '$TEST_DIR/budget/results/implementation/app1' '$TEST_DIR/budget/empty'
+    printf '{\"features\": [{\"name\": \"基本UI\", \"type\": \"ui\", \"complexity\": \"medium\"}, {\"name\": \"高度なUI\", \"type\": \"ui\", \"complexity\": \"medium\"}]}' \
+        > '$TEST_DIR/budget/results/implementation/app1/codefit_features.json'
+    seq 1 360 > '$TEST_DIR/budget/results/implementation/app1/index.js'
+    for i in 1 2 3 4 5 6; do
+        PROGRESS_DB='$TEST_DIR/budget/progress.db' PROGRESS_PROJECT=/b log_progress feature_00\$i \"データ保存 \$i\" \
+            '2024-01-15 10:00:00' '2024-01-15 10:10:00' SUCCESS '' feature 240
+    done
+    bg() { claudeflow_call budget --db '$TEST_DIR/budget/progress.db' --history '$TEST_DIR/budget/results' \"\$@\"; }
+    [ \"\$(claudeflow_call budget --history '$TEST_DIR/budget/empty' estimate ui medium)\" = 60 ] \
+        && [ \"\$(bg estimate ui medium)\" -gt 80 ] \
+        && [ \"\$(bg estimate data medium)\" -gt 150 ] \
+        && [ \"\$(bg estimate logic medium)\" = 100 ] \
+        && bg model | grep -q '^data.*6\$'
+"
+
+test_function "機能選択: 必須機能を入れた残りで優先度の合計が最大の組み合わせを選び、100機能を50ms未満で選ぶ" "
+    out=\$(claudeflow_call budget --history '$TEST_DIR/budget/empty' select --max-lines 260 \
+        --required '基本UI:ui:simple:必須' --optional '大機能:logic:complex:大きい:3' \
+        --optional '小機能A:ui:simple:小さい:2' --optional '小機能B:ui:simple:小さい:2' --optional '中機能:data:simple:中:2' \
+        --features-json '$TEST_DIR/budget/features.json' --app-name テスト)
+    [ \"\$(echo \"\$out\" | cut -f1,2 | tr '\t\n' ': ')\" = 'required:基本UI skipped:大機能 selected:小機能A selected:小機能B selected:中機能 ' ] \
+        && [ \"\$(claudeflow_call -i jsonquery -r '.features[3].type' < '$TEST_DIR/budget/features.json')\" = data ] \
+        && (cd '$SCRIPTS_DIR' && python3 -c '
+import random, time
+from claudeflow.budget import Feature, select_features
+random.seed(1)
+kinds, levels = (\"ui\", \"logic\", \"data\", \"animation\"), (\"simple\", \"medium\", \"complex\")
+features = [Feature(f\"f{i}\", random.choice(kinds), random.choice(levels), priority=random.randint(1, 5)) for i in range(100)]
+start = time.perf_counter()
+chosen = select_features(features, 2000)
+elapsed = time.perf_counter() - start
+assert sum(features[i].lines for i in chosen) <= 2000
+assert elapsed < 0.05, elapsed
+')
+"
+
+# アプリ名の変換
+test_function "アプリ名: 辞書とかな・漢字の読みを最長一致で変換し、ローマ字読みの結果をキャッシュする" "
+    export APPNAME_CACHE='$TEST_DIR/appname/cache.json' CLAUDEFLOW_USE_CLAUDE_TRANSLATION=false
+    an() { claudeflow_call appname --cache '$TEST_DIR/appname/cache.json' \"\$@\"; }
+    [ \"\$(extract_project_name '' test '魚釣りゲーム')\" = fishing-game-app ] \
+        && [ \"\$(extract_project_name '' test 'ドラゴンクエスト')\" = doragonkuesuto-app ] \
+        && [ \"\$(an slug 'ちょっとキャッチ漢字')\" = chottokyatchi-kanji ] \
+        && [ \"\$(an slug 'ｽｰﾊﾟｰ 計算機')\" = supa-calculator ] \
+        && ! an slug --strict 'ドラゴンクエスト' \
+        && grep -q 'doragonkuesuto' '$TEST_DIR/appname/cache.json' \
+        && [ \"\$(printf '魚釣り\nあいうえお\n' | claudeflow_call -i appname --cache '$TEST_DIR/appname/cache.json' batch | cut -f2 | tr '\n' ' ')\" = 'fishing aiueo ' ]
+    rc=\$?
+    unset APPNAME_CACHE CLAUDEFLOW_USE_CLAUDE_TRANSLATION
+    [ \$rc -eq 0 ]
+"
+
+test_function "アプリ名: Claudeの翻訳を1回だけ呼び、保存した翻訳を同じ名前と似た名前に使う" "
+    mkdir -p '$TEST_DIR/appname/bin'
+    printf '#!/bin/bash\necho call >> \"%s\"\necho pocket-money\n' '$TEST_DIR/appname/calls' > '$TEST_DIR/appname/bin/claude'
+    chmod +x '$TEST_DIR/appname/bin/claude'
+    (export APPNAME_CACHE='$TEST_DIR/appname/translated.json' PATH='$TEST_DIR/appname/bin':\$PATH
+     [ \"\$(extract_project_name '' test '小遣い帳' | tail -1)\" = pocket-money-app ] \
+        && [ \"\$(extract_project_name '' test '小遣い帳' | tail -1)\" = pocket-money-app ] \
+        && [ \"\$(extract_project_name '' test '小遣い帳メモ' | tail -1)\" = pocket-money-memo-app ] \
+        && [ \$(wc -l < '$TEST_DIR/appname/calls') -eq 1 ])
+"
+
+# スナップショット
+test_function "スナップショット: 変更のない木は読み直さずに保存せず、差分・復元・gcができる" "
+    mkdir -p '$TEST_DIR/snap/base/app/src' '$TEST_DIR/snap/base/app/node_modules'
+    head -c 2500000 /dev/urandom > '$TEST_DIR/snap/base/app/data.bin'
+    echo one > '$TEST_DIR/snap/base/app/src/a.txt'
+    echo dep > '$TEST_DIR/snap/base/app/node_modules/m.js'
+    echo log > '$TEST_DIR/snap/top.log'
+    sn() { claudeflow_call snapshot --store '$TEST_DIR/snap/store' \"\$@\"; }
+    sn create --base '$TEST_DIR/snap/base' app ../top.log | grep -q '4ファイル' \
+        && sleep 1 \
+        && second=\$(sn create --base '$TEST_DIR/snap/base' --exclude node_modules app ../top.log) \
+        && echo \"\$second\" | grep -q '3ファイル.*読み込み 0B.*追加保存 0B' \
+        && [ \$(sn list | wc -l) -eq 2 ] \
+        && echo two > '$TEST_DIR/snap/base/app/src/a.txt' \
+        && [ \"\$(sn diff latest)\" = 'M app/src/a.txt' ] \
+        && [ \"\$(sn diff \$(sn list | head -1 | cut -c1-15) latest)\" = '- app/node_modules/m.js' ] \
+        && rm -r '$TEST_DIR/snap/base/app' '$TEST_DIR/snap/top.log' \
+        && [ \"\$(sn restore latest --base '$TEST_DIR/snap/base')\" = 3 ] \
+        && [ \"\$(cat '$TEST_DIR/snap/base/app/src/a.txt')\" = one ] \
+        && [ \$(stat -c%s '$TEST_DIR/snap/base/app/data.bin') -eq 2500000 ] \
+        && [ -f '$TEST_DIR/snap/top.log' ] \
+        && sn gc --keep 1 | grep -q 'スナップショット 1件, チャンク 1件' \
+        && ! sn restore missing --base '$TEST_DIR/snap/base' 2>/dev/null
+"
+
+test_function "スナップショット: clean-development.sh がバックアップの一覧と差分を表示する" "
+    (export CLAUDEFLOW_SNAPSHOT_DIR='$TEST_DIR/snap/store'
+     bash '$SCRIPTS_DIR/clean-development.sh' --list-backups | grep -q '3ファイル' \
+        && [ -z \"\$(bash '$SCRIPTS_DIR/clean-development.sh' --diff-backups latest latest)\" ] \
+        && bash '$SCRIPTS_DIR/clean-development.sh' --help | grep -q -- '--restore-backup')
+"
+
+# クリーンアップ計画
+test_function "クリーンアップ計画: 1回の走査で *.log を含む合計・大きいファイルを求め、保護対象と基準を除く" "
+    mkdir -p '$TEST_DIR/plan/root/implementation/app' '$TEST_DIR/plan/root/scripts' '$TEST_DIR/plan/root/results'
+    head -c 5000 /dev/zero > '$TEST_DIR/plan/root/implementation/app/big.js'
+    echo x > '$TEST_DIR/plan/root/implementation/a.txt'
+    echo keep > '$TEST_DIR/plan/root/scripts/run.sh'
+    printf 'aaaa' > '$TEST_DIR/plan/one.log'
+    printf 'bbbbbb' > '$TEST_DIR/plan/two.log'
+    touch -d '40 days ago' '$TEST_DIR/plan/one.log'
+    pl() { claudeflow_call cleanplan \"\$@\"; }
+    pl plan --base '$TEST_DIR/plan/root' --protect scripts --top 2 --output '$TEST_DIR/plan/plan.json' \
+        implementation results .env '../*.log' scripts/run.sh .. \
+        && [ \"\$(pl total '$TEST_DIR/plan/plan.json')\" = 4:5012 ] \
+        && [ \"\$(pl paths '$TEST_DIR/plan/plan.json' | cut -f3 | tr '\n' ' ')\" = 'implementation results ../one.log ../two.log ' ] \
+        && pl show --no-color '$TEST_DIR/plan/plan.json' > '$TEST_DIR/plan/show.txt' \
+        && grep -q '📄 \*.log ファイル (2 ファイル, 10B)' '$TEST_DIR/plan/show.txt' \
+        && grep -q 'それ以前: 1 ファイル, 4B' '$TEST_DIR/plan/show.txt' \
+        && grep -q '⛔ scripts/run.sh' '$TEST_DIR/plan/show.txt' \
+        && grep -q '⛔ \.\.:' '$TEST_DIR/plan/show.txt' \
+        && [ \"\$(grep -A2 '大きいファイル' '$TEST_DIR/plan/show.txt' | tail -2 | awk '{print \$2}' | tr '\n' ' ')\" = 'implementation/app/big.js ../two.log ' ] \
+        && pl plan --base '$TEST_DIR/plan/root' --output '$TEST_DIR/plan/empty.json' missing \
+        && ! pl show --no-color '$TEST_DIR/plan/empty.json' >/dev/null
+"
+
+test_function "クリーンアップ計画: 保護対象を含む親ディレクトリは削除対象にしない" "
+    mkdir -p '$TEST_DIR/plan/nest/tools/keep' '$TEST_DIR/plan/nest/tools/cache'
+    echo keep > '$TEST_DIR/plan/nest/tools/keep/a.sh'
+    echo x > '$TEST_DIR/plan/nest/tools/cache/b.tmp'
+    claudeflow_call cleanplan plan --base '$TEST_DIR/plan/nest' --protect tools/keep --output '$TEST_DIR/plan/nest.json' \
+        tools tools/cache \
+        && [ \"\$(claudeflow_call cleanplan paths '$TEST_DIR/plan/nest.json' | cut -f3)\" = tools/cache ] \
+        && claudeflow_call cleanplan show --no-color '$TEST_DIR/plan/nest.json' | grep -q '⛔ tools: 保護対象を含みます: tools/keep'
+"
+
+# パイプライン
+test_function "パイプライン: タスクの入力から依存を決め、独立したフェーズを並列に、失敗後は続きから再開する" "
+    mkdir -p '$TEST_DIR/pipe/results'
+    cp -r '$SCRIPTS_DIR/../tasks' '$TEST_DIR/pipe/tasks'
+    printf '#!/bin/bash\necho \"\$1\" >> \"%s\"\n[ \"\$1\" = \"\${FAIL_PHASE:-}\" ] && exit 3\nsleep 0.3\necho \"\$1 \$CLAUDEFLOW_REQ_LEVEL\" > \"%s/\$1_result.md\"\n' \
+        '$TEST_DIR/pipe/calls' '$TEST_DIR/pipe/results' > '$TEST_DIR/pipe/phase.sh'
+    pp() { claudeflow_py pipeline --tasks '$TEST_DIR/pipe/tasks' --results '$TEST_DIR/pipe/results' \"\$@\"; }
+    [ \"\$(pp graph | awk -F'\t' '\$1 == \"06_implementation\" {print \$3}')\" = 05_design ] \
+        && [ \"\$(pp --mode light graph | awk -F'\t' '\$1 == \"06_implementation\" {print \$3}')\" = 03_requirements ] \
+        && ! FAIL_PHASE=05_design pp run --jobs 2 -- bash '$TEST_DIR/pipe/phase.sh' > '$TEST_DIR/pipe/first.txt' \
+        && grep -q '並列実行: 04_prototype .*05_design' '$TEST_DIR/pipe/first.txt' \
+        && grep -q '未実行: 06_implementation' '$TEST_DIR/pipe/first.txt' \
+        && : > '$TEST_DIR/pipe/calls' \
+        && pp run -- bash '$TEST_DIR/pipe/phase.sh' > /dev/null \
+        && [ \"\$(head -1 '$TEST_DIR/pipe/calls')\" = 05_design ] && [ \$(wc -l < '$TEST_DIR/pipe/calls') -eq 5 ] \
+        && : > '$TEST_DIR/pipe/calls' \
+        && pp run -- bash '$TEST_DIR/pipe/phase.sh' > /dev/null && [ ! -s '$TEST_DIR/pipe/calls' ] \
+        && CLAUDEFLOW_REQ_LEVEL=C pp run -- bash '$TEST_DIR/pipe/phase.sh' > /dev/null \
+        && [ \"\$(head -1 '$TEST_DIR/pipe/calls')\" = 03_requirements ] && [ \$(wc -l < '$TEST_DIR/pipe/calls') -eq 7 ] \
+        && grep -q 'C' '$TEST_DIR/pipe/results/03_requirements_result.md'
+"
+
+# 実装フェーズだけ標準入力から確認の答えを読むスタブ（実装モード1〜3のスクリプトの read を再現する）
+mkdir -p "$TEST_DIR/pipe-light/results"
+cat > "$TEST_DIR/pipe-light/phase.sh" << 'STUB'
+#!/bin/bash
+set -e
+answer=""
+if [ "$1" = 06_implementation ]; then
+    read -r answer
+fi
+sleep 0.3
+echo "$1 $answer" > "$RESULTS/$1_result.md"
+STUB
+
+test_function "パイプライン: 入力を求める実装フェーズは並列にせず、端末の標準入力をつないで実行する" "
+    echo y | RESULTS='$TEST_DIR/pipe-light/results' claudeflow_py pipeline --tasks '$SCRIPTS_DIR/../tasks' \
+        --results '$TEST_DIR/pipe-light/results' --mode light run --jobs 2 -- bash '$TEST_DIR/pipe-light/phase.sh' \
+        > '$TEST_DIR/pipe-light/out.txt' \
+        && grep -qx '06_implementation y' '$TEST_DIR/pipe-light/results/06_implementation_result.md' \
+        && [ -s '$TEST_DIR/pipe-light/results/07_testing_result.md' ] \
+        && ! grep -q '並列実行: .*06_implementation' '$TEST_DIR/pipe-light/out.txt'
+"
+
+# パターン検索
+test_function "パターン検索: 予算を超えたライブラリから機能に関係する断片だけを選び、追記分だけ索引を更新する" "
+    mkdir -p '$TEST_DIR/pat'
+    printf '# パターン\n\n## バリデーションパターン\n\`\`\`typescript\n# not a heading\nconst validate = (v: string) => v.length > 0;\n\`\`\`\n' > '$TEST_DIR/pat/P.md'
+    [ \"\$(select_patterns '$TEST_DIR/pat/P.md' '何か' | wc -l)\" -eq 8 ] \
+        && for i in \$(seq 1 60); do printf '\n## From feature%s\n### 保存パターン%s\nsaveToLocalStorage で localStorage に保存する\n' \$i \$i >> '$TEST_DIR/pat/P.md'; done \
+        && selected=\$(CLAUDEFLOW_PATTERN_BUDGET=200 select_patterns '$TEST_DIR/pat/P.md' '入力値のバリデーション') \
+        && echo \"\$selected\" | grep -q 'const validate' \
+        && ! echo \"\$selected\" | grep -q 'saveToLocalStorage' \
+        && [ \$(printf '%s' \"\$selected\" | claudeflow_call -i tokens count) -le 200 ] \
+        && [ \"\$(claudeflow_call patternindex update '$TEST_DIR/pat/P.md')\" = 61 ] \
+        && printf '\n## 認証パターン\nverifyJwtToken でトークンを検証する\n' >> '$TEST_DIR/pat/P.md' \
+        && [ \"\$(claudeflow_call patternindex update '$TEST_DIR/pat/P.md')\" = 62 ] \
+        && [ \"\$(claudeflow_call patternindex search '$TEST_DIR/pat/P.md' 'JWT トークン検証' --top-k 1 | cut -f3)\" = 認証パターン ]
+"
+
+test_function "パターン検索: 並列の機能が同時に追記しても節が混ざらない" "
+    printf '# パターン\n' > '$TEST_DIR/pat/C.md'
+    for i in \$(seq 1 20); do
+        (printf '\n### 機能%s のパターン\n' \$i; head -c 20000 /dev/zero | tr '\\0' x; echo) \
+            | claudeflow_call -i patternindex append '$TEST_DIR/pat/C.md' > /dev/null &
+    done
+    wait
+    [ \$(grep -c '^### ' '$TEST_DIR/pat/C.md') -eq 20 ] && [ \$(grep -cx 'x\\{20000\\}' '$TEST_DIR/pat/C.md') -eq 20 ] \
+        && [ \"\$(claudeflow_call patternindex update '$TEST_DIR/pat/C.md')\" = 20 ]
+"
+
+# ハイブリッド実装の再開（スクリプトの置き場所から決まるプロジェクトを作業ディレクトリに作り、claudeは失敗するスタブ）
+mkdir -p "$TEST_DIR/resume/ClaudeFlow/scripts" "$TEST_DIR/resume/ClaudeFlow/implementation" "$TEST_DIR/resume/bin"
+for f in "$SCRIPTS_DIR"/*; do ln -s "$f" "$TEST_DIR/resume/ClaudeFlow/scripts/"; done
+printf '#!/bin/bash\nexit 1\n' > "$TEST_DIR/resume/bin/claude"
+chmod +x "$TEST_DIR/resume/bin/claude"
+printf '# 要件\nアプリ名: resumeapp\n' > "$TEST_DIR/resume/requirements.md"
+echo "# 設計" > "$TEST_DIR/resume/design.md"
+cat > "$TEST_DIR/resume/ClaudeFlow/implementation/features.json" << 'JSON'
+{"features": [
+  {"id": "feature_001", "name": "ユーザー登録", "description": "アカウントを作成する"},
+  {"id": "feature_002", "name": "商品一覧", "description": "商品を表示する"},
+  {"id": "feature_003", "name": "お問い合わせ", "description": "フォームを送信する"}
+]}
+JSON
+
+test_function "再開: 完了済みの機能とRESUME_FROM_FEATUREより前の機能を飛ばす" "
+    (cd '$TEST_DIR/resume/ClaudeFlow/scripts' \
+        && export PATH='$TEST_DIR/resume/bin':\$PATH CLAUDEFLOW_PROGRESS_DB='$TEST_DIR/resume/progress.db' \
+            CLAUDEFLOW_IMPL_LEVEL=1 CLAUDEFLOW_FEATURE_SELECTION=A CLAUDEFLOW_FORCE_FEATURES_REUSE=true \
+        && done_feature() { claudeflow_py progress --db \"\$CLAUDEFLOW_PROGRESS_DB\" finish --feature \$1 --status SUCCESS \
+            --project ./../../implementation/resumeapp/src; } \
+        && done_feature feature_001 && done_feature feature_003 \
+        && timeout 60 bash resume-hybrid-implementation.sh feature_003 '$TEST_DIR/resume/requirements.md' '$TEST_DIR/resume/design.md' \
+            < /dev/null > '$TEST_DIR/resume/from.txt' 2>&1 \
+        && grep -q 'スキップ（完了済み）: feature_002' '$TEST_DIR/resume/from.txt' \
+        && done_feature feature_002 \
+        && timeout 60 bash resume-hybrid-implementation.sh '' '$TEST_DIR/resume/requirements.md' '$TEST_DIR/resume/design.md' \
+            < /dev/null > '$TEST_DIR/resume/all.txt' 2>&1 \
+        && [ \$(grep -c 'スキップ（完了済み）' '$TEST_DIR/resume/all.txt') -eq 3 ] \
+        && grep -q 'すべての機能が完了しています' '$TEST_DIR/resume/all.txt')
+"
+
+# ベンチマーク
+test_function "ベンチマーク: 同じシードで同じコーパスを生成" "
+    cd '$SCRIPTS_DIR' && python3 -c '
+from claudeflow.validation.bench import generate_corpus
+a, b = generate_corpus(100 * 1024, 7), generate_corpus(100 * 1024, 7)
+assert a == b and a != generate_corpus(100 * 1024, 8)
+assert 90 * 1024 < len(a.encode()) <= 100 * 1024 and a.count(\"<script>\") > 5
+'
+"
+
+test_function "ベンチマーク: ベースラインより悪化すると失敗" "
+    claudeflow_py validation.bench --sizes 10K --no-scripts --repeat 1 --corpus-dir '$TEST_DIR/bench' \
+        --baseline '$TEST_DIR/bench/baseline.json' --update-baseline
+    claudeflow_py validation.bench --sizes 10K --no-scripts --repeat 1 --corpus-dir '$TEST_DIR/bench' \
+        --baseline '$TEST_DIR/bench/baseline.json'
+    sed -i 's/\"peak_rss_kb\": [0-9]*/\"peak_rss_kb\": 1/' '$TEST_DIR/bench/baseline.json'
+    ! claudeflow_py validation.bench --sizes 10K --no-scripts --repeat 1 --corpus-dir '$TEST_DIR/bench' \
+        --baseline '$TEST_DIR/bench/baseline.json' > '$TEST_DIR/bench/out.txt'
+    grep -q '❌ 性能劣化を検出しました' '$TEST_DIR/bench/out.txt'
+"
+
+test_function "不明なルールセットはエラー" "
+    ! claudeflow_py validation '$TEST_DIR/good.html' --ruleset unknown
+"
+
+echo ""
+echo -e "合格: ${GREEN}$PASSED${NC} / 失敗: ${RED}$FAILED${NC}"
+[ $FAILED -eq 0 ]
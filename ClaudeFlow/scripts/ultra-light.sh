@@ -135,7 +135,7 @@ unified_requirements_prompt="以下のアプリの企画と要件定義を統合
 ※固定的な項目にとらわれず、必要に応じて独自のセクションを追加してください"
 
 echo -e "${BLUE}  企画・要件を生成中...${NC}"
-echo "$unified_requirements_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$RESULTS_DIR/01_unified_requirements.md"
+claude_cached "$unified_requirements_prompt" "$RESULTS_DIR/01_unified_requirements.md"
 
 echo -e "${GREEN}  ✅ 企画・要件完了${NC}"
 echo ""
@@ -295,7 +295,7 @@ echo -e "${BLUE}  実装コードを生成中...${NC}"
 PROJECT_DIR=$(create_unified_project "$RESULTS_DIR/01_unified_requirements.md" "$PROJECT_ROOT/implementation" "$english_app_name")
 APP_DIR="$PROJECT_DIR"
 
-echo "$implementation_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$APP_DIR/implementation_result.md"
+claude_cached "$implementation_prompt" "$APP_DIR/implementation_result.md"
 
 # 実装結果から実際のファイルを抽出・作成（改善版）
 extract_and_create_files() {
@@ -305,145 +305,41 @@ extract_and_create_files() {
     
     echo -e "${BLUE}    ファイル抽出を開始...${NC}"
     
-    # デバッグ情報（実装結果ファイルのサイズとコードブロック数を表示）
-    if [ -f "$impl_file" ]; then
-        local impl_size=$(wc -c < "$impl_file")
-        local html_blocks=$(grep -c '```html' "$impl_file" 2>/dev/null || echo "0")
-        local md_blocks=$(grep -c '```markdown\|```md' "$impl_file" 2>/dev/null || echo "0")
-        local html_file_refs=$(grep -c '\*\*[^*]*\.html\*\*' "$impl_file" 2>/dev/null || echo "0")
-        echo -e "${CYAN}      実装結果: ${impl_size} bytes, HTMLブロック: ${html_blocks}, MDブロック: ${md_blocks}, HTMLファイル参照: ${html_file_refs}${NC}"
-        
-        # 実装結果の最初の数行を表示
-        echo -e "${CYAN}      実装結果の先頭部分:${NC}"
-        head -5 "$impl_file" | sed 's/^/        /'
-        
-        # 実装結果が要約のみの場合を検出
-        if [ "$html_blocks" -eq 0 ] && [ "$html_file_refs" -gt 0 ]; then
-            echo -e "${YELLOW}      ⚠ 実装結果にHTMLコードブロックが含まれていません${NC}"
-            echo -e "${YELLOW}      → これは実装の要約のみで、実際のコードが生成されなかった可能性があります${NC}"
-        fi
-    else
+    if [ ! -f "$impl_file" ]; then
         echo -e "${RED}      ✗ 実装結果ファイルが見つかりません: $impl_file${NC}"
+        create_fallback_html "$output_dir/index.html" "$app_name"
+        create_fallback_readme "$output_dir/README.md" "$app_name"
+        verify_generated_files "$output_dir"
+        return
     fi
     
-    # HTMLファイルの抽出（ゲーム固有のファイル名に対応）
-    echo -e "${BLUE}    HTMLファイルを作成中...${NC}"
-    
-    # 実装結果から実際のファイル名を検出（複数パターンに対応）
-    local html_files=$(grep -E "\*\*[^*]*\.html\*\*" "$impl_file" | sed -E 's/.*\*\*([^*]+\.html)\*\*.*/\1/' | head -1)
-    
-    # index.htmlを優先的に検索
-    if grep -q "index\.html" "$impl_file"; then
-        html_files="index.html"
-    fi
-    
-    # デバッグ情報の表示
-    echo -e "${CYAN}      検索されたHTMLファイル名: $html_files${NC}"
-    
-    if [ -n "$html_files" ]; then
-        echo -e "${CYAN}      検出されたHTMLファイル: $html_files${NC}"
-        
-        # HTMLファイルのコード抽出を試みる（改善版）
-        # パターン1: **index.html**形式の直後
-        if awk "/\*\*${html_files}\*\*/,/\`\`\`$/" "$impl_file" | awk '/```html/,/```/' | grep -v '```' | grep -v "^\*\*" > "$output_dir/index.html.tmp" && [ -s "$output_dir/index.html.tmp" ]; then
-            mv "$output_dir/index.html.tmp" "$output_dir/index.html"
-            echo -e "${GREEN}      ✓ ${html_files}から抽出完了${NC}"
-        # パターン2: 一般的な```で囲まれたコード
-        elif awk "/$html_files/,/\`\`\`/" "$impl_file" | awk '/```/,/```/' | grep -v '```' > "$output_dir/index.html.tmp" && [ -s "$output_dir/index.html.tmp" ]; then
-            mv "$output_dir/index.html.tmp" "$output_dir/index.html"
-            echo -e "${GREEN}      ✓ コードブロックから抽出完了${NC}"
-        # パターン3: ```htmlブロックを直接検索（ファイル名に依存しない）
-        elif awk '/```html/,/```/' "$impl_file" | grep -v '```' > "$output_dir/index.html.tmp" && [ -s "$output_dir/index.html.tmp" ]; then
-            mv "$output_dir/index.html.tmp" "$output_dir/index.html"
-            echo -e "${GREEN}      ✓ HTMLコードブロックから抽出完了${NC}"
-        # パターン4: 最初の<!DOCTYPE html>から</html>までを抽出
-        elif awk '/<!DOCTYPE html>/,/<\/html>/' "$impl_file" > "$output_dir/index.html.tmp" && [ -s "$output_dir/index.html.tmp" ]; then
-            mv "$output_dir/index.html.tmp" "$output_dir/index.html"
-            echo -e "${GREEN}      ✓ HTMLタグから抽出完了${NC}"
-        # パターン5: 任意のHTMLファイル名のコードブロックを検出
-        elif awk "/\*\*[^*]*\.html\*\*/,/\`\`\`/" "$impl_file" | awk '/```html/,/```/' | grep -v '```' > "$output_dir/index.html.tmp" && [ -s "$output_dir/index.html.tmp" ]; then
-            mv "$output_dir/index.html.tmp" "$output_dir/index.html"
-            echo -e "${GREEN}      ✓ 任意のHTMLファイルから抽出完了${NC}"
-        # パターン6: 全体から最大のHTMLコードブロックを抽出
-        elif awk '/```html/,/```/' "$impl_file" | grep -v '```' | head -1000 > "$output_dir/index.html.tmp" && [ -s "$output_dir/index.html.tmp" ]; then
-            mv "$output_dir/index.html.tmp" "$output_dir/index.html"
-            echo -e "${GREEN}      ✓ 最大HTMLブロックから抽出完了${NC}"
-        else
-            echo -e "${YELLOW}      ⚠ コード抽出に失敗、フォールバック実行${NC}"
-            echo -e "${CYAN}      デバッグ: 実装ファイルの内容を確認${NC}"
-            echo "      HTML参照数: $(grep -c '\*\*[^*]*\.html\*\*' "$impl_file" 2>/dev/null || echo "0")"
-            echo "      HTMLブロック数: $(grep -c '```html' "$impl_file" 2>/dev/null || echo "0")"
-            echo "      DOCTYPE数: $(grep -c '<!DOCTYPE html' "$impl_file" 2>/dev/null || echo "0")"
-            create_fallback_html "$output_dir/index.html" "$app_name"
-        fi
-        
-        # 抽出されたHTMLファイルの内容チェック
-        if [ -f "$output_dir/index.html" ]; then
-            if grep -q "実装済み\|省略\|プレースホルダー" "$output_dir/index.html"; then
-                echo -e "${RED}      ✗ 抽出されたHTMLにプレースホルダーが含まれています${NC}"
-                echo -e "${YELLOW}      → フォールバックページに置き換えます${NC}"
-                create_fallback_html "$output_dir/index.html" "$app_name"
-            elif [ $(wc -l < "$output_dir/index.html") -lt 10 ]; then
-                echo -e "${RED}      ✗ 抽出されたHTMLが短すぎます ($(wc -l < "$output_dir/index.html")行)${NC}"
-                echo -e "${YELLOW}      → フォールバックページに置き換えます${NC}"
-                create_fallback_html "$output_dir/index.html" "$app_name"
-            fi
-        fi
-        rm -f "$output_dir/index.html.tmp"
-    else
-        echo -e "${YELLOW}    HTMLファイルの参照が見つからない、```htmlブロックを検索${NC}"
-        # ファイル名が見つからない場合でも```htmlブロックを検索
-        if awk '/```html/,/```/' "$impl_file" | grep -v '```' > "$output_dir/index.html" && [ -s "$output_dir/index.html" ]; then
-            echo -e "${GREEN}    ✓ HTMLコードブロックから直接抽出成功${NC}"
-        else
-            echo -e "${YELLOW}    フォールバック実行${NC}"
-            create_fallback_html "$output_dir/index.html" "$app_name"
-        fi
-    fi
-    
-    # README.mdの抽出（改善版）
-    echo -e "${BLUE}    README.mdを作成中...${NC}"
+    # デバッグ情報（実装結果ファイルのサイズと先頭部分を表示）
+    echo -e "${CYAN}      実装結果: $(wc -c < "$impl_file") bytes${NC}"
+    echo -e "${CYAN}      実装結果の先頭部分:${NC}"
+    head -5 "$impl_file" | sed 's/^/        /'
     
-    # 実装結果から実際のREADMEファイル名を検出
-    local readme_files=$(grep -E "\*\*[^*]*\.md\*\*" "$impl_file" | sed -E 's/.*\*\*([^*]+\.md)\*\*.*/\1/' | head -1)
+    # 応答を1回だけ走査し、全コードブロックをファイル名見出し・言語に従って一度に書き出す
+    # 抽出結果の一覧は <実装結果>_files.json に保存する
+    local manifest="${impl_file%.*}_files.json"
+    claudeflow_call codeblocks "$impl_file" -o "$output_dir" --manifest "$manifest" --summary \
+        | sed 's/^/      /' || true
     
-    # README.mdを優先的に検索
-    if grep -q "README\.md" "$impl_file"; then
-        readme_files="README.md"
+    # 抽出されたHTMLファイルの内容チェック
+    if [ ! -s "$output_dir/index.html" ]; then
+        echo -e "${YELLOW}      ⚠ index.htmlを抽出できませんでした（要約のみでコードが生成されなかった可能性があります）${NC}"
+        create_fallback_html "$output_dir/index.html" "$app_name"
+    elif grep -q "実装済み\|省略\|プレースホルダー" "$output_dir/index.html"; then
+        echo -e "${RED}      ✗ 抽出されたHTMLにプレースホルダーが含まれています${NC}"
+        echo -e "${YELLOW}      → フォールバックページに置き換えます${NC}"
+        create_fallback_html "$output_dir/index.html" "$app_name"
+    elif [ $(wc -l < "$output_dir/index.html") -lt 10 ]; then
+        echo -e "${RED}      ✗ 抽出されたHTMLが短すぎます ($(wc -l < "$output_dir/index.html")行)${NC}"
+        echo -e "${YELLOW}      → フォールバックページに置き換えます${NC}"
+        create_fallback_html "$output_dir/index.html" "$app_name"
     fi
     
-    # デバッグ情報の表示
-    echo -e "${CYAN}      検索されたREADMEファイル名: $readme_files${NC}"
-    
-    if [ -n "$readme_files" ]; then
-        echo -e "${CYAN}      検出されたREADMEファイル: $readme_files${NC}"
-        
-        # READMEファイルのコード抽出を試みる（複数パターン対応）
-        # パターン1: **README.md**形式の直後
-        if awk "/\*\*${readme_files}\*\*/,/\`\`\`$/" "$impl_file" | awk '/```markdown/,/```/' | grep -v '```' | grep -v "^\*\*" > "$output_dir/README.md.tmp" && [ -s "$output_dir/README.md.tmp" ]; then
-            mv "$output_dir/README.md.tmp" "$output_dir/README.md"
-            echo -e "${GREEN}      ✓ ${readme_files}から抽出完了${NC}"
-        elif awk "/$readme_files/,/\`\`\`/" "$impl_file" | awk '/```md/,/```/' | grep -v '```' > "$output_dir/README.md.tmp" && [ -s "$output_dir/README.md.tmp" ]; then
-            mv "$output_dir/README.md.tmp" "$output_dir/README.md"
-            echo -e "${GREEN}      ✓ コードブロックから抽出完了${NC}"
-        # パターン3: ```markdownブロックを直接検索
-        elif awk '/```markdown/,/```/' "$impl_file" | grep -v '```' > "$output_dir/README.md.tmp" && [ -s "$output_dir/README.md.tmp" ]; then
-            mv "$output_dir/README.md.tmp" "$output_dir/README.md"
-            echo -e "${GREEN}      ✓ Markdownブロックから抽出完了${NC}"
-        else
-            create_fallback_readme "$output_dir/README.md" "$app_name"
-        fi
-        rm -f "$output_dir/README.md.tmp"
-    else
-        echo -e "${YELLOW}    READMEファイルの参照が見つからない、```markdownブロックを検索${NC}"
-        # ファイル名が見つからない場合でも```markdownブロックを検索
-        if awk '/```markdown/,/```/' "$impl_file" | grep -v '```' > "$output_dir/README.md" && [ -s "$output_dir/README.md" ]; then
-            echo -e "${GREEN}    ✓ Markdownブロックから直接抽出成功${NC}"
-        elif awk '/```md/,/```/' "$impl_file" | grep -v '```' > "$output_dir/README.md" && [ -s "$output_dir/README.md" ]; then
-            echo -e "${GREEN}    ✓ mdブロックから直接抽出成功${NC}"
-        else
-            create_fallback_readme "$output_dir/README.md" "$app_name"
-        fi
+    if [ ! -s "$output_dir/README.md" ]; then
+        create_fallback_readme "$output_dir/README.md" "$app_name"
     fi
     
     # ファイル生成の検証
@@ -598,6 +494,11 @@ verify_generated_files() {
 
 extract_and_create_files "$APP_DIR/implementation_result.md" "$APP_DIR" "$original_app_name"
 
+# 選択した機能をアプリと一緒に残す（次回以降の機能の行数見積もりの学習に使う）
+if [ -f "$RESULTS_DIR/features.json" ]; then
+    cp "$RESULTS_DIR/features.json" "$APP_DIR/codefit_features.json"
+fi
+
 # 行数制限チェック
 echo -e "${BLUE}  行数制限チェックを実行中...${NC}"
 line_check_result=0
@@ -648,7 +549,7 @@ $(cat "$APP_DIR/implementation_result.md")
 
 問題があれば修正案を提示してください。"
 
-echo "$test_prompt" | claude --print --dangerously-skip-permissions --allowedTools 'Bash Write Edit MultiEdit Read LS Glob Grep' > "$APP_DIR/test_result.md"
+claude_cached "$test_prompt" "$APP_DIR/test_result.md"
 
 echo -e "${GREEN}  ✅ 実装+テスト完了${NC}"
 echo ""
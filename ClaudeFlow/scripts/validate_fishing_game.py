@@ -1,18 +1,13 @@
 #!/usr/bin/env python3
 """
 魚釣りゲームの詳細検証スクリプト
+（HTML解析と問題検出は統合検証エンジンを使用）
 """
 
-import os
 import re
-import json
+import sys
 
-def extract_js_from_html(html_content):
-    """HTMLからJavaScriptコードを抽出"""
-    js_match = re.search(r'<script>(.*?)</script>', html_content, re.DOTALL)
-    if js_match:
-        return js_match.group(1)
-    return None
+from claudeflow.validation import load_document, run_rules
 
 def analyze_fish_data(js_code):
     """魚データの詳細解析"""
@@ -110,53 +105,43 @@ def check_game_functionality(js_code):
     
     return results
 
-def check_potential_issues(html_content, js_code):
+def check_potential_issues(doc):
     """潜在的な問題のチェック"""
-    issues = []
-    
-    # セキュリティチェック
-    if 'eval(' in js_code:
-        issues.append("⚠️ eval()の使用 - セキュリティリスクの可能性")
-    
-    if 'innerHTML' in js_code and not 'textContent' in js_code:
-        issues.append("⚠️ innerHTMLのみ使用 - XSSリスクの可能性")
-    
-    # パフォーマンスチェック
-    dom_access_count = len(re.findall(r'getElementById', js_code))
-    if dom_access_count > 50:
-        issues.append(f"⚠️ DOM要素への頻繁なアクセス ({dom_access_count}回) - パフォーマンスに影響の可能性")
-    
+    # セキュリティ・パフォーマンスチェックはルールとして検出
+    findings = run_rules(doc, 'js.eval,js.inner_html,js.dom_access')
+    issues = [f"⚠️ {finding.message}" for finding in findings]
+
     # ブラウザ互換性
+    js_code = doc.script_text
     if 'AudioContext' in js_code and 'webkitAudioContext' in js_code:
         issues.append("✅ AudioContextのクロスブラウザ対応実装")
     elif 'AudioContext' in js_code:
         issues.append("⚠️ AudioContext - Safari旧バージョンで動作しない可能性")
-    
+
     # モバイル対応
-    if 'viewport' in html_content:
+    if 'viewport' in doc.text:
         issues.append("✅ モバイル対応のviewport設定")
     
-    if '@media' in html_content:
+    if '@media' in doc.text:
         issues.append("✅ レスポンシブデザイン対応")
     
     return issues
 
 def main():
     """メイン処理"""
-    file_path = '/mnt/c/makeProc/ClaudeFlow/ClaudeFlow/scripts/fishinggame.html'
+    file_path = sys.argv[1] if len(sys.argv) > 1 else '/mnt/c/makeProc/ClaudeFlow/ClaudeFlow/scripts/fishinggame.html'
     
     print("=" * 60)
     print("🎣 魚釣りゲーム詳細検証レポート")
     print("=" * 60)
     
-    if not os.path.exists(file_path):
+    try:
+        doc = load_document(file_path)
+    except OSError:
         print(f"❌ エラー: ファイルが見つかりません: {file_path}")
         return
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    js_code = extract_js_from_html(content)
+    js_code = doc.script_text
     if not js_code:
         print("❌ JavaScriptコードが見つかりません")
         return
@@ -206,7 +191,7 @@ def main():
     # 潜在的な問題
     print("\n🔍 潜在的な問題と特徴")
     print("-" * 40)
-    issues = check_potential_issues(content, js_code)
+    issues = check_potential_issues(doc)
     for issue in issues:
         print(f"  {issue}")
     
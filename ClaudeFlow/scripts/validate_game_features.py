@@ -1,8 +1,16 @@
+#!/usr/bin/env python3
+"""魚釣りゲームの機能キーワードチェック（統合検証エンジンのDocumentを使用）"""
+
 import re
+import sys
+
+from claudeflow.validation import load_document, run_rules
 
-# HTMLファイルを読み込む
-with open('fishinggame.html', 'r', encoding='utf-8') as f:
-    content = f.read()
+file_path = sys.argv[1] if len(sys.argv) > 1 else 'fishinggame.html'
+
+# HTMLファイルを一度だけ読み込んで解析
+doc = load_document(file_path)
+content = doc.text
 
 print('=== 魚釣りゲーム機能チェック ===\n')
 
@@ -38,7 +46,7 @@ for feature, keywords in features.items():
 # ゲームロジックの確認
 print('\n✅ ゲームロジック:')
 logic_patterns = {
-    '釣り開始処理': r'startFishing < /dev/null | cast',
+    '釣り開始処理': r'startFishing|cast',
     '魚の判定': r'checkBite|catchFish',
     '時間経過': r'timeSystem|updateTime',
     'スコア管理': r'score|points',
@@ -68,4 +76,11 @@ for element, keyword in ui_elements.items():
     if keyword in content:
         print(f'  - {element}: 実装済み')
 
+# 必須要素・ゲーム関数（fishingルールセット）
+missing = run_rules(doc, 'fishing.core_elements,fishing.game_functions')
+if missing:
+    print('\n⚠️  不足:')
+    for finding in missing:
+        print(f'  - {finding.message}')
+
 print('\n=== チェック完了 ===')
@@ -1,107 +1,24 @@
 #!/usr/bin/env python3
-import re
-import json
+"""パックマンゲーム実装の検証（統合検証エンジンのpacmanルールセットを使用）"""
 
-def check_html():
-    """HTML構文の基本チェック"""
-    with open('index.html', 'r', encoding='utf-8') as f:
-        html = f.read()
-    
-    errors = []
-    
-    # DOCTYPEチェック
-    if not html.startswith('<!DOCTYPE html>'):
-        errors.append('DOCTYPEが正しくありません')
-    
-    # タグのペアチェック
-    tags = ['html', 'head', 'body', 'title', 'style', 'script', 'div', 'canvas', 'button', 'span']
-    for tag in tags:
-        open_count = len(re.findall(f'<{tag}[\\s>]', html, re.IGNORECASE))
-        close_count = len(re.findall(f'</{tag}>', html, re.IGNORECASE))
-        if open_count != close_count:
-            errors.append(f'{tag}タグの開始と終了が一致しません: 開始={open_count}, 終了={close_count}')
-    
-    # 必須要素チェック
-    if '<title>' not in html:
-        errors.append('titleタグがありません')
-    if 'charset=' not in html:
-        errors.append('文字エンコーディング指定がありません')
-    if '<canvas' not in html:
-        errors.append('canvasタグがありません')
-    
-    return errors
+import sys
 
-def check_javascript():
-    """JavaScript構文の基本チェック"""
-    with open('index.html', 'r', encoding='utf-8') as f:
-        html = f.read()
-    
-    # scriptタグ内のJavaScriptを抽出
-    script_match = re.search(r'<script>(.*?)</script>', html, re.DOTALL)
-    if not script_match:
-        return ['JavaScriptコードが見つかりません']
-    
-    js_code = script_match.group(1)
-    errors = []
-    
-    # 基本的な構文チェック
-    # 括弧のバランス
-    open_parens = js_code.count('(')
-    close_parens = js_code.count(')')
-    if open_parens != close_parens:
-        errors.append(f'括弧のバランスが崩れています: ( = {open_parens}, ) = {close_parens}')
-    
-    open_braces = js_code.count('{')
-    close_braces = js_code.count('}')
-    if open_braces != close_braces:
-        errors.append(f'波括弧のバランスが崩れています: {{ = {open_braces}, }} = {close_braces}')
-    
-    open_brackets = js_code.count('[')
-    close_brackets = js_code.count(']')
-    if open_brackets != close_brackets:
-        errors.append(f'角括弧のバランスが崩れています: [ = {open_brackets}, ] = {close_brackets}')
-    
-    # 重要な変数/関数の存在チェック
-    required_items = [
-        'canvas', 'ctx', 'gameState', 'score', 'level', 'lives',
-        'pacman', 'ghosts', 'maze', 'startGame', 'gameLoop', 'updatePacman'
-    ]
-    
-    for item in required_items:
-        if item not in js_code:
-            errors.append(f'必須の変数/関数 "{item}" が見つかりません')
-    
-    return errors
+from claudeflow.validation import load_document, run_rules
+from claudeflow.validation.rulesets.pacman import missing_features as find_missing_features
+
+HTML_RULES = 'html.parse,html.doctype,html.tags,html.charset,pacman.canvas'
+JS_RULES = 'js.brackets,pacman.required_identifiers'
 
-def check_game_features():
-    """ゲーム機能の実装チェック"""
-    with open('index.html', 'r', encoding='utf-8') as f:
-        html = f.read()
-    
-    features = {
-        'パックマン描画': 'drawPacman' in html,
-        'ゴースト描画': 'drawGhosts' in html,
-        '迷路描画': 'drawMaze' in html,
-        'キーボード操作': 'keydown' in html,
-        'タッチ操作': 'touchstart' in html,
-        'スコア管理': 'score' in html and 'updateUI' in html,
-        'ライフ管理': 'lives' in html,
-        'レベル進行': 'level' in html,
-        'サウンド': 'AudioContext' in html,
-        'ローカルストレージ': 'localStorage' in html,
-        '衝突判定': 'checkCollisions' in html,
-        'パワーモード': 'powerMode' in html
-    }
-    
-    missing = [name for name, exists in features.items() if not exists]
-    return missing
 
 def main():
+    file_path = sys.argv[1] if len(sys.argv) > 1 else 'index.html'
+    doc = load_document(file_path)
+
     print("パックマンゲーム実装の検証を開始します...\n")
     
     # HTML構文チェック
     print("1. HTML構文チェック:")
-    html_errors = check_html()
+    html_errors = [finding.message for finding in run_rules(doc, HTML_RULES)]
     if not html_errors:
         print("   ✓ エラーなし")
     else:
@@ -111,7 +28,10 @@ def main():
     
     # JavaScript構文チェック
     print("\n2. JavaScript基本構文チェック:")
-    js_errors = check_javascript()
+    if doc.scripts:
+        js_errors = [finding.message for finding in run_rules(doc, JS_RULES)]
+    else:
+        js_errors = ['JavaScriptコードが見つかりません']
     if not js_errors:
         print("   ✓ エラーなし")
     else:
@@ -121,7 +41,7 @@ def main():
     
     # ゲーム機能チェック
     print("\n3. ゲーム機能実装チェック:")
-    missing_features = check_game_features()
+    missing_features = find_missing_features(doc)
     if not missing_features:
         print("   ✓ すべての主要機能が実装されています")
     else:
@@ -140,4 +60,4 @@ def main():
         print("  上記の問題を修正することを推奨します")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
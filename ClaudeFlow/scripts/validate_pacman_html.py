@@ -2,112 +2,51 @@
 """パックマンゲームのHTMLファイルを検証するスクリプト"""
 
 import re
-import json
 import sys
-from html.parser import HTMLParser
 
-class HTMLValidator(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self.errors = []
-        self.warnings = []
-        self.tag_stack = []
-        self.has_doctype = False
-        self.has_head = False
-        self.has_body = False
-        self.has_title = False
-        self.javascript_errors = []
-        
-    def handle_decl(self, decl):
-        if decl.lower() == 'doctype html':
-            self.has_doctype = True
-            
-    def handle_starttag(self, tag, attrs):
-        self.tag_stack.append(tag)
-        if tag == 'head':
-            self.has_head = True
-        elif tag == 'body':
-            self.has_body = True
-        elif tag == 'title':
-            self.has_title = True
-            
-    def handle_endtag(self, tag):
-        if self.tag_stack and self.tag_stack[-1] == tag:
-            self.tag_stack.pop()
-        else:
-            self.errors.append(f"不適切な終了タグ: </{tag}>")
-            
-    def handle_data(self, data):
-        # JavaScript内の基本的な構文チェック
-        if self.tag_stack and self.tag_stack[-1] == 'script':
-            # よくあるJavaScriptエラーをチェック
-            if re.search(r'\bfunction\s+\w+\s*\([^)]*\)\s*{(?![^}]*})', data):
-                self.javascript_errors.append("関数の閉じ括弧が不足している可能性")
-            if data.count('{') != data.count('}'):
-                self.javascript_errors.append("中括弧の数が一致しません")
-            if data.count('(') != data.count(')'):
-                self.javascript_errors.append("丸括弧の数が一致しません")
-            if data.count('[') != data.count(']'):
-                self.javascript_errors.append("角括弧の数が一致しません")
+from claudeflow.validation import load_document, run_rules
+from claudeflow.validation.rulesets.pacman import REQUIRED_IDS
+
 
 def validate_pacman_html(filename):
     """パックマンHTMLファイルを検証"""
     print(f"=== {filename} の検証開始 ===\n")
     
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            content = f.read()
+        doc = load_document(filename)
     except Exception as e:
         print(f"❌ ファイル読み込みエラー: {e}")
         return False
+    content = doc.text
     
-    # HTMLパーサーで検証
-    parser = HTMLValidator()
-    try:
-        parser.feed(content)
-    except Exception as e:
-        print(f"❌ HTML解析エラー: {e}")
+    if doc.parse_error:
+        print(f"❌ HTML解析エラー: {doc.parse_error}")
         return False
     
     # 基本的なHTML構造チェック
     print("【HTML構造チェック】")
-    if parser.has_doctype:
-        print("✅ DOCTYPE宣言: OK")
-    else:
-        print("❌ DOCTYPE宣言: 見つかりません")
-        
-    if parser.has_head:
-        print("✅ <head>タグ: OK")
-    else:
-        print("❌ <head>タグ: 見つかりません")
-        
-    if parser.has_body:
-        print("✅ <body>タグ: OK")
-    else:
-        print("❌ <body>タグ: 見つかりません")
-        
-    if parser.has_title:
-        print("✅ <title>タグ: OK")
-    else:
-        print("❌ <title>タグ: 見つかりません")
+    structure = [
+        (not run_rules(doc, 'html.doctype'), "DOCTYPE宣言"),
+        (doc.tag_count.get('head'), "<head>タグ"),
+        (doc.tag_count.get('body'), "<body>タグ"),
+        (doc.tag_count.get('title'), "<title>タグ"),
+    ]
+    for ok, desc in structure:
+        if ok:
+            print(f"✅ {desc}: OK")
+        else:
+            print(f"❌ {desc}: 見つかりません")
     
-    if parser.tag_stack:
-        print(f"❌ 閉じられていないタグ: {parser.tag_stack}")
+    unclosed = [issue.tag for issue in doc.tag_issues if issue.kind == 'unclosed']
+    if unclosed:
+        print(f"❌ 閉じられていないタグ: {unclosed}")
     else:
         print("✅ すべてのタグが適切に閉じられています")
     
     # パックマンゲーム特有の要素チェック
     print("\n【ゲーム要素チェック】")
-    required_elements = [
-        ('gameCanvas', 'Canvas要素'),
-        ('score', 'スコア表示'),
-        ('lives', 'ライフ表示'),
-        ('menu', 'メニュー'),
-        ('gameOver', 'ゲームオーバー画面')
-    ]
-    
-    for elem_id, desc in required_elements:
-        if f'id="{elem_id}"' in content or f"id='{elem_id}'" in content:
+    for elem_id, desc in REQUIRED_IDS:
+        if doc.has_id(elem_id):
             print(f"✅ {desc} (#{elem_id}): OK")
         else:
             print(f"❌ {desc} (#{elem_id}): 見つかりません")
@@ -159,20 +98,22 @@ def validate_pacman_html(filename):
             print(f"⚠️  {desc}: 未実装の可能性")
     
     # エラーと警告の表示
-    if parser.errors:
+    html_errors = run_rules(doc, 'html.tags,html.duplicate_ids')
+    if html_errors:
         print("\n【HTMLエラー】")
-        for error in parser.errors:
-            print(f"❌ {error}")
+        for error in html_errors:
+            print(f"❌ Line {error.line}: {error.message}")
     
-    if parser.javascript_errors:
+    js_errors = run_rules(doc, 'js.brackets')
+    if js_errors:
         print("\n【JavaScript潜在的エラー】")
-        for error in parser.javascript_errors:
-            print(f"⚠️  {error}")
+        for error in js_errors:
+            print(f"⚠️  Line {error.line}: {error.message}")
     
     # ファイルサイズと行数
     print(f"\n【ファイル情報】")
-    lines = content.count('\n') + 1
-    size = len(content.encode('utf-8'))
+    lines = doc.line_count
+    size = doc.size
     print(f"📊 行数: {lines}行")
     print(f"📊 サイズ: {size:,}バイト ({size/1024:.1f}KB)")
     
@@ -183,7 +124,7 @@ def validate_pacman_html(filename):
     
     # 総合評価
     print("\n【総合評価】")
-    if not parser.errors and parser.has_doctype and parser.has_head and parser.has_body:
+    if not html_errors and all(ok for ok, _ in structure[:3]):
         print("✅ 基本的なHTML構造は問題ありません")
         print("✅ パックマンゲームとして必要な要素が含まれています")
         print("\n⭐ ブラウザで開いて実際の動作確認を推奨します")
@@ -193,4 +134,4 @@ def validate_pacman_html(filename):
         return False
 
 if __name__ == "__main__":
-    validate_pacman_html("/mnt/c/makeProc/ClaudeFlow/ClaudeFlow/scripts/index.html")
\ No newline at end of file
+    validate_pacman_html(sys.argv[1] if len(sys.argv) > 1 else "/mnt/c/makeProc/ClaudeFlow/ClaudeFlow/scripts/index.html")
\ No newline at end of file
@@ -17,19 +17,45 @@ show_usage() {
     -f, --file <file>    特定のログファイルを表示
     -e, --errors         エラーのみ表示
     -s, --summary        サマリー表示
-    -p, --progress       進捗CSVを表示
+    -p, --progress       実装進捗を表示
     -t, --tail <n>       最後のn行のみ表示
     -g, --grep <pattern> パターンでフィルタリング
+    -r, --run <id>       実行IDで絞り込む（デフォルト: 最新の実行、all ですべて）
+    -F, --feature <id>   機能IDで絞り込む（カンマ区切りで複数指定可）
+        --since <time>   この時刻以降（例: "2024-01-15 10:00"）
+        --until <time>   この時刻以前
     -h, --help           このヘルプを表示
 
+    イベントログ（$EVENT_LOG_DIR）がある場合、-e / -s / -g と絞り込みは
+    索引を使って該当する記録だけを読みます（-f 指定時はテキストログを検索します）
+
 例:
     $0                   # 最新のログを表示
     $0 --errors          # 最新のログからエラーのみ表示
     $0 --summary         # 実行サマリーを表示
     $0 --grep "feature_001" # feature_001に関するログのみ表示
+    $0 --feature feature_001 --run all  # すべての実行からfeature_001の記録を表示
 EOF
 }
 
+# イベントログを検索する（query / summary と追加の条件）
+query_events() {
+    local command="$1"
+    shift
+    
+    local options=()
+    [ "$run_id" != "all" ] && options+=(--run "${run_id:-latest}")
+    [ -n "$feature_ids" ] && options+=(--feature "$feature_ids")
+    [ -n "$since" ] && options+=(--since "$since")
+    [ -n "$until" ] && options+=(--until "$until")
+    claudeflow_call eventlog --dir "$EVENT_LOG_DIR" "$command" "${options[@]}" "$@"
+}
+
+# イベントログが使えるか（ログファイルを指定していない場合のみ）
+use_event_log() {
+    [ -z "$log_file" ] && compgen -G "$EVENT_LOG_DIR/events*.jsonl*" > /dev/null
+}
+
 # 最新のログファイルを取得
 get_latest_log() {
     if [ -d "$LOG_DIR" ]; then
@@ -90,24 +116,21 @@ show_summary() {
     echo "  進行中: $((total_features - completed_features))"
 }
 
-# 進捗CSV表示
+# 進捗表示（最近の記録・統計・時間のかかった機能・フェーズごとの失敗率）
 show_progress() {
-    if [ -f "$PROGRESS_CSV" ]; then
+    if [ -f "$PROGRESS_DB" ]; then
         echo -e "${CYAN}=== 実装進捗 ===${NC}"
-        column -t -s',' "$PROGRESS_CSV" | head -20
+        claudeflow_call progress --db "$PROGRESS_DB" show --limit "${tail_lines:-20}"
         
         echo ""
-        echo "統計:"
-        local total=$(tail -n +2 "$PROGRESS_CSV" | wc -l)
-        local success=$(tail -n +2 "$PROGRESS_CSV" | grep -c ",SUCCESS,")
-        local error=$(tail -n +2 "$PROGRESS_CSV" | grep -c ",ERROR,")
+        echo -e "${CYAN}=== 時間のかかった機能 ===${NC}"
+        claudeflow_call progress --db "$PROGRESS_DB" slowest --limit 5
         
-        echo "  総機能数: $total"
-        echo "  成功: $success"
-        echo "  エラー: $error"
-        [ $total -gt 0 ] && echo "  成功率: $((success * 100 / total))%"
+        echo ""
+        echo -e "${CYAN}=== フェーズごとの失敗率 ===${NC}"
+        claudeflow_call progress --db "$PROGRESS_DB" failures
     else
-        echo "進捗CSVファイルが見つかりません: $PROGRESS_CSV"
+        echo "進捗の記録が見つかりません: $PROGRESS_DB"
     fi
 }
 
@@ -117,6 +140,10 @@ main() {
     local log_file=""
     local tail_lines=""
     local grep_pattern=""
+    run_id=""
+    feature_ids=""
+    since=""
+    until=""
     
     # オプション解析
     while [[ $# -gt 0 ]]; do
@@ -154,6 +181,22 @@ main() {
                 grep_pattern="$2"
                 shift 2
                 ;;
+            -r|--run)
+                run_id="$2"
+                shift 2
+                ;;
+            -F|--feature)
+                feature_ids="$2"
+                shift 2
+                ;;
+            --since)
+                since="$2"
+                shift 2
+                ;;
+            --until)
+                until="$2"
+                shift 2
+                ;;
             -h|--help)
                 show_usage
                 exit 0
@@ -175,6 +218,29 @@ main() {
             show_progress
             ;;
         *)
+            if use_event_log && { [ "$mode" = "errors" ] || [ "$mode" = "summary" ] || [ -n "$grep_pattern" ] || \
+                [ -n "$run_id$feature_ids$since$until" ]; }; then
+                echo -e "${CYAN}イベントログ: $EVENT_LOG_DIR${NC}"
+                echo ""
+                case $mode in
+                    errors)
+                        echo -e "${RED}=== エラーログ ===${NC}"
+                        query_events query --status ERROR
+                        ;;
+                    summary)
+                        echo -e "${CYAN}=== 実行サマリー ===${NC}"
+                        query_events summary
+                        ;;
+                    *)
+                        local query_options=()
+                        [ -n "$grep_pattern" ] && query_options+=(--grep "$grep_pattern")
+                        [ -n "$tail_lines" ] && query_options+=(--tail "$tail_lines")
+                        query_events query "${query_options[@]}"
+                        ;;
+                esac
+                return
+            fi
+            
             # ログファイルが指定されていない場合は最新を使用
             if [ -z "$log_file" ]; then
                 log_file=$(get_latest_log)